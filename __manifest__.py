@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 {
     'name': 'KCCA Performance Management Information System',
-    'version': '18.0.1.0.20',
+    'version': '18.0.1.0.26',
     'category': 'Human Resources/Performance',
     'summary': 'Comprehensive Performance Management System for KCCA',
     'description': """
@@ -114,6 +114,8 @@ Hierarchical Structure:
         'views/performance_workflow_views.xml',
         'views/performance_alerts_views.xml',
         'views/audit_log_views.xml',
+        'views/performance_instrumentation_views.xml',
+        'views/performance_period_close_views.xml',
         'views/financial_strategy_views.xml',
         'views/financial_analysis_views.xml',
         'views/financial_integration_views.xml',
@@ -177,6 +179,8 @@ Hierarchical Structure:
             'robust_pmis/static/src/js/kcca_directorate_charts.js',
             # Updated dashboard for Odoo 18 compatibility
             'robust_pmis/static/src/js/performance_dashboard_form.js',
+            # Live dashboard updates over the bus (polls only as a fallback)
+            'robust_pmis/static/src/js/dashboard_realtime.js',
             'robust_pmis/static/src/xml/kcca_directorate_charts.xml',
             # KPI Linkage Dashboard client action
             'robust_pmis/static/src/js/kpi_linkage_dashboard.js',
@@ -3,3 +3,4 @@
 
 from . import portal_controller
 from . import dashboard_controller
+from . import ingest_controller
@@ -2,10 +2,13 @@ from odoo import http
 from odoo.http import request
 import json
 
+from ..models.performance_instrumentation import instrumented
+
 
 class PerformanceDashboardController(http.Controller):
 
     @http.route('/performance/dashboard/data', type='json', auth='user')
+    @instrumented('/performance/dashboard/data')
     def get_dashboard_data(self, filters=None):
         """Return JSON data for dashboard charts and widgets.
         Accepts optional 'filters' dict from the client to provide filtered analytics.
@@ -22,14 +25,14 @@ class PerformanceDashboardController(http.Controller):
             except Exception:
                 filters = None
 
-        # Get real-time metrics
-        realtime_data = dashboard.get_realtime_metrics()
-
-        # Get dashboard analytics (filtered if requested)
+        # Get dashboard analytics (filtered if requested) and real-time metrics;
+        # unfiltered, both come from one section request sharing its intermediates
         if filters:
+            realtime_data = dashboard.get_dashboard_sections(['realtime'])['realtime']
             dashboard_data = dashboard.get_filtered_dashboard_data(filters)
         else:
-            dashboard_data = dashboard.get_dashboard_data()
+            dashboard_data = dashboard.get_dashboard_sections()
+            realtime_data = dashboard_data.pop('realtime')
 
         # Merge real-time metrics with dashboard data without overriding computed averages
         # Keep only totals from realtime to avoid zeroing analytics-driven averages
@@ -51,22 +54,54 @@ class PerformanceDashboardController(http.Controller):
         return dashboard_data
 
     @http.route('/performance/dashboard/summary', type='json', auth='user')
-    def get_summary_stats(self):
-        """Return real-time summary statistics"""
+    @instrumented('/performance/dashboard/summary')
+    def get_summary_stats(self, version=None):
+        """Return real-time summary statistics.
+
+        The payload carries a ``version`` token. A client polling with the
+        token it last received gets ``{'not_modified': True}`` back without
+        any aggregation while the underlying data is unchanged.
+        """
+        current = request.env['performance.dashboard.cache']._get_summary_version()
+        if version and version == current:
+            return {'not_modified': True, 'version': current}
+
+        dashboard = request.env['performance.dashboard'].search([], limit=1)
+        if not dashboard:
+            dashboard = request.env['performance.dashboard'].create({})
+
+        metrics = dashboard.get_realtime_metrics()
+        metrics['version'] = current
+        return metrics
+
+    @http.route('/performance/dashboard/sections', type='json', auth='user')
+    @instrumented('/performance/dashboard/sections')
+    def get_sections(self, sections=None):
+        """Return only the requested dashboard sections (all when ``sections`` is empty)"""
         dashboard = request.env['performance.dashboard'].search([], limit=1)
         if not dashboard:
             dashboard = request.env['performance.dashboard'].create({})
 
-        return dashboard.get_realtime_metrics()
+        return dashboard.get_dashboard_sections(sections)
 
     @http.route('/performance/dashboard/chart/<string:chart_type>', type='json', auth='user')
+    @instrumented('/performance/dashboard/chart/<chart_type>')
     def get_chart_data(self, chart_type):
         """Return specific chart data"""
+        chart_sections = {
+            'goals_performance': 'goals_performance',
+            'distribution': 'distribution',
+            'top_kpis': 'top_kpis',
+        }
+        if chart_type not in chart_sections:
+            return {}
+
         dashboard = request.env['performance.dashboard'].search([], limit=1)
         if not dashboard:
             dashboard = request.env['performance.dashboard'].create({})
 
-        data = dashboard.get_dashboard_data()
+        # Only the section this chart renders is computed
+        data = dashboard.get_dashboard_sections([chart_sections[chart_type]])
 
         if chart_type == 'goals_performance':
             return {
@@ -114,8 +149,6 @@ class PerformanceDashboardController(http.Controller):
 
         return {}
 
-    @http.route('/performance/dashboard/summary', type='json', auth='user')
-
     @http.route(['/odoo/action-<string:xmlid>'], type='http', auth='user')
     def legacy_action_redirect(self, xmlid, **kw):
         """Redirect legacy /odoo/action-<xmlid>?... to /web#action=<xmlid>&...
@@ -184,13 +217,3 @@ class PerformanceDashboardController(http.Controller):
             params.append(f"view_type={kw.get('view_type')}")
         target = '/web#action=robust_pmis.action_division_performance_dashboard' + (('&' + '&'.join(params)) if params else '')
         return request.redirect(target, code=301)
-
-
-    def get_summary_stats(self):
-        """Return summary statistics for dashboard widgets"""
-        dashboard = request.env['performance.dashboard'].search([], limit=1)
-        if not dashboard:
-            dashboard = request.env['performance.dashboard'].create({})
-
-        data = dashboard.get_dashboard_data()
-        return data['summary']
\ No newline at end of file
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+from odoo import http
+from odoo.exceptions import AccessError, UserError
+from odoo.http import request
+
+from ..models.performance_instrumentation import instrumented
+
+
+class PerformanceIngestController(http.Controller):
+
+    @http.route('/performance/indicator/ingest', type='http', auth='bearer', methods=['POST'], csrf=False)
+    @instrumented('/performance/indicator/ingest')
+    def ingest_indicator_values(self, file=None, format=None, on_error='abort', update_current=None, **kw):
+        """Bulk load per-FY indicator targets and actuals.
+
+        The payload is either an uploaded ``file`` or the raw request body, as
+        CSV (``indicator,fy,target,actual`` header) or JSON. ``on_error=skip``
+        loads the valid rows and reports the others; ``update_current=1`` also
+        updates target/current values from current-FY rows.
+
+        Callers authenticate with an API key (``Authorization: Bearer <key>``).
+        The route takes no CSRF token, so browser sessions are refused: a
+        cookie alone would let any site post data on a logged-in user's behalf.
+        """
+        if not request.httprequest.headers.get('Authorization', '').startswith('Bearer '):
+            return request.make_json_response(
+                {'error': "An API key is required: send 'Authorization: Bearer <key>'"}, status=401)
+        if file is not None:
+            content = file.read()
+            filename = (file.filename or '').lower()
+        else:
+            content = request.httprequest.get_data()
+            filename = ''
+        content_type = request.httprequest.mimetype or ''
+        data_format = format or ('csv' if filename.endswith('.csv') or 'csv' in content_type else 'json')
+        if data_format not in ('csv', 'json'):
+            return request.make_json_response({'error': "format must be 'csv' or 'json'"}, status=400)
+
+        try:
+            result = request.env['performance.value.ingest'].ingest_payload(
+                content, data_format,
+                on_error='skip' if on_error == 'skip' else 'abort',
+                update_current=update_current in ('1', 'true', 'True'),
+            )
+        except AccessError as e:
+            return request.make_json_response({'error': str(e)}, status=403)
+        except (UserError, ValueError) as e:
+            # ValidationError is a UserError; ValueError covers malformed CSV/JSON
+            request.env.cr.rollback()
+            return request.make_json_response({'error': str(e)}, status=400)
+        result['errors'] = [{'row': row_no, 'message': message} for row_no, message in result['errors']]
+        return request.make_json_response(result)
@@ -4,6 +4,8 @@ from odoo import http, fields, _
 from odoo.http import request
 from odoo.addons.portal.controllers.portal import CustomerPortal, pager as portal_pager
 
+from ..models.performance_instrumentation import instrumented
+
 
 class KCCAPortalController(CustomerPortal):
 
@@ -21,6 +23,7 @@ class KCCAPortalController(CustomerPortal):
         return values
 
     @http.route(['/my/kcca_performance'], type='http', auth="public", website=True)
+    @instrumented('/my/kcca_performance')
     def portal_kcca_performance(self, page=1, date_begin=None, date_end=None, sortby=None, **kw):
         """KCCA Performance Portal Page"""
         values = self._prepare_portal_layout_values()
@@ -30,8 +33,8 @@ class KCCAPortalController(CustomerPortal):
         directorates = request.env['kcca.directorate'].sudo().search([('active', '=', True)])
         programmes = request.env['kcca.programme'].sudo().search([('active', '=', True)])
         
-        # Calculate summary statistics
-        total_kpis = request.env['key.performance.indicator'].sudo().search_count([('active', '=', True)])
+        # Calculate summary statistics (from the materialized rollups)
+        total_kpis = request.env['performance.rollup'].sudo()._get_totals('kpi')['record_count']
         
         if strategic_goals:
             avg_goal_progress = sum(goal.progress for goal in strategic_goals) / len(strategic_goals)
@@ -61,6 +64,7 @@ class KCCAPortalController(CustomerPortal):
         return request.render("robust_pmis.portal_kcca_performance", values)
 
     @http.route(['/my/kcca_performance/goal/<int:goal_id>'], type='http', auth="public", website=True)
+    @instrumented('/my/kcca_performance/goal/<goal_id>')
     def portal_strategic_goal_detail(self, goal_id, **kw):
         """Strategic Goal Detail Page"""
         goal = request.env['strategic.goal'].sudo().browse(goal_id)
@@ -76,6 +80,7 @@ class KCCAPortalController(CustomerPortal):
         return request.render("robust_pmis.portal_strategic_goal_detail", values)
 
     @http.route(['/my/kcca_performance/directorate/<int:directorate_id>'], type='http', auth="public", website=True)
+    @instrumented('/my/kcca_performance/directorate/<directorate_id>')
     def portal_directorate_detail(self, directorate_id, **kw):
         """Directorate Detail Page"""
         directorate = request.env['kcca.directorate'].sudo().browse(directorate_id)
@@ -91,6 +96,7 @@ class KCCAPortalController(CustomerPortal):
         return request.render("robust_pmis.portal_directorate_detail", values)
 
     @http.route(['/my/kcca_performance/programme/<int:programme_id>'], type='http', auth="public", website=True)
+    @instrumented('/my/kcca_performance/programme/<programme_id>')
     def portal_programme_detail(self, programme_id, **kw):
         """Programme Detail Page"""
         programme = request.env['kcca.programme'].sudo().browse(programme_id)
@@ -106,14 +112,16 @@ class KCCAPortalController(CustomerPortal):
         return request.render("robust_pmis.portal_programme_detail", values)
 
     @http.route(['/kcca_performance/public_dashboard'], type='http', auth="public", website=True)
+    @instrumented('/kcca_performance/public_dashboard')
     def public_performance_dashboard(self, **kw):
         """Public Performance Dashboard"""
         # Get aggregated public data
         strategic_goals = request.env['strategic.goal'].sudo().search([('active', '=', True)])
         directorates = request.env['kcca.directorate'].sudo().search([('active', '=', True)])
         
-        # Calculate public metrics
-        total_kpis = request.env['key.performance.indicator'].sudo().search_count([('active', '=', True)])
+        # Calculate public metrics (KPI figures come from the materialized rollups)
+        Rollup = request.env['performance.rollup'].sudo()
+        total_kpis = Rollup._get_totals('kpi')['record_count']
         total_programmes = request.env['kcca.programme'].sudo().search_count([('active', '=', True)])
         
         # Overall performance metrics
@@ -123,7 +131,9 @@ class KCCAPortalController(CustomerPortal):
             overall_strategic_progress = 0
         
         if directorates:
-            overall_directorate_performance = sum(d.overall_performance for d in directorates) / len(directorates)
+            directorate_stats = Rollup._get_stats('kpi', 'directorate', directorates.ids)
+            overall_directorate_performance = sum(
+                row['avg_achievement'] for row in directorate_stats.values()) / len(directorates)
         else:
             overall_directorate_performance = 0
         
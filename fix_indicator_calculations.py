@@ -135,10 +135,9 @@ def fix_indicator_calculations():
         # Check if computed fields are properly stored
         print(f"\n💾 Verifying Stored Computed Fields...")
         
-        # Force recomputation of all indicators
+        # Force recomputation of all indicators (one set-based UPDATE)
+        env['performance.achievement'].recompute('performance.indicator')
         all_indicators = env['performance.indicator'].search([])
-        all_indicators._compute_achievement()
-        all_indicators._compute_status()
         
         # Check results
         non_zero_achievement = all_indicators.filtered(lambda x: x.achievement_percentage > 0)
@@ -151,6 +151,55 @@ def post_init_hook(env):
     except Exception as e:
         print(f"[post_init] Implementing relations enforcement failed: {e}")
 
+    # Bring stored KPI/indicator achievement and status in line with the loaded values
+    try:
+        res = env['performance.achievement'].sudo().recompute_all()
+        print(f"[post_init] Achievement recomputed: {res}")
+    except Exception as e:
+        print(f"[post_init] Achievement recompute failed: {e}")
+
+    # Fill the stored strategic goal counts, related entities and progress
+    try:
+        env['strategic.goal'].sudo()._refresh_rollups()
+        print("[post_init] Strategic goal rollups refreshed")
+    except Exception as e:
+        print(f"[post_init] Strategic goal rollup refresh failed: {e}")
+
+    # Fill the unified KPI fact table
+    try:
+        env['kpi.unified'].sudo().rebuild()
+        print("[post_init] Unified KPI facts built")
+    except Exception as e:
+        print(f"[post_init] Unified KPI fact build failed: {e}")
+
+    # Fill the strategic-programme analytics materialized view
+    try:
+        env['strategic.programme.analytics'].sudo().refresh(concurrently=False)
+        print("[post_init] Strategic-programme analytics refreshed")
+    except Exception as e:
+        print(f"[post_init] Strategic-programme analytics refresh failed: {e}")
+
+    # Build the materialized performance rollups from the loaded data
+    try:
+        env['performance.rollup'].sudo().refresh_all()
+        print("[post_init] Performance rollups refreshed")
+    except Exception as e:
+        print(f"[post_init] Performance rollup refresh failed: {e}")
+
+    # Build the programme results-chain closure table
+    try:
+        env['programme.hierarchy.closure'].sudo().rebuild_all()
+        print("[post_init] Programme hierarchy closure rebuilt")
+    except Exception as e:
+        print(f"[post_init] Programme hierarchy closure rebuild failed: {e}")
+
+    # Range-partition the audit log and score history tables
+    try:
+        env['performance.history.partition'].sudo().enable_partitioning()
+        print("[post_init] History tables partitioned")
+    except Exception as e:
+        print(f"[post_init] History table partitioning failed: {e}")
+
     # Check if transport programme already exists
     existing_programme = env['kcca.programme'].search([('code', '=', 'ITIS')], limit=1)
     if existing_programme:
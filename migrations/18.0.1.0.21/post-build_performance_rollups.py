@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """Populate the materialized performance rollups for existing data."""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['performance.rollup'].refresh_all()
+    print("[migrate 18.0.1.0.21] Performance rollups built")
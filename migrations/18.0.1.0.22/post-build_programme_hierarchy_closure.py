@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """Populate the programme hierarchy closure table for existing data."""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['programme.hierarchy.closure'].rebuild_all()
+    print("[migrate 18.0.1.0.22] Programme hierarchy closure built")
@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """Move audit.log and performance.score onto range-partitioned tables."""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['performance.history.partition'].enable_partitioning()
+    print("[migrate 18.0.1.0.23] History tables partitioned")
@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """Fill the stored strategic goal counts, related entities and progress."""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    changed = env['strategic.goal']._refresh_rollups()
+    print(f"[migrate 18.0.1.0.24] Strategic goal rollups refreshed ({changed} goal(s) changed)")
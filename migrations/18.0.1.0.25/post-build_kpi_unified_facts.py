@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """Fill the unified KPI fact table from KPIs and programme indicators."""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['kpi.unified'].rebuild()
+    cr.execute("SELECT COUNT(*) FROM kpi_unified")
+    print(f"[migrate 18.0.1.0.25] Unified KPI facts built ({cr.fetchone()[0]} row(s))")
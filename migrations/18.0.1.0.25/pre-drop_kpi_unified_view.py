@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+
+
+def migrate(cr, version):
+    """kpi.unified becomes a table; drop the former UNION view so the ORM can create it."""
+    cr.execute("DROP VIEW IF EXISTS kpi_unified")
@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """The cron data is noupdate; deactivate the quarterly score cron replaced by cron_snapshot_scores."""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    cron = env.ref('robust_pmis.cron_quarterly_score_generation', raise_if_not_found=False)
+    if cron and cron.active:
+        cron.active = False
+        print("[migrate 18.0.1.0.26] Quarterly score generation cron deactivated")
@@ -15,19 +15,32 @@ from . import intervention
 from . import output
 from . import piap_action
 from . import performance_indicator
+from . import performance_value_ingest
+from . import performance_achievement
+from . import programme_hierarchy_closure
 from . import performance_action
 from . import performance_score
+from . import performance_score_summary
 from . import performance_analytics
 from . import performance_workflow
 from . import performance_alerts
+from . import notification_digest
 from . import audit_log
+from . import audit_log_summary
+from . import performance_history_partition
 from . import financial_strategy
 from . import programme_budget
 from . import strategic_programme_analytics
 from . import financial_analysis
 from . import financial_integration
 from . import financial_dashboard
+from . import performance_rollup
 from . import performance_dashboard
+from . import performance_dashboard_cache
+from . import performance_dashboard_engine
+from . import performance_dashboard_live
+from . import performance_period_close
+from . import performance_instrumentation
 
 from . import legacy_cleanup
 from . import settings
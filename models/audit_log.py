@@ -1,7 +1,36 @@
 # -*- coding: utf-8 -*-
 
+import fcntl
+import json
+import logging
+import os
+import time
+from functools import partial
+
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
+from odoo.tools import config
+
+_logger = logging.getLogger(__name__)
+
+
+def _append_spool(path, lines):
+    """Append JSON lines to the audit spool file (runs after commit)."""
+    if not lines:
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    payload = ''.join(line + '\n' for line in lines)
+    while True:
+        with open(path, 'a', encoding='utf-8') as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                # The ingest cron may have renamed the file while we waited for the lock
+                if os.path.exists(path) and os.stat(path).st_ino == os.fstat(handle.fileno()).st_ino:
+                    handle.write(payload)
+                    handle.flush()
+                    return
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
 
 
 class AuditLog(models.Model):
@@ -118,58 +147,62 @@ class AuditLog(models.Model):
         help="Related directorate (if applicable)"
     )
     
-    # Computed fields
+    # Filled when the entry is written (no stored compute on the hot path)
     model_display_name = fields.Char(
         string='Model Display Name',
-        compute='_compute_model_display_name',
-        store=True
+        readonly=True
     )
     
-    @api.depends('model_name')
-    def _compute_model_display_name(self):
-        for record in self:
-            if record.model_name:
-                try:
-                    model = self.env[record.model_name]
-                    record.model_display_name = model._description or record.model_name
-                except KeyError:
-                    record.model_display_name = record.model_name
-            else:
-                record.model_display_name = ''
+    _BUFFER_KEY = 'audit.log.buffer'
+    _SPOOL_KEY = 'audit.log.spool'
+    _INSERT_CHUNK = 1000
+    _AUTO_COLUMNS = ('create_uid', 'create_date', 'write_uid', 'write_date')
+
+    def init(self):
+        cr = self.env.cr
+        # Default list order and the retention cutoff
+        cr.execute("CREATE INDEX IF NOT EXISTS audit_log_create_date_idx ON audit_log (create_date DESC)")
+        cr.execute("CREATE INDEX IF NOT EXISTS audit_log_timestamp_idx ON audit_log (timestamp)")
+        # History of one record
+        cr.execute("""
+            CREATE INDEX IF NOT EXISTS audit_log_record_timestamp_idx
+                ON audit_log (model_name, record_id, timestamp DESC)
+        """)
+
+    @api.model
+    def _get_model_display_name(self, model_name):
+        if not model_name:
+            return ''
+        model = self.env.registry.get(model_name)
+        return (model._description if model is not None else None) or model_name
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        for vals in vals_list:
+            if 'model_display_name' not in vals:
+                vals['model_display_name'] = self._get_model_display_name(vals.get('model_name'))
+        return super().create(vals_list)
     
     @api.model
-    def log_action(self, model_name, record_id, action_type, action_description, 
-                   details=None, field_name=None, old_value=None, new_value=None,
-                   record_name=None, programme_id=None, directorate_id=None):
-        """
-        Create an audit log entry
-        
-        Args:
-            model_name (str): Name of the model
-            record_id (int): ID of the record
-            action_type (str): Type of action performed
-            action_description (str): Description of the action
-            details (str, optional): Detailed information
-            field_name (str, optional): Name of changed field
-            old_value (str, optional): Previous value
-            new_value (str, optional): New value
-            record_name (str, optional): Name of the record
-            programme_id (int, optional): Related programme ID
-            directorate_id (int, optional): Related directorate ID
-        """
-        # Get request context for additional information
+    def _get_request_info(self):
+        """Return (ip address, user agent, session id) of the current request, if any"""
         request = getattr(self.env, 'request', None)
-        ip_address = None
-        user_agent = None
-        session_id = None
-        
-        if request:
-            ip_address = request.httprequest.environ.get('REMOTE_ADDR')
-            user_agent = request.httprequest.environ.get('HTTP_USER_AGENT')
-            session_id = request.session.sid if hasattr(request, 'session') else None
-        
-        # Create the audit log entry
-        return self.create({
+        if not request:
+            return None, None, None
+        return (
+            request.httprequest.environ.get('REMOTE_ADDR'),
+            request.httprequest.environ.get('HTTP_USER_AGENT'),
+            request.session.sid if hasattr(request, 'session') else None,
+        )
+
+    @api.model
+    def _prepare_log_vals(self, model_name, record_id, action_type, action_description,
+                          details=None, field_name=None, old_value=None, new_value=None,
+                          record_name=None, programme_id=None, directorate_id=None,
+                          request_info=None):
+        """Return the create values of an audit log entry (see ``log_action``)"""
+        ip_address, user_agent, session_id = request_info or self._get_request_info()
+        return {
             'model_name': model_name,
             'record_id': record_id,
             'action_type': action_type,
@@ -184,20 +217,15 @@ class AuditLog(models.Model):
             'ip_address': ip_address,
             'user_agent': user_agent,
             'session_id': session_id,
-        })
-    
+            'user_id': self.env.uid,
+            'timestamp': fields.Datetime.now(),
+            'model_display_name': self._get_model_display_name(model_name),
+        }
+
     @api.model
-    def log_field_change(self, record, field_name, old_value, new_value, action_description=None):
-        """
-        Log a field change for a record
-        
-        Args:
-            record: The record that was changed
-            field_name (str): Name of the changed field
-            old_value: Previous value
-            new_value: New value
-            action_description (str, optional): Custom description
-        """
+    def _prepare_field_change_vals(self, record, field_name, old_value, new_value,
+                                   action_description=None, request_info=None):
+        """Return the create values logging a field change of ``record``"""
         if not action_description:
             field_label = record._fields.get(field_name).string if field_name in record._fields else field_name
             action_description = f"{field_label} updated"
@@ -214,7 +242,7 @@ class AuditLog(models.Model):
         if hasattr(record, 'directorate_id') and record.directorate_id:
             directorate_id = record.directorate_id.id
         
-        return self.log_action(
+        return self._prepare_log_vals(
             model_name=record._name,
             record_id=record.id,
             action_type='update',
@@ -224,9 +252,177 @@ class AuditLog(models.Model):
             new_value=new_value,
             record_name=record.display_name,
             programme_id=programme_id,
-            directorate_id=directorate_id
+            directorate_id=directorate_id,
+            request_info=request_info,
         )
+
+    @api.model
+    def log_action(self, model_name, record_id, action_type, action_description, 
+                   details=None, field_name=None, old_value=None, new_value=None,
+                   record_name=None, programme_id=None, directorate_id=None):
+        """
+        Queue an audit log entry; it is written when the transaction commits
+        
+        Args:
+            model_name (str): Name of the model
+            record_id (int): ID of the record
+            action_type (str): Type of action performed
+            action_description (str): Description of the action
+            details (str, optional): Detailed information
+            field_name (str, optional): Name of changed field
+            old_value (str, optional): Previous value
+            new_value (str, optional): New value
+            record_name (str, optional): Name of the record
+            programme_id (int, optional): Related programme ID
+            directorate_id (int, optional): Related directorate ID
+        """
+        return self._buffer([self._prepare_log_vals(
+            model_name, record_id, action_type, action_description,
+            details=details, field_name=field_name, old_value=old_value, new_value=new_value,
+            record_name=record_name, programme_id=programme_id, directorate_id=directorate_id,
+        )])
+    
+    @api.model
+    def log_field_change(self, record, field_name, old_value, new_value, action_description=None):
+        """
+        Log a field change for a record
+        
+        Args:
+            record: The record that was changed
+            field_name (str): Name of the changed field
+            old_value: Previous value
+            new_value: New value
+            action_description (str, optional): Custom description
+        """
+        return self._buffer([self._prepare_field_change_vals(
+            record, field_name, old_value, new_value, action_description=action_description)])
+
+    @api.model
+    def log_field_changes(self, changes):
+        """
+        Log many field changes in one go
+        
+        Args:
+            changes (list): dicts with the ``log_field_change`` arguments
+                (record, field_name, old_value, new_value, action_description)
+        """
+        if not changes:
+            return True
+        request_info = self._get_request_info()
+        return self._buffer([
+            self._prepare_field_change_vals(request_info=request_info, **change)
+            for change in changes
+        ])
     
+    # ------------------------------------------------------------------
+    # Buffered writer
+    # ------------------------------------------------------------------
+    @api.model
+    def _get_backend(self):
+        """Return 'table' (multi-row insert at commit) or 'spool' (append-only JSONL file)."""
+        backend = self.env['ir.config_parameter'].sudo().get_param('robust_pmis.audit_log_backend', 'table')
+        return backend if backend in ('table', 'spool') else 'table'
+
+    @api.model
+    def _get_spool_path(self):
+        path = self.env['ir.config_parameter'].sudo().get_param('robust_pmis.audit_log_spool_dir')
+        if not path:
+            path = os.path.join(config['data_dir'], 'robust_pmis_audit')
+        return os.path.join(path, f'{self.env.cr.dbname}.jsonl')
+
+    @api.model
+    def _buffer(self, vals_list):
+        """Queue audit entries for the current transaction.
+
+        The whole buffer is written with one multi-row ``INSERT`` per chunk when
+        the transaction commits (precommit), or appended to the JSONL spool
+        after the commit when the spool backend is enabled. Entries queued
+        inside a savepoint that is rolled back are dropped with it.
+        """
+        if not vals_list:
+            return True
+        self.browse().check_access('create')
+        data = self.env.cr.precommit.data
+        buffer = data.get(self._BUFFER_KEY)
+        if buffer is None:
+            buffer = data[self._BUFFER_KEY] = []
+            self.env.cr.precommit.add(self._flush_buffer)
+        buffer.extend(vals_list)
+        return True
+
+    @api.model
+    def _flush_buffer(self):
+        """Write the queued entries of the current transaction."""
+        rows = self.env.cr.precommit.data.pop(self._BUFFER_KEY, None)
+        if not rows:
+            return
+        if self._get_backend() == 'spool':
+            spool = self.env.cr.postcommit.data.get(self._SPOOL_KEY)
+            if spool is None:
+                spool = self.env.cr.postcommit.data[self._SPOOL_KEY] = []
+                self.env.cr.postcommit.add(partial(_append_spool, self._get_spool_path(), spool))
+            spool.extend(json.dumps(row, default=str) for row in rows)
+            return
+        self._insert_rows(rows)
+
+    @api.model
+    def _search(self, domain, *args, **kwargs):
+        # Entries of the current transaction stay visible to its own searches
+        if self.env.cr.precommit.data.get(self._BUFFER_KEY):
+            self._flush_buffer()
+        return super()._search(domain, *args, **kwargs)
+
+    @api.model
+    def _insert_rows(self, rows):
+        """Insert ``rows`` (create values) with multi-row INSERT statements, bypassing the ORM."""
+        now = fields.Datetime.now()
+        columns = sorted({fname for row in rows for fname in row
+                          if fname in self._fields and fname not in self._AUTO_COLUMNS})
+        sql_columns = columns + list(self._AUTO_COLUMNS)
+        placeholders = '(' + ', '.join(['%s'] * len(sql_columns)) + ')'
+        for start in range(0, len(rows), self._INSERT_CHUNK):
+            chunk = rows[start:start + self._INSERT_CHUNK]
+            params = []
+            for row in chunk:
+                for fname in columns:
+                    params.append(self._fields[fname].convert_to_column_insert(row.get(fname), self, row))
+                uid = row.get('user_id') or self.env.uid
+                stamp = row.get('timestamp') or now
+                params.extend([uid, stamp, uid, stamp])
+            self.env.cr.execute(
+                f'INSERT INTO {self._table} ({", ".join(sql_columns)}) VALUES '
+                + ', '.join([placeholders] * len(chunk)),
+                params,
+            )
+        self.invalidate_model()
+
+    @api.model
+    def cron_ingest_audit_spool(self):
+        """Load the JSONL spool written by the spool backend into ``audit.log``."""
+        path = self._get_spool_path()
+        if not os.path.exists(path):
+            return True
+        processing = f'{path}.{os.getpid()}.{int(time.time())}'
+        with open(path, 'a', encoding='utf-8') as handle:
+            # Writers re-check the inode under this lock and reopen the new file
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                os.rename(path, processing)
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+        rows = []
+        with open(processing, encoding='utf-8') as handle:
+            for line in handle:
+                line = line.strip()
+                if line:
+                    rows.append(json.loads(line))
+        if rows:
+            self.sudo()._insert_rows(rows)
+            self.env.cr.commit()
+        os.unlink(processing)
+        _logger.info("Ingested %s audit log entries from %s", len(rows), path)
+        return True
+
     def name_get(self):
         result = []
         for record in self:
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields
+
+
+class AuditLogSummary(models.Model):
+    """Monthly counts of compacted ``audit.log`` entries.
+
+    Entries older than the retention window are folded into one row per month,
+    model, action type and user (see ``performance.history.partition``).
+    """
+    _name = 'audit.log.summary'
+    _description = 'Audit Log Summary'
+    _order = 'month desc, model_name'
+    _log_access = False
+
+    _sql_constraints = [
+        ('audit_summary_unique', 'unique(month, model_name, action_type, user_id)',
+         'Only one summary per month, model, action type and user is allowed.'),
+    ]
+
+    month = fields.Date(string='Month', required=True, index=True)
+    model_name = fields.Char(string='Model', required=True)
+    action_type = fields.Char(string='Action Type', required=True)
+    user_id = fields.Many2one('res.users', string='User', required=True, ondelete='restrict')
+    entry_count = fields.Integer(string='Entries')
+    first_timestamp = fields.Datetime(string='First Entry')
+    last_timestamp = fields.Datetime(string='Last Entry')
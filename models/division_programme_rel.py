@@ -445,16 +445,31 @@ class DivisionProgrammeRel(models.Model):
             if division_id and programme_id and 'is_direct' not in vals:
                 vals['is_direct'] = self._compute_is_direct_value(division_id, programme_id)
         records = super().create(vals_list)
+        self.env['performance.rollup']._mark_dirty(records)
+        self.env['strategic.goal']._mark_rollup_dirty(records)
+        self.env['performance.dashboard.cache']._invalidate()
         return records
 
     def write(self, vals):
+        self.env['performance.dashboard.cache']._invalidate()
+        Rollup = self.env['performance.rollup']
+        Rollup._mark_dirty(self)
+        self.env['strategic.goal']._mark_rollup_dirty(self)
         res = super().write(vals)
         # If division or programme changed (or either present in vals), recompute is_direct
         if any(k in vals for k in ('division_id', 'programme_id')):
             for rec in self:
                 rec.is_direct = self._compute_is_direct_value(rec.division_id.id, rec.programme_id.id)
+        Rollup._mark_dirty(self)
+        self.env['strategic.goal']._mark_rollup_dirty(self)
         return res
 
+    def unlink(self):
+        self.env['performance.rollup']._mark_dirty(self)
+        self.env['strategic.goal']._mark_rollup_dirty(self)
+        self.env['performance.dashboard.cache']._invalidate()
+        return super().unlink()
+
     @api.model
     def mark_direct_programme_flags(self):
         """Batch-tag existing relationships where the programme is owned by the same division.
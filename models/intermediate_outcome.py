@@ -172,3 +172,26 @@ class IntermediateOutcome(models.Model):
         action['domain'] = [('output_id.intervention_id.outcome_id', '=', self.id)]
         action['context'] = {'default_outcome_id': self.id}
         return action
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env['programme.hierarchy.closure']._mark_dirty(records)
+        return records
+
+    def write(self, vals):
+        # A move changes the parent programme of the indicators below
+        Closure = self.env['programme.hierarchy.closure']
+        Rollup = self.env['performance.rollup']
+        moved = Closure._is_relevant_write(self._name, vals)
+        if moved:
+            indicators = Rollup._mark_chain_dirty(self)
+        result = super().write(vals)
+        if moved:
+            Closure._mark_dirty(self)
+            Rollup._mark_dirty(indicators)
+        return result
+
+    def unlink(self):
+        self.env['programme.hierarchy.closure']._forget(self)
+        return super().unlink()
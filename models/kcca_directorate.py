@@ -176,12 +176,11 @@ class KCCADirectorate(models.Model):
     
     @api.depends('kpi_ids.achievement_percentage')
     def _compute_performance(self):
+        stats = self.env['performance.rollup']._get_stats(
+            'kpi', 'directorate', [rec._origin.id for rec in self if rec._origin.id])
         for record in self:
-            if record.kpi_ids:
-                total_achievement = sum(kpi.achievement_percentage for kpi in record.kpi_ids)
-                record.overall_performance = total_achievement / len(record.kpi_ids)
-            else:
-                record.overall_performance = 0.0
+            row = stats.get(record._origin.id)
+            record.overall_performance = row['avg_achievement'] if row else 0.0
     
     def action_view_divisions(self):
         """Action to view divisions"""
@@ -458,43 +458,31 @@ class KCCADivision(models.Model):
         - direct: performance.indicator with responsible_division_id == division
         - programme: performance.indicator whose parent_programme_id is in implementing_programme_ids
         Status distribution considers programme indicators as the broader performance picture.
+        Figures are read from the ``performance.rollup`` indicator rows.
         """
-        Indicator = self.env['performance.indicator']
+        Rollup = self.env['performance.rollup']
+        division_ids = [rec._origin.id for rec in self if rec._origin.id]
+        implementing = {rec.id: set(rec.implementing_programme_ids._origin.ids) for rec in self}
+        direct_stats = Rollup._get_stats('indicator', 'division', division_ids)
+        programme_stats = Rollup._get_stats(
+            'indicator', 'parent_programme', set().union(*implementing.values()) if implementing else set())
         for rec in self:
             # Direct KPIs owned by division
-            direct_inds = Indicator.search([('responsible_division_id', '=', rec.id)])
-            rec.direct_pi_count = len(direct_inds)
-            if direct_inds:
-                rec.direct_pi_avg = round(sum(direct_inds.mapped('achievement_percentage')) / len(direct_inds), 2)
-            else:
-                rec.direct_pi_avg = 0.0
+            direct = direct_stats.get(rec._origin.id)
+            rec.direct_pi_count = direct['record_count'] if direct else 0
+            rec.direct_pi_avg = round(direct['achievement_sum'] / direct['record_count'], 2) if direct else 0.0
 
             # Programme KPIs across implementing programmes
-            prog_inds = Indicator.browse()
-            if rec.implementing_programme_ids:
-                prog_inds = Indicator.search([('parent_programme_id', 'in', rec.implementing_programme_ids.ids)])
-            rec.programme_pi_count = len(prog_inds)
-            if prog_inds:
-                rec.programme_pi_avg = round(sum(prog_inds.mapped('achievement_percentage')) / len(prog_inds), 2)
-            else:
-                rec.programme_pi_avg = 0.0
+            rows = [programme_stats[pid] for pid in implementing[rec.id] if pid in programme_stats]
+            count = sum(r['record_count'] for r in rows)
+            rec.programme_pi_count = count
+            rec.programme_pi_avg = round(sum(r['achievement_sum'] for r in rows) / count, 2) if count else 0.0
 
             # Status distribution (using programme indicators to reflect overall picture)
-            high = medium = low = none = 0
-            for ind in prog_inds:
-                ach = ind.achievement_percentage or 0.0
-                if ach == 0:
-                    none += 1
-                elif ach >= 80:
-                    high += 1
-                elif ach >= 50:
-                    medium += 1
-                else:
-                    low += 1
-            rec.pi_high_count = high
-            rec.pi_medium_count = medium
-            rec.pi_low_count = low
-            rec.pi_none_count = none
+            rec.pi_high_count = sum(r['count_high'] for r in rows)
+            rec.pi_medium_count = sum(r['count_medium'] for r in rows)
+            rec.pi_low_count = sum(r['count_low'] for r in rows)
+            rec.pi_none_count = sum(r['count_none'] for r in rows)
 
     # --- Maintenance utilities ---
     @api.model
@@ -503,6 +491,9 @@ class KCCADivision(models.Model):
 
         This addresses stale values persisted before clamps were introduced.
         """
+        # KPIs and indicators: one set-based UPDATE per model
+        achievement = self.env['performance.achievement'].sudo().recompute_all()
+
         # Programmes
         progs = self.env['kcca.programme'].sudo().search([])
         if progs:
@@ -519,6 +510,9 @@ class KCCADivision(models.Model):
             rels._compute_status_indicators()
             rels.flush_recordset()
 
+        # Stored values were rewritten without write(); rebuild the rollups
+        self.env['performance.rollup'].sudo().refresh_all()
+
         # Divisions
         divs = self.sudo().search([])
         if divs:
@@ -528,6 +522,8 @@ class KCCADivision(models.Model):
             divs.flush_recordset()
 
         return {
+            'kpis': achievement['key.performance.indicator'],
+            'indicators': achievement['performance.indicator'],
             'programmes': len(progs),
             'relations': len(rels),
             'divisions': len(divs),
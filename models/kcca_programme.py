@@ -265,6 +265,31 @@ class KCCAProgramme(models.Model):
                 # Check if division belongs to the directorate
                 if record.division_id.directorate_id != record.directorate_id:
                     raise ValidationError(_("If both Directorate and Division are selected, the Division must belong to the selected Directorate."))
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env['programme.hierarchy.closure']._mark_dirty(records)
+        self.env['strategic.goal']._mark_rollup_dirty(records)
+        self.env['performance.dashboard.cache']._invalidate()
+        return records
+
+    def write(self, vals):
+        self.env['performance.dashboard.cache']._invalidate()
+        Goal = self.env['strategic.goal']
+        goal_dirty = Goal._is_rollup_write(self._name, vals)
+        if goal_dirty:
+            Goal._mark_rollup_dirty(self)
+        res = super().write(vals)
+        if goal_dirty:
+            Goal._mark_rollup_dirty(self)
+        return res
+
+    def unlink(self):
+        self.env['programme.hierarchy.closure']._forget(self)
+        self.env['strategic.goal']._mark_rollup_dirty(self)
+        self.env['performance.dashboard.cache']._invalidate()
+        return super().unlink()
     
     def action_view_objectives(self):
         """Action to view programme objectives"""
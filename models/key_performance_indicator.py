@@ -272,9 +272,27 @@ class KeyPerformanceIndicator(models.Model):
                     'target_value': record.target_value,
                 }
 
+        self.env['performance.dashboard.cache']._invalidate()
+        Rollup = self.env['performance.rollup']
+        rollup_dirty = Rollup._is_relevant_write(self._name, vals)
+        if rollup_dirty:
+            Rollup._mark_dirty(self)
+        Goal = self.env['strategic.goal']
+        goal_dirty = Goal._is_rollup_write(self._name, vals)
+        if goal_dirty:
+            Goal._mark_rollup_dirty(self)
+
         # Call parent write method
         result = super().write(vals)
 
+        if rollup_dirty:
+            Rollup._mark_dirty(self)
+        if goal_dirty:
+            Goal._mark_rollup_dirty(self)
+        Unified = self.env['kpi.unified']
+        if Unified._is_relevant_write(self._name, vals):
+            Unified._mark_dirty(self)
+
         # Log value changes in chatter and audit log
         if 'current_value' in vals:
             for record in self:
@@ -312,8 +330,19 @@ class KeyPerformanceIndicator(models.Model):
         # Compute classification fields for all created records in batch
         for rec in records:
             rec._compute_classification_fields()
+        self.env['performance.rollup']._mark_dirty(records)
+        self.env['strategic.goal']._mark_rollup_dirty(records)
+        self.env['kpi.unified']._mark_dirty(records)
+        self.env['performance.dashboard.cache']._invalidate()
         return records
 
+    def unlink(self):
+        self.env['performance.rollup']._mark_dirty(self)
+        self.env['strategic.goal']._mark_rollup_dirty(self)
+        self.env['kpi.unified']._mark_dirty(self)
+        self.env['performance.dashboard.cache']._invalidate()
+        return super().unlink()
+
     @api.depends('kra_id', 'programme_id', 'division_id', 'directorate_id')
     def _compute_classification_fields(self):
         """Compute classification level and parent type based on relationships"""
@@ -398,57 +427,94 @@ class KeyPerformanceIndicator(models.Model):
         directorate_alerts = {}
         for kpi in at_risk_kpis:
             if kpi.directorate_id:
-                if kpi.directorate_id not in directorate_alerts:
-                    directorate_alerts[kpi.directorate_id] = []
-                directorate_alerts[kpi.directorate_id].append(kpi)
+                directorate_alerts.setdefault(kpi.directorate_id, self.browse())
+                directorate_alerts[kpi.directorate_id] |= kpi
 
-        # Send alerts to directorate heads
+        # Queue one section per directorate for its head; sent as one digest per user
         for directorate, kpis in directorate_alerts.items():
             if directorate.director_id:
                 self._send_performance_alert(directorate.director_id, directorate, kpis)
 
+        self.env['performance.notification.digest'].flush()
         return True
 
     @api.model
     def cron_performance_alerts(self):
         """Send performance alerts for KPIs requiring attention"""
-        # Find KPIs with no recent updates (last 30 days)
         from datetime import datetime, timedelta
 
         thirty_days_ago = datetime.now() - timedelta(days=30)
 
-        # Get KPIs without recent actions
-        kpis_without_updates = self.search([
-            ('active', '=', True),
-            ('responsible_user_id', '!=', False),
-        ])
+        # KPIs with a responsible user and no action on any contributing
+        # programme indicator in the last 30 days, in one query
+        self.flush_model(['active', 'responsible_user_id'])
+        self.env['performance.action'].flush_model(['indicator_id', 'date'])
+        self.env.cr.execute("""
+            SELECT k.id
+              FROM key_performance_indicator k
+             WHERE k.active AND k.responsible_user_id IS NOT NULL
+               AND NOT EXISTS (
+                    SELECT 1
+                      FROM kpi_programme_indicator_rel rel
+                      JOIN performance_action a ON a.indicator_id = rel.programme_indicator_id
+                     WHERE rel.strategic_kpi_id = k.id AND a.date >= %s)
+        """, [thirty_days_ago.date()])
+        kpis_without_updates = self.browse([row[0] for row in self.env.cr.fetchall()])
 
         for kpi in kpis_without_updates:
-            # Check if there are recent actions
-            recent_actions = self.env['performance.action'].search([
-                ('indicator_id', '=', kpi.id),
-                ('date', '>=', thirty_days_ago.date()),
-            ], limit=1)
-
-            if not recent_actions and kpi.responsible_user_id:
-                self._send_update_reminder(kpi.responsible_user_id, kpi)
+            self._send_update_reminder(kpi.responsible_user_id, kpi)
 
+        self.env['performance.notification.digest'].flush()
         return True
 
     def _send_performance_alert(self, user, directorate, kpis):
-        """Send performance alert email to user"""
-        template = self.env.ref('robust_pmis.email_template_performance_alert', raise_if_not_found=False)
-        if template:
-            template.with_context(
-                directorate=directorate,
-                kpis=kpis,
-            ).send_mail(user.id, force_send=True)
+        """Queue the performance alert section for ``user`` in the notification digest"""
+        rows = ''.join(f"""
+            <tr>
+                <td style="padding: 8px;">{kpi.name}</td>
+                <td style="padding: 8px;">{kpi.current_value} {kpi.measurement_unit or ''}</td>
+                <td style="padding: 8px;">{kpi.target_value} {kpi.measurement_unit or ''}</td>
+                <td style="padding: 8px;">{kpi.achievement_percentage:.1f}%</td>
+                <td style="padding: 8px; color: {'red' if kpi.status == 'behind' else 'orange'};">
+                    {(kpi.status or '').replace('_', ' ').title()}
+                </td>
+            </tr>""" for kpi in kpis)
+        body = f"""
+            <p>This is an automated alert regarding KPI performance in your directorate: <strong>{directorate.name}</strong></p>
+            <p>The following KPIs require immediate attention:</p>
+            <table border="1" style="border-collapse: collapse; width: 100%;">
+                <thead>
+                    <tr style="background-color: #f0f0f0;">
+                        <th style="padding: 8px;">KPI Name</th>
+                        <th style="padding: 8px;">Current Value</th>
+                        <th style="padding: 8px;">Target Value</th>
+                        <th style="padding: 8px;">Achievement</th>
+                        <th style="padding: 8px;">Status</th>
+                    </tr>
+                </thead>
+                <tbody>{rows}</tbody>
+            </table>
+            <p>Please review these KPIs and take necessary corrective actions.</p>
+        """
+        self.env['performance.notification.digest'].add(
+            user, _("KCCA Performance Alert - %s") % directorate.name, body,
+            category=_("Performance Alerts"))
 
     def _send_update_reminder(self, user, kpi):
-        """Send update reminder email to responsible user"""
-        template = self.env.ref('robust_pmis.email_template_update_reminder', raise_if_not_found=False)
-        if template:
-            template.with_context(kpi=kpi).send_mail(user.id, force_send=True)
+        """Queue the update reminder section for ``user`` in the notification digest"""
+        body = f"""
+            <div style="background-color: #f9f9f9; padding: 15px; margin: 10px 0; border-left: 4px solid #2c5aa0;">
+                <h3 style="margin: 0; color: #2c5aa0;">{kpi.name}</h3>
+                <p><strong>Current Value:</strong> {kpi.current_value} {kpi.measurement_unit or ''}</p>
+                <p><strong>Target Value:</strong> {kpi.target_value} {kpi.measurement_unit or ''}</p>
+                <p><strong>Achievement:</strong> {kpi.achievement_percentage:.1f}%</p>
+                <p><strong>Status:</strong> {(kpi.status or '').replace('_', ' ').title()}</p>
+                <p>No performance actions have been recorded for this KPI in the last 30 days.</p>
+            </div>
+        """
+        self.env['performance.notification.digest'].add(
+            user, _("Reminder: Update Required for KPI - %s") % kpi.name, body,
+            category=_("KPI Update Reminders"))
 
     # --- Fiscal year validation helpers and constraints ---
     def _get_plan_years(self):
@@ -119,7 +119,35 @@ class KeyResultArea(models.Model):
                 raise ValidationError(_("KRA must be linked to either a Strategic Goal or Strategic Objective."))
             if record.strategic_goal_id and record.strategic_objective_id:
                 raise ValidationError(_("KRA cannot be linked to both Strategic Goal and Strategic Objective. Choose one."))
-    
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env['strategic.goal']._mark_rollup_dirty(records)
+        return records
+
+    def write(self, vals):
+        Goal = self.env['strategic.goal']
+        goal_dirty = Goal._is_rollup_write(self._name, vals)
+        moved = 'strategic_goal_id' in vals or 'strategic_objective_id' in vals
+        if goal_dirty:
+            Goal._mark_rollup_dirty(self)
+        if moved:
+            # KPI rollup rows of the old and the new goal
+            kpis = self.with_context(active_test=False).kpi_ids
+            self.env['performance.rollup']._mark_dirty(kpis)
+        res = super().write(vals)
+        if goal_dirty:
+            Goal._mark_rollup_dirty(self)
+        if moved:
+            self.env['performance.rollup']._mark_dirty(kpis)
+            self.env['kpi.unified']._mark_dirty(kpis)
+        return res
+
+    def unlink(self):
+        self.env['strategic.goal']._mark_rollup_dirty(self)
+        return super().unlink()
+
     def action_view_kpis(self):
         """Action to view KPIs"""
         action = self.env.ref('robust_pmis.action_key_performance_indicator').read()[0]
@@ -1,15 +1,40 @@
 # -*- coding: utf-8 -*-
 
-from odoo import api, fields, models, tools, _
+from odoo import api, fields, models, _
+
+# Fiscal year (July-June) start year and quarter of a date column
+_FISCAL_YEAR = """
+    CASE WHEN {col} IS NULL THEN NULL
+         WHEN EXTRACT(MONTH FROM {col}) >= 7 THEN EXTRACT(YEAR FROM {col})::integer
+         ELSE EXTRACT(YEAR FROM {col})::integer - 1 END
+"""
+_FISCAL_QUARTER = """
+    CASE WHEN {col} IS NULL THEN NULL
+         ELSE 'q' || (MOD(EXTRACT(MONTH FROM {col})::integer + 5, 12) / 3 + 1) END
+"""
 
 
 class KPIUnified(models.Model):
+    """Fact table of Strategic KPIs and Programme Indicators, one row per source record.
+
+    Rows are upserted from the source tables by the create/write/unlink hooks
+    of both models (and of KRAs/objectives for the hierarchy keys): touched
+    sources are queued and synced right before the transaction commits, or
+    before the next read of the table. A nightly cron rebuilds everything.
+    """
     _name = 'kpi.unified'
     _description = 'Unified KPI (Strategic + Programme Indicators)'
     _rec_name = 'name'
-    _auto = False  # SQL view
+    _order = 'kind, name'
+    _log_access = False
+
+    _sql_constraints = [
+        ('source_unique', 'unique(source_model, source_id)',
+         'Only one unified KPI row per source record is allowed.'),
+    ]
 
     name = fields.Char(readonly=True)
+    active = fields.Boolean(readonly=True, default=True)
     kind = fields.Selection([
         ('strategic', 'Strategic KPI'),
         ('programme', 'Programme Indicator'),
@@ -21,25 +46,41 @@ class KPIUnified(models.Model):
         ('performance.indicator', 'Programme Indicator'),
     ], string='Source Record', compute='_compute_source_ref', readonly=True, store=False)
 
-    achievement_percentage = fields.Float(string='Achievement (%)', readonly=True)
+    achievement_percentage = fields.Float(string='Achievement (%)', readonly=True, aggregator='avg')
     status = fields.Selection([
         ('not_started', 'Not Started'),
         ('on_track', 'On Track'),
         ('at_risk', 'At Risk'),
         ('behind', 'Behind Schedule'),
         ('achieved', 'Achieved'),
-    ], readonly=True)
+    ], readonly=True, index=True)
 
     start_date = fields.Date(readonly=True)
     end_date = fields.Date(readonly=True)
+    fiscal_year = fields.Integer(string='Fiscal Year', readonly=True, index=True, aggregator=False,
+                                 help="Start year of the fiscal year (July-June) the KPI starts in")
+    fiscal_quarter = fields.Selection([
+        ('q1', 'Q1 (Jul-Sep)'),
+        ('q2', 'Q2 (Oct-Dec)'),
+        ('q3', 'Q3 (Jan-Mar)'),
+        ('q4', 'Q4 (Apr-Jun)'),
+    ], string='Fiscal Quarter', readonly=True)
     measurement_unit = fields.Char(readonly=True)
     target_value = fields.Float(readonly=True)
     current_value = fields.Float(readonly=True)
 
-    kra_id = fields.Many2one('key.result.area', string='KRA', readonly=True)
-    programme_id = fields.Many2one('kcca.programme', string='Programme', readonly=True)
-    directorate_id = fields.Many2one('kcca.directorate', string='Directorate', readonly=True)
-    division_id = fields.Many2one('kcca.division', string='Division', readonly=True)
+    # Hierarchy keys
+    goal_id = fields.Many2one('strategic.goal', string='Strategic Goal', readonly=True, index=True)
+    objective_id = fields.Many2one('strategic.objective', string='Strategic Objective', readonly=True)
+    kra_id = fields.Many2one('key.result.area', string='KRA', readonly=True, index=True)
+    programme_id = fields.Many2one('kcca.programme', string='Programme', readonly=True, index=True)
+    outcome_id = fields.Many2one('intermediate.outcome', string='Intermediate Outcome', readonly=True)
+    output_id = fields.Many2one('output', string='Output', readonly=True)
+    directorate_id = fields.Many2one('kcca.directorate', string='Directorate', readonly=True, index=True)
+    division_id = fields.Many2one('kcca.division', string='Division', readonly=True, index=True)
+    parent_kpi_id = fields.Many2one('key.performance.indicator', string='Parent Strategic KPI', readonly=True)
+    is_linked = fields.Boolean(string='Linked to Strategic KPI', readonly=True,
+                               help="Programme indicator contributing to at least one strategic KPI")
     thematic_area = fields.Selection([
         ('infrastructure', 'Infrastructure & Transport'),
         ('health', 'Health Services'),
@@ -54,6 +95,68 @@ class KPIUnified(models.Model):
     ], string='Thematic Area', readonly=True)
     responsible_user_id = fields.Many2one('res.users', string='Responsible', readonly=True)
 
+    _PENDING_KEY = 'kpi.unified.pending'
+    _COLUMNS = [
+        'kind', 'source_model', 'source_id', 'name', 'active', 'achievement_percentage', 'status',
+        'start_date', 'end_date', 'fiscal_year', 'fiscal_quarter', 'measurement_unit', 'target_value',
+        'current_value', 'goal_id', 'objective_id', 'kra_id', 'programme_id', 'outcome_id', 'output_id',
+        'directorate_id', 'division_id', 'parent_kpi_id', 'is_linked', 'thematic_area', 'responsible_user_id',
+    ]
+
+    # source model -> kind, fields whose writes change the row, SELECT producing _COLUMNS
+    _FACT_SOURCES = {
+        'key.performance.indicator': {
+            'kind': 'strategic',
+            'trigger_fields': {
+                'name', 'active', 'current_value', 'target_value', 'baseline_value', 'kpi_type', 'status',
+                'start_date', 'end_date', 'measurement_unit', 'kra_id', 'programme_id', 'directorate_id',
+                'division_id', 'thematic_area', 'responsible_user_id',
+            },
+            'select': f"""
+                SELECT 'strategic', 'key.performance.indicator', t.id, t.name, t.active,
+                       t.achievement_percentage, t.status, t.start_date, t.end_date,
+                       {_FISCAL_YEAR.format(col='t.start_date')}, {_FISCAL_QUARTER.format(col='t.start_date')},
+                       t.measurement_unit, t.target_value, t.current_value,
+                       COALESCE(kra.strategic_goal_id, so.strategic_goal_id), kra.strategic_objective_id,
+                       t.kra_id, t.programme_id, NULL::integer, NULL::integer,
+                       t.directorate_id, t.division_id, NULL::integer, FALSE,
+                       t.thematic_area, t.responsible_user_id
+                  FROM key_performance_indicator t
+             LEFT JOIN key_result_area kra ON kra.id = t.kra_id
+             LEFT JOIN strategic_objective so ON so.id = kra.strategic_objective_id
+            """,
+        },
+        'performance.indicator': {
+            'kind': 'programme',
+            'trigger_fields': {
+                'name', 'active', 'current_value', 'target_value', 'baseline_value', 'indicator_type', 'status',
+                'start_date', 'end_date', 'measurement_unit', 'programme_id', 'outcome_id', 'output_id',
+                'piap_action_id', 'responsible_directorate_id', 'responsible_division_id', 'thematic_area',
+                'responsible_user_id', 'parent_strategic_kpi_id', 'strategic_kpi_ids',
+            },
+            'select': f"""
+                SELECT 'programme', 'performance.indicator', t.id, t.name, t.active,
+                       t.achievement_percentage, t.status, t.start_date, t.end_date,
+                       {_FISCAL_YEAR.format(col='t.start_date')}, {_FISCAL_QUARTER.format(col='t.start_date')},
+                       t.measurement_unit, t.target_value, t.current_value,
+                       NULL::integer, NULL::integer,
+                       NULL::integer, t.parent_programme_id, t.outcome_id, t.output_id,
+                       t.responsible_directorate_id, t.responsible_division_id, t.parent_strategic_kpi_id,
+                       t.parent_strategic_kpi_id IS NOT NULL OR EXISTS (
+                           SELECT 1 FROM kpi_programme_indicator_rel r WHERE r.programme_indicator_id = t.id),
+                       t.thematic_area, t.responsible_user_id
+                  FROM performance_indicator t
+            """,
+        },
+    }
+
+    def init(self):
+        # Top/bottom lists per type and the default list order
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS kpi_unified_kind_achievement_idx
+                ON kpi_unified (kind, achievement_percentage DESC)
+        """)
+
     @api.depends('source_model', 'source_id')
     def _compute_source_ref(self):
         for rec in self:
@@ -76,52 +179,123 @@ class KPIUnified(models.Model):
             'target': 'current',
         }
 
-    def init(self):
-        tools.drop_view_if_exists(self.env.cr, 'kpi_unified')
-        self.env.cr.execute(
-            """
-            CREATE OR REPLACE VIEW kpi_unified AS (
-                SELECT
-                    kpi.id AS id,
-                    'strategic'::varchar AS kind,
-                    'key.performance.indicator'::varchar AS source_model,
-                    kpi.id AS source_id,
-                    kpi.name,
-                    kpi.achievement_percentage,
-                    kpi.status,
-                    kpi.start_date,
-                    kpi.end_date,
-                    kpi.measurement_unit,
-                    kpi.target_value,
-                    kpi.current_value,
-                    kpi.kra_id,
-                    kpi.programme_id,
-                    kpi.directorate_id,
-                    kpi.division_id,
-                    kpi.thematic_area,
-                    kpi.responsible_user_id
-                FROM key_performance_indicator kpi
-                UNION ALL
-                SELECT
-                    -pi.id AS id,
-                    'programme'::varchar AS kind,
-                    'performance.indicator'::varchar AS source_model,
-                    pi.id AS source_id,
-                    pi.name,
-                    pi.achievement_percentage,
-                    pi.status,
-                    pi.start_date,
-                    pi.end_date,
-                    pi.measurement_unit,
-                    pi.target_value,
-                    pi.current_value,
-                    NULL::integer AS kra_id,
-                    pi.parent_programme_id AS programme_id,
-                    pi.responsible_directorate_id AS directorate_id,
-                    pi.responsible_division_id AS division_id,
-                    pi.thematic_area,
-                    pi.responsible_user_id
-                FROM performance_indicator pi
-            );
-            """
-        )
+    # ------------------------------------------------------------------
+    # Sync
+    # ------------------------------------------------------------------
+    @api.model
+    def _sync(self, model_name, ids=None):
+        """Upsert the rows of ``model_name`` sources (all when ``ids`` is None) and drop orphans."""
+        spec = self._FACT_SOURCES[model_name]
+        cr = self.env.cr
+        where, params = '', []
+        if ids is not None:
+            ids = [i for i in ids if i]
+            if not ids:
+                return
+            where, params = 'WHERE t.id = ANY(%s)', [ids]
+        columns = ', '.join(self._COLUMNS)
+        updates = ', '.join(f"{column} = EXCLUDED.{column}" for column in self._COLUMNS[3:])
+        cr.execute(f"""
+            INSERT INTO kpi_unified ({columns})
+            {spec['select']}
+            {where}
+            ON CONFLICT (source_model, source_id) DO UPDATE SET {updates}
+        """, params)
+        table = self.env[model_name]._table
+        if ids is None:
+            cr.execute(f"""
+                DELETE FROM kpi_unified u
+                 WHERE u.source_model = %s
+                   AND NOT EXISTS (SELECT 1 FROM {table} t WHERE t.id = u.source_id)
+            """, [model_name])
+        else:
+            cr.execute(f"""
+                DELETE FROM kpi_unified u
+                 WHERE u.source_model = %s AND u.source_id = ANY(%s)
+                   AND NOT EXISTS (SELECT 1 FROM {table} t WHERE t.id = u.source_id)
+            """, [model_name, ids])
+
+    @api.model
+    def _flush_sources(self):
+        for model_name in ('key.performance.indicator', 'performance.indicator', 'key.result.area',
+                           'strategic.objective'):
+            self.env[model_name].flush_model()
+
+    @api.model
+    def rebuild(self):
+        """Resync every row from the source tables."""
+        self._flush_sources()
+        self.env.cr.precommit.data.pop(self._PENDING_KEY, None)
+        for model_name in self._FACT_SOURCES:
+            self._sync(model_name)
+        self.invalidate_model()
+        return True
+
+    @api.model
+    def cron_rebuild_unified_kpis(self):
+        """Nightly resync; catches hierarchy moves that bypass the write hooks."""
+        return self.rebuild()
+
+    @api.model
+    def _is_relevant_write(self, model_name, vals):
+        return bool(self._FACT_SOURCES[model_name]['trigger_fields'].intersection(vals))
+
+    @api.model
+    def _mark_dirty(self, records):
+        """Queue the rows of ``records`` (KPIs or programme indicators) for a sync before commit."""
+        if not records:
+            return
+        data = self.env.cr.precommit.data
+        pending = data.get(self._PENDING_KEY)
+        if pending is None:
+            pending = data[self._PENDING_KEY] = {}
+            self.env.cr.precommit.add(self._flush_pending)
+        pending.setdefault(records._name, set()).update(records.ids)
+
+    @api.model
+    def _flush_pending(self):
+        """Sync all queued rows."""
+        if not self.env.cr.precommit.data.get(self._PENDING_KEY):
+            return
+        self._flush_sources()
+        # Take the batch only after flushing: flushing may queue more rows
+        pending = self.env.cr.precommit.data.pop(self._PENDING_KEY, None) or {}
+        for model_name, ids in pending.items():
+            self._sync(model_name, ids)
+        self.invalidate_model()
+
+    @api.model
+    def _search(self, domain, offset=0, limit=None, order=None, **kwargs):
+        # Reads within the writing transaction see the queued changes
+        self._flush_pending()
+        return super()._search(domain, offset=offset, limit=limit, order=order, **kwargs)
+
+    @api.model
+    def _read_group(self, domain, groupby=(), aggregates=(), having=(), offset=0, limit=None, order=None):
+        self._flush_pending()
+        return super()._read_group(domain, groupby, aggregates, having=having, offset=offset, limit=limit,
+                                   order=order)
+
+    # ------------------------------------------------------------------
+    # Dashboard API
+    # ------------------------------------------------------------------
+    @api.model
+    def get_linkage_summary(self):
+        """Counts for the KPI linkage dashboard, from a single grouped query."""
+        counts = {'strategic': 0, 'programme': 0}
+        linked = 0
+        areas = set()
+        for kind, thematic_area, is_linked, count in self._read_group(
+                [], ['kind', 'thematic_area', 'is_linked'], ['__count']):
+            counts[kind] = counts.get(kind, 0) + count
+            if thematic_area:
+                areas.add(thematic_area)
+            if kind == 'programme' and is_linked:
+                linked += count
+        programme = counts['programme']
+        return {
+            'strategic_count': counts['strategic'],
+            'programme_count': programme,
+            'thematic_area_count': len(areas),
+            'linkage_coverage': round(100.0 * linked / programme) if programme else 0,
+        }
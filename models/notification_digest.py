@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+import logging
+from collections import defaultdict
+
+from odoo import models, api, _
+
+_logger = logging.getLogger(__name__)
+
+
+class PerformanceNotificationDigest(models.AbstractModel):
+    """Per-recipient email digests for the PMIS crons.
+
+    Crons ``add`` HTML sections for users instead of sending one email per
+    user per record. Sections are collected for the whole transaction (one
+    cron run) and, right before commit or on an explicit ``flush``, each
+    recipient gets a single email holding all of their sections. The emails
+    are created in one batch and left to the mail queue, so a slow or
+    unreachable SMTP server never runs inside the cron transaction.
+    """
+    _name = 'performance.notification.digest'
+    _description = 'Notification Digest'
+
+    _PENDING_KEY = 'performance.notification.digest.pending'
+
+    @api.model
+    def add(self, users, subject, body, category=None):
+        """Queue ``body`` (HTML) for every user in ``users``.
+
+        ``category`` groups sections under a heading in the digest; ``subject``
+        is used as-is when it is the recipient's only section.
+        """
+        users = users.filtered('active')
+        if not users:
+            return
+        data = self.env.cr.precommit.data
+        pending = data.get(self._PENDING_KEY)
+        if pending is None:
+            pending = data[self._PENDING_KEY] = defaultdict(list)
+            self.env.cr.precommit.add(self._flush_pending)
+        for user in users:
+            pending[user.id].append((category or subject, subject, body))
+
+    @api.model
+    def flush(self):
+        """Queue the pending digests now; return the number of emails created."""
+        return self._flush_pending()
+
+    def _render_digest(self, user, sections):
+        if len(sections) == 1:
+            subject = sections[0][1]
+        else:
+            subject = _("KCCA Performance Digest: %s updates") % len(sections)
+        grouped = defaultdict(list)
+        for category, _subject, body in sections:
+            grouped[category].append(body)
+        parts = []
+        for category, bodies in grouped.items():
+            if len(sections) > 1:
+                parts.append(f'<h3 style="color: #2c5aa0;">{category}</h3>')
+            parts.extend(bodies)
+        body = f"""
+            <div style="margin: 0px; padding: 0px;">
+                <p>Dear {user.name},</p>
+                {'<hr/>'.join(parts)}
+                <p>Best regards,<br/>
+                KCCA Performance Management System</p>
+            </div>
+        """
+        return subject, body
+
+    @api.model
+    def _flush_pending(self):
+        pending = self.env.cr.precommit.data.pop(self._PENDING_KEY, None)
+        if not pending:
+            return 0
+        users = self.env['res.users'].sudo().browse(list(pending))
+        email_from = self.env.company.email_formatted or self.env.user.email_formatted
+        vals_list = []
+        for user in users:
+            if not user.email:
+                _logger.info("Notification digest skipped for %s: no email address", user.login)
+                continue
+            subject, body = self._render_digest(user, pending[user.id])
+            vals_list.append({
+                'subject': subject,
+                'body_html': body,
+                'email_from': email_from,
+                'recipient_ids': [(4, user.partner_id.id)],
+                'auto_delete': True,
+            })
+        if vals_list:
+            self.env['mail.mail'].sudo().create(vals_list)
+            # Wake the mail queue instead of sending from this transaction
+            scheduler = self.env.ref('mail.ir_cron_mail_scheduler_action', raise_if_not_found=False)
+            if scheduler:
+                scheduler.sudo()._trigger()
+        _logger.info("Notification digest: %s email(s) queued", len(vals_list))
+        return len(vals_list)
@@ -177,6 +177,16 @@ class Output(models.Model):
             result.append((record.id, name))
         return result
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env['programme.hierarchy.closure']._mark_dirty(records)
+        return records
+
+    def unlink(self):
+        self.env['programme.hierarchy.closure']._forget(self)
+        return super().unlink()
+
     def write(self, vals):
         """Override write to log important changes in chatter"""
         # Track current values before update
@@ -191,9 +201,20 @@ class Output(models.Model):
                     'end_date': record.end_date,
                 }
 
+        # A move changes the parent programme of the indicators below
+        Closure = self.env['programme.hierarchy.closure']
+        Rollup = self.env['performance.rollup']
+        moved = Closure._is_relevant_write(self._name, vals)
+        if moved:
+            indicators = Rollup._mark_chain_dirty(self)
+
         # Call parent write method
         result = super().write(vals)
 
+        if moved:
+            Closure._mark_dirty(self)
+            Rollup._mark_dirty(indicators)
+
         # Log significant changes in chatter
         for record in self:
             old_vals = old_values.get(record.id, {})
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+import logging
+
+from odoo import models, api
+
+_logger = logging.getLogger(__name__)
+
+# Raw achievement of one row, mirroring ``_compute_achievement`` of both models:
+# increasing = current / target, decreasing = 100 when at or below target,
+# else improvement from baseline, target = 100 minus the relative deviation.
+_RAW_ACHIEVEMENT = """
+    CASE
+        WHEN COALESCE(t.target_value, 0) = 0 THEN 0.0
+        WHEN t.{type} = 'increasing' THEN
+            CASE WHEN t.target_value > 0
+                 THEN (COALESCE(t.current_value, 0) / t.target_value) * 100
+                 ELSE 0.0 END
+        WHEN t.{type} = 'decreasing' THEN
+            CASE WHEN t.target_value > 0 AND COALESCE(t.current_value, 0) <= t.target_value THEN 100.0
+                 WHEN COALESCE(t.baseline_value, 0) != 0 AND t.baseline_value > t.target_value
+                 THEN ((t.baseline_value - COALESCE(t.current_value, 0))
+                       / (t.baseline_value - t.target_value)) * 100
+                 ELSE 0.0 END
+        ELSE
+            CASE WHEN t.target_value > 0
+                 THEN 100.0 - (ABS(COALESCE(t.current_value, 0) - t.target_value) / t.target_value) * 100
+                 ELSE 0.0 END
+    END
+"""
+
+_STATUS = """
+    CASE WHEN c.achievement = 0 THEN 'not_started'
+         WHEN c.achievement >= 100 THEN 'achieved'
+         WHEN c.achievement >= 80 THEN 'on_track'
+         WHEN c.achievement >= 60 THEN 'at_risk'
+         ELSE 'behind' END
+"""
+
+_ACHIEVEMENT_LEVEL = """
+    CASE WHEN c.achievement = 0 THEN 'none'
+         WHEN c.achievement >= 80 THEN 'high'
+         WHEN c.achievement >= 50 THEN 'medium'
+         ELSE 'low' END
+"""
+
+
+class PerformanceAchievement(models.AbstractModel):
+    """Set-based recompute of achievement, status and achievement level.
+
+    Produces the same values as the per-record ``_compute_*`` methods of
+    ``key.performance.indicator`` and ``performance.indicator`` with one
+    ``UPDATE ... FROM`` per model, for full-table recomputes (install hook,
+    ``kcca.division.recompute_all_performance``, maintenance scripts).
+    """
+    _name = 'performance.achievement'
+    _description = 'Batched Achievement Recompute'
+
+    # model -> type column, clamp applied to the raw achievement, extra stored columns
+    _ACHIEVEMENT_MODELS = {
+        'key.performance.indicator': {
+            'type_column': 'kpi_type',
+            # KPIs clamp every type to [0, 100]
+            'clamp': "LEAST(100.0, GREATEST(0.0, {raw}))",
+            'columns': {'status': _STATUS},
+        },
+        'performance.indicator': {
+            'type_column': 'indicator_type',
+            # Indicators cap increasing/decreasing at 100 and floor the target type at 0
+            'clamp': "CASE WHEN t.indicator_type IN ('increasing', 'decreasing') "
+                     "THEN LEAST(100.0, {raw}) ELSE GREATEST(0.0, {raw}) END",
+            'columns': {'status': _STATUS, 'achievement_level': _ACHIEVEMENT_LEVEL},
+        },
+    }
+
+    @api.model
+    def recompute(self, model_name, ids=None):
+        """Recompute the stored achievement fields of ``model_name`` (all rows when ``ids`` is None).
+
+        Only rows whose values change are rewritten. Stored fields depending
+        on them are then recomputed by the ORM in one batch.
+
+        Returns:
+            int: number of rewritten rows
+        """
+        spec = self._ACHIEVEMENT_MODELS[model_name]
+        Model = self.env[model_name]
+        fnames = ['achievement_percentage'] + list(spec['columns'])
+        # Pending writes go first, so the statement sees the latest inputs
+        Model.flush_model()
+
+        raw = _RAW_ACHIEVEMENT.format(type=spec['type_column'])
+        achievement = spec['clamp'].format(raw=raw)
+        assignments = ',\n'.join(
+            ["achievement_percentage = c.achievement"]
+            + [f"{column} = {expr}" for column, expr in spec['columns'].items()])
+        changed = ' OR '.join(
+            ["t.achievement_percentage IS DISTINCT FROM c.achievement"]
+            + [f"t.{column} IS DISTINCT FROM ({expr})" for column, expr in spec['columns'].items()])
+        where, params = '', []
+        if ids is not None:
+            if not ids:
+                return 0
+            where, params = 'WHERE t.id = ANY(%s)', [list(ids)]
+
+        self.env.cr.execute(f"""
+            UPDATE {Model._table} t
+               SET {assignments}
+              FROM (SELECT t.id, {achievement} AS achievement FROM {Model._table} t {where}) c
+             WHERE t.id = c.id AND ({changed})
+         RETURNING t.id
+        """, params)
+        changed_ids = [row[0] for row in self.env.cr.fetchall()]
+        if changed_ids:
+            records = Model.browse(changed_ids)
+            records.invalidate_recordset(fnames)
+            records.modified(fnames)
+            self.env['performance.rollup']._mark_dirty(records)
+            self.env['kpi.unified']._mark_dirty(records)
+            if model_name == 'key.performance.indicator':
+                self.env['strategic.goal']._mark_rollup_dirty(records)
+            self.env['performance.dashboard.cache']._invalidate()
+        _logger.info("Batched achievement recompute on %s: %s row(s) changed", model_name, len(changed_ids))
+        return len(changed_ids)
+
+    @api.model
+    def recompute_all(self):
+        """Recompute every KPI and indicator; return {model: rewritten rows}."""
+        return {model_name: self.recompute(model_name) for model_name in self._ACHIEVEMENT_MODELS}
@@ -112,6 +112,13 @@ class PerformanceAction(models.Model):
         ('rejected', 'Rejected'),
     ], string='Status', default='draft', tracking=True)
     
+    chatter_pending = fields.Boolean(
+        string='Chatter Note Pending',
+        copy=False,
+        index=True,
+        help="Value-change note not yet posted on the indicator (deferred chatter mode)"
+    )
+    
     # Attachments
     attachment_ids = fields.Many2many(
         'ir.attachment',
@@ -179,6 +186,25 @@ class PerformanceAction(models.Model):
         self.state = 'rejected'
         self.message_post(body=_("Action rejected"))
     
+    @api.model
+    def cron_post_pending_chatter(self, limit=5000):
+        """Post the deferred value-change notes of automatic value updates"""
+        actions = self.with_context(active_test=False).search(
+            [('chatter_pending', '=', True)], order='id', limit=limit)
+        if not actions:
+            return True
+        scores = self.env['performance.score'].search([('action_id', 'in', actions.ids)])
+        achievement = {score.action_id.id: score.achievement_percentage for score in scores}
+        self.env['performance.indicator']._log_value_change_notes([{
+            'indicator_id': action.indicator_id.id,
+            'old_value': action.previous_value,
+            'new_value': action.new_value,
+            'achievement': achievement.get(action.id, 0.0),
+            'user_id': action.action_by_id.id,
+        } for action in actions])
+        actions.write({'chatter_pending': False})
+        return True
+    
     def action_reset_to_draft(self):
         """Reset to draft"""
         self.state = 'draft'
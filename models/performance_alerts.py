@@ -2,6 +2,7 @@
 
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
+from collections import defaultdict
 from datetime import datetime, timedelta, date
 import json
 
@@ -43,6 +44,12 @@ class PerformanceAlert(models.Model):
         help="KPI that triggered the alert"
     )
     
+    indicator_id = fields.Many2one(
+        'performance.indicator',
+        string='Related Indicator',
+        help="Programme indicator whose score history triggered the alert"
+    )
+    
     programme_id = fields.Many2one(
         'kcca.programme',
         string='Related Programme',
@@ -155,6 +162,11 @@ class PerformanceAlert(models.Model):
         help="Age of the alert in hours"
     )
     
+    # Score-history checks, in achievement points: minimum drop between the
+    # recent and previous moving averages, and the projected FY-end level to reach
+    _DECLINE_DROP = 5.0
+    _PROJECTION_TARGET = 100.0
+
     @api.depends('create_date')
     def _compute_age(self):
         now = datetime.now()
@@ -175,32 +187,38 @@ class PerformanceAlert(models.Model):
             else:
                 record.is_overdue = False
     
+    def init(self):
+        # De-duplication lookups of the set-based checks
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS performance_alert_kpi_type_date_idx
+                ON performance_alert (kpi_id, alert_type, create_date)
+             WHERE kpi_id IS NOT NULL
+        """)
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS performance_alert_indicator_type_date_idx
+                ON performance_alert (indicator_id, alert_type, create_date)
+             WHERE indicator_id IS NOT NULL
+        """)
+
     @api.model_create_multi
     def create(self, vals_list):
-        """Override create to send notifications"""
+        """Override create to send notifications (deferred by the cron to the end of its run)"""
         alerts = super().create(vals_list)
-        for alert in alerts:
-            alert._send_alert_notification()
+        if not self.env.context.get('pmis_alert_digest_deferred'):
+            alerts._send_alert_digest()
         return alerts
-    
+
     def _send_alert_notification(self):
         """Send alert notification to relevant users"""
-        if self.notification_sent:
-            return
-        
-        # Determine recipients based on alert context
-        recipients = self._get_alert_recipients()
-        
-        if not recipients:
-            return
-        
-        # Prepare notification content
-        subject = f"[{self.severity.upper()}] {self.name}"
-        
-        body = f"""
-        <div style="font-family: Arial, sans-serif;">
-            <h3 style="color: {self._get_severity_color()};">{self.name}</h3>
-            
+        self._send_alert_digest()
+
+    def _render_alert_section(self):
+        """HTML block describing one alert, used in the digest emails."""
+        self.ensure_one()
+        color = self._get_severity_color()
+        return f"""
+            <h3 style="color: {color};">{self.name}</h3>
+
             <table style="border-collapse: collapse; width: 100%;">
                 <tr>
                     <td style="padding: 8px; border: 1px solid #ddd; background-color: #f9f9f9;"><strong>Alert Type:</strong></td>
@@ -215,46 +233,88 @@ class PerformanceAlert(models.Model):
                     <td style="padding: 8px; border: 1px solid #ddd;">{self.create_date.strftime('%Y-%m-%d %H:%M:%S')}</td>
                 </tr>
             </table>
-            
+
             <h4>Description:</h4>
-            <div style="background-color: #f8f9fa; padding: 10px; border-left: 4px solid {self._get_severity_color()};">
+            <div style="background-color: #f8f9fa; padding: 10px; border-left: 4px solid {color};">
                 {self.description}
             </div>
-            
+
             {f'<h4>Recommended Actions:</h4><div>{self.recommended_actions}</div>' if self.recommended_actions else ''}
-            
-            <p style="margin-top: 20px;">
-                <strong>Please acknowledge this alert and take appropriate action.</strong>
-            </p>
-        </div>
         """
-        
-        # Send notifications
-        for user in recipients:
-            self.message_post(
+
+    def _send_alert_digest(self):
+        """Notify the recipients of the alerts in ``self``, one digest per recipient.
+
+        Each recipient gets a single message listing all of their new alerts,
+        queued through the mail queue. Critical/urgent alerts also get a TODO
+        activity per recipient, created in one batch.
+        """
+        alerts = self.filtered(lambda alert: not alert.notification_sent)
+        if not alerts:
+            return
+
+        admin_group = self.env.ref('robust_pmis.group_kcca_pmis_admin', raise_if_not_found=False)
+        admin_users = admin_group.users if admin_group else self.env['res.users']
+        alert_ids_by_user = defaultdict(list)
+        recipients_by_alert = {}
+        for alert in alerts:
+            recipients = alert._get_alert_recipients(admin_users=admin_users)
+            recipients_by_alert[alert.id] = recipients
+            for user in recipients:
+                alert_ids_by_user[user].append(alert.id)
+
+        severity_rank = {'urgent': 0, 'critical': 1, 'warning': 2, 'info': 3}
+        for user, alert_ids in alert_ids_by_user.items():
+            user_alerts = self.browse(alert_ids).sorted(lambda alert: severity_rank.get(alert.severity, 9))
+            top = user_alerts[0]
+            if len(user_alerts) == 1:
+                subject = f"[{top.severity.upper()}] {top.name}"
+            else:
+                subject = _("[%(severity)s] %(count)s new performance alerts") % {
+                    'severity': top.severity.upper(), 'count': len(user_alerts)}
+            body = f"""
+            <div style="font-family: Arial, sans-serif;">
+                {'<hr/>'.join(alert._render_alert_section() for alert in user_alerts)}
+                <p style="margin-top: 20px;">
+                    <strong>Please acknowledge these alerts and take appropriate action.</strong>
+                </p>
+            </div>
+            """
+            top.message_notify(
+                partner_ids=user.partner_id.ids,
                 subject=subject,
                 body=body,
-                partner_ids=[user.partner_id.id],
-                message_type='email'
+                force_send=False,
             )
-        
-        # Create activities for critical/urgent alerts (guard if activity exists)
-        if self.severity in ['critical', 'urgent']:
-            # Safely resolve the default TODO activity type by external id
-            todo_type = self.env.ref('mail.mail_activity_data_todo', raise_if_not_found=False)
-            if todo_type:
-                for user in recipients:
-                    self.activity_schedule(
-                        'mail.mail_activity_data_todo',
-                        user_id=user.id,
-                        summary=f"Handle {self.severity} alert: {self.name}",
-                        note=self.description,
-                        date_deadline=date.today() + timedelta(days=1)
-                    )
 
-        self.notification_sent = True
+        # Trace on each alert who was notified
+        bodies = {
+            alert.id: _("Notification sent to: %s") % ', '.join(recipients_by_alert[alert.id].mapped('name'))
+            for alert in alerts if recipients_by_alert[alert.id]
+        }
+        if bodies:
+            alerts.browse(list(bodies))._message_log_batch(bodies=bodies)
+
+        todo_type = self.env.ref('mail.mail_activity_data_todo', raise_if_not_found=False)
+        if todo_type:
+            model_id = self.env['ir.model']._get_id(self._name)
+            deadline = date.today() + timedelta(days=1)
+            activity_vals = [{
+                'res_model_id': model_id,
+                'res_id': alert.id,
+                'activity_type_id': todo_type.id,
+                'user_id': user.id,
+                'summary': f"Handle {alert.severity} alert: {alert.name}",
+                'note': alert.description,
+                'date_deadline': deadline,
+            } for alert in alerts if alert.severity in ['critical', 'urgent']
+              for user in recipients_by_alert[alert.id]]
+            if activity_vals:
+                self.env['mail.activity'].create(activity_vals)
+
+        alerts.write({'notification_sent': True})
 
-    def _get_alert_recipients(self):
+    def _get_alert_recipients(self, admin_users=None):
         """Get list of users who should receive this alert"""
         recipients = self.env['res.users']
         
@@ -277,6 +337,10 @@ class PerformanceAlert(models.Model):
         if self.kpi_id and self.kpi_id.responsible_user_id:
             recipients |= self.kpi_id.responsible_user_id
         
+        # Add indicator responsible person if indicator-related
+        if self.indicator_id and self.indicator_id.responsible_user_id:
+            recipients |= self.indicator_id.responsible_user_id
+        
         # Add workflow participants if workflow-related
         if self.workflow_id:
             recipients |= self.workflow_id.reviewer_ids
@@ -284,9 +348,10 @@ class PerformanceAlert(models.Model):
         
         # For critical/urgent alerts, also notify PMIS admins
         if self.severity in ['critical', 'urgent']:
-            admin_group = self.env.ref('robust_pmis.group_kcca_pmis_admin', raise_if_not_found=False)
-            if admin_group:
-                recipients |= admin_group.users
+            if admin_users is None:
+                admin_group = self.env.ref('robust_pmis.group_kcca_pmis_admin', raise_if_not_found=False)
+                admin_users = admin_group.users if admin_group else self.env['res.users']
+            recipients |= admin_users
         
         return recipients
     
@@ -333,120 +398,226 @@ class PerformanceAlert(models.Model):
     
     @api.model
     def cron_check_performance_alerts(self):
-        """Cron job to check for performance issues and create alerts"""
+        """Cron job to check for performance issues and create alerts.
+
+        The alerts of the whole run are notified together, so each recipient
+        gets a single digest per run.
+        """
+        deferred = self.with_context(pmis_alert_digest_deferred=True)
         # Check for KPIs with declining performance
-        self._check_kpi_performance_decline()
+        alerts = deferred._check_kpi_performance_decline()
         
-        # Check for missed targets
-        self._check_missed_targets()
+        # One pass over the score history feeds the decline and missed-target checks
+        trends = self.env['performance.score']._analyze_trends()
+        alerts |= deferred._check_indicator_decline(trends)
+        alerts |= deferred._check_missed_targets(trends)
         
         # Check for approaching deadlines
-        self._check_approaching_deadlines()
+        alerts |= deferred._check_approaching_deadlines()
         
         # Check for overdue alerts that need escalation
-        self._check_alert_escalation()
+        alerts |= deferred._check_alert_escalation()
         
+        alerts.with_context(pmis_alert_digest_deferred=False)._send_alert_digest()
         return True
     
+    @api.model
+    def _find_kpi_alert_candidates(self, alert_type, where, window_days, params=None):
+        """KPIs matching ``where`` without a ``alert_type`` alert in the last ``window_days``.
+
+        One anti-join query, whatever the number of KPIs.
+        """
+        self.env['key.performance.indicator'].flush_model()
+        self.flush_model(['kpi_id', 'alert_type'])
+        params = dict(params or {},
+                      alert_type=alert_type,
+                      since=fields.Datetime.now() - timedelta(days=window_days))
+        self.env.cr.execute(f"""
+            SELECT k.id
+              FROM key_performance_indicator k
+             WHERE k.active AND ({where})
+               AND NOT EXISTS (
+                    SELECT 1 FROM performance_alert a
+                     WHERE a.kpi_id = k.id
+                       AND a.alert_type = %(alert_type)s
+                       AND a.create_date >= %(since)s)
+             ORDER BY k.id
+        """, params)
+        return self.env['key.performance.indicator'].browse([row[0] for row in self.env.cr.fetchall()])
+
     def _check_kpi_performance_decline(self):
         """Check for KPIs with declining performance"""
-        # Get KPIs that have shown decline in last 30 days
-        thirty_days_ago = date.today() - timedelta(days=30)
-        
-        kpis = self.env['key.performance.indicator'].search([
-            ('active', '=', True),
-            ('status', 'in', ['behind', 'at_risk'])
+        # Behind/at-risk KPIs without a decline alert in the last 7 days
+        kpis = self._find_kpi_alert_candidates(
+            'performance_decline', "k.status IN ('behind', 'at_risk')", window_days=7)
+        if not kpis:
+            return self.browse()
+
+        status_labels = dict(kpis._fields['status'].selection)
+        return self.create([{
+            'name': f'Performance Decline: {kpi.name}',
+            'alert_type': 'performance_decline',
+            'severity': 'critical' if kpi.status == 'behind' else 'warning',
+            'kpi_id': kpi.id,
+            'directorate_id': kpi.directorate_id.id if kpi.directorate_id else False,
+            'description': f"""
+            <p>KPI <strong>{kpi.name}</strong> is showing declining performance:</p>
+            <ul>
+                <li><strong>Current Status:</strong> {status_labels[kpi.status]}</li>
+                <li><strong>Current Value:</strong> {kpi.current_value} {kpi.measurement_unit}</li>
+                <li><strong>Target Value:</strong> {kpi.target_value} {kpi.measurement_unit}</li>
+                <li><strong>Achievement:</strong> {kpi.achievement_percentage:.1f}%</li>
+            </ul>
+            """,
+            'recommended_actions': """
+            <ul>
+                <li>Review current strategies and interventions</li>
+                <li>Identify root causes of performance decline</li>
+                <li>Develop corrective action plan</li>
+                <li>Increase monitoring frequency</li>
+                <li>Consider resource reallocation</li>
+            </ul>
+            """,
+            'assigned_user_id': kpi.responsible_user_id.id if kpi.responsible_user_id else False,
+        } for kpi in kpis])
+    
+    @api.model
+    def _recently_alerted(self, field_name, ids, alert_type, window_days):
+        """Ids among ``ids`` that got a ``alert_type`` alert through ``field_name`` in the last ``window_days``."""
+        if not ids:
+            return set()
+        self.flush_model([field_name, 'alert_type'])
+        self.env.cr.execute(f"""
+            SELECT DISTINCT {field_name}
+              FROM performance_alert
+             WHERE {field_name} = ANY(%s) AND alert_type = %s AND create_date >= %s
+        """, [list(ids), alert_type, fields.Datetime.now() - timedelta(days=window_days)])
+        return {row[0] for row in self.env.cr.fetchall()}
+
+    def _prepare_indicator_alert_vals(self, indicator, trend, alert_type, severity, title, summary):
+        return {
+            'name': f'{title}: {indicator.name}',
+            'alert_type': alert_type,
+            'severity': severity,
+            'indicator_id': indicator.id,
+            'programme_id': indicator.parent_programme_id.id if indicator.parent_programme_id else False,
+            'directorate_id': indicator.responsible_directorate_id.id if indicator.responsible_directorate_id else False,
+            'description': f"""
+            <p>Indicator <strong>{indicator.name}</strong> {summary}:</p>
+            <ul>
+                <li><strong>Latest Achievement:</strong> {trend['last_achievement']:.1f}% ({trend['last_date']})</li>
+                <li><strong>Recent Average:</strong> {trend['recent_avg'] or 0.0:.1f}%</li>
+                <li><strong>Previous Average:</strong> {trend['previous_avg'] or 0.0:.1f}%</li>
+                <li><strong>Trend:</strong> {(trend['slope'] or 0.0) * 30:+.1f} points per month</li>
+                <li><strong>Projected at FY End ({trend['fy_end']}):</strong> {trend['projected_achievement']:.1f}%
+                    ({trend['projected_value']:.2f} against a target of {indicator.target_value})</li>
+            </ul>
+            """,
+            'recommended_actions': """
+            <ul>
+                <li>Review the latest scores and their sources</li>
+                <li>Identify root causes of the trend</li>
+                <li>Develop corrective action plan</li>
+                <li>Increase monitoring frequency</li>
+            </ul>
+            """,
+            'assigned_user_id': indicator.responsible_user_id.id if indicator.responsible_user_id else False,
+            'alert_data': json.dumps({key: trend[key] for key in (
+                'points', 'slope', 'recent_avg', 'previous_avg', 'projected_achievement')}),
+        }
+
+    def _check_indicator_decline(self, trends=None):
+        """Raise decline alerts for indicators whose recent scores trend down.
+
+        An indicator declines when its slope is negative and the average of its
+        latest scores dropped at least ``_DECLINE_DROP`` points below the
+        average of the scores before them.
+        """
+        if trends is None:
+            trends = self.env['performance.score']._analyze_trends()
+        declining = {
+            indicator_id: trend for indicator_id, trend in trends.items()
+            if trend['slope'] is not None and trend['slope'] < 0
+            and trend['previous_avg'] is not None
+            and trend['recent_avg'] <= trend['previous_avg'] - self._DECLINE_DROP
+        }
+        declining_ids = set(declining) - self._recently_alerted('indicator_id', declining, 'performance_decline', 7)
+        if not declining_ids:
+            return self.browse()
+        indicators = self.env['performance.indicator'].browse(sorted(declining_ids))
+        return self.create([
+            self._prepare_indicator_alert_vals(
+                indicator, declining[indicator.id], 'performance_decline',
+                'critical' if declining[indicator.id]['last_achievement'] < 60 else 'warning',
+                'Performance Decline', 'is showing declining performance')
+            for indicator in indicators
+        ])
+
+    def _check_missed_targets(self, trends=None):
+        """Raise alerts for indicators projected to miss their target at FY end"""
+        if trends is None:
+            trends = self.env['performance.score']._analyze_trends()
+        # Only indicators scored in the fiscal year being projected
+        missing = {
+            indicator_id: trend for indicator_id, trend in trends.items()
+            if trend['last_date'] >= date(trend['fy_end'].year - 1, 7, 1)
+            and trend['projected_achievement'] < self._PROJECTION_TARGET
+        }
+        missing_ids = set(missing) - self._recently_alerted('indicator_id', missing, 'target_missed', 30)
+        if not missing_ids:
+            return self.browse()
+        indicators = self.env['performance.indicator'].browse(sorted(missing_ids))
+        return self.create([
+            self._prepare_indicator_alert_vals(
+                indicator, missing[indicator.id], 'target_missed',
+                'critical' if missing[indicator.id]['projected_achievement'] < 60 else 'warning',
+                'Target Projected to be Missed', 'is projected to miss its fiscal year target')
+            for indicator in indicators
         ])
-        
-        for kpi in kpis:
-            # Check if alert already exists for this KPI in last 7 days
-            existing_alert = self.search([
-                ('kpi_id', '=', kpi.id),
-                ('alert_type', '=', 'performance_decline'),
-                ('create_date', '>=', datetime.now() - timedelta(days=7))
-            ], limit=1)
-            
-            if not existing_alert:
-                # Create performance decline alert
-                self.create({
-                    'name': f'Performance Decline: {kpi.name}',
-                    'alert_type': 'performance_decline',
-                    'severity': 'critical' if kpi.status == 'behind' else 'warning',
-                    'kpi_id': kpi.id,
-                    'directorate_id': kpi.directorate_id.id if kpi.directorate_id else False,
-                    'description': f"""
-                    <p>KPI <strong>{kpi.name}</strong> is showing declining performance:</p>
-                    <ul>
-                        <li><strong>Current Status:</strong> {dict(kpi._fields['status'].selection)[kpi.status]}</li>
-                        <li><strong>Current Value:</strong> {kpi.current_value} {kpi.measurement_unit}</li>
-                        <li><strong>Target Value:</strong> {kpi.target_value} {kpi.measurement_unit}</li>
-                        <li><strong>Achievement:</strong> {kpi.achievement_percentage:.1f}%</li>
-                    </ul>
-                    """,
-                    'recommended_actions': """
-                    <ul>
-                        <li>Review current strategies and interventions</li>
-                        <li>Identify root causes of performance decline</li>
-                        <li>Develop corrective action plan</li>
-                        <li>Increase monitoring frequency</li>
-                        <li>Consider resource reallocation</li>
-                    </ul>
-                    """,
-                    'assigned_user_id': kpi.responsible_user_id.id if kpi.responsible_user_id else False,
-                })
-    
-    def _check_missed_targets(self):
-        """Check for missed targets"""
-        # Implementation for checking missed targets
-        pass
     
     def _check_approaching_deadlines(self):
         """Check for approaching deadlines"""
-        # Check for KPIs with end dates approaching
-        seven_days_from_now = date.today() + timedelta(days=7)
-        
-        kpis_approaching_deadline = self.env['key.performance.indicator'].search([
-            ('active', '=', True),
-            ('end_date', '<=', seven_days_from_now),
-            ('end_date', '>=', date.today()),
-            ('status', '!=', 'achieved')
-        ])
-        
-        for kpi in kpis_approaching_deadline:
-            # Check if alert already exists
-            existing_alert = self.search([
-                ('kpi_id', '=', kpi.id),
-                ('alert_type', '=', 'deadline_approaching'),
-                ('create_date', '>=', datetime.now() - timedelta(days=3))
-            ], limit=1)
-            
-            if not existing_alert:
-                days_remaining = (kpi.end_date - date.today()).days
-                self.create({
-                    'name': f'Deadline Approaching: {kpi.name}',
-                    'alert_type': 'deadline_approaching',
-                    'severity': 'urgent' if days_remaining <= 3 else 'warning',
-                    'kpi_id': kpi.id,
-                    'directorate_id': kpi.directorate_id.id if kpi.directorate_id else False,
-                    'description': f"""
-                    <p>KPI <strong>{kpi.name}</strong> deadline is approaching:</p>
-                    <ul>
-                        <li><strong>End Date:</strong> {kpi.end_date}</li>
-                        <li><strong>Days Remaining:</strong> {days_remaining}</li>
-                        <li><strong>Current Achievement:</strong> {kpi.achievement_percentage:.1f}%</li>
-                        <li><strong>Status:</strong> {dict(kpi._fields['status'].selection)[kpi.status]}</li>
-                    </ul>
-                    """,
-                    'recommended_actions': """
-                    <ul>
-                        <li>Accelerate current activities</li>
-                        <li>Review and adjust targets if necessary</li>
-                        <li>Allocate additional resources</li>
-                        <li>Prepare contingency plans</li>
-                    </ul>
-                    """,
-                    'assigned_user_id': kpi.responsible_user_id.id if kpi.responsible_user_id else False,
-                })
+        # KPIs ending within 7 days, not achieved, without a deadline alert in the last 3 days
+        today = date.today()
+        kpis = self._find_kpi_alert_candidates(
+            'deadline_approaching',
+            "k.end_date BETWEEN %(today)s AND %(horizon)s AND k.status IS DISTINCT FROM 'achieved'",
+            window_days=3,
+            params={'today': today, 'horizon': today + timedelta(days=7)},
+        )
+        if not kpis:
+            return self.browse()
+
+        status_labels = dict(kpis._fields['status'].selection)
+        vals_list = []
+        for kpi in kpis:
+            days_remaining = (kpi.end_date - today).days
+            vals_list.append({
+                'name': f'Deadline Approaching: {kpi.name}',
+                'alert_type': 'deadline_approaching',
+                'severity': 'urgent' if days_remaining <= 3 else 'warning',
+                'kpi_id': kpi.id,
+                'directorate_id': kpi.directorate_id.id if kpi.directorate_id else False,
+                'description': f"""
+                <p>KPI <strong>{kpi.name}</strong> deadline is approaching:</p>
+                <ul>
+                    <li><strong>End Date:</strong> {kpi.end_date}</li>
+                    <li><strong>Days Remaining:</strong> {days_remaining}</li>
+                    <li><strong>Current Achievement:</strong> {kpi.achievement_percentage:.1f}%</li>
+                    <li><strong>Status:</strong> {status_labels.get(kpi.status, '')}</li>
+                </ul>
+                """,
+                'recommended_actions': """
+                <ul>
+                    <li>Accelerate current activities</li>
+                    <li>Review and adjust targets if necessary</li>
+                    <li>Allocate additional resources</li>
+                    <li>Prepare contingency plans</li>
+                </ul>
+                """,
+                'assigned_user_id': kpi.responsible_user_id.id if kpi.responsible_user_id else False,
+            })
+        return self.create(vals_list)
     
     def _check_alert_escalation(self):
         """Check for alerts that need escalation"""
@@ -456,29 +627,30 @@ class PerformanceAlert(models.Model):
             ('is_overdue', '=', True)
         ])
         
-        for alert in overdue_alerts:
-            alert._escalate_alert()
+        if overdue_alerts:
+            return overdue_alerts._escalate_alert()
+        return self.browse()
     
     def _escalate_alert(self):
-        """Escalate overdue alert"""
-        # Create escalation alert
-        escalation_alert = self.create({
-            'name': f'ESCALATED: {self.name}',
+        """Escalate overdue alerts, creating the escalation alerts in one batch"""
+        state_labels = dict(self._fields['state'].selection)
+        escalation_alerts = self.create([{
+            'name': f'ESCALATED: {alert.name}',
             'alert_type': 'risk_escalation',
             'severity': 'urgent',
-            'kpi_id': self.kpi_id.id if self.kpi_id else False,
-            'programme_id': self.programme_id.id if self.programme_id else False,
-            'directorate_id': self.directorate_id.id if self.directorate_id else False,
+            'kpi_id': alert.kpi_id.id if alert.kpi_id else False,
+            'programme_id': alert.programme_id.id if alert.programme_id else False,
+            'directorate_id': alert.directorate_id.id if alert.directorate_id else False,
             'description': f"""
             <p><strong>ESCALATED ALERT:</strong> The following alert has not been handled within the specified time limit:</p>
             <div style="background-color: #fff3cd; padding: 10px; border: 1px solid #ffeaa7;">
-                <h4>Original Alert: {self.name}</h4>
-                <p><strong>Created:</strong> {self.create_date.strftime('%Y-%m-%d %H:%M:%S')}</p>
-                <p><strong>Age:</strong> {self.age_hours:.1f} hours</p>
-                <p><strong>Current Status:</strong> {dict(self._fields['state'].selection)[self.state]}</p>
+                <h4>Original Alert: {alert.name}</h4>
+                <p><strong>Created:</strong> {alert.create_date.strftime('%Y-%m-%d %H:%M:%S')}</p>
+                <p><strong>Age:</strong> {alert.age_hours:.1f} hours</p>
+                <p><strong>Current Status:</strong> {state_labels[alert.state]}</p>
             </div>
             <p>Original Description:</p>
-            {self.description}
+            {alert.description}
             """,
             'recommended_actions': """
             <ul>
@@ -489,13 +661,14 @@ class PerformanceAlert(models.Model):
             </ul>
             """,
             'auto_escalate': False,  # Don't auto-escalate escalation alerts
-        })
+        } for alert in self])
         
-        # Update original alert
+        # Update original alerts
         self.write({
             'state': 'in_progress',
             'assigned_user_id': self.env.user.id,
         })
+        return escalation_alerts
 
 
 class PerformanceAlertAssignWizard(models.TransientModel):
@@ -4,8 +4,66 @@ from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
 from datetime import datetime, timedelta, date
 import json
+import logging
 import statistics
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+_logger = logging.getLogger(__name__)
+
+# Trend analysis window and the scores needed for a trend
+_TREND_DAYS = 90
+_TREND_MIN_POINTS = 3
+
+
+def _trend_stats_python(series):
+    """Trend statistics of each achievement series (oldest first), one dict per series."""
+    stats = []
+    for values in series:
+        stats.append({
+            'count': len(values),
+            'current': values[-1],
+            'average': statistics.mean(values),
+            'volatility': statistics.stdev(values) if len(values) > 1 else 0.0,
+            'recent_avg': statistics.mean(values[-3:]),
+            'earlier_avg': statistics.mean(values[:3]),
+        })
+    return stats
+
+
+def _trend_stats_numpy(series):
+    """Same as ``_trend_stats_python``, computed on padded matrices in one go."""
+    counts = numpy.array([len(values) for values in series])
+    width = counts.max()
+    # Left-aligned for the first scores, right-aligned for the latest ones
+    left = numpy.full((len(series), width), numpy.nan)
+    right = numpy.full((len(series), width), numpy.nan)
+    for row, values in enumerate(series):
+        left[row, :len(values)] = values
+        right[row, width - len(values):] = values
+    average = numpy.nanmean(left, axis=1)
+    volatility = numpy.where(counts > 1, numpy.nanstd(left, axis=1, ddof=1) if width > 1 else 0.0, 0.0)
+    recent_avg = numpy.nanmean(right[:, -3:], axis=1)
+    earlier_avg = numpy.nanmean(left[:, :3], axis=1)
+    current = right[:, -1]
+    return [{
+        'count': int(counts[row]),
+        'current': float(current[row]),
+        'average': float(average[row]),
+        'volatility': float(volatility[row]),
+        'recent_avg': float(recent_avg[row]),
+        'earlier_avg': float(earlier_avg[row]),
+    } for row in range(len(series))]
+
+
+def _trend_stats(series):
+    if not series:
+        return []
+    return _trend_stats_numpy(series) if numpy is not None else _trend_stats_python(series)
+
 
 class PerformanceAnalytics(models.Model):
     _name = 'performance.analytics'
@@ -39,6 +97,7 @@ class PerformanceAnalytics(models.Model):
         ('directorate', 'Directorate Level'),
         ('programme', 'Programme Level'),
         ('kpi', 'KPI Level'),
+        ('indicator', 'Indicator Level'),
     ], string='Analysis Scope', required=True, default='strategic')
     
     # Related records
@@ -66,6 +125,12 @@ class PerformanceAnalytics(models.Model):
         help="KPI for analysis"
     )
     
+    indicator_id = fields.Many2one(
+        'performance.indicator',
+        string='Performance Indicator',
+        help="Programme indicator for analysis"
+    )
+    
     # Analysis results
     insights = fields.Html(
         string='Key Insights',
@@ -111,6 +176,12 @@ class PerformanceAnalytics(models.Model):
         help="Detailed analysis data in JSON format"
     )
     
+    input_signature = fields.Char(
+        string='Input Signature',
+        readonly=True,
+        help="Hash of the scores a trend analysis was computed from; unchanged inputs are not re-analysed"
+    )
+    
     # Status and workflow
     state = fields.Selection([
         ('draft', 'Draft'),
@@ -134,7 +205,7 @@ class PerformanceAnalytics(models.Model):
     @api.model
     def cron_generate_weekly_analytics(self):
         """Generate weekly performance analytics"""
-        # Generate trend analysis for all active KPIs
+        # Generate trend analysis for all active KPIs and indicators
         self._generate_kpi_trend_analysis()
         
         # Generate directorate performance comparison
@@ -145,64 +216,123 @@ class PerformanceAnalytics(models.Model):
         
         return True
     
+    def init(self):
+        # Latest trend analysis per KPI / indicator, for the unchanged-input check
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS performance_analytics_trend_subject_idx
+                ON performance_analytics (kpi_id, indicator_id, id DESC)
+             WHERE analysis_type = 'trend'
+        """)
+
     def _generate_kpi_trend_analysis(self):
-        """Generate trend analysis for KPIs"""
-        kpis = self.env['key.performance.indicator'].search([('active', '=', True)])
-        
-        for kpi in kpis:
-            # Get performance scores for the last 3 months
-            three_months_ago = date.today() - timedelta(days=90)
-            scores = self.env['performance.score'].search([
-                ('indicator_id', '=', kpi.id),
-                ('date', '>=', three_months_ago)
-            ], order='date')
-            
-            if len(scores) >= 3:  # Need at least 3 data points
-                trend_data = self._analyze_trend(scores)
-                
-                # Create analytics record
-                self.create({
+        """Generate trend analysis for KPIs and programme indicators
+
+        The last 90 days of scores of every active KPI and indicator are read
+        in one query, the statistics are computed for all of them at once and
+        the analytics records are created in one batch. Subjects whose scores
+        did not change since their last trend analysis are skipped.
+        """
+        today = date.today()
+        period_start = today - timedelta(days=_TREND_DAYS)
+        self.env['performance.score'].flush_model()
+        self.flush_model(['analysis_type', 'kpi_id', 'indicator_id', 'input_signature'])
+        self.env.cr.execute("""
+            SELECT s.kpi_id, s.indicator_id,
+                   ARRAY_AGG(s.achievement_percentage ORDER BY s.date, s.id) AS achievements,
+                   ARRAY_AGG(s.date ORDER BY s.date, s.id) AS dates,
+                   MD5(STRING_AGG(s.date::text || '=' || s.achievement_percentage::text, ','
+                                  ORDER BY s.date, s.id)) AS signature
+              FROM performance_score s
+              LEFT JOIN key_performance_indicator k ON k.id = s.kpi_id
+              LEFT JOIN performance_indicator pi ON pi.id = s.indicator_id
+             WHERE s.date BETWEEN %s AND %s AND (k.active OR pi.active)
+             GROUP BY s.kpi_id, s.indicator_id
+            HAVING COUNT(*) >= %s
+        """, [period_start, today, _TREND_MIN_POINTS])
+        rows = self.env.cr.dictfetchall()
+
+        self.env.cr.execute("""
+            SELECT DISTINCT ON (kpi_id, indicator_id) kpi_id, indicator_id, input_signature
+              FROM performance_analytics
+             WHERE analysis_type = 'trend' AND input_signature IS NOT NULL
+             ORDER BY kpi_id, indicator_id, id DESC
+        """)
+        previous = {(kpi_id, indicator_id): signature
+                    for kpi_id, indicator_id, signature in self.env.cr.fetchall()}
+        skipped = len(rows)
+        rows = [row for row in rows
+                if previous.get((row['kpi_id'], row['indicator_id'])) != row['signature']]
+        skipped -= len(rows)
+        if not rows:
+            _logger.info("Weekly trend analysis: inputs unchanged for all %s subject(s)", skipped)
+            return self.browse()
+
+        stats = _trend_stats([row['achievements'] for row in rows])
+        kpis = self.env['key.performance.indicator'].browse({row['kpi_id'] for row in rows if row['kpi_id']})
+        indicators = self.env['performance.indicator'].browse(
+            {row['indicator_id'] for row in rows if row['indicator_id']})
+        kpis.mapped('directorate_id')
+        indicators.mapped('responsible_directorate_id')
+
+        vals_list = []
+        for row, row_stats in zip(rows, stats):
+            trend_data = self._render_trend(row['achievements'], row['dates'], row_stats)
+            if row['kpi_id']:
+                kpi = kpis.browse(row['kpi_id'])
+                subject = {
                     'title': f'Trend Analysis: {kpi.name}',
-                    'analysis_type': 'trend',
                     'scope': 'kpi',
                     'kpi_id': kpi.id,
                     'directorate_id': kpi.directorate_id.id if kpi.directorate_id else False,
-                    'analysis_period_start': three_months_ago,
-                    'analysis_period_end': date.today(),
-                    'data_points': len(scores),
-                    'insights': trend_data['insights'],
-                    'recommendations': trend_data['recommendations'],
-                    'risk_level': trend_data['risk_level'],
-                    'confidence_score': trend_data['confidence'],
-                    'analysis_data': json.dumps(trend_data['raw_data']),
-                    'state': 'approved',  # Auto-approve system-generated analytics
-                })
+                }
+            else:
+                indicator = indicators.browse(row['indicator_id'])
+                subject = {
+                    'title': f'Trend Analysis: {indicator.name}',
+                    'scope': 'indicator',
+                    'indicator_id': indicator.id,
+                    'programme_id': indicator.parent_programme_id.id if indicator.parent_programme_id else False,
+                    'directorate_id': (indicator.responsible_directorate_id.id
+                                       if indicator.responsible_directorate_id else False),
+                }
+            vals_list.append(dict(subject, **{
+                'analysis_type': 'trend',
+                'analysis_period_start': period_start,
+                'analysis_period_end': today,
+                'data_points': row_stats['count'],
+                'insights': trend_data['insights'],
+                'recommendations': trend_data['recommendations'],
+                'risk_level': trend_data['risk_level'],
+                'confidence_score': trend_data['confidence'],
+                'analysis_data': json.dumps(trend_data['raw_data']),
+                'input_signature': row['signature'],
+                'state': 'approved',  # Auto-approve system-generated analytics
+            }))
+        analyses = self.with_context(mail_create_nolog=True, tracking_disable=True).create(vals_list)
+        _logger.info("Weekly trend analysis: %s record(s) created, %s unchanged skipped",
+                     len(analyses), skipped)
+        return analyses.with_env(self.env)
     
     def _analyze_trend(self, scores):
         """Analyze trend from performance scores"""
         values = [score.achievement_percentage for score in scores]
-        dates = [score.date.strftime('%Y-%m-%d') for score in scores]
-        
-        # Calculate trend direction
-        if len(values) >= 2:
-            recent_avg = statistics.mean(values[-3:]) if len(values) >= 3 else values[-1]
-            earlier_avg = statistics.mean(values[:3]) if len(values) >= 3 else values[0]
-            trend_direction = 'improving' if recent_avg > earlier_avg else 'declining' if recent_avg < earlier_avg else 'stable'
-        else:
-            trend_direction = 'insufficient_data'
-        
-        # Calculate volatility
-        volatility = statistics.stdev(values) if len(values) > 1 else 0
+        return self._render_trend(values, [score.date for score in scores], _trend_stats_python([values])[0])
+
+    def _render_trend(self, values, dates, stats):
+        """Insights, recommendations and risk of one series from its ``_trend_stats`` entry"""
+        recent_avg, earlier_avg = stats['recent_avg'], stats['earlier_avg']
+        trend_direction = 'improving' if recent_avg > earlier_avg else 'declining' if recent_avg < earlier_avg else 'stable'
+        volatility, average = stats['volatility'], stats['average']
         
         # Generate insights
         insights = f"""
         <h4>Trend Analysis Results</h4>
         <ul>
             <li><strong>Trend Direction:</strong> {trend_direction.title()}</li>
-            <li><strong>Current Performance:</strong> {values[-1]:.1f}%</li>
-            <li><strong>Average Performance:</strong> {statistics.mean(values):.1f}%</li>
+            <li><strong>Current Performance:</strong> {stats['current']:.1f}%</li>
+            <li><strong>Average Performance:</strong> {average:.1f}%</li>
             <li><strong>Performance Volatility:</strong> {volatility:.1f}%</li>
-            <li><strong>Data Points Analyzed:</strong> {len(values)}</li>
+            <li><strong>Data Points Analyzed:</strong> {stats['count']}</li>
         </ul>
         """
         
@@ -237,10 +367,10 @@ class PerformanceAnalytics(models.Model):
                 <li>Look for opportunities for improvement</li>
             </ul>
             """
-            risk_level = 'medium' if statistics.mean(values) < 80 else 'low'
+            risk_level = 'medium' if average < 80 else 'low'
         
         # Calculate confidence based on data quality
-        confidence = min(100, (len(values) / 12) * 100)  # Higher confidence with more data points
+        confidence = min(100, (stats['count'] / 12) * 100)  # Higher confidence with more data points
         
         return {
             'insights': insights,
@@ -248,11 +378,11 @@ class PerformanceAnalytics(models.Model):
             'risk_level': risk_level,
             'confidence': confidence,
             'raw_data': {
-                'values': values,
-                'dates': dates,
+                'values': list(values),
+                'dates': [day.strftime('%Y-%m-%d') for day in dates],
                 'trend_direction': trend_direction,
                 'volatility': volatility,
-                'average': statistics.mean(values),
+                'average': average,
             }
         }
     
@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+from datetime import date
+
 from odoo import models, fields, api
 
 
@@ -34,10 +36,10 @@ class PerformanceDashboard(models.Model):
         strategic_goals = self.env['strategic.goal'].search([('active', '=', True)])
         kras = self.env['key.result.area'].search([('active', '=', True)])
         # Include both strategic KPIs and programme-level performance indicators
-        strategic_kpis = self.env['key.performance.indicator'].search([('active', '=', True)])
-        programme_indicators = self.env['performance.indicator'].search([('active', '=', True)])
-        # Combine both types of KPIs for total count
-        total_kpi_count = len(strategic_kpis) + len(programme_indicators)
+        total_kpi_count = (
+            self.env['key.performance.indicator'].search_count([('active', '=', True)])
+            + self.env['performance.indicator'].search_count([('active', '=', True)])
+        )
         
         programmes = self.env['kcca.programme'].search([('active', '=', True)])
         directorates = self.env['kcca.directorate'].search([('active', '=', True)])
@@ -55,36 +57,20 @@ class PerformanceDashboard(models.Model):
         
         # Calculate average KRA performance based on linked KPIs
         # Include 0% for KRAs that have no KPIs to avoid inflated averages
+        Rollup = self.env['performance.rollup']
         if kras:
-            kra_performances = []
-            for kra in kras:
-                kra_kpis = self.env['key.performance.indicator'].search([('kra_id', '=', kra.id)])
-                if kra_kpis:
-                    avg_kra_perf = sum((kpi.achievement_percentage or 0.0) for kpi in kra_kpis) / len(kra_kpis)
-                    kra_performances.append(avg_kra_perf)
-                else:
-                    kra_performances.append(0.0)
-
-            self.avg_kra_performance = (sum(kra_performances) / len(kra_performances)) if kra_performances else 0.0
+            kra_stats = Rollup._get_stats('kpi', 'kra', kras.ids)
+            kra_performances = [kra_stats[kra.id]['avg_achievement'] if kra.id in kra_stats else 0.0 for kra in kras]
+            self.avg_kra_performance = sum(kra_performances) / len(kra_performances)
         else:
             self.avg_kra_performance = 0.0
         
         # Calculate average KPI performance including both strategic KPIs and programme indicators
-        all_performances = []
-        
-        # Add strategic KPI performances
-        if strategic_kpis:
-            strategic_performances = [kpi.achievement_percentage or 0.0 for kpi in strategic_kpis]
-            all_performances.extend(strategic_performances)
-        
-        # Add programme indicator performances
-        if programme_indicators:
-            programme_performances = [ind.achievement_percentage or 0.0 for ind in programme_indicators]
-            all_performances.extend(programme_performances)
-        
-        # Calculate overall KPI performance
-        if all_performances:
-            self.avg_kpi_performance = sum(all_performances) / len(all_performances)
+        kpi_totals = Rollup._get_totals('kpi')
+        indicator_totals = Rollup._get_totals('indicator')
+        kpi_count = kpi_totals['record_count'] + indicator_totals['record_count']
+        if kpi_count:
+            self.avg_kpi_performance = (kpi_totals['achievement_sum'] + indicator_totals['achievement_sum']) / kpi_count
         else:
             self.avg_kpi_performance = 0.0
 
@@ -114,38 +100,165 @@ class PerformanceDashboard(models.Model):
         Supported filters: data_type ('strategic'|'programme'|'all'),
         scope ('organization'|'strategic_goal'|'strategic_objective'|'programme'|'directorate'|'division'),
         entity (id or 'all'), performance (excellent/good/fair/poor/all), period (fy/q1..q4 - placeholder).
+        Periods closed with ``performance.period.close`` are served from their frozen rollups.
         """
         self.ensure_one()
 
         if not filters:
             return self.get_dashboard_data()
 
+        # Closed periods are answered from the rollup rows frozen at the close
+        period_key = filters.get('period')
+        if self.env['performance.period.close']._is_closed(period_key):
+            payload = self._compute_closed_dashboard_data(filters, period_key)
+            payload['filters_applied'] = filters
+            return payload
+
+        # Payloads list goals, objectives and KRAs too: key on the summary version
+        Cache = self.env['performance.dashboard.cache']
+        payload = Cache.get_or_compute(
+            'filtered', filters, lambda: self._compute_filtered_dashboard_data(filters),
+            version=Cache._get_summary_version())
+        payload['filters_applied'] = filters
+        return payload
+
+    # Scope filters: dotted domains per dataset, resolved once per request into id sets
+    _SCOPE_DOMAINS = {
+        'strategic_goal': {
+            'kpi': [('kra_id.strategic_objective_id.strategic_goal_id', '=', '{entity}')],
+            'indicator': [('parent_programme_id.strategic_objective_ids.strategic_goal_id', '=', '{entity}')],
+            'division_programme': [('programme_id.strategic_objective_ids.strategic_goal_id', '=', '{entity}')],
+            'programme': [('strategic_objective_ids.strategic_goal_id', '=', '{entity}')],
+        },
+        'strategic_objective': {
+            'kpi': [('kra_id.strategic_objective_id', '=', '{entity}')],
+            'indicator': [('parent_programme_id.strategic_objective_ids', 'in', ['{entity}'])],
+            'division_programme': [('programme_id.strategic_objective_ids', 'in', ['{entity}'])],
+            'programme': [('strategic_objective_ids', 'in', ['{entity}'])],
+        },
+        'programme': {
+            # Strategic KPIs via Objective -> Programmes linkage
+            'kpi': [('kra_id.strategic_objective_id.programme_ids', 'in', ['{entity}'])],
+            'indicator': [('parent_programme_id', '=', '{entity}')],
+            'division_programme': [('programme_id', '=', '{entity}')],
+            'programme': [('id', '=', '{entity}')],
+        },
+        'directorate': {
+            # Strategic KPIs via Programmes implemented by this directorate
+            'kpi': [('kra_id.strategic_objective_id.programme_ids.implementing_directorate_ids', 'in', ['{entity}'])],
+            'indicator': [('parent_programme_id.implementing_directorate_ids', 'in', ['{entity}'])],
+            # Divisions under this directorate or programmes implemented by this directorate
+            'division_programme': ['|', ('division_id.directorate_id', '=', '{entity}'),
+                                   ('programme_id.implementing_directorate_ids', 'in', ['{entity}'])],
+            'programme': [('implementing_directorate_ids', 'in', ['{entity}'])],
+        },
+        'division': {
+            # Strategic KPIs via Programmes implemented by this division
+            'kpi': [('kra_id.strategic_objective_id.programme_ids.division_programme_rel_ids.division_id', '=', '{entity}')],
+            'indicator': [('parent_programme_id.division_programme_rel_ids.division_id', '=', '{entity}')],
+            'division_programme': [('division_id', '=', '{entity}')],
+            'programme': [('division_programme_rel_ids.division_id', '=', '{entity}')],
+        },
+    }
+
+    _SCOPE_MODELS = {
+        'kpi': 'key.performance.indicator',
+        'indicator': 'performance.indicator',
+        'division_programme': 'division.programme.rel',
+        'programme': 'kcca.programme',
+    }
+
+    @api.model
+    def _resolve_scope_ids(self, scope, entity_id):
+        """Resolve a scope/entity filter into {dataset: [ids]} with one query per dataset.
+
+        Returns an empty dict for organization-wide (unrestricted) requests.
+        """
+        templates = self._SCOPE_DOMAINS.get(scope)
+        if not entity_id or not templates:
+            return {}
+
+        def _bind(term):
+            if isinstance(term, tuple):
+                value = term[2]
+                if value == '{entity}':
+                    value = entity_id
+                elif value == ['{entity}']:
+                    value = [entity_id]
+                return (term[0], term[1], value)
+            return term
+
+        return {
+            dataset: self.env[self._SCOPE_MODELS[dataset]].search([_bind(t) for t in domain]).ids
+            for dataset, domain in templates.items()
+        }
+
+    @api.model
+    def _get_period_range(self, period):
+        """Return (date_start, date_end) for 'fy:YYYY' / 'qN:YYYY' keys, else (None, None)."""
+        try:
+            if isinstance(period, str) and period:
+                kind, year = period.split(':', 1)
+                year = int(year)
+                if kind == 'fy':
+                    return date(year, 7, 1), date(year + 1, 6, 30)
+                if kind[0].lower() == 'q':
+                    # Q1: Jul-Sep, Q2: Oct-Dec, Q3: Jan-Mar, Q4: Apr-Jun
+                    quarter = int(kind[1])
+                    return {
+                        1: (date(year, 7, 1), date(year, 9, 30)),
+                        2: (date(year, 10, 1), date(year, 12, 31)),
+                        3: (date(year + 1, 1, 1), date(year + 1, 3, 31)),
+                    }.get(quarter, (date(year + 1, 4, 1), date(year + 1, 6, 30)))
+        except Exception:
+            pass
+        return None, None
+
+    @api.model
+    def _bucket_counts(self, model_name, domain):
+        """Distribution bucket counts for ``domain`` (missing achievement counts as poor)."""
+        Model = self.env[model_name]
+        return {
+            'excellent': Model.search_count(domain + [('achievement_percentage', '>=', 90)]),
+            'good': Model.search_count(domain + [('achievement_percentage', '>=', 70), ('achievement_percentage', '<', 90)]),
+            'fair': Model.search_count(domain + [('achievement_percentage', '>=', 50), ('achievement_percentage', '<', 70)]),
+            'poor': Model.search_count(domain + ['|', ('achievement_percentage', '<', 50), ('achievement_percentage', '=', False)]),
+        }
+
+    def _compute_filtered_dashboard_data(self, filters):
+        """Build the filtered dashboard payload (uncached).
+
+        The scope/entity filter is resolved once into id sets; every aggregate
+        below is a single grouped query restricted to those ids.
+        """
+        Engine = self.env['performance.dashboard.engine']
+        KPI = self.env['key.performance.indicator']
+        Indicator = self.env['performance.indicator']
+        Rel = self.env['division.programme.rel']
+
         # Build domains for both datasets (strategic KPIs and programme indicators)
         domain_kpi = []
         domain_prog = []
         domain_div_rel = [('active', '=', True)]
+        programmes_domain = [('active', '=', True)]
 
         # Performance filter
         perf = (filters or {}).get('performance')
-        if perf and perf != 'all':
-            if perf == 'excellent':
-                domain_kpi.append(('achievement_percentage', '>=', 90))
-                domain_prog.append(('achievement_percentage', '>=', 90))
-                domain_div_rel.append(('performance_score', '>=', 90))
-            elif perf == 'good':
-                rng = [('achievement_percentage', '>=', 70), ('achievement_percentage', '<', 90)]
-                domain_kpi.extend(rng)
-                domain_prog.extend(rng)
-                domain_div_rel.extend([('performance_score', '>=', 70), ('performance_score', '<', 90)])
-            elif perf == 'fair':
-                rng = [('achievement_percentage', '>=', 50), ('achievement_percentage', '<', 70)]
-                domain_kpi.extend(rng)
-                domain_prog.extend(rng)
-                domain_div_rel.extend([('performance_score', '>=', 50), ('performance_score', '<', 70)])
-            elif perf == 'poor':
-                domain_kpi.append(('achievement_percentage', '<', 50))
-                domain_prog.append(('achievement_percentage', '<', 50))
-                domain_div_rel.append(('performance_score', '<', 50))
+        perf_ranges = {
+            'excellent': (90, None),
+            'good': (70, 90),
+            'fair': (50, 70),
+            'poor': (None, 50),
+        }
+        if perf in perf_ranges:
+            low, high = perf_ranges[perf]
+            for domain, fname in ((domain_kpi, 'achievement_percentage'),
+                                  (domain_prog, 'achievement_percentage'),
+                                  (domain_div_rel, 'performance_score')):
+                if low is not None:
+                    domain.append((fname, '>=', low))
+                if high is not None:
+                    domain.append((fname, '<', high))
 
         # Scope + entity filter
         scope = (filters or {}).get('scope') or 'organization'
@@ -155,115 +268,58 @@ class PerformanceDashboard(models.Model):
         except Exception:
             entity_id = None
 
-        if entity_id:
-            if scope == 'strategic_goal':
-                domain_kpi.append(('kra_id.strategic_objective_id.strategic_goal_id', '=', entity_id))
-                # Programme indicators through programme -> objectives -> goal
-                domain_prog.append(('parent_programme_id.strategic_objective_ids.strategic_goal_id', '=', entity_id))
-                domain_div_rel.append(('programme_id.strategic_objective_ids.strategic_goal_id', '=', entity_id))
-            elif scope == 'strategic_objective':
-                domain_kpi.append(('kra_id.strategic_objective_id', '=', entity_id))
-                domain_prog.append(('parent_programme_id.strategic_objective_ids', 'in', [entity_id]))
-                domain_div_rel.append(('programme_id.strategic_objective_ids', 'in', [entity_id]))
-            elif scope == 'programme':
-                # Strategic KPIs via Objective -> Programmes linkage
-                domain_kpi.append(('kra_id.strategic_objective_id.programme_ids', 'in', [entity_id]))
-                domain_prog.append(('parent_programme_id', '=', entity_id))
-                domain_div_rel.append(('programme_id', '=', entity_id))
-            elif scope == 'directorate':
-                # Strategic KPIs via Programmes implemented by this directorate
-                domain_kpi.append(('kra_id.strategic_objective_id.programme_ids.implementing_directorate_ids', 'in', [entity_id]))
-                domain_prog.append(('parent_programme_id.implementing_directorate_ids', 'in', [entity_id]))
-                # Division relationships for divisions under this directorate or programmes implemented by this directorate
-                domain_div_rel.append('|')
-                domain_div_rel.append(('division_id.directorate_id', '=', entity_id))
-                domain_div_rel.append(('programme_id.implementing_directorate_ids', 'in', [entity_id]))
-            elif scope == 'division':
-                # Strategic KPIs via Programmes implemented by this division
-                domain_kpi.append(('kra_id.strategic_objective_id.programme_ids.division_programme_rel_ids.division_id', '=', entity_id))
-                # Use division relationships table via programme
-                domain_prog.append(('parent_programme_id.division_programme_rel_ids.division_id', '=', entity_id))
-                domain_div_rel.append(('division_id', '=', entity_id))
+        scope_ids = self._resolve_scope_ids(scope, entity_id)
+        if scope_ids:
+            domain_kpi.append(('id', 'in', scope_ids['kpi']))
+            domain_prog.append(('id', 'in', scope_ids['indicator']))
+            domain_div_rel.append(('id', 'in', scope_ids['division_programme']))
+            programmes_domain.append(('id', 'in', scope_ids['programme']))
 
         # Period filter (FY/Q) – apply using start/end date ranges on KPI/PI and Division-Programme relations
-        def _fy_range(year_start):
-            # Uganda FY assumed: Jul 1 (year_start) to Jun 30 (year_start+1)
-            from datetime import date
-            return date(year_start, 7, 1), date(year_start + 1, 6, 30)
-
-        def _quarter_range(year_start, quarter):
-            from datetime import date
-            # Q1: Jul-Sep, Q2: Oct-Dec, Q3: Jan-Mar, Q4: Apr-Jun
-            if quarter == 1:
-                return date(year_start, 7, 1), date(year_start, 9, 30)
-            if quarter == 2:
-                return date(year_start, 10, 1), date(year_start, 12, 31)
-            if quarter == 3:
-                return date(year_start + 1, 1, 1), date(year_start + 1, 3, 31)
-            # default Q4
-            return date(year_start + 1, 4, 1), date(year_start + 1, 6, 30)
-
-        period = (filters or {}).get('period')
-        date_start = date_end = None
-        try:
-            if isinstance(period, str) and period:
-                # Formats supported: 'fy:2024', 'q1:2024', 'q2:2024', 'q3:2024', 'q4:2024'
-                if period.startswith('fy:'):
-                    y = int(period.split(':', 1)[1])
-                    date_start, date_end = _fy_range(y)
-                elif period[0].lower() == 'q' and ':' in period:
-                    qpart, ypart = period.split(':', 1)
-                    q = int(qpart[1])
-                    y = int(ypart)
-                    date_start, date_end = _quarter_range(y, q)
-        except Exception:
-            date_start = date_end = None
-
+        date_start, date_end = self._get_period_range((filters or {}).get('period'))
         if date_start and date_end:
             # Overlap of [start_date, end_date] with [date_start, date_end]
             overlap = ['&', ('start_date', '<=', date_end), '|', ('end_date', '=', False), ('end_date', '>=', date_start)]
             domain_kpi.extend(overlap)
             domain_prog.extend(overlap)
             domain_div_rel.extend(overlap)
+            programmes_domain.extend(overlap)
 
         # Compute strategic (KPI) aggregates for KRAs and Goals regardless of data_type,
         # as these structures are inherently strategic.
+        kra_stats = {
+            kra.id: (total or 0.0, count)
+            for kra, total, count in KPI._read_group(
+                domain_kpi, ['kra_id'], ['achievement_percentage:sum', '__count'])
+            if kra
+        }
         kras_data = []
         kras = self.env['key.result.area'].search([])
         for kra in kras:
-            kpi_domain = [('kra_id', '=', kra.id)] + domain_kpi
-            kpis = self.env['key.performance.indicator'].search(kpi_domain)
-            if kpis:
-                avg_performance = sum(kpi.achievement_percentage or 0.0 for kpi in kpis) / len(kpis)
-                kpi_count = len(kpis)
-            else:
-                # Treat KRA with no KPIs in scope as 0% to avoid inflated averages
-                avg_performance = 0.0
-                kpi_count = 0
+            total, count = kra_stats.get(kra.id, (0.0, 0))
             kras_data.append({
                 'name': kra.name,
-                'performance': avg_performance,
-                'kpi_count': kpi_count,
+                # Treat KRA with no KPIs in scope as 0% to avoid inflated averages
+                'performance': total / count if count else 0.0,
+                'kpi_count': count,
                 'strategic_objective': kra.strategic_objective_id.name if kra.strategic_objective_id else 'No Objective'
             })
 
+        goal_stats = {}
+        for kra in self.env['key.result.area'].with_context(active_test=False).browse(list(kra_stats)):
+            goal_id = kra.strategic_objective_id.strategic_goal_id.id
+            if goal_id:
+                total, count = goal_stats.get(goal_id, (0.0, 0))
+                goal_stats[goal_id] = (total + kra_stats[kra.id][0], count + kra_stats[kra.id][1])
         goals_data = []
         strategic_goals = self.env['strategic.goal'].search([])
         for goal in strategic_goals:
-            goal_domain = [('kra_id.strategic_objective_id.strategic_goal_id', '=', goal.id)] + domain_kpi
-            kpis = self.env['key.performance.indicator'].search(goal_domain)
-            if kpis:
-                avg_performance = sum(kpi.achievement_percentage or 0.0 for kpi in kpis) / len(kpis)
-                kpi_count = len(kpis)
-            else:
-                avg_performance = 0.0
-                kpi_count = 0
-            target_value = getattr(goal, 'target_percentage', 100.0) or 100.0
+            total, count = goal_stats.get(goal.id, (0.0, 0))
             goals_data.append({
                 'name': goal.name,
-                'performance': avg_performance,
-                'kpi_count': kpi_count,
-                'target': target_value
+                'performance': total / count if count else 0.0,
+                'kpi_count': count,
+                'target': getattr(goal, 'target_percentage', 100.0) or 100.0
             })
 
         # Build top performers and distribution depending on data_type
@@ -271,21 +327,9 @@ class PerformanceDashboard(models.Model):
         top_kpis_data = []
         distribution_data = {'excellent': 0, 'good': 0, 'fair': 0, 'poor': 0}
 
-        def _dist_from_records(records):
-            return {
-                'excellent': len([r for r in records if (r.achievement_percentage or 0) >= 90]),
-                'good': len([r for r in records if 70 <= (r.achievement_percentage or 0) < 90]),
-                'fair': len([r for r in records if 50 <= (r.achievement_percentage or 0) < 70]),
-                'poor': len([r for r in records if (r.achievement_percentage or 0) < 50]),
-            }
-
-        def _safe_avg(values):
-            vals = [float(v) for v in values if v is not None]
-            return round(sum(vals) / len(vals), 2) if vals else 0.0
-
         if data_type in ('strategic', 'all'):
             kpi_domain = [('achievement_percentage', '>', 0)] + domain_kpi
-            top_strat = self.env['key.performance.indicator'].search(kpi_domain, order='achievement_percentage desc', limit=10)
+            top_strat = KPI.search(kpi_domain, order='achievement_percentage desc', limit=10)
             top_kpis_data.extend([{
                 'name': k.name,
                 'performance': k.achievement_percentage,
@@ -294,11 +338,11 @@ class PerformanceDashboard(models.Model):
                 'kra': k.kra_id.name if k.kra_id else 'No KRA',
                 'type': 'Strategic KPI'
             } for k in top_strat])
-            distribution_data = _dist_from_records(self.env['key.performance.indicator'].search(domain_kpi))
+            distribution_data = self._bucket_counts(KPI._name, domain_kpi)
 
         if data_type in ('programme', 'all'):
             prog_domain = [('achievement_percentage', '>', 0)] + domain_prog
-            top_prog = self.env['performance.indicator'].search(prog_domain, order='achievement_percentage desc', limit=10)
+            top_prog = Indicator.search(prog_domain, order='achievement_percentage desc', limit=10)
             top_kpis_data.extend([{
                 'name': p.name,
                 'performance': p.achievement_percentage,
@@ -308,57 +352,43 @@ class PerformanceDashboard(models.Model):
                 'type': 'Programme KPI'
             } for p in top_prog])
             # Merge distributions by summing bins
-            prog_dist = _dist_from_records(self.env['performance.indicator'].search(domain_prog))
+            prog_dist = self._bucket_counts(Indicator._name, domain_prog)
             for k in distribution_data:
                 distribution_data[k] = (distribution_data.get(k, 0) or 0) + prog_dist.get(k, 0)
 
         # Sort combined list and cap to 10
         top_kpis_data = sorted(top_kpis_data, key=lambda x: x['performance'] or 0, reverse=True)[:10]
 
+        # Compute averages for gauges including division-programme performance
+        kpi_total, kpi_count = Engine._totals(KPI._name, ['achievement_percentage'], domain_kpi)
+        ind_total, ind_count = Engine._totals(Indicator._name, ['achievement_percentage'], domain_prog)
+        rel_score, rel_budget, rel_count = Engine._totals(
+            Rel._name, ['performance_score', 'budget_utilization'], domain_div_rel)
+
         # Summary numbers (counts)
-        filtered_count = 0
         if data_type == 'strategic':
-            filtered_count = self.env['key.performance.indicator'].search_count(domain_kpi)
+            filtered_count = kpi_count
         elif data_type == 'programme':
-            filtered_count = self.env['performance.indicator'].search_count(domain_prog)
+            filtered_count = ind_count
         else:
-            filtered_count = (
-                self.env['key.performance.indicator'].search_count(domain_kpi)
-                + self.env['performance.indicator'].search_count(domain_prog)
-            )
+            filtered_count = kpi_count + ind_count
 
-        # Compute averages for gauges including division-programme performance
-        strat_recs = self.env['key.performance.indicator'].search(domain_kpi)
-        prog_recs = self.env['performance.indicator'].search(domain_prog)
-        div_rel_recs = self.env['division.programme.rel'].search(domain_div_rel)
+        def _avg(total, count):
+            return round(total / count, 2) if count else 0.0
 
         # KPI-only (treat missing values as 0)
-        kpi_only_avg = _safe_avg([(r.achievement_percentage or 0.0) for r in strat_recs] + [(r.achievement_percentage or 0.0) for r in prog_recs])
+        kpi_only_avg = _avg(kpi_total + ind_total, kpi_count + ind_count)
 
         # Average KRA performance across all KRAs (0 if none in scope) to avoid inflation
-        avg_kra = _safe_avg([k.get('performance') for k in kras_data])
+        avg_kra = Engine._safe_avg([k.get('performance') for k in kras_data])
 
         # Programme average across all programmes in scope (not only those with indicators) to avoid inflation
-        programmes_domain = [('active', '=', True)]
-        if scope == 'strategic_goal' and entity_id:
-            programmes_domain.append(('strategic_objective_ids.strategic_goal_id', '=', entity_id))
-        elif scope == 'strategic_objective' and entity_id:
-            programmes_domain.append(('strategic_objective_ids', 'in', [entity_id]))
-        elif scope == 'programme' and entity_id:
-            programmes_domain.append(('id', '=', entity_id))
-        elif scope == 'directorate' and entity_id:
-            programmes_domain.append(('implementing_directorate_ids', 'in', [entity_id]))
-        elif scope == 'division' and entity_id:
-            programmes_domain.append(('division_programme_rel_ids.division_id', '=', entity_id))
-
-        # Apply period overlap to programme via its start/end dates if available
-        if date_start and date_end:
-            programmes_domain.extend(['&', ('start_date', '<=', date_end), '|', ('end_date', '=', False), ('end_date', '>=', date_start)])
-
-        programmes_all = self.env['kcca.programme'].search(programmes_domain)
-        avg_prog = _safe_avg([(p.overall_performance or 0.0) for p in programmes_all]) if (data_type in ('programme', 'all')) else 0.0
+        avg_prog = 0.0
+        if data_type in ('programme', 'all'):
+            prog_total, prog_count = Engine._totals('kcca.programme', ['overall_performance'], programmes_domain)
+            avg_prog = _avg(prog_total, prog_count)
 
-        avg_div_prog = _safe_avg([r.performance_score for r in div_rel_recs])
+        avg_div_prog = _avg(rel_score, rel_count)
 
         # Blended overall: average of the three macro-aggregates to keep semantics consistent with unfiltered endpoint
         components = []
@@ -369,7 +399,7 @@ class PerformanceDashboard(models.Model):
         # Always consider division-programme component for 'all' or when filtering across entities including divisions/directorates
         if data_type == 'all' or scope in ('directorate', 'division', 'organization'):
             components.append(avg_div_prog)
-        avg_performance = _safe_avg(components)
+        avg_performance = Engine._safe_avg(components)
 
         # No fallback inflation: keep KPI-only average as-is to avoid overstating progress
 
@@ -390,7 +420,135 @@ class PerformanceDashboard(models.Model):
                 'avg_kra_performance': avg_kra,
                 'avg_programme_performance': avg_prog,
                 'avg_division_programme_performance': avg_div_prog,
-                'avg_budget_utilization': _safe_avg([r.budget_utilization for r in div_rel_recs]),
+                'avg_budget_utilization': _avg(rel_budget, rel_count),
+            }
+        }
+
+    # Scope -> {source: entity type} of the frozen rollup rows answering it
+    _CLOSED_SCOPE_ENTITIES = {
+        'strategic_goal': {'kpi': 'goal'},
+        'strategic_objective': {'kpi': 'kra'},
+        'programme': {'indicator': 'parent_programme', 'division_programme': 'programme'},
+        'directorate': {'kpi': 'directorate', 'indicator': 'directorate', 'division_programme': 'directorate'},
+        'division': {'kpi': 'division', 'indicator': 'division', 'division_programme': 'division'},
+    }
+
+    def _compute_closed_dashboard_data(self, filters, period_key):
+        """Build the filtered payload of closed period ``period_key`` from its frozen rollups.
+
+        Every user gets the figures as they stood at the close. Rollup rows
+        are aggregates, so some parts of the live payload have no frozen
+        counterpart: top KPIs are not listed, the performance band narrows
+        the counts and the distribution but not the averages, programme
+        performance is the average of the indicators in scope, and KRA and
+        goal charts cover the whole organization.
+        """
+        Engine = self.env['performance.dashboard.engine']
+        Snapshot = self.env['performance.period.snapshot']
+        bands = ('excellent', 'good', 'fair', 'poor')
+
+        scope = filters.get('scope') or 'organization'
+        entity = filters.get('entity') or 'all'
+        try:
+            entity_id = int(entity) if entity and entity != 'all' else None
+        except Exception:
+            entity_id = None
+        perf = filters.get('performance')
+
+        def _totals(source):
+            """Return (achievement sum, budget sum, count, band counts) of ``source`` in scope."""
+            if not entity_id or scope not in self._CLOSED_SCOPE_ENTITIES:
+                rows = Snapshot._get_stats(period_key, source, 'organization', [0]).values()
+            elif scope == 'strategic_objective':
+                kras = self.env['key.result.area'].with_context(active_test=False).search([
+                    ('strategic_objective_id', '=', entity_id)])
+                rows = Snapshot._get_stats(period_key, source, 'kra', kras.ids).values() if source == 'kpi' else []
+            else:
+                entity_type = self._CLOSED_SCOPE_ENTITIES[scope].get(source)
+                rows = Snapshot._get_stats(period_key, source, entity_type, [entity_id]).values() if entity_type else []
+            rows = list(rows)
+            dist = {band: sum(row[f'count_{band}'] for row in rows) for band in bands}
+            if perf in dist:
+                dist = {band: dist[band] if band == perf else 0 for band in bands}
+            return (sum(row['achievement_sum'] or 0.0 for row in rows),
+                    sum(row['budget_utilization_sum'] or 0.0 for row in rows),
+                    sum(row['record_count'] for row in rows),
+                    dist)
+
+        kpi_total, _kpi_budget, kpi_count, kpi_dist = _totals('kpi')
+        ind_total, _ind_budget, ind_count, ind_dist = _totals('indicator')
+        rel_score, rel_budget, rel_count, _rel_dist = _totals('division_programme')
+
+        kra_stats = Snapshot._get_stats(period_key, 'kpi', 'kra')
+        kras = self.env['key.result.area'].search([])
+        kras_data = []
+        for kra in kras:
+            row = kra_stats.get(kra.id)
+            count = row['record_count'] if row else 0
+            kras_data.append({
+                'name': kra.name,
+                'performance': (row['achievement_sum'] or 0.0) / count if count else 0.0,
+                'kpi_count': count,
+                'strategic_objective': kra.strategic_objective_id.name if kra.strategic_objective_id else 'No Objective'
+            })
+
+        goal_stats = Snapshot._get_stats(period_key, 'kpi', 'goal')
+        strategic_goals = self.env['strategic.goal'].search([])
+        goals_data = []
+        for goal in strategic_goals:
+            row = goal_stats.get(goal.id)
+            count = row['record_count'] if row else 0
+            goals_data.append({
+                'name': goal.name,
+                'performance': (row['achievement_sum'] or 0.0) / count if count else 0.0,
+                'kpi_count': count,
+                'target': getattr(goal, 'target_percentage', 100.0) or 100.0
+            })
+
+        data_type = filters.get('data_type') or 'all'
+        distribution_data = {band: 0 for band in bands}
+        filtered_count = 0
+        if data_type in ('strategic', 'all'):
+            distribution_data = {band: distribution_data[band] + kpi_dist[band] for band in bands}
+            filtered_count += sum(kpi_dist.values()) if perf in kpi_dist else kpi_count
+        if data_type in ('programme', 'all'):
+            distribution_data = {band: distribution_data[band] + ind_dist[band] for band in bands}
+            filtered_count += sum(ind_dist.values()) if perf in ind_dist else ind_count
+
+        def _avg(total, count):
+            return round(total / count, 2) if count else 0.0
+
+        kpi_only_avg = _avg(kpi_total + ind_total, kpi_count + ind_count)
+        avg_kra = Engine._safe_avg([k.get('performance') for k in kras_data])
+        avg_prog = _avg(ind_total, ind_count) if data_type in ('programme', 'all') else 0.0
+        avg_div_prog = _avg(rel_score, rel_count)
+
+        # Same blend as the live payload
+        components = []
+        if data_type in ('strategic', 'all'):
+            components.append(kpi_only_avg)
+        if data_type in ('programme', 'all'):
+            components.append(avg_prog)
+        if data_type == 'all' or scope in ('directorate', 'division', 'organization'):
+            components.append(avg_div_prog)
+
+        return {
+            'kras_performance': kras_data,
+            'goals_performance': goals_data,
+            'top_kpis': [],
+            'distribution': distribution_data,
+            'filters_applied': filters,
+            'summary': {
+                'filtered_kpis': filtered_count,
+                'total_goals': len(strategic_goals),
+                'total_kras': len(kras),
+                'avg_performance': Engine._safe_avg(components),
+                'kpi_only_performance': kpi_only_avg,
+                'avg_kpi_performance': kpi_only_avg,
+                'avg_kra_performance': avg_kra,
+                'avg_programme_performance': avg_prog,
+                'avg_division_programme_performance': avg_div_prog,
+                'avg_budget_utilization': _avg(rel_budget, rel_count),
             }
         }
 
@@ -424,7 +582,16 @@ class PerformanceDashboard(models.Model):
         return options
 
     def get_dashboard_data(self):
-        """Return JSON data for dashboard charts"""
+        """Return JSON data for dashboard charts.
+
+        Aggregates are computed set-wise by ``performance.dashboard.engine``;
+        ``_get_dashboard_data_legacy`` is kept as the per-record reference.
+        """
+        self.ensure_one()
+        return self.env['performance.dashboard.engine'].get_dashboard_payload(self)
+
+    def _get_dashboard_data_legacy(self):
+        """Reference (record-by-record) implementation of ``get_dashboard_data``."""
         self.ensure_one()
         
         def _safe_avg(values):
@@ -635,6 +802,19 @@ class PerformanceDashboard(models.Model):
     
     def get_realtime_metrics(self):
         """Get real-time metrics without using computed fields"""
+        return self.env['performance.dashboard.engine'].get_sections(self, ['realtime'])['realtime']
+
+    def get_dashboard_sections(self, sections=None):
+        """Return only the requested dashboard sections (see ``performance.dashboard.engine.get_sections``).
+
+        Sections are the keys of ``get_dashboard_data`` plus ``realtime``
+        (the ``get_realtime_metrics`` payload); a combined request computes
+        shared intermediates once.
+        """
+        return self.env['performance.dashboard.engine'].get_sections(self, sections)
+
+    def _get_realtime_metrics_legacy(self):
+        """Reference (record-by-record) implementation of ``get_realtime_metrics``."""
         # Get counts directly from database
         strategic_goals = self.env['strategic.goal'].search([])
         kras = self.env['key.result.area'].search([])
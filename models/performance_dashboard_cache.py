@@ -0,0 +1,405 @@
+# -*- coding: utf-8 -*-
+import copy
+import hashlib
+import json
+import logging
+import socket
+import threading
+import time
+from collections import OrderedDict
+
+import psycopg2
+
+from odoo import models, api, SUPERUSER_ID
+
+_logger = logging.getLogger(__name__)
+
+
+class _MemoryBackend:
+    """Per-process LRU; only consistent with a single worker."""
+    # {key: (expires_at, payload)}
+    _entries = OrderedDict()
+    _lock = threading.Lock()
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                return copy.deepcopy(entry[1])
+            self._entries.pop(key, None)
+        return None
+
+    def set(self, key, payload, data, ttl, size, version):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, copy.deepcopy(payload))
+            while len(self._entries) > size:
+                self._entries.popitem(last=False)
+
+    def purge(self, version, size):
+        # Entries of older versions are unreachable and age out of the LRU
+        return 0
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class _PostgresBackend:
+    """UNLOGGED table shared by every worker of the database.
+
+    Rows are written on a short cursor of their own and committed at once,
+    so the request never holds locks on the table while it runs. The write
+    waits at most ``LOCK_TIMEOUT`` on a concurrent writer of the same key
+    and otherwise leaves the payload uncached. Expired rows and rows beyond
+    the size limit are removed by ``purge`` (after each data version bump
+    and from the purge cron), not on the write path.
+    """
+    TABLE = 'performance_payload_cache'
+    LOCK_TIMEOUT = '100ms'
+
+    def __init__(self, cache):
+        self.cr = cache.env.cr
+        self.registry = cache.env.registry
+
+    @classmethod
+    def init(cls, cr):
+        cr.execute(f"""
+            CREATE UNLOGGED TABLE IF NOT EXISTS {cls.TABLE} (
+                key varchar PRIMARY KEY,
+                data_version bigint NOT NULL,
+                payload text NOT NULL,
+                size integer NOT NULL,
+                stored_at timestamp NOT NULL,
+                expires_at timestamp NOT NULL
+            )
+        """)
+        cr.execute(f"CREATE INDEX IF NOT EXISTS {cls.TABLE}_stored_at_idx ON {cls.TABLE} (stored_at)")
+
+    def get(self, key):
+        self.cr.execute(f"""
+            SELECT payload FROM {self.TABLE}
+             WHERE key = %s AND expires_at > (now() AT TIME ZONE 'UTC')
+        """, [key])
+        row = self.cr.fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, payload, data, ttl, size, version):
+        try:
+            with self.registry.cursor() as cr:
+                cr.execute(f"SET LOCAL lock_timeout = '{self.LOCK_TIMEOUT}'")
+                # The key carries the version: a live row already holds this payload
+                cr.execute(f"""
+                    INSERT INTO {self.TABLE} AS entry (key, data_version, payload, size, stored_at, expires_at)
+                    VALUES (%s, %s, %s, %s, now() AT TIME ZONE 'UTC',
+                            (now() AT TIME ZONE 'UTC') + make_interval(secs => %s))
+                    ON CONFLICT (key) DO UPDATE
+                       SET payload = EXCLUDED.payload, size = EXCLUDED.size,
+                           stored_at = EXCLUDED.stored_at, expires_at = EXCLUDED.expires_at
+                     WHERE entry.expires_at <= (now() AT TIME ZONE 'UTC')
+                """, [key, version, data, len(data), ttl])
+        except psycopg2.Error as e:
+            # Lock timeout on a busy key, read-only database: the payload is just not cached
+            _logger.debug("Payload cache write skipped: %s", e)
+
+    def purge(self, version, size):
+        # Old versions, expired rows and everything beyond the newest ``size`` entries
+        self.cr.execute(f"""
+            DELETE FROM {self.TABLE}
+             WHERE data_version < %s
+                OR expires_at <= (now() AT TIME ZONE 'UTC')
+                OR key IN (SELECT key FROM {self.TABLE} ORDER BY stored_at DESC, key OFFSET %s)
+        """, [version, size])
+        return self.cr.rowcount
+
+    def clear(self):
+        self.cr.execute(f"DELETE FROM {self.TABLE}")
+
+
+class _SocketBackend:
+    """Local key-value store (memcached text protocol) on a unix socket.
+
+    The store should be dedicated to PMIS: ``clear`` flushes all of it. Any
+    socket error turns into a cache miss.
+    """
+    TIMEOUT = 0.5
+
+    def __init__(self, cache):
+        self.path = cache._get_param('robust_pmis.dashboard_cache_socket', '/run/memcached/memcached.sock')
+
+    def _request(self, command, read):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.TIMEOUT)
+            sock.connect(self.path)
+            sock.sendall(command)
+            with sock.makefile('rb') as stream:
+                return read(stream)
+
+    def get(self, key):
+        def read(stream):
+            header = stream.readline().split()
+            if not header or header[0] != b'VALUE':
+                return None
+            data = stream.read(int(header[3]) + 2)[:-2]
+            stream.readline()  # END
+            return data
+
+        try:
+            data = self._request(f"get {key}\r\n".encode(), read)
+        except OSError as e:
+            _logger.warning("Payload cache socket %s unavailable: %s", self.path, e)
+            return None
+        return json.loads(data) if data else None
+
+    def set(self, key, payload, data, ttl, size, version):
+        # Version tags live in the key; the store's own LRU enforces the size
+        encoded = data.encode()
+        try:
+            self._request(f"set {key} 0 {ttl} {len(encoded)}\r\n".encode() + encoded + b"\r\n",
+                          lambda stream: stream.readline())
+        except OSError as e:
+            _logger.warning("Payload cache socket %s unavailable: %s", self.path, e)
+
+    def purge(self, version, size):
+        return 0
+
+    def clear(self):
+        try:
+            self._request(b"flush_all\r\n", lambda stream: stream.readline())
+        except OSError as e:
+            _logger.warning("Payload cache socket %s unavailable: %s", self.path, e)
+
+
+class PerformanceDashboardCache(models.AbstractModel):
+    """Cross-worker cache for computed dashboard payloads.
+
+    Entries are keyed on the database, a data version, the user's access context
+    and the normalized filter tuple. The data version is bumped after every
+    transaction that wrote KPIs, indicators, programmes or division-programme
+    relationships, so all workers stop using old entries as soon as the write
+    is committed; entries are tagged with the version they were computed at
+    and older ones are purged after the bump. A transaction that wrote such
+    rows itself never reads from or fills the cache.
+
+    Versions are rows of ``performance_dashboard_data_version`` (numbered by a
+    sequence, read as the greatest row) rather than the sequence value
+    itself: a sequence is read outside the transaction snapshot, so a
+    REPEATABLE READ transaction could tag a payload computed from old rows
+    with a version bumped after it started. Appending a row never waits on a
+    concurrent bump.
+
+    The storage is pluggable (``robust_pmis.dashboard_cache_backend``): an
+    UNLOGGED table shared by all workers (``postgres``, default), a local
+    memcached socket (``socket``) or the per-process LRU (``memory``).
+    Entries expire after ``robust_pmis.dashboard_cache_ttl`` seconds, purges
+    trim the store to ``robust_pmis.dashboard_cache_size`` entries and
+    payloads larger than ``robust_pmis.dashboard_cache_max_bytes`` are not
+    cached.
+    """
+    _name = 'performance.dashboard.cache'
+    _description = 'Performance Dashboard Payload Cache'
+
+    _VERSION_SEQUENCE = 'performance_dashboard_data_seq'
+    _VERSION_TABLE = 'performance_dashboard_data_version'
+    _DIRTY_KEY = 'performance.dashboard.cache.dirty'
+    # Tables listed by the realtime summary and dashboard sections whose writes do not bump the sequence
+    _SUMMARY_TABLES = ('strategic_goal', 'strategic_objective', 'key_result_area', 'kcca_directorate', 'kcca_division')
+
+    _BACKENDS = {
+        'postgres': _PostgresBackend,
+        'socket': _SocketBackend,
+        'memory': _MemoryBackend,
+    }
+
+    def init(self):
+        cr = self.env.cr
+        cr.execute(f"CREATE SEQUENCE IF NOT EXISTS {self._VERSION_SEQUENCE}")
+        cr.execute(f"CREATE TABLE IF NOT EXISTS {self._VERSION_TABLE} (version bigint PRIMARY KEY)")
+        cr.execute(f"""
+            INSERT INTO {self._VERSION_TABLE} (version)
+            SELECT last_value FROM {self._VERSION_SEQUENCE}
+             WHERE NOT EXISTS (SELECT 1 FROM {self._VERSION_TABLE})
+        """)
+        _PostgresBackend.init(self.env.cr)
+
+    # ------------------------------------------------------------------
+    # Configuration
+    # ------------------------------------------------------------------
+    @api.model
+    def _get_param(self, key, default):
+        return self.env['ir.config_parameter'].sudo().get_param(key) or default
+
+    @api.model
+    def _get_limits(self):
+        """Return (max entries, ttl seconds) from system parameters."""
+        try:
+            size = int(self._get_param('robust_pmis.dashboard_cache_size', 256))
+        except Exception:
+            size = 256
+        try:
+            ttl = int(self._get_param('robust_pmis.dashboard_cache_ttl', 900))
+        except Exception:
+            ttl = 900
+        return size, ttl
+
+    @api.model
+    def _get_max_bytes(self):
+        try:
+            return int(self._get_param('robust_pmis.dashboard_cache_max_bytes', 2 * 1024 * 1024))
+        except Exception:
+            return 2 * 1024 * 1024
+
+    @api.model
+    def _get_backend(self):
+        name = self._get_param('robust_pmis.dashboard_cache_backend', 'postgres')
+        backend = self._BACKENDS.get(name)
+        if backend is None:
+            _logger.warning("Unknown dashboard cache backend %r, using postgres", name)
+            backend = _PostgresBackend
+        return backend(self)
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+    @api.model
+    def _get_data_version(self):
+        """Latest version committed before this transaction's snapshot."""
+        self.env.cr.execute(f"SELECT COALESCE(MAX(version), 0) FROM {self._VERSION_TABLE}")
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    def _get_summary_version(self):
+        """Return a short token that changes whenever the realtime summary may change.
+
+        Combines the data version with the row count and latest write of the
+        other tables the summary counts (a count catches deletions) and the
+        user's access context, in a single cheap query.
+        """
+        stats = ',\n'.join(
+            f"(SELECT ROW(COUNT(*), MAX(write_date))::text FROM {table})" for table in self._SUMMARY_TABLES)
+        self.env.cr.execute(f"SELECT (SELECT COALESCE(MAX(version), 0) FROM {self._VERSION_TABLE}), {stats}")
+        state = (self.env.cr.dbname, self.env.cr.fetchone(), self._get_access_context())
+        return hashlib.sha1(repr(state).encode()).hexdigest()[:16]
+
+    @api.model
+    def _get_access_context(self):
+        """Users sharing groups, companies and language see identical payloads."""
+        user = self.env.user
+        return (
+            tuple(sorted(user.groups_id.ids)),
+            tuple(sorted(self.env.companies.ids)),
+            self.env.lang or '',
+        )
+
+    @api.model
+    def _normalize_filters(self, filters):
+        """Return a hashable tuple for the dashboard filter dict."""
+        filters = filters or {}
+        scope = filters.get('scope') or 'organization'
+        entity = filters.get('entity') or 'all'
+        try:
+            entity = int(entity) if entity != 'all' else 'all'
+        except Exception:
+            entity = 'all'
+        if scope == 'organization':
+            entity = 'all'
+        return (
+            filters.get('data_type') or 'all',
+            scope,
+            entity,
+            filters.get('performance') or 'all',
+            filters.get('period') or '',
+        )
+
+    # ------------------------------------------------------------------
+    # Cache API
+    # ------------------------------------------------------------------
+    @api.model
+    def _invalidate(self):
+        """Flag the current transaction as dirty; after commit, bump the version and schedule a live update."""
+        # postcommit data survives savepoints and is dropped on commit/rollback
+        data = self.env.cr.postcommit.data
+        if data.get(self._DIRTY_KEY):
+            return
+        data[self._DIRTY_KEY] = True
+        registry = self.env.registry
+        sequence, table = self._VERSION_SEQUENCE, self._VERSION_TABLE
+
+        def _bump_version():
+            with registry.cursor() as cr:
+                cr.execute(f"INSERT INTO {table} (version) VALUES (nextval('{sequence}')) RETURNING version")
+                version = cr.fetchone()[0]
+            with registry.cursor() as cr:
+                env = api.Environment(cr, SUPERUSER_ID, {})
+                env['performance.dashboard.cache']._purge(version)
+                # Open dashboards get the new values pushed over the bus
+                env['performance.dashboard.live']._schedule()
+
+        self.env.cr.postcommit.add(_bump_version)
+
+    @api.model
+    def _make_key(self, kind, filters, version):
+        return 'pmis:' + hashlib.sha1(repr((
+            self.env.cr.dbname,
+            version,
+            self._get_access_context(),
+            kind,
+            self._normalize_filters(filters),
+        )).encode()).hexdigest()
+
+    @api.model
+    def get_or_compute(self, kind, filters, compute, version=None):
+        """Return the cached payload for ``filters``, computing and storing it on a miss.
+
+        ``version`` replaces the data version in the key for payloads that
+        depend on more than the versioned tables. The caller owns the returned
+        payload and may mutate it.
+        """
+        if self.env.cr.postcommit.data.get(self._DIRTY_KEY):
+            return compute()
+
+        size, ttl = self._get_limits()
+        data_version = self._get_data_version()
+        key = self._make_key(kind, filters, version if version is not None else data_version)
+        backend = self._get_backend()
+        payload = backend.get(key)
+        if payload is not None:
+            return payload
+
+        payload = compute()
+        try:
+            data = json.dumps(payload, sort_keys=True)
+            # Only payloads that survive the JSON round trip unchanged are shared
+            storable = len(data) <= self._get_max_bytes() and json.loads(data) == payload
+        except (TypeError, ValueError):
+            storable = False
+        if storable:
+            backend.set(key, payload, data, ttl, size, data_version)
+        return payload
+
+    @api.model
+    def _purge(self, version):
+        """Drop entries computed before data version ``version`` and the superseded version rows."""
+        try:
+            with self.env.cr.savepoint(flush=False):
+                self.env.cr.execute(f"DELETE FROM {self._VERSION_TABLE} WHERE version < %s", [version])
+        except psycopg2.Error as e:
+            # A concurrent bump deleted them first; the next purge catches up
+            _logger.debug("Dashboard data version rows not trimmed: %s", e)
+        return self._get_backend().purge(version, self._get_limits()[0])
+
+    @api.model
+    def cron_purge_dashboard_cache(self):
+        """Hourly: drop expired and surplus entries when no data change has triggered a purge."""
+        self._purge(self._get_data_version())
+        return True
+
+    @api.model
+    def clear(self):
+        """Drop every cached payload."""
+        self._get_backend().clear()
+        return True
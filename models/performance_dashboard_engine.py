@@ -0,0 +1,349 @@
+# -*- coding: utf-8 -*-
+from collections import defaultdict
+
+from odoo import models, api
+
+
+class PerformanceDashboardEngine(models.AbstractModel):
+    """Set-based aggregation engine for the organisation dashboard.
+
+    Every section of the dashboard payload is computed with a fixed number of
+    grouped queries instead of one search per KRA, goal, directorate or
+    division. KPI, indicator and division-programme aggregates are read from
+    the ``performance.rollup`` table; entity lists and programme links still go
+    through the ORM so the default active filter applies.
+
+    Sections are computed independently (``get_sections``), each cached under
+    its own key, so a chart or a poll only pays for what it displays. A
+    combined request shares intermediates (rollup totals, KRA statistics,
+    entity lists) between its sections through a per-request memo.
+    """
+    _name = 'performance.dashboard.engine'
+    _description = 'Performance Dashboard Aggregation Engine'
+
+    # Sections of the full ``get_dashboard_data`` payload, in payload order
+    _PAYLOAD_SECTIONS = (
+        'kras_performance', 'goals_performance', 'top_kpis', 'distribution',
+        'directorate_contributions', 'division_contributions', 'summary',
+    )
+    # Every section ``get_sections`` can compute
+    _SECTIONS = _PAYLOAD_SECTIONS + ('realtime',)
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+    @api.model
+    def _safe_avg(self, values):
+        vals = [float(v) for v in values if v is not None]
+        return round(sum(vals) / len(vals), 2) if vals else 0.0
+
+    @api.model
+    def _clamp(self, value):
+        try:
+            v = float(value)
+        except Exception:
+            return 0.0
+        return 0.0 if v < 0 else (100.0 if v > 100 else v)
+
+    @api.model
+    def _shared(self, memo, key, compute):
+        """Return ``compute()``, evaluated once per ``memo`` (one combined request)."""
+        if memo is None:
+            return compute()
+        if key not in memo:
+            memo[key] = compute()
+        return memo[key]
+
+    @api.model
+    def _org_totals(self, source, memo=None):
+        return self._shared(memo, ('totals', source), lambda: self.env['performance.rollup']._get_totals(source))
+
+    @api.model
+    def _kra_rows(self, memo=None):
+        return self._shared(memo, 'kra_rows', lambda: self.env['performance.rollup']._get_stats('kpi', 'kra'))
+
+    @api.model
+    def _search_all(self, model_name, memo=None):
+        return self._shared(memo, ('records', model_name), lambda: self.env[model_name].search([]))
+
+    @api.model
+    def _rollup_sum_count(self, source, entity_type, entity_ids=None, period_key='all'):
+        """Return {entity_id: [sum, count]} from the rollup table."""
+        stats = self.env['performance.rollup']._get_stats(source, entity_type, entity_ids, period_key)
+        return {eid: [row['achievement_sum'] or 0.0, row['record_count']] for eid, row in stats.items()}
+
+    @api.model
+    def _ids_by(self, model_name, domain, groupby, field_name='id'):
+        """Return {group_id: set(ids of ``field_name``)} grouped by ``groupby``."""
+        rows = self.env[model_name]._read_group(domain, [groupby], [f'{field_name}:array_agg'])
+        return {group.id: {i for i in ids if i} for group, ids in rows if group}
+
+    @api.model
+    def _totals(self, model_name, field_names, domain=None):
+        """Return (sums..., count) over ``domain`` in a single query."""
+        aggregates = [f'{fname}:sum' for fname in field_names] + ['__count']
+        row = self.env[model_name]._read_group(domain or [], [], aggregates)[0]
+        return [v or 0.0 for v in row[:-1]] + [row[-1]]
+
+    # ------------------------------------------------------------------
+    # Payload sections
+    # ------------------------------------------------------------------
+    @api.model
+    def _compute_kras_performance(self, memo=None):
+        kra_rows = self._kra_rows(memo)
+        kras_data = []
+        for kra in self._search_all('key.result.area', memo):
+            row = kra_rows.get(kra.id)
+            total, count = (row['achievement_sum'] or 0.0, row['record_count']) if row else (0.0, 0)
+            kras_data.append({
+                'name': kra.name,
+                'performance': total / count if count else 0.0,
+                'kpi_count': count,
+                'strategic_objective': kra.strategic_objective_id.name if kra.strategic_objective_id else 'No Objective'
+            })
+        return kras_data
+
+    @api.model
+    def _compute_goals_performance(self, memo=None):
+        # Goal rows roll KPIs up through the strategic objective (same path as the
+        # historical 'kra_id.strategic_objective_id.strategic_goal_id' domain)
+        goal_stats = self._rollup_sum_count('kpi', 'goal')
+        goals_data = []
+        for goal in self._search_all('strategic.goal', memo):
+            total, count = goal_stats.get(goal.id, (0.0, 0))
+            goals_data.append({
+                'name': goal.name,
+                'performance': total / count if count else 0.0,
+                'kpi_count': count,
+                'target': goal.target_percentage if hasattr(goal, 'target_percentage') else 100.0
+            })
+        return goals_data
+
+    @api.model
+    def _compute_top_kpis(self):
+        # Five best of each type from the unified KPI fact table (kind, achievement index)
+        Unified = self.env['kpi.unified']
+        top_kpis_data = []
+        for kind, label in (('strategic', 'Strategic KPI'), ('programme', 'Programme KPI')):
+            rows = Unified.search([
+                ('kind', '=', kind), ('achievement_percentage', '>', 0)
+            ], order='achievement_percentage desc', limit=5)
+            for row in rows:
+                if kind == 'strategic':
+                    parent = row.kra_id.name if row.kra_id else 'No KRA'
+                else:
+                    parent = row.programme_id.name if row.programme_id else 'No Programme'
+                top_kpis_data.append({
+                    'name': row.name,
+                    'performance': row.achievement_percentage,
+                    'target': row.target_value,
+                    'current': row.current_value,
+                    'kra': parent,
+                    'type': label,
+                })
+        return sorted(top_kpis_data, key=lambda x: x['performance'], reverse=True)[:10]
+
+    @api.model
+    def _compute_distribution(self, memo=None):
+        kpi_row = self._org_totals('kpi', memo)
+        ind_row = self._org_totals('indicator', memo)
+        return {
+            bucket: kpi_row[f'count_{bucket}'] + ind_row[f'count_{bucket}']
+            for bucket in ('excellent', 'good', 'fair', 'poor')
+        }
+
+    @api.model
+    def _programme_performance_map(self, programme_ids):
+        Programme = self.env['kcca.programme'].with_context(active_test=False)
+        rows = Programme.search_read([('id', 'in', list(programme_ids))], ['overall_performance'])
+        return {r['id']: r['overall_performance'] or 0.0 for r in rows}
+
+    @api.model
+    def _compute_directorate_contributions(self, divisions=None):
+        directorates = self.env['kcca.directorate'].search([])
+        dir_ids = directorates.ids
+        if divisions is None:
+            divisions = self.env['kcca.division'].search([])
+
+        kpi_rows = self.env['performance.rollup']._get_stats('kpi', 'directorate', dir_ids)
+        # Division-programme relationship scores rolled up to the division's directorate
+        rel_by_dir = self._rollup_sum_count('division_programme', 'directorate', dir_ids)
+
+        # all_programme_ids = direct | division (legacy) programmes | implementing
+        programme_sets = defaultdict(set)
+        for dir_id, ids in self._ids_by('kcca.programme', [('directorate_id', 'in', dir_ids)], 'directorate_id').items():
+            programme_sets[dir_id] |= ids
+        div_programmes = self._ids_by('kcca.programme', [('division_id', 'in', divisions.ids)], 'division_id')
+        for division in divisions:
+            if division.directorate_id and division.id in div_programmes:
+                programme_sets[division.directorate_id.id] |= div_programmes[division.id]
+        for dir_id, ids in self._ids_by(
+                'kcca.programme', [('implementing_directorate_ids', 'in', dir_ids)], 'implementing_directorate_ids').items():
+            programme_sets[dir_id] |= ids
+        prog_perf = self._programme_performance_map(set().union(*programme_sets.values()) if programme_sets else set())
+
+        directorate_contributions = []
+        for d in directorates:
+            kpi_row = kpi_rows.get(d.id)
+            count = kpi_row['record_count'] if kpi_row else 0
+            kpi_ach = kpi_row['achievement_sum'] / count if count else 0.0
+            progs = programme_sets.get(d.id, set())
+            prog_ach = sum(prog_perf.get(p, 0.0) for p in progs) / len(progs) if progs else 0.0
+            rel_total, rel_count = rel_by_dir.get(d.id, (0.0, 0))
+            div_rel_ach = rel_total / rel_count if rel_count else 0.0
+            blended_prog = (prog_ach + div_rel_ach) / 2.0 if (prog_ach or div_rel_ach) else 0.0
+            directorate_contributions.append({
+                'name': d.name,
+                'kpi_achievement': round(kpi_ach, 2),
+                'programme_progress': round(blended_prog, 2),
+                'on_target_kpis': kpi_row['count_on_target'] if kpi_row else 0,
+                'total_kpis': count,
+            })
+        return directorate_contributions
+
+    @api.model
+    def _compute_division_contributions(self, divisions=None):
+        if divisions is None:
+            divisions = self.env['kcca.division'].search([])
+        div_ids = divisions.ids
+        rel_stats = self._rollup_sum_count('division_programme', 'division', div_ids)
+
+        # programme_ids (legacy one2many) | implementing_programme_ids (non-direct relationships)
+        programme_sets = defaultdict(set)
+        for div_id, ids in self._ids_by('kcca.programme', [('division_id', 'in', div_ids)], 'division_id').items():
+            programme_sets[div_id] |= ids
+        for div_id, ids in self._ids_by(
+                'division.programme.rel', [('division_id', 'in', div_ids), ('is_direct', '=', False)],
+                'division_id', 'programme_id').items():
+            programme_sets[div_id] |= ids
+        all_programme_ids = set().union(*programme_sets.values()) if programme_sets else set()
+        prog_perf = self._programme_performance_map(all_programme_ids)
+
+        ind_rows = self.env['performance.rollup']._get_stats('indicator', 'programme', all_programme_ids)
+
+        division_contributions = []
+        for v in divisions:
+            progs = programme_sets.get(v.id, set())
+            prog_ach = sum(prog_perf.get(p, 0.0) for p in progs) / len(progs) if progs else 0.0
+            rel_total, rel_count = rel_stats.get(v.id, (0.0, 0))
+            div_rel_ach = rel_total / rel_count if rel_count else 0.0
+            blended_prog = (prog_ach + div_rel_ach) / 2.0 if (prog_ach or div_rel_ach) else 0.0
+            rows = [ind_rows[p] for p in progs if p in ind_rows]
+            ind_total = sum(r['achievement_sum'] for r in rows)
+            ind_count = sum(r['record_count'] for r in rows)
+            division_contributions.append({
+                'name': v.name,
+                'programme_progress': round(blended_prog, 2),
+                'indicator_achievement': round(ind_total / ind_count, 2) if ind_count else 0.0,
+                'on_target_indicators': sum(r['count_on_target'] for r in rows),
+                'total_indicators': ind_count,
+            })
+        return division_contributions
+
+    @api.model
+    def _compute_summary(self, dashboard, memo=None):
+        kpi_row = self._org_totals('kpi', memo)
+        ind_row = self._org_totals('indicator', memo)
+        rel_row = self._org_totals('division_programme', memo)
+        kpi_total, kpi_count = kpi_row['achievement_sum'], kpi_row['record_count']
+        ind_total, ind_count = ind_row['achievement_sum'], ind_row['record_count']
+        rel_score, rel_budget, rel_count = (
+            rel_row['achievement_sum'], rel_row['budget_utilization_sum'], rel_row['record_count'])
+        prog_total, prog_count = self._totals('kcca.programme', ['overall_performance'])
+
+        def _avg(total, count):
+            return round(total / count, 2) if count else 0.0
+
+        avg_kpi_performance = _avg(kpi_total + ind_total, kpi_count + ind_count)
+        avg_programme_performance = _avg(prog_total, prog_count)
+        avg_division_programme_performance = _avg(rel_score, rel_count)
+        avg_overall = self._safe_avg([avg_kpi_performance, avg_programme_performance, avg_division_programme_performance])
+        avg_kpi_performance = self._clamp(avg_kpi_performance)
+
+        return {
+            'total_goals': dashboard.total_goals,
+            'total_kras': dashboard.total_kras,
+            'avg_kra_performance': dashboard.avg_kra_performance,
+            'total_kpis': dashboard.total_kpis,
+            'avg_performance': self._clamp(avg_overall),
+            'kpi_only_performance': avg_kpi_performance,
+            'avg_kpi_performance': avg_kpi_performance,
+            'avg_programme_performance': self._clamp(avg_programme_performance),
+            'avg_division_programme_performance': self._clamp(avg_division_programme_performance),
+            'avg_budget_utilization': _avg(rel_budget, rel_count),
+            'total_programmes': dashboard.total_programmes,
+            'total_directorates': dashboard.total_directorates,
+            'total_divisions': dashboard.total_divisions,
+            'strategic_kpis_count': kpi_count,
+            'programme_kpis_count': ind_count,
+        }
+
+    @api.model
+    def _compute_realtime(self, memo=None):
+        """Same payload as ``performance.dashboard._get_realtime_metrics_legacy``."""
+        goal_count = len(self._search_all('strategic.goal', memo))
+        kras = self._search_all('key.result.area', memo)
+        # KRAs without KPIs have no rollup row and are skipped
+        kra_rows = self._kra_rows(memo)
+        kra_performances = [kra_rows[kra_id]['avg_achievement'] for kra_id in kras.ids if kra_id in kra_rows]
+        avg_kra_performance = sum(kra_performances) / len(kra_performances) if kra_performances else 0.0
+
+        kpi_totals = self._org_totals('kpi', memo)
+        indicator_totals = self._org_totals('indicator', memo)
+        kpi_count = kpi_totals['record_count'] + indicator_totals['record_count']
+        avg_kpi_performance = 0.0
+        if kpi_count:
+            avg_kpi_performance = (kpi_totals['achievement_sum'] + indicator_totals['achievement_sum']) / kpi_count
+
+        # Programmes without progress do not weigh on the average
+        prog_total, prog_count = self._totals('kcca.programme', ['overall_performance'],
+                                              [('overall_performance', '!=', 0)])
+        return {
+            'total_goals': goal_count,
+            'total_strategic_goals': goal_count,
+            'total_kras': len(kras),
+            'total_kpis': kpi_count,
+            'total_programmes': self.env['kcca.programme'].search_count([]),
+            'total_directorates': self.env['kcca.directorate'].search_count([]),
+            'total_divisions': len(self._search_all('kcca.division', memo)),
+            'avg_kra_performance': avg_kra_performance,
+            'avg_kpi_performance': avg_kpi_performance,
+            'kpi_only_performance': avg_kpi_performance,
+            'avg_programme_performance': prog_total / prog_count if prog_count else 0.0,
+            'avg_directorate_performance': 0.0,  # Can be enhanced later
+            'avg_division_performance': 0.0,     # Can be enhanced later
+        }
+
+    @api.model
+    def get_sections(self, dashboard, sections=None):
+        """Return {section: payload} for the requested sections (all when ``sections`` is empty).
+
+        Each section is cached on its own, keyed on the summary version
+        (dashboard data version plus goal/KRA/directorate/division changes);
+        unknown section names are ignored.
+        """
+        names = [name for name in (sections or self._SECTIONS) if name in self._SECTIONS]
+        Cache = self.env['performance.dashboard.cache']
+        version = Cache._get_summary_version()
+        memo = {}
+        builders = {
+            'kras_performance': lambda: self._compute_kras_performance(memo),
+            'goals_performance': lambda: self._compute_goals_performance(memo),
+            'top_kpis': self._compute_top_kpis,
+            'distribution': lambda: self._compute_distribution(memo),
+            'directorate_contributions': lambda: self._compute_directorate_contributions(
+                self._search_all('kcca.division', memo)),
+            'division_contributions': lambda: self._compute_division_contributions(
+                self._search_all('kcca.division', memo)),
+            'summary': lambda: self._compute_summary(dashboard, memo),
+            'realtime': lambda: self._compute_realtime(memo),
+        }
+        return {
+            name: Cache.get_or_compute(f'section:{name}', None, builders[name], version=version)
+            for name in names
+        }
+
+    @api.model
+    def get_dashboard_payload(self, dashboard):
+        """Build the full ``performance.dashboard.get_dashboard_data`` payload."""
+        return self.get_sections(dashboard, self._PAYLOAD_SECTIONS)
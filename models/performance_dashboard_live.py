@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import json
+import logging
+from datetime import timedelta
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+
+class PerformanceDashboardLive(models.AbstractModel):
+    """Push dashboard updates over the bus instead of having every tab poll.
+
+    Transactions that change KPIs, indicators, programmes or division-programme
+    relationships schedule one publication a few seconds after their commit
+    (see ``performance.dashboard.cache._invalidate``); further changes inside
+    that window join the scheduled one, so a bulk import publishes once. The
+    publication computes the realtime metrics and chart sections a single
+    time, compares each of them with the last published digest and
+    broadcasts the names of the changed ones on one bus channel. No values
+    are sent: the publication runs as the cron user, so each dashboard
+    refetches the named parts through its own session and record rules.
+    """
+    _name = 'performance.dashboard.live'
+    _description = 'Live Dashboard Updates'
+
+    _CHANNEL = 'robust_pmis.dashboard'
+    _NOTIFICATION = 'robust_pmis/dashboard_changed'
+    _STATE_TABLE = 'performance_dashboard_live_state'
+    # Chart sections of ``get_dashboard_data`` the dashboards patch in place
+    _SECTIONS = ('goals_performance', 'kras_performance', 'top_kpis', 'distribution')
+
+    def init(self):
+        # Digest of every published metric and section, shared by all workers
+        self.env.cr.execute(f"""
+            CREATE UNLOGGED TABLE IF NOT EXISTS {self._STATE_TABLE} (
+                key varchar PRIMARY KEY,
+                digest varchar NOT NULL
+            )
+        """)
+
+    @api.model
+    def _get_window(self):
+        """Seconds during which changes are coalesced into one publication."""
+        try:
+            return int(self.env['ir.config_parameter'].sudo().get_param('robust_pmis.dashboard_push_window') or 10)
+        except Exception:
+            return 10
+
+    @api.model
+    def _schedule(self):
+        """Schedule a publication unless one is already pending."""
+        cron = self.env.ref('robust_pmis.cron_publish_dashboard_updates', raise_if_not_found=False)
+        if not cron or not cron.active:
+            return False
+        self.env.cr.execute("SELECT 1 FROM ir_cron_trigger WHERE cron_id = %s LIMIT 1", [cron.id])
+        if self.env.cr.fetchone():
+            return False
+        cron.sudo()._trigger(at=fields.Datetime.now() + timedelta(seconds=self._get_window()))
+        return True
+
+    @api.model
+    def _collect(self):
+        """Return {key: value} of everything a live dashboard displays."""
+        dashboard = self.env['performance.dashboard'].search([], limit=1)
+        if not dashboard:
+            dashboard = self.env['performance.dashboard'].create({})
+        values = {f'metric:{key}': value for key, value in dashboard.get_realtime_metrics().items()}
+        data = dashboard.get_dashboard_data()
+        values.update({f'section:{key}': data.get(key) for key in self._SECTIONS})
+        return values
+
+    @api.model
+    def publish(self):
+        """Broadcast the names of the metrics and sections changed since the last publication.
+
+        Returns:
+            dict: the published message, empty when nothing changed
+        """
+        values = self._collect()
+        digests = {
+            key: hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()
+            for key, value in values.items()
+        }
+        self.env.cr.execute(f"SELECT key, digest FROM {self._STATE_TABLE} WHERE key = ANY(%s)", [list(digests)])
+        published = dict(self.env.cr.fetchall())
+        changed = [key for key, digest in digests.items() if published.get(key) != digest]
+        if not changed:
+            return {}
+
+        self.env.cr.execute(f"""
+            INSERT INTO {self._STATE_TABLE} (key, digest)
+            SELECT * FROM unnest(%s::varchar[], %s::varchar[])
+            ON CONFLICT (key) DO UPDATE SET digest = EXCLUDED.digest
+        """, [changed, [digests[key] for key in changed]])
+        message = {'metrics': [], 'sections': []}
+        for key in sorted(changed):
+            kind, name = key.split(':', 1)
+            message['metrics' if kind == 'metric' else 'sections'].append(name)
+        self.env['bus.bus']._sendone(self._CHANNEL, self._NOTIFICATION, message)
+        _logger.info("Dashboard update published: %s metric(s), %s section(s)",
+                     len(message['metrics']), len(message['sections']))
+        return message
+
+    @api.model
+    def cron_publish_dashboard_updates(self):
+        self.publish()
+        return True
@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+import logging
+import re
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+_BOUND_RE = re.compile(r"FROM \('([0-9-]+)[^']*'\) TO \('([0-9-]+)[^']*'\)")
+
+
+class PerformanceHistoryPartition(models.AbstractModel):
+    """Range partitioning and retention for the append-only history tables.
+
+    ``audit.log`` is partitioned by calendar month on ``timestamp`` and
+    ``performance.score`` by fiscal quarter (Jul-Sep = Q1) on ``date``. Each
+    table gets a DEFAULT partition for out-of-range rows; the daily cron keeps
+    a few partitions ahead of today and moves matching rows out of the default
+    partition when a new partition is created.
+
+    Retention is off by default. When ``robust_pmis.score_retention_months`` or
+    ``robust_pmis.audit_log_retention_months`` is set, detail rows older than
+    the window are folded into ``performance.score.summary`` /
+    ``audit.log.summary`` and whole partitions are dropped.
+    """
+    _name = 'performance.history.partition'
+    _description = 'History Table Partitioning and Retention'
+
+    # model -> partition column, default granularity, retention parameter
+    _HISTORY_TABLES = {
+        'audit.log': {
+            'column': 'timestamp',
+            'granularity': 'month',
+            'retention_param': 'robust_pmis.audit_log_retention_months',
+        },
+        'performance.score': {
+            'column': 'date',
+            'granularity': 'quarter',
+            'retention_param': 'robust_pmis.score_retention_months',
+        },
+    }
+
+    # ------------------------------------------------------------------
+    # Periods
+    # ------------------------------------------------------------------
+    @api.model
+    def _period_start(self, day, granularity):
+        if granularity == 'month':
+            return day.replace(day=1)
+        # Fiscal quarters start in July, October, January and April
+        fiscal_start = date(day.year if day.month >= 7 else day.year - 1, 7, 1)
+        return fiscal_start + relativedelta(months=(day.month - 7) % 12 // 3 * 3)
+
+    @api.model
+    def _period_bounds(self, start, end, granularity):
+        """Return [(suffix, date_from, date_to)] covering ``start`` .. ``end`` (inclusive)."""
+        step = relativedelta(months=1 if granularity == 'month' else 3)
+        current = self._period_start(start, granularity)
+        bounds = []
+        while current <= end:
+            upper = current + step
+            if granularity == 'month':
+                suffix = f'y{current.year}m{current.month:02d}'
+            else:
+                fiscal_year = current.year if current.month >= 7 else current.year - 1
+                quarter = ((current.month - 7) % 12) // 3 + 1
+                suffix = f'fy{fiscal_year}q{quarter}'
+            bounds.append((suffix, current, upper))
+            current = upper
+        return bounds
+
+    @api.model
+    def _get_granularity(self, model_name):
+        param = self.env['ir.config_parameter'].sudo().get_param(
+            f'robust_pmis.partition_granularity.{model_name}')
+        return param if param in ('month', 'quarter') else self._HISTORY_TABLES[model_name]['granularity']
+
+    @api.model
+    def _get_int_param(self, key, default):
+        try:
+            return int(self.env['ir.config_parameter'].sudo().get_param(key) or default)
+        except Exception:
+            return default
+
+    # ------------------------------------------------------------------
+    # Catalog helpers
+    # ------------------------------------------------------------------
+    @api.model
+    def _is_partitioned(self, table):
+        self.env.cr.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [table])
+        row = self.env.cr.fetchone()
+        return bool(row) and row[0] == 'p'
+
+    @api.model
+    def _get_partitions(self, table):
+        """Return [(partition name, date_from or None, date_to or None)]; None bounds mean DEFAULT."""
+        self.env.cr.execute("""
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+              FROM pg_inherits i
+              JOIN pg_class c ON c.oid = i.inhrelid
+             WHERE i.inhparent = to_regclass(%s)
+        """, [table])
+        partitions = []
+        for name, bound in self.env.cr.fetchall():
+            match = _BOUND_RE.search(bound or '')
+            if match:
+                partitions.append((name, fields.Date.to_date(match.group(1)), fields.Date.to_date(match.group(2))))
+            else:
+                partitions.append((name, None, None))
+        return partitions
+
+    # ------------------------------------------------------------------
+    # Partitioning
+    # ------------------------------------------------------------------
+    @api.model
+    def _convert_to_partitioned(self, model_name):
+        """Swap the table of ``model_name`` for a range-partitioned copy (one-off, idempotent)."""
+        spec = self._HISTORY_TABLES[model_name]
+        Model = self.env[model_name]
+        table, column = Model._table, spec['column']
+        if self._is_partitioned(table):
+            return False
+        Model.flush_model()
+        cr = self.env.cr
+        legacy = f'{table}_unpartitioned'
+
+        cr.execute("""
+            SELECT indexname, indexdef FROM pg_indexes
+             WHERE schemaname = current_schema() AND tablename = %s
+        """, [table])
+        indexes = [(name, definition) for name, definition in cr.fetchall()
+                   if name != f'{table}_pkey' and 'UNIQUE' not in definition]
+        cr.execute("""
+            SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+             WHERE conrelid = to_regclass(%s) AND contype IN ('f', 'c')
+        """, [table])
+        constraints = cr.fetchall()
+
+        # The partition key is part of the primary key and must never be NULL
+        cr.execute(f"UPDATE {table} SET {column} = create_date WHERE {column} IS NULL")
+        cr.execute(f"SELECT MIN({column})::date, MAX({column})::date FROM {table}")
+        min_date, max_date = cr.fetchone()
+
+        cr.execute(f'ALTER TABLE {table} RENAME TO {legacy}')
+        cr.execute(f"""
+            CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING STORAGE INCLUDING COMMENTS)
+                PARTITION BY RANGE ({column})
+        """)
+        cr.execute(f'ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL')
+        cr.execute(f'ALTER TABLE {table} ADD PRIMARY KEY (id, {column})')
+        cr.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+        cr.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+        today = fields.Date.context_today(self)
+        self._ensure_partitions(model_name, min(min_date or today, today), max(max_date or today, today))
+
+        cr.execute(f'INSERT INTO {table} SELECT * FROM {legacy}')
+        cr.execute(f'DROP TABLE {legacy}')
+        for _name, definition in indexes:
+            definition = re.sub(rf' ON (ONLY )?(\w+\.)?{legacy} ', f' ON {table} ', definition)
+            cr.execute(definition.replace('CREATE INDEX ', 'CREATE INDEX IF NOT EXISTS ', 1))
+        for name, definition in constraints:
+            cr.execute(f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition}')
+        Model.init()
+        Model.invalidate_model()
+        _logger.info("Partitioned %s by %s", table, column)
+        return True
+
+    @api.model
+    def _ensure_partitions(self, model_name, start, end):
+        """Create the missing partitions covering ``start`` .. ``end``."""
+        spec = self._HISTORY_TABLES[model_name]
+        table, column = self.env[model_name]._table, spec['column']
+        if not self._is_partitioned(table):
+            return 0
+        cr = self.env.cr
+        existing = {name for name, _from, _to in self._get_partitions(table)}
+        created = 0
+        for suffix, date_from, date_to in self._period_bounds(start, end, self._get_granularity(model_name)):
+            name = f'{table}_{suffix}'
+            if name in existing:
+                continue
+            # Rows already parked in the default partition must move into the new one
+            cr.execute(f'CREATE TEMP TABLE _pmis_moved (LIKE {table}) ON COMMIT DROP')
+            cr.execute(f"""
+                WITH moved AS (
+                    DELETE FROM {table}_default WHERE {column} >= %s AND {column} < %s RETURNING *
+                )
+                INSERT INTO _pmis_moved SELECT * FROM moved
+            """, [date_from, date_to])
+            cr.execute(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)",
+                       [date_from, date_to])
+            cr.execute(f'INSERT INTO {table} SELECT * FROM _pmis_moved')
+            cr.execute('DROP TABLE _pmis_moved')
+            created += 1
+        return created
+
+    @api.model
+    def enable_partitioning(self):
+        """Partition every history table (used by the migration and post-init hook)."""
+        for model_name in self._HISTORY_TABLES:
+            self._convert_to_partitioned(model_name)
+        return True
+
+    # ------------------------------------------------------------------
+    # Retention
+    # ------------------------------------------------------------------
+    @api.model
+    def _compact_scores(self, cutoff):
+        """Fold scores dated before ``cutoff`` into per fiscal-quarter summaries.
+
+        Indicator scores and strategic KPI snapshots are summarised alike, one
+        row per subject and quarter, since the purge deletes both.
+        """
+        for column in ('indicator_id', 'kpi_id'):
+            self._compact_score_subject(column, cutoff)
+
+    @api.model
+    def _compact_score_subject(self, column, cutoff):
+        self.env.cr.execute(f"""
+            INSERT INTO performance_score_summary (
+                {column}, period_key, period_start, period_end, score_count,
+                avg_achievement, min_achievement, max_achievement,
+                last_date, last_value, last_target_value, last_achievement
+            )
+            SELECT {column},
+                   'q' || q.quarter || ':' || q.fiscal_year,
+                   MIN(q.period_start), (MIN(q.period_start) + INTERVAL '3 months' - INTERVAL '1 day')::date,
+                   COUNT(*), AVG(achievement_percentage),
+                   MIN(achievement_percentage), MAX(achievement_percentage),
+                   (ARRAY_AGG(date ORDER BY date DESC, id DESC))[1],
+                   (ARRAY_AGG(value ORDER BY date DESC, id DESC))[1],
+                   (ARRAY_AGG(target_value ORDER BY date DESC, id DESC))[1],
+                   (ARRAY_AGG(achievement_percentage ORDER BY date DESC, id DESC))[1]
+              FROM performance_score s
+             CROSS JOIN LATERAL (
+                SELECT EXTRACT(YEAR FROM s.date - INTERVAL '6 months')::int AS fiscal_year,
+                       (EXTRACT(MONTH FROM s.date)::int + 5) %% 12 / 3 + 1 AS quarter,
+                       (DATE_TRUNC('quarter', s.date - INTERVAL '6 months') + INTERVAL '6 months')::date AS period_start
+             ) q
+             WHERE s.date < %s AND s.{column} IS NOT NULL
+          GROUP BY {column}, q.fiscal_year, q.quarter
+            ON CONFLICT ({column}, period_key) DO UPDATE SET
+                score_count = performance_score_summary.score_count + EXCLUDED.score_count,
+                avg_achievement = (performance_score_summary.avg_achievement * performance_score_summary.score_count
+                                   + EXCLUDED.avg_achievement * EXCLUDED.score_count)
+                                  / (performance_score_summary.score_count + EXCLUDED.score_count),
+                min_achievement = LEAST(performance_score_summary.min_achievement, EXCLUDED.min_achievement),
+                max_achievement = GREATEST(performance_score_summary.max_achievement, EXCLUDED.max_achievement),
+                last_date = GREATEST(performance_score_summary.last_date, EXCLUDED.last_date),
+                last_value = CASE WHEN EXCLUDED.last_date >= performance_score_summary.last_date
+                                  THEN EXCLUDED.last_value ELSE performance_score_summary.last_value END,
+                last_target_value = CASE WHEN EXCLUDED.last_date >= performance_score_summary.last_date
+                                         THEN EXCLUDED.last_target_value
+                                         ELSE performance_score_summary.last_target_value END,
+                last_achievement = CASE WHEN EXCLUDED.last_date >= performance_score_summary.last_date
+                                        THEN EXCLUDED.last_achievement
+                                        ELSE performance_score_summary.last_achievement END
+        """, [cutoff])
+
+    @api.model
+    def _compact_audit_log(self, cutoff):
+        """Fold audit entries older than ``cutoff`` into monthly counts."""
+        self.env.cr.execute("""
+            INSERT INTO audit_log_summary (month, model_name, action_type, user_id, entry_count,
+                                           first_timestamp, last_timestamp)
+            SELECT DATE_TRUNC('month', timestamp)::date, model_name, action_type, user_id,
+                   COUNT(*), MIN(timestamp), MAX(timestamp)
+              FROM audit_log
+             WHERE timestamp < %s
+          GROUP BY 1, 2, 3, 4
+            ON CONFLICT (month, model_name, action_type, user_id) DO UPDATE SET
+                entry_count = audit_log_summary.entry_count + EXCLUDED.entry_count,
+                first_timestamp = LEAST(audit_log_summary.first_timestamp, EXCLUDED.first_timestamp),
+                last_timestamp = GREATEST(audit_log_summary.last_timestamp, EXCLUDED.last_timestamp)
+        """, [cutoff])
+
+    @api.model
+    def _apply_retention(self, model_name):
+        """Compact and purge the detail rows of ``model_name`` older than its retention window."""
+        spec = self._HISTORY_TABLES[model_name]
+        months = self._get_int_param(spec['retention_param'], 0)
+        if months <= 0:
+            return 0
+        Model = self.env[model_name]
+        Model.flush_model()
+        table, column = Model._table, spec['column']
+        granularity = self._get_granularity(model_name)
+        # Align the cutoff on a partition boundary so whole partitions can be dropped
+        cutoff = self._period_start(fields.Date.context_today(self) - relativedelta(months=months), granularity)
+
+        if model_name == 'performance.score':
+            self._compact_scores(cutoff)
+        else:
+            self._compact_audit_log(cutoff)
+
+        cr = self.env.cr
+        dropped = 0
+        for name, date_from, date_to in self._get_partitions(table):
+            if date_to and date_to <= cutoff:
+                cr.execute(f'DROP TABLE {name}')
+                dropped += 1
+        # Default partition or unpartitioned table
+        cr.execute(f'DELETE FROM {table} WHERE {column} < %s', [cutoff])
+        Model.invalidate_model()
+        _logger.info("Retention on %s: cutoff %s, %s partition(s) dropped, %s row(s) deleted",
+                     table, cutoff, dropped, cr.rowcount)
+        return dropped
+
+    @api.model
+    def cron_maintain_history_partitions(self):
+        """Daily: create upcoming partitions and apply the retention policy."""
+        ahead = self._get_int_param('robust_pmis.partition_premake', 3)
+        today = fields.Date.context_today(self)
+        for model_name in self._HISTORY_TABLES:
+            step = relativedelta(months=ahead * (1 if self._get_granularity(model_name) == 'month' else 3))
+            self._ensure_partitions(model_name, today, today + step)
+            self._apply_retention(model_name)
+        return True
@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 
+from markupsafe import Markup
+
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
 
@@ -398,6 +400,22 @@ class PerformanceIndicator(models.Model):
             else:
                 record.achievement_level = 'low'
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env['programme.hierarchy.closure']._mark_dirty(records)
+        self.env['performance.rollup']._mark_dirty(records)
+        self.env['kpi.unified']._mark_dirty(records)
+        self.env['performance.dashboard.cache']._invalidate()
+        return records
+
+    def unlink(self):
+        self.env['programme.hierarchy.closure']._forget(self)
+        self.env['performance.rollup']._mark_dirty(self)
+        self.env['kpi.unified']._mark_dirty(self)
+        self.env['performance.dashboard.cache']._invalidate()
+        return super().unlink()
+
     def write(self, vals):
         """Override write to log value changes and create performance actions"""
         # Track current values before update
@@ -409,61 +427,173 @@ class PerformanceIndicator(models.Model):
                     'target_value': record.target_value,
                 }
 
+        self.env['performance.dashboard.cache']._invalidate()
+        Rollup = self.env['performance.rollup']
+        rollup_dirty = Rollup._is_relevant_write(self._name, vals)
+        if rollup_dirty:
+            Rollup._mark_dirty(self)
+
         # Call parent write method
         result = super().write(vals)
 
-        # Create performance actions and audit logs for value changes
+        if rollup_dirty:
+            Rollup._mark_dirty(self)
+        Closure = self.env['programme.hierarchy.closure']
+        if Closure._is_relevant_write(self._name, vals):
+            Closure._mark_dirty(self)
+        Unified = self.env['kpi.unified']
+        if Unified._is_relevant_write(self._name, vals):
+            Unified._mark_dirty(self)
+
+        # Queue performance actions, scores, audit logs and chatter notes for value changes
         if 'current_value' in vals:
-            for record in self:
-                old_current = old_values.get(record.id, {}).get('current_value', 0.0)
-                if old_current != record.current_value:
-                    # Create performance action to log the change
-                    self.env['performance.action'].create({
-                        'name': f"Value Update: {record.name}",
-                        'description': f"Current value updated from {old_current} to {record.current_value}",
-                        'date': fields.Date.context_today(self),
-                        'indicator_id': record.id,
-                        'action_type': 'update',
-                        'previous_value': old_current,
-                        'new_value': record.current_value,
-                        'progress_notes': f"Value updated by {self.env.user.name} via inline editing",
-                        'state': 'approved',  # Auto-approve inline edits
-                        'approved_by_id': self.env.user.id,
-                    })
-
-                    # Create performance score record
-                    self.env['performance.score'].create({
-                        'indicator_id': record.id,
-                        'date': fields.Date.context_today(self),
-                        'value': record.current_value,
-                        'achievement_percentage': record.achievement_percentage,
-                        'target_value': record.target_value,
-                        'notes': f"Inline edit by {self.env.user.name}",
-                    })
-
-                    # Create audit log entry
-                    self.env['audit.log'].log_field_change(
-                        record=record,
-                        field_name='current_value',
-                        old_value=old_current,
-                        new_value=record.current_value,
-                        action_description=f"Performance Indicator value updated via inline editing"
-                    )
-
-                    # Post message to chatter
-                    record.message_post(
-                        body=f"<p><strong>Value Updated</strong></p>"
-                             f"<ul>"
-                             f"<li>Previous Value: <strong>{old_current} {record.measurement_unit or ''}</strong></li>"
-                             f"<li>New Value: <strong>{record.current_value} {record.measurement_unit or ''}</strong></li>"
-                             f"<li>Achievement: <strong>{record.achievement_percentage:.1f}%</strong></li>"
-                             f"<li>Updated by: <strong>{self.env.user.name}</strong></li>"
-                             f"</ul>",
-                        subtype_id=self.env.ref('mail.mt_note').id
-                    )
+            changed = self.filtered(
+                lambda r: old_values.get(r.id, {}).get('current_value', 0.0) != r.current_value)
+            if changed:
+                changed._queue_value_changes({
+                    rid: values['current_value'] for rid, values in old_values.items()
+                })
 
         return result
     
+    # ------------------------------------------------------------------
+    # Value change side effects
+    # ------------------------------------------------------------------
+    _VALUE_CHANGES_KEY = 'performance.indicator.value_changes'
+
+    @api.model
+    def _get_chatter_mode(self):
+        """Return how value-change notes are posted: 'immediate', 'deferred' or 'disabled'.
+
+        The ``pmis_indicator_chatter`` context key overrides the
+        ``robust_pmis.indicator_chatter`` system parameter; imports default to
+        'deferred' so the notes are posted by the cron instead of the import.
+        """
+        mode = self.env.context.get('pmis_indicator_chatter')
+        if not mode and self.env.context.get('import_file'):
+            mode = 'deferred'
+        if not mode:
+            mode = self.env['ir.config_parameter'].sudo().get_param('robust_pmis.indicator_chatter', 'immediate')
+        return mode if mode in ('immediate', 'deferred', 'disabled') else 'immediate'
+
+    def _queue_value_changes(self, old_values):
+        """Queue the side effects of the current_value changes of ``self``.
+
+        Entries are collected across every write of the transaction and created
+        with batched ``create(vals_list)`` calls at precommit (see
+        ``_flush_value_changes``).
+        """
+        data = self.env.cr.precommit.data
+        queue = data.get(self._VALUE_CHANGES_KEY)
+        if queue is None:
+            queue = data[self._VALUE_CHANGES_KEY] = []
+            self.env.cr.precommit.add(self.browse()._flush_value_changes)
+        chatter = self._get_chatter_mode()
+        today = fields.Date.context_today(self)
+        for record in self:
+            queue.append({
+                'indicator_id': record.id,
+                'old_value': old_values.get(record.id, 0.0),
+                'new_value': record.current_value,
+                'achievement': record.achievement_percentage,
+                'target_value': record.target_value,
+                'date': today,
+                'user_id': self.env.user.id,
+                'chatter': chatter,
+            })
+
+    @api.model
+    def _flush_value_changes(self):
+        """Create the queued performance actions, scores, audit logs and notes in batches."""
+        entries = self.env.cr.precommit.data.pop(self._VALUE_CHANGES_KEY, None)
+        if not entries:
+            return
+        indicators = self.browse({e['indicator_id'] for e in entries}).exists()
+        entries = [e for e in entries if e['indicator_id'] in indicators._ids]
+        if not entries:
+            return
+        users = self.env['res.users'].sudo().browse({e['user_id'] for e in entries})
+        user_names = {user.id: user.name for user in users}
+
+        # Automatic actions skip mail tracking, followers and the creation note
+        actions = self.env['performance.action'].with_context(tracking_disable=True).create([{
+            'name': f"Value Update: {self.browse(e['indicator_id']).name}",
+            'description': f"Current value updated from {e['old_value']} to {e['new_value']}",
+            'date': e['date'],
+            'indicator_id': e['indicator_id'],
+            'action_type': 'update',
+            'previous_value': e['old_value'],
+            'new_value': e['new_value'],
+            'progress_notes': f"Value updated by {user_names[e['user_id']]} via inline editing",
+            'state': 'approved',  # Auto-approve inline edits
+            'action_by_id': e['user_id'],
+            'approved_by_id': e['user_id'],
+            'chatter_pending': e['chatter'] == 'deferred',
+        } for e in entries])
+
+        self.env['performance.score'].create([{
+            'indicator_id': e['indicator_id'],
+            'action_id': action.id,
+            'date': e['date'],
+            'value': e['new_value'],
+            'achievement_percentage': e['achievement'],
+            'target_value': e['target_value'],
+            'notes': f"Inline edit by {user_names[e['user_id']]}",
+        } for e, action in zip(entries, actions)])
+
+        self.env['audit.log'].log_field_changes([{
+            'record': self.browse(e['indicator_id']),
+            'field_name': 'current_value',
+            'old_value': e['old_value'],
+            'new_value': e['new_value'],
+            'action_description': "Performance Indicator value updated via inline editing",
+        } for e in entries])
+
+        self._log_value_change_notes([e for e in entries if e['chatter'] == 'immediate'])
+        self.env.flush_all()
+
+    def _value_change_note(self, old_value, new_value, achievement, user_name):
+        self.ensure_one()
+        unit = self.measurement_unit or ''
+        return Markup(
+            "<p><strong>Value Updated</strong></p>"
+            "<ul>"
+            "<li>Previous Value: <strong>%s %s</strong></li>"
+            "<li>New Value: <strong>%s %s</strong></li>"
+            "<li>Achievement: <strong>%s%%</strong></li>"
+            "<li>Updated by: <strong>%s</strong></li>"
+            "</ul>"
+        ) % (old_value, unit, new_value, unit, f"{achievement or 0.0:.1f}", user_name)
+
+    @api.model
+    def _log_value_change_notes(self, entries):
+        """Post value-change notes with one batched message insert per author.
+
+        An indicator changed several times gets its notes spread over successive
+        batches so each note keeps its own message.
+        """
+        if not entries:
+            return
+        batches = []
+        open_batches = {}
+        for entry in entries:
+            batch = open_batches.get(entry['user_id'])
+            if batch is None or entry['indicator_id'] in batch:
+                batch = open_batches[entry['user_id']] = {}
+                batches.append((entry['user_id'], batch))
+            batch[entry['indicator_id']] = entry
+        Users = self.env['res.users'].sudo()
+        for user_id, batch in batches:
+            user = Users.browse(user_id)
+            records = self.browse(list(batch))
+            bodies = {
+                record.id: record._value_change_note(
+                    batch[record.id]['old_value'], batch[record.id]['new_value'],
+                    batch[record.id]['achievement'], user.name)
+                for record in records
+            }
+            records._message_log_batch(bodies=bodies, author_id=user.partner_id.id)
+
     @api.constrains('programme_id', 'outcome_id')
     def _check_parent_constraint(self):
         for record in self:
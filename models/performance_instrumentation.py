@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+import functools
+import heapq
+import logging
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timedelta
+
+from odoo import models, fields, api, SUPERUSER_ID
+from odoo.http import request
+
+_logger = logging.getLogger(__name__)
+
+# Latency histogram upper bounds (ms); the last bucket counts everything slower
+_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+_TOP_QUERIES = 5
+_QUERY_TEXT_LIMIT = 2000
+_FLUSH_INTERVAL = 60
+
+# Process-wide buffers, written to the database at most every _FLUSH_INTERVAL seconds:
+# {(dbname, kind, endpoint, day): aggregate} and [(dbname, slow call values)]
+_PENDING = {}
+_PENDING_SLOW = []
+_LOCK = threading.Lock()
+_STATE = {'last_flush': time.monotonic()}
+_ACTIVE = threading.local()
+
+
+class _Probe:
+    """Per-invocation counters fed by the cursor query hook."""
+    __slots__ = ('queries', 'sql_time', 'rows', 'top', 'seq')
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.rows = 0
+        self.top = []
+        self.seq = 0
+
+    def hook(self, cr, query, params, query_start, query_time):
+        self.queries += 1
+        self.sql_time += query_time
+        try:
+            rowcount = cr.rowcount
+        except Exception:
+            rowcount = -1
+        if rowcount > 0:
+            self.rows += rowcount
+        # Keep the slowest statements only; the text is rendered when the call is slow
+        self.seq += 1
+        if len(self.top) < _TOP_QUERIES:
+            heapq.heappush(self.top, (query_time, self.seq, query))
+        elif query_time > self.top[0][0]:
+            heapq.heapreplace(self.top, (query_time, self.seq, query))
+
+    def top_queries(self):
+        lines = []
+        for query_time, _seq, query in sorted(self.top, reverse=True):
+            text = str(query)
+            if len(text) > _QUERY_TEXT_LIMIT:
+                text = text[:_QUERY_TEXT_LIMIT] + ' ...'
+            lines.append(f"-- {query_time * 1000:.1f} ms\n{text}")
+        return '\n\n'.join(lines)
+
+
+def _get_settings(env):
+    """Return (enabled, slow threshold in ms); both are cached system parameters."""
+    Param = env['ir.config_parameter'].sudo()
+    enabled = (Param.get_param('robust_pmis.instrumentation') or 'on') != 'off'
+    try:
+        slow_ms = int(Param.get_param('robust_pmis.instrumentation_slow_ms') or 1000)
+    except Exception:
+        slow_ms = 1000
+    return enabled, slow_ms
+
+
+def _record(dbname, kind, endpoint, wall, probe, slow_ms, uid):
+    wall_ms = wall * 1000
+    sql_ms = probe.sql_time * 1000
+    key = (dbname, kind, endpoint, fields.Date.today())
+    bucket = next((i for i, bound in enumerate(_BUCKETS_MS) if wall_ms <= bound), len(_BUCKETS_MS))
+    slow = None
+    if wall_ms >= slow_ms:
+        slow = {
+            'kind': kind, 'endpoint': endpoint, 'timestamp': fields.Datetime.now(), 'user_id': uid,
+            'duration_ms': wall_ms, 'sql_ms': sql_ms, 'python_ms': max(0.0, wall_ms - sql_ms),
+            'query_count': probe.queries, 'rows_touched': probe.rows, 'top_queries': probe.top_queries(),
+        }
+    with _LOCK:
+        agg = _PENDING.get(key)
+        if agg is None:
+            agg = _PENDING[key] = {
+                'calls': 0, 'total_ms': 0.0, 'sql_ms': 0.0, 'queries': 0, 'rows': 0, 'max_ms': 0.0,
+                'histogram': [0] * (len(_BUCKETS_MS) + 1),
+            }
+        agg['calls'] += 1
+        agg['total_ms'] += wall_ms
+        agg['sql_ms'] += sql_ms
+        agg['queries'] += probe.queries
+        agg['rows'] += probe.rows
+        agg['max_ms'] = max(agg['max_ms'], wall_ms)
+        agg['histogram'][bucket] += 1
+        if slow:
+            _PENDING_SLOW.append((dbname, slow))
+
+
+def _flush(registry, force=False):
+    """Write this process's buffered stats of ``registry``'s database with a separate cursor."""
+    now = time.monotonic()
+    with _LOCK:
+        if not force and now - _STATE['last_flush'] < _FLUSH_INTERVAL:
+            return
+        _STATE['last_flush'] = now
+        dbname = registry.db_name
+        pending = {key: _PENDING.pop(key) for key in [k for k in _PENDING if k[0] == dbname]}
+        slow = [vals for db, vals in _PENDING_SLOW if db == dbname]
+        _PENDING_SLOW[:] = [item for item in _PENDING_SLOW if item[0] != dbname]
+    if not pending and not slow:
+        return
+    try:
+        with registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            env['performance.instrumentation']._store(pending, slow)
+    except Exception:
+        _logger.warning("Could not store PMIS instrumentation stats", exc_info=True)
+
+
+@contextmanager
+def _probe(env, kind, endpoint):
+    thread = threading.current_thread()
+    probe = _Probe()
+    hooks = getattr(thread, 'query_hooks', None)
+    if hooks is None:
+        hooks = thread.query_hooks = []
+    depth = getattr(_ACTIVE, 'depth', 0)
+    _ACTIVE.depth = depth + 1
+    hooks.append(probe.hook)
+    start = time.perf_counter()
+    try:
+        yield probe
+    finally:
+        wall = time.perf_counter() - start
+        try:
+            thread.query_hooks.remove(probe.hook)
+        except ValueError:
+            pass
+        _ACTIVE.depth = depth
+        try:
+            _record(env.cr.dbname, kind, endpoint, wall, probe, _get_settings(env)[1], env.uid)
+            # Only the outermost probe flushes, so nested probes never count the flush queries
+            if not depth:
+                _flush(env.registry)
+        except Exception:
+            _logger.warning("PMIS instrumentation failed for %s", endpoint, exc_info=True)
+
+
+def probe(env, kind, endpoint):
+    """Context manager measuring the enclosed block as one call of ``endpoint``."""
+    if not _get_settings(env)[0]:
+        return nullcontext()
+    return _probe(env, kind, endpoint)
+
+
+def instrumented(endpoint):
+    """Controller decorator (below ``@http.route``) recording each request of ``endpoint``."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with probe(request.env, 'route', endpoint):
+                response = func(self, *args, **kwargs)
+                # QWeb pages render lazily; render inside the probe so templates are counted
+                if getattr(response, 'is_qweb', False):
+                    response.flatten()
+                return response
+        return wrapper
+    return decorator
+
+
+def _instrument_method(method, endpoint):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with probe(self.env, 'cron', endpoint):
+            return method(self, *args, **kwargs)
+    wrapper._pmis_instrumented = True
+    return wrapper
+
+
+class PerformanceInstrumentation(models.AbstractModel):
+    """Query-count and latency instrumentation of PMIS routes and crons.
+
+    Routes opt in with the ``instrumented`` decorator; every ``cron_*``
+    method of the module's models is wrapped when the registry loads. Each
+    call installs a cursor query hook (the one Odoo's profiler uses) that
+    counts queries, SQL time and affected rows. Calls are aggregated in
+    memory per endpoint and day, with a latency histogram for p50/p95, and
+    written at most once a minute per worker. Calls slower than
+    ``robust_pmis.instrumentation_slow_ms`` are kept with their slowest
+    statements in ``performance.slow.call``.
+    """
+    _name = 'performance.instrumentation'
+    _description = 'PMIS Instrumentation'
+
+    def _register_hook(self):
+        super()._register_hook()
+        for model_name in list(self.env.registry):
+            ModelClass = self.env.registry[model_name]
+            if model_name == self._name or getattr(ModelClass, '_original_module', None) != 'robust_pmis':
+                continue
+            for name in dir(ModelClass):
+                if not name.startswith(('cron_', '_cron_')):
+                    continue
+                method = getattr(ModelClass, name, None)
+                if not callable(method) or getattr(method, '_pmis_instrumented', False):
+                    continue
+                setattr(ModelClass, name, _instrument_method(method, f'{model_name}.{name}'))
+
+    @api.model
+    def _percentile(self, histogram, count, max_ms, fraction):
+        """Estimate a percentile from the bucket counts by linear interpolation."""
+        if not count:
+            return 0.0
+        rank = fraction * count
+        seen = 0
+        lower = 0.0
+        for index, bucket_count in enumerate(histogram):
+            upper = _BUCKETS_MS[index] if index < len(_BUCKETS_MS) else max_ms
+            if bucket_count and seen + bucket_count >= rank:
+                return min(max_ms, lower + (upper - lower) * (rank - seen) / bucket_count)
+            seen += bucket_count
+            lower = upper
+        return max_ms
+
+    @api.model
+    def _store(self, pending, slow):
+        """Merge buffered aggregates into ``performance.endpoint.stat`` and log slow calls."""
+        cr = self.env.cr
+        for (_dbname, kind, endpoint, day), agg in pending.items():
+            cr.execute("""
+                INSERT INTO performance_endpoint_stat (kind, endpoint, day, call_count, histogram)
+                VALUES (%s, %s, %s, 0, '[]'::jsonb)
+                ON CONFLICT (kind, endpoint, day) DO NOTHING
+            """, [kind, endpoint, day])
+            cr.execute("""
+                SELECT id, call_count, total_ms, sql_ms, query_count, rows_touched, max_ms, histogram
+                  FROM performance_endpoint_stat
+                 WHERE kind = %s AND endpoint = %s AND day = %s
+                   FOR UPDATE
+            """, [kind, endpoint, day])
+            stat_id, calls, total_ms, sql_ms, queries, rows, max_ms, histogram = cr.fetchone()
+            histogram = list(histogram or [])
+            histogram += [0] * (len(agg['histogram']) - len(histogram))
+            histogram = [a + b for a, b in zip(histogram, agg['histogram'])]
+            calls = (calls or 0) + agg['calls']
+            total_ms = (total_ms or 0.0) + agg['total_ms']
+            sql_ms = (sql_ms or 0.0) + agg['sql_ms']
+            max_ms = max(max_ms or 0.0, agg['max_ms'])
+            self.env['performance.endpoint.stat'].browse(stat_id).write({
+                'call_count': calls,
+                'total_ms': total_ms,
+                'sql_ms': sql_ms,
+                'python_ms': max(0.0, total_ms - sql_ms),
+                'query_count': (queries or 0) + agg['queries'],
+                'rows_touched': (rows or 0) + agg['rows'],
+                'max_ms': max_ms,
+                'histogram': histogram,
+                'p50_ms': self._percentile(histogram, calls, max_ms, 0.5),
+                'p95_ms': self._percentile(histogram, calls, max_ms, 0.95),
+            })
+        if slow:
+            self.env['performance.slow.call'].create(slow)
+
+    @api.model
+    def cron_flush_instrumentation(self):
+        """Store this worker's pending stats and purge rows past the retention window."""
+        _flush(self.env.registry, force=True)
+        try:
+            days = int(self.env['ir.config_parameter'].sudo().get_param(
+                'robust_pmis.instrumentation_retention_days') or 30)
+        except Exception:
+            days = 30
+        cutoff = datetime.now() - timedelta(days=days)
+        self.env['performance.endpoint.stat'].search([('day', '<', cutoff.date())]).unlink()
+        self.env['performance.slow.call'].search([('timestamp', '<', cutoff)]).unlink()
+        return True
+
+
+class PerformanceEndpointStat(models.Model):
+    """Daily latency and query statistics of one instrumented route or cron."""
+    _name = 'performance.endpoint.stat'
+    _description = 'Endpoint Performance Statistics'
+    _order = 'day desc, p95_ms desc'
+    _rec_name = 'endpoint'
+    _log_access = False
+
+    _sql_constraints = [
+        ('endpoint_day_unique', 'unique(kind, endpoint, day)',
+         'Only one statistics row per endpoint and day is allowed.'),
+    ]
+
+    kind = fields.Selection([
+        ('route', 'Route'),
+        ('cron', 'Scheduled Job'),
+    ], string='Type', required=True)
+    endpoint = fields.Char(string='Endpoint', required=True, index=True)
+    day = fields.Date(string='Day', required=True, index=True)
+    call_count = fields.Integer(string='Calls', aggregator='sum')
+    total_ms = fields.Float(string='Total Time (ms)', aggregator='sum')
+    sql_ms = fields.Float(string='SQL Time (ms)', aggregator='sum')
+    python_ms = fields.Float(string='Python Time (ms)', aggregator='sum')
+    query_count = fields.Integer(string='Queries', aggregator='sum')
+    rows_touched = fields.Integer(string='Rows Touched', aggregator='sum')
+    max_ms = fields.Float(string='Max (ms)', aggregator='max')
+    p50_ms = fields.Float(string='p50 (ms)', aggregator='max')
+    p95_ms = fields.Float(string='p95 (ms)', aggregator='max')
+    avg_ms = fields.Float(string='Average (ms)', compute='_compute_averages')
+    avg_queries = fields.Float(string='Queries per Call', compute='_compute_averages')
+    histogram = fields.Json(string='Latency Histogram')
+
+    @api.depends('call_count', 'total_ms', 'query_count')
+    def _compute_averages(self):
+        for record in self:
+            calls = record.call_count or 0
+            record.avg_ms = record.total_ms / calls if calls else 0.0
+            record.avg_queries = record.query_count / calls if calls else 0.0
+
+
+class PerformanceSlowCall(models.Model):
+    """One call slower than the instrumentation threshold, with its slowest statements."""
+    _name = 'performance.slow.call'
+    _description = 'Slow PMIS Call'
+    _order = 'timestamp desc'
+    _rec_name = 'endpoint'
+    _log_access = False
+
+    kind = fields.Selection([
+        ('route', 'Route'),
+        ('cron', 'Scheduled Job'),
+    ], string='Type', required=True)
+    endpoint = fields.Char(string='Endpoint', required=True, index=True)
+    timestamp = fields.Datetime(string='Time', required=True, index=True)
+    user_id = fields.Many2one('res.users', string='User', ondelete='set null')
+    duration_ms = fields.Float(string='Duration (ms)')
+    sql_ms = fields.Float(string='SQL Time (ms)')
+    python_ms = fields.Float(string='Python Time (ms)')
+    query_count = fields.Integer(string='Queries')
+    rows_touched = fields.Integer(string='Rows Touched')
+    top_queries = fields.Text(string='Slowest Queries')
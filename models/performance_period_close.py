@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+import logging
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+
+class PerformancePeriodClose(models.Model):
+    """Close of a finished fiscal year or quarter.
+
+    Closing copies every ``performance.rollup`` row of the period into
+    ``performance.period.snapshot``. Dashboard requests for a closed period
+    are answered from those frozen rows, so every user sees the figures as
+    they stood at the close whatever changes afterwards. Reopening drops the
+    frozen rows so the period is computed live again. Both operations are
+    restricted to PMIS administrators and recorded in the audit log.
+    """
+    _name = 'performance.period.close'
+    _description = 'Performance Period Close'
+    _inherit = ['mail.thread']
+    _order = 'period_key desc'
+    _rec_name = 'period_key'
+
+    _sql_constraints = [
+        ('period_key_unique', 'unique(period_key)', 'A period can only be closed once; reopen it instead.'),
+    ]
+
+    period_key = fields.Char(
+        string='Period',
+        required=True,
+        index=True,
+        help="Dashboard period key: fy:YYYY for a fiscal year, qN:YYYY for a fiscal quarter"
+    )
+    state = fields.Selection([
+        ('open', 'Open'),
+        ('closed', 'Closed'),
+        ('reopened', 'Reopened'),
+    ], string='Status', required=True, default='open', readonly=True, tracking=True)
+    closed_by_id = fields.Many2one('res.users', string='Closed By', readonly=True)
+    closed_on = fields.Datetime(string='Closed On', readonly=True)
+    reopened_by_id = fields.Many2one('res.users', string='Reopened By', readonly=True)
+    reopened_on = fields.Datetime(string='Reopened On', readonly=True)
+    reopen_reason = fields.Text(
+        string='Reopen Reason',
+        help="Required to reopen the period; kept in the audit log"
+    )
+    snapshot_count = fields.Integer(
+        string='Frozen Rollups',
+        compute='_compute_snapshot_count',
+        help="Rollup rows (one per source, entity and period) frozen when the period was closed"
+    )
+
+    def _compute_snapshot_count(self):
+        counts = dict(self.env['performance.period.snapshot'].sudo()._read_group(
+            [('close_id', 'in', self.ids)], ['close_id'], ['__count']))
+        for close in self:
+            close.snapshot_count = counts.get(close, 0)
+
+    @api.model
+    def _check_period(self, period_key):
+        Dashboard = self.env['performance.dashboard']
+        date_start, date_end = Dashboard._get_period_range(period_key)
+        if not date_end:
+            raise UserError(_("'%s' is not a fiscal year (fy:YYYY) or quarter (qN:YYYY) period.") % period_key)
+        if date_end >= fields.Date.context_today(self):
+            raise UserError(_("Period %s ends on %s and cannot be closed before it is over.") % (period_key, date_end))
+        if period_key not in [period[0] for period in self.env['performance.rollup']._get_period_ranges()]:
+            raise UserError(_("Period %s is outside the strategic plan window and has no rollups to freeze.") % period_key)
+
+    @api.model
+    def _is_closed(self, period_key):
+        """Return True when dashboard period ``period_key`` is closed."""
+        if not period_key:
+            return False
+        self.env.cr.execute(
+            "SELECT 1 FROM performance_period_close WHERE period_key = %s AND state = 'closed'", [period_key])
+        return bool(self.env.cr.fetchone())
+
+    # ------------------------------------------------------------------
+    # Operations
+    # ------------------------------------------------------------------
+    def _check_admin(self):
+        if not (self.env.is_superuser() or self.env.user.has_group('robust_pmis.group_kcca_pmis_admin')):
+            raise UserError(_("Only PMIS administrators can close or reopen performance periods."))
+
+    @api.model
+    def close_period(self, period_key):
+        """Freeze the finished period ``period_key``; return its close record."""
+        self._check_admin()
+        self._check_period(period_key)
+        close = self.search([('period_key', '=', period_key)])
+        if close.state == 'closed':
+            raise UserError(_("Period %s is already closed.") % period_key)
+        if not close:
+            close = self.create({'period_key': period_key})
+        close._close()
+        return close
+
+    def action_close(self):
+        """Close the period of each record (again, for reopened periods)."""
+        self._check_admin()
+        for close in self:
+            if close.state == 'closed':
+                raise UserError(_("Period %s is already closed.") % close.period_key)
+            self._check_period(close.period_key)
+            close._close()
+        return True
+
+    def _close(self):
+        self.ensure_one()
+        self.write({
+            'state': 'closed',
+            'closed_by_id': self.env.user.id,
+            'closed_on': fields.Datetime.now(),
+            'reopen_reason': False,
+        })
+        frozen = self.env['performance.period.snapshot']._freeze(self)
+        self.message_post(body=_("Period closed: %s rollup rows frozen.") % frozen)
+        self.env['audit.log'].log_action(
+            self._name, self.id, 'other', _("Closed performance period %s") % self.period_key,
+            record_name=self.period_key,
+        )
+        _logger.info("Performance period %s closed", self.period_key)
+
+    def action_reopen(self):
+        """Drop the frozen rollup rows; the period is computed from live rows again."""
+        self._check_admin()
+        for close in self:
+            if close.state != 'closed':
+                raise UserError(_("Period %s is not closed.") % close.period_key)
+            if not (close.reopen_reason or '').strip():
+                raise UserError(_("Give a reason before reopening period %s.") % close.period_key)
+            self.env['performance.period.snapshot'].sudo().with_context(pmis_period_reopen=True).search([
+                ('close_id', '=', close.id),
+            ]).unlink()
+            close.write({
+                'state': 'reopened',
+                'reopened_by_id': self.env.user.id,
+                'reopened_on': fields.Datetime.now(),
+            })
+            close.message_post(body=_("Period reopened: %s") % close.reopen_reason)
+            self.env['audit.log'].log_action(
+                close._name, close.id, 'other', _("Reopened performance period %s") % close.period_key,
+                details=close.reopen_reason, record_name=close.period_key,
+            )
+        return True
+
+
+class PerformancePeriodSnapshot(models.Model):
+    """Rollup row of a closed period, as it stood when the period was closed.
+
+    Rows are copied from ``performance.rollup`` by ``_freeze`` and never
+    updated; they are deleted when the period is reopened.
+    """
+    _name = 'performance.period.snapshot'
+    _description = 'Performance Period Snapshot'
+    _log_access = False
+    _order = 'period_key, source, entity_type, entity_id'
+
+    _sql_constraints = [
+        ('period_rollup_unique', 'unique(period_key, source, entity_type, entity_id)',
+         'Only one frozen rollup row per period and entity is allowed.'),
+    ]
+
+    # Figures copied from ``performance.rollup``
+    _STAT_COLUMNS = (
+        'record_count', 'achievement_sum', 'avg_achievement', 'budget_utilization_sum',
+        'count_excellent', 'count_good', 'count_fair', 'count_poor', 'count_on_target',
+        'count_high', 'count_medium', 'count_low', 'count_none',
+    )
+
+    close_id = fields.Many2one('performance.period.close', string='Period Close', required=True,
+                               ondelete='restrict', index=True)
+    period_key = fields.Char(string='Period', required=True, index=True)
+    source = fields.Selection(selection=lambda self: self.env['performance.rollup']._fields['source'].selection,
+                              string='Source', required=True)
+    entity_type = fields.Selection(
+        selection=lambda self: self.env['performance.rollup']._fields['entity_type'].selection,
+        string='Entity Type', required=True)
+    entity_id = fields.Integer(string='Entity ID', required=True,
+                               help="Database id of the entity (0 for organization rows)")
+    record_count = fields.Integer(string='Count')
+    achievement_sum = fields.Float(string='Achievement Sum')
+    avg_achievement = fields.Float(string='Average Achievement (%)')
+    budget_utilization_sum = fields.Float(string='Budget Utilization Sum')
+    count_excellent = fields.Integer(string='Excellent (>= 90%)')
+    count_good = fields.Integer(string='Good (70-90%)')
+    count_fair = fields.Integer(string='Fair (50-70%)')
+    count_poor = fields.Integer(string='Poor (< 50%)')
+    count_on_target = fields.Integer(string='On Target (>= 100%)')
+    count_high = fields.Integer(string='High Level (>= 80%)')
+    count_medium = fields.Integer(string='Medium Level (50-80%)')
+    count_low = fields.Integer(string='Low Level (< 50%)')
+    count_none = fields.Integer(string='No Achievement')
+
+    @api.model
+    def _freeze(self, close):
+        """Copy the current rollup rows of ``close``'s period; return the number of rows."""
+        self.env['performance.rollup']._flush_pending()
+        columns = ', '.join(self._STAT_COLUMNS)
+        self.env.cr.execute(f"""
+            INSERT INTO performance_period_snapshot (close_id, period_key, source, entity_type, entity_id, {columns})
+            SELECT %s, period_key, source, entity_type, entity_id, {columns}
+              FROM performance_rollup
+             WHERE period_key = %s
+        """, [close.id, close.period_key])
+        count = self.env.cr.rowcount
+        self.invalidate_model()
+        return count
+
+    @api.model
+    def _get_stats(self, period_key, source, entity_type, entity_ids=None):
+        """Return {entity_id: row dict} of the frozen rows, shaped as ``performance.rollup._get_stats``."""
+        query = f"""
+            SELECT entity_id, {', '.join(self._STAT_COLUMNS)}
+              FROM performance_period_snapshot
+             WHERE period_key = %s AND source = %s AND entity_type = %s
+        """
+        params = [period_key, source, entity_type]
+        if entity_ids is not None:
+            ids = tuple(entity_ids)
+            if not ids:
+                return {}
+            query += " AND entity_id IN %s"
+            params.append(ids)
+        self.env.cr.execute(query, params)
+        return {row['entity_id']: row for row in self.env.cr.dictfetchall()}
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        raise UserError(_("Period snapshots are frozen from the rollups when the period is closed."))
+
+    def write(self, vals):
+        raise UserError(_("Period snapshots are immutable; reopen the period instead."))
+
+    def unlink(self):
+        if not self.env.context.get('pmis_period_reopen'):
+            raise UserError(_("Period snapshots are only removed by reopening the period."))
+        return super().unlink()
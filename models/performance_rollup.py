@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+from datetime import date
+
+from odoo import models, fields, api
+
+
+class PerformanceRollup(models.Model):
+    """Materialized performance rollups, one row per entity per period.
+
+    Rows are (re)built with grouped ``INSERT ... SELECT`` statements straight from
+    the KPI, indicator and division-programme tables. Writes on those models mark
+    the affected entities dirty; the dirty rows are rebuilt before the next read
+    or, at the latest, right before the transaction commits.
+
+    Period keys follow the dashboard filter format: ``all``, ``fy:2024`` and
+    ``q1:2024`` .. ``q4:2024``. A record belongs to a period when its
+    start/end dates overlap the period range (same rule as the dashboard filter).
+    """
+    _name = 'performance.rollup'
+    _description = 'Performance Rollup'
+    _log_access = False
+    _order = 'source, entity_type, entity_id, period_key'
+
+    _sql_constraints = [
+        ('rollup_key_unique', 'unique(source, entity_type, entity_id, period_key)',
+         'Only one rollup row per entity and period is allowed.'),
+    ]
+
+    source = fields.Selection([
+        ('kpi', 'Strategic KPIs'),
+        ('indicator', 'Programme Indicators'),
+        ('division_programme', 'Division-Programme Relationships'),
+    ], string='Source', required=True, index=True)
+    entity_type = fields.Selection([
+        ('organization', 'Organization'),
+        ('kra', 'Key Result Area'),
+        ('goal', 'Strategic Goal'),
+        ('programme', 'Programme'),
+        ('parent_programme', 'Parent Programme'),
+        ('directorate', 'Directorate'),
+        ('division', 'Division'),
+    ], string='Entity Type', required=True, index=True)
+    entity_id = fields.Integer(string='Entity ID', required=True, index=True,
+                               help="Database id of the entity (0 for organization rows)")
+    period_key = fields.Char(string='Period', required=True, index=True)
+    record_count = fields.Integer(string='Count')
+    achievement_sum = fields.Float(string='Achievement Sum')
+    avg_achievement = fields.Float(string='Average Achievement (%)')
+    budget_utilization_sum = fields.Float(string='Budget Utilization Sum',
+                                          help="Only filled for division-programme rows")
+    count_excellent = fields.Integer(string='Excellent (>= 90%)')
+    count_good = fields.Integer(string='Good (70-90%)')
+    count_fair = fields.Integer(string='Fair (50-70%)')
+    count_poor = fields.Integer(string='Poor (< 50%)')
+    count_on_target = fields.Integer(string='On Target (>= 100%)')
+    count_high = fields.Integer(string='High Level (>= 80%)')
+    count_medium = fields.Integer(string='Medium Level (50-80%)')
+    count_low = fields.Integer(string='Low Level (< 50%)')
+    count_none = fields.Integer(string='No Achievement')
+    refreshed_at = fields.Datetime(string='Refreshed At')
+
+    _PENDING_KEY = 'performance.rollup.pending'
+
+    # source -> model, measured column and {entity_type: (sql expression, extra joins)}
+    _ROLLUP_SOURCES = {
+        'kpi': {
+            'model': 'key.performance.indicator',
+            'metric': 'achievement_percentage',
+            'trigger_fields': {
+                'current_value', 'target_value', 'baseline_value', 'kpi_type', 'active',
+                'start_date', 'end_date', 'kra_id', 'directorate_id', 'division_id',
+            },
+            'entities': {
+                'organization': ('0', ''),
+                'kra': ('t.kra_id', ''),
+                'goal': ('so.strategic_goal_id',
+                         'JOIN key_result_area kra ON kra.id = t.kra_id '
+                         'JOIN strategic_objective so ON so.id = kra.strategic_objective_id'),
+                'directorate': ('t.directorate_id', ''),
+                'division': ('t.division_id', ''),
+            },
+        },
+        'indicator': {
+            'model': 'performance.indicator',
+            'metric': 'achievement_percentage',
+            'trigger_fields': {
+                'current_value', 'target_value', 'baseline_value', 'indicator_type', 'active',
+                'start_date', 'end_date', 'programme_id', 'outcome_id', 'output_id', 'piap_action_id',
+                'responsible_directorate_id', 'responsible_division_id',
+            },
+            'entities': {
+                'organization': ('0', ''),
+                'programme': ('t.programme_id', ''),
+                'parent_programme': ('t.parent_programme_id', ''),
+                'directorate': ('t.responsible_directorate_id', ''),
+                'division': ('t.responsible_division_id', ''),
+            },
+        },
+        'division_programme': {
+            'model': 'division.programme.rel',
+            'metric': 'performance_score',
+            # Every relationship write can move the performance score
+            'trigger_fields': None,
+            'entities': {
+                'organization': ('0', ''),
+                'division': ('t.division_id', ''),
+                'directorate': ('dv.directorate_id', 'JOIN kcca_division dv ON dv.id = t.division_id'),
+                'programme': ('t.programme_id', ''),
+            },
+        },
+    }
+
+    # ------------------------------------------------------------------
+    # Periods
+    # ------------------------------------------------------------------
+    @api.model
+    def _get_period_ranges(self):
+        """Return [(period_key, date_start, date_end)] for the configured plan window."""
+        Param = self.env['ir.config_parameter'].sudo()
+        try:
+            start_year = int(Param.get_param('robust_pmis.plan_start_year') or 2024)
+        except Exception:
+            start_year = 2024
+        try:
+            years = int(Param.get_param('robust_pmis.plan_years') or 5)
+        except Exception:
+            years = 5
+
+        periods = [('all', None, None)]
+        for y in range(start_year, start_year + years):
+            periods.append((f'fy:{y}', date(y, 7, 1), date(y + 1, 6, 30)))
+            periods.append((f'q1:{y}', date(y, 7, 1), date(y, 9, 30)))
+            periods.append((f'q2:{y}', date(y, 10, 1), date(y, 12, 31)))
+            periods.append((f'q3:{y}', date(y + 1, 1, 1), date(y + 1, 3, 31)))
+            periods.append((f'q4:{y}', date(y + 1, 4, 1), date(y + 1, 6, 30)))
+        return periods
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+    @api.model
+    def _refresh(self, source, entity_type, entity_ids=None):
+        """Rebuild rollup rows of one (source, entity_type) pair.
+
+        When ``entity_ids`` is given only those entities are rebuilt; entities that
+        no longer have any record simply lose their rows.
+        """
+        spec = self._ROLLUP_SOURCES[source]
+        expr, joins = spec['entities'][entity_type]
+        table = self.env[spec['model']]._table
+        metric = f"COALESCE(t.{spec['metric']}, 0)"
+        budget = 'COALESCE(t.budget_utilization, 0)' if source == 'division_programme' else '0'
+
+        params = []
+        delete_sql = "DELETE FROM performance_rollup WHERE source = %s AND entity_type = %s"
+        delete_params = [source, entity_type]
+        entity_filter = ''
+        if entity_ids is not None and entity_type != 'organization':
+            ids = tuple(i for i in entity_ids if i)
+            if not ids:
+                return
+            delete_sql += " AND entity_id IN %s"
+            delete_params.append(ids)
+            entity_filter = f"AND {expr} IN %s"
+        self.env.cr.execute(delete_sql, delete_params)
+
+        periods = self._get_period_ranges()
+        values_sql = ', '.join(['(%s, %s::date, %s::date)'] * len(periods))
+        for period in periods:
+            params.extend(period)
+        params.extend([source, entity_type])
+        if entity_filter:
+            params.append(ids)
+
+        self.env.cr.execute(f"""
+            INSERT INTO performance_rollup (
+                source, entity_type, entity_id, period_key, record_count, achievement_sum,
+                avg_achievement, budget_utilization_sum, count_excellent, count_good, count_fair,
+                count_poor, count_on_target, count_high, count_medium, count_low, count_none,
+                refreshed_at
+            )
+            SELECT src.source, src.entity_type, {expr}, p.period_key,
+                   COUNT(*),
+                   SUM({metric}),
+                   AVG({metric}),
+                   SUM({budget}),
+                   COUNT(*) FILTER (WHERE {metric} >= 90),
+                   COUNT(*) FILTER (WHERE {metric} >= 70 AND {metric} < 90),
+                   COUNT(*) FILTER (WHERE {metric} >= 50 AND {metric} < 70),
+                   COUNT(*) FILTER (WHERE {metric} < 50),
+                   COUNT(*) FILTER (WHERE {metric} >= 100),
+                   COUNT(*) FILTER (WHERE {metric} >= 80),
+                   COUNT(*) FILTER (WHERE {metric} >= 50 AND {metric} < 80),
+                   COUNT(*) FILTER (WHERE {metric} < 50 AND {metric} <> 0),
+                   COUNT(*) FILTER (WHERE {metric} = 0),
+                   NOW() AT TIME ZONE 'UTC'
+              FROM {table} t
+              {joins}
+              JOIN (VALUES {values_sql}) AS p(period_key, date_start, date_end)
+                ON p.date_start IS NULL
+                OR (t.start_date <= p.date_end AND (t.end_date IS NULL OR t.end_date >= p.date_start))
+              CROSS JOIN (SELECT %s::varchar AS source, %s::varchar AS entity_type) src
+             WHERE t.active IS TRUE AND {expr} IS NOT NULL {entity_filter}
+          GROUP BY src.source, src.entity_type, {expr}, p.period_key
+        """, params)
+
+    @api.model
+    def refresh_all(self):
+        """Rebuild every rollup row from scratch."""
+        for source, spec in self._ROLLUP_SOURCES.items():
+            self.env[spec['model']].flush_model()
+        self.env.cr.precommit.data.pop(self._PENDING_KEY, None)
+        for source, spec in self._ROLLUP_SOURCES.items():
+            for entity_type in spec['entities']:
+                self._refresh(source, entity_type)
+        self.invalidate_model()
+        return True
+
+    @api.model
+    def cron_refresh_performance_rollups(self):
+        """Nightly full rebuild; catches hierarchy moves that bypass the write hooks."""
+        return self.refresh_all()
+
+    # ------------------------------------------------------------------
+    # Incremental maintenance
+    # ------------------------------------------------------------------
+    @api.model
+    def _entity_keys(self, records):
+        """Return {entity_type: set(ids)} touched by ``records`` (current values)."""
+        records = records.sudo().with_context(active_test=False)
+        if records._name == 'key.performance.indicator':
+            return {
+                'organization': {0},
+                'kra': set(records.kra_id.ids),
+                'goal': set(records.kra_id.strategic_objective_id.strategic_goal_id.ids),
+                'directorate': set(records.directorate_id.ids),
+                'division': set(records.division_id.ids),
+            }
+        if records._name == 'performance.indicator':
+            return {
+                'organization': {0},
+                'programme': set(records.programme_id.ids),
+                'parent_programme': set(records.parent_programme_id.ids),
+                'directorate': set(records.responsible_directorate_id.ids),
+                'division': set(records.responsible_division_id.ids),
+            }
+        return {
+            'organization': {0},
+            'division': set(records.division_id.ids),
+            'directorate': set(records.division_id.directorate_id.ids),
+            'programme': set(records.programme_id.ids),
+        }
+
+    @api.model
+    def _source_for_model(self, model_name):
+        for source, spec in self._ROLLUP_SOURCES.items():
+            if spec['model'] == model_name:
+                return source
+        return None
+
+    @api.model
+    def _is_relevant_write(self, model_name, vals):
+        source = self._source_for_model(model_name)
+        trigger_fields = self._ROLLUP_SOURCES[source]['trigger_fields']
+        return trigger_fields is None or bool(trigger_fields.intersection(vals))
+
+    @api.model
+    def _mark_dirty(self, records):
+        """Queue the rollup rows touched by ``records`` for an incremental rebuild."""
+        if not records:
+            return
+        source = self._source_for_model(records._name)
+        data = self.env.cr.precommit.data
+        pending = data.get(self._PENDING_KEY)
+        if pending is None:
+            pending = data[self._PENDING_KEY] = {}
+            self.env.cr.precommit.add(self._flush_pending)
+        for entity_type, ids in self._entity_keys(records).items():
+            pending.setdefault((source, entity_type), set()).update(ids)
+
+    @api.model
+    def _mark_chain_dirty(self, nodes):
+        """Queue the rows of the indicators below programme-chain ``nodes``; return the indicators.
+
+        Their stored parent programme is recomputed when a node moves, without
+        going through ``performance.indicator.write``; callers mark the
+        returned indicators again once the move is written.
+        """
+        by_node = self.env['programme.hierarchy.closure']._get_descendant_ids(
+            nodes._name, nodes.ids, 'performance.indicator')
+        ids = set().union(*by_node.values()) if by_node else set()
+        indicators = self.env['performance.indicator'].browse(sorted(ids))
+        self._mark_dirty(indicators)
+        return indicators
+
+    @api.model
+    def _flush_pending(self):
+        """Rebuild all queued rollup rows."""
+        pending = self.env.cr.precommit.data.get(self._PENDING_KEY)
+        if not pending:
+            return
+        for spec in self._ROLLUP_SOURCES.values():
+            self.env[spec['model']].flush_model()
+        # Take the batch only after flushing: flushing may queue more keys
+        pending = self.env.cr.precommit.data.pop(self._PENDING_KEY, None) or {}
+        for (source, entity_type), ids in pending.items():
+            self._refresh(source, entity_type, ids)
+        self.invalidate_model()
+
+    # ------------------------------------------------------------------
+    # Read API
+    # ------------------------------------------------------------------
+    @api.model
+    def _get_stats(self, source, entity_type, entity_ids=None, period_key='all'):
+        """Return {entity_id: row dict} for the requested rollup slice.
+
+        Entities without records have no row; callers should treat them as zero.
+        """
+        self._flush_pending()
+        query = """
+            SELECT entity_id, record_count, achievement_sum, avg_achievement, budget_utilization_sum,
+                   count_excellent, count_good, count_fair, count_poor, count_on_target,
+                   count_high, count_medium, count_low, count_none
+              FROM performance_rollup
+             WHERE source = %s AND entity_type = %s AND period_key = %s
+        """
+        params = [source, entity_type, period_key or 'all']
+        if entity_ids is not None:
+            ids = tuple(entity_ids)
+            if not ids:
+                return {}
+            query += " AND entity_id IN %s"
+            params.append(ids)
+        self.env.cr.execute(query, params)
+        return {row['entity_id']: row for row in self.env.cr.dictfetchall()}
+
+    @api.model
+    def _get_totals(self, source, period_key='all'):
+        """Return the organization row of ``source`` (zeros when empty)."""
+        row = self._get_stats(source, 'organization', [0], period_key).get(0)
+        if row:
+            return row
+        return {
+            'entity_id': 0, 'record_count': 0, 'achievement_sum': 0.0, 'avg_achievement': 0.0,
+            'budget_utilization_sum': 0.0, 'count_excellent': 0, 'count_good': 0, 'count_fair': 0,
+            'count_poor': 0, 'count_on_target': 0, 'count_high': 0, 'count_medium': 0,
+            'count_low': 0, 'count_none': 0,
+        }
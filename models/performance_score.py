@@ -1,8 +1,24 @@
 # -*- coding: utf-8 -*-
+import logging
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+
+from dateutil.relativedelta import relativedelta
 
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
 
+_logger = logging.getLogger(__name__)
+
+# Mirrors ``_compute_status`` for rows inserted in SQL
+_STATUS_SQL = """
+    CASE WHEN {a} = 0 THEN 'not_started'
+         WHEN {a} >= 100 THEN 'achieved'
+         WHEN {a} >= 80 THEN 'on_track'
+         WHEN {a} >= 60 THEN 'at_risk'
+         ELSE 'behind' END
+"""
+
 
 class PerformanceScore(models.Model):
     _name = 'performance.score'
@@ -14,11 +30,18 @@ class PerformanceScore(models.Model):
     indicator_id = fields.Many2one(
         'performance.indicator',
         string='Performance Indicator',
-        required=True,
         ondelete='cascade',
         help="Performance indicator being scored"
     )
     
+    kpi_id = fields.Many2one(
+        'key.performance.indicator',
+        string='Strategic KPI',
+        ondelete='cascade',
+        index=True,
+        help="Strategic KPI being scored (set instead of the indicator)"
+    )
+    
     action_id = fields.Many2one(
         'performance.action',
         string='Related Action',
@@ -100,7 +123,120 @@ class PerformanceScore(models.Model):
         ('behind', 'Behind Schedule'),
         ('achieved', 'Achieved'),
     ], string='Status', compute='_compute_status', store=True)
+
+    period_key = fields.Char(
+        string='Snapshot Period',
+        index=True,
+        help="Period captured by a snapshot row (d:2025-01-31, q1:2024, fy:2024); "
+             "one snapshot per KPI or indicator and period"
+    )
+
+    _sql_constraints = [
+        ('score_subject_check', 'CHECK((indicator_id IS NULL) != (kpi_id IS NULL))',
+         'A score belongs to either a performance indicator or a strategic KPI.'),
+    ]
+
+    # Trend analysis: most recent scores per indicator used for the slope,
+    # scores per moving average, minimum history and how far back to look
+    _TREND_WINDOW = 8
+    _TREND_SHORT = 3
+    _TREND_MIN_POINTS = 3
+    _TREND_HISTORY_DAYS = 3 * 365
     
+    _CAPTURE_TABLE = 'performance_score_capture'
+
+    def init(self):
+        # Trend and history queries filter one indicator over a date range
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS performance_score_indicator_date_idx
+                ON performance_score (indicator_id, date)
+        """)
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS performance_score_date_idx ON performance_score (date)
+        """)
+        # Snapshot keys; the date is part of them because it is the partition key
+        for column in ('indicator_id', 'kpi_id'):
+            self.env.cr.execute(f"""
+                CREATE UNIQUE INDEX IF NOT EXISTS performance_score_{column}_period_uniq
+                    ON performance_score ({column}, period_key, date)
+                 WHERE {column} IS NOT NULL AND period_key IS NOT NULL
+            """)
+        # One row per captured period; ``snapshot`` locks it (see there)
+        self.env.cr.execute(f"""
+            CREATE TABLE IF NOT EXISTS {self._CAPTURE_TABLE} (
+                period_key varchar PRIMARY KEY,
+                captured_at timestamp NOT NULL
+            )
+        """)
+
+    @api.model
+    def _fy_end(self, day):
+        """Last day of the July-June fiscal year containing ``day``."""
+        return date(day.year + 1 if day.month >= 7 else day.year, 6, 30)
+
+    @api.model
+    def _analyze_trends(self, as_of=None):
+        """Score-history trend of every active indicator, in one windowed pass.
+
+        Over the last ``_TREND_WINDOW`` scores of each indicator: least-squares
+        slope of the achievement (points per day), the average of the latest
+        ``_TREND_SHORT`` scores and of the ``_TREND_SHORT`` before them, and the
+        achievement and value projected to the end of the fiscal year.
+
+        Returns:
+            dict: indicator id -> trend values; indicators with fewer than
+            ``_TREND_MIN_POINTS`` scores are left out
+        """
+        as_of = as_of or fields.Date.context_today(self)
+        fy_end = self._fy_end(as_of)
+        self.flush_model(['indicator_id', 'date', 'value', 'achievement_percentage'])
+        self.env['performance.indicator'].flush_model(['active'])
+        # x is the day offset from as_of, so the intercept is the trend value today
+        self.env.cr.execute("""
+            WITH ranked AS (
+                SELECT s.indicator_id, s.date, s.value, s.achievement_percentage,
+                       (s.date - %(as_of)s)::float AS x,
+                       ROW_NUMBER() OVER (PARTITION BY s.indicator_id ORDER BY s.date DESC, s.id DESC) AS rn
+                  FROM performance_score s
+                  JOIN performance_indicator pi ON pi.id = s.indicator_id AND pi.active
+                 WHERE s.date BETWEEN %(since)s AND %(as_of)s
+            )
+            SELECT indicator_id,
+                   COUNT(*) AS points,
+                   MAX(date) AS last_date,
+                   regr_slope(achievement_percentage, x) AS slope,
+                   regr_intercept(achievement_percentage, x) AS intercept,
+                   regr_slope(value, x) AS value_slope,
+                   regr_intercept(value, x) AS value_intercept,
+                   AVG(achievement_percentage) FILTER (WHERE rn <= %(short)s) AS recent_avg,
+                   AVG(achievement_percentage) FILTER (WHERE rn > %(short)s AND rn <= 2 * %(short)s) AS previous_avg,
+                   (ARRAY_AGG(achievement_percentage ORDER BY rn))[1] AS last_achievement,
+                   (ARRAY_AGG(value ORDER BY rn))[1] AS last_value
+              FROM ranked
+             WHERE rn <= %(window)s
+             GROUP BY indicator_id
+            HAVING COUNT(*) >= %(min_points)s
+        """, {
+            'as_of': as_of,
+            'since': as_of - timedelta(days=self._TREND_HISTORY_DAYS),
+            'short': self._TREND_SHORT,
+            'window': self._TREND_WINDOW,
+            'min_points': self._TREND_MIN_POINTS,
+        })
+        horizon = (fy_end - as_of).days
+        trends = {}
+        for row in self.env.cr.dictfetchall():
+            if row['slope'] is not None:
+                row['projected_achievement'] = row['intercept'] + row['slope'] * horizon
+                row['projected_value'] = row['value_intercept'] + row['value_slope'] * horizon
+            else:
+                # All scores on one day: no trend, the projection is the latest score
+                row['projected_achievement'] = row['last_achievement']
+                row['projected_value'] = row['last_value']
+            row['fy_end'] = fy_end
+            trends[row.pop('indicator_id')] = row
+        return trends
+
     @api.depends('date')
     def _compute_year(self):
         for record in self:
@@ -109,11 +245,12 @@ class PerformanceScore(models.Model):
             else:
                 record.year = False
     
-    @api.depends('indicator_id.name', 'date', 'achievement_percentage')
+    @api.depends('indicator_id.name', 'kpi_id.name', 'date', 'achievement_percentage')
     def _compute_display_name(self):
         for record in self:
-            if record.indicator_id and record.date:
-                record.display_name = f"{record.indicator_id.name} - {record.date} ({record.achievement_percentage:.1f}%)"
+            subject = record.indicator_id or record.kpi_id
+            if subject and record.date:
+                record.display_name = f"{subject.name} - {record.date} ({record.achievement_percentage:.1f}%)"
             else:
                 record.display_name = "Performance Score"
     
@@ -131,29 +268,164 @@ class PerformanceScore(models.Model):
             else:
                 record.status = 'behind'
     
+    @api.constrains('indicator_id', 'kpi_id')
+    def _check_score_subject(self):
+        for record in self:
+            if bool(record.indicator_id) == bool(record.kpi_id):
+                raise ValidationError(_("A score belongs to either a performance indicator or a strategic KPI."))
+
+    # model -> score column, FROM clause and stored fields only indicators fill
+    _SNAPSHOT_SOURCES = {
+        'performance.indicator': {
+            'column': 'indicator_id',
+            'from': 'performance_indicator t LEFT JOIN kcca_programme prog ON prog.id = t.parent_programme_id',
+            'indicator_name': 't.name',
+            'programme_name': 'prog.name',
+        },
+        'key.performance.indicator': {
+            'column': 'kpi_id',
+            'from': 'key_performance_indicator t',
+            'indicator_name': 'NULL',
+            'programme_name': 'NULL',
+        },
+    }
+
+    @api.model
+    def _snapshot_period(self, period_type, day):
+        """Return (period key, period selection, period end) of the ``period_type`` period containing ``day``.
+
+        Quarters and years are fiscal (July-June); a daily period ends on
+        ``day`` itself. ``_capture_period`` dates the snapshot on the period
+        end only within the grace window after it.
+        """
+        if period_type == 'daily':
+            return f'd:{day}', False, day
+        fiscal_year = day.year if day.month >= 7 else day.year - 1
+        if period_type == 'annual':
+            return f'fy:{fiscal_year}', 'annual', date(fiscal_year + 1, 6, 30)
+        start = self.env['performance.history.partition']._period_start(day, 'quarter')
+        quarter = (start.month - 7) % 12 // 3 + 1
+        return f'q{quarter}:{fiscal_year}', f'q{quarter}', start + relativedelta(months=3) - timedelta(days=1)
+
+    @api.model
+    def snapshot(self, period_key, snapshot_date, period=False, notes=None, created_before=None):
+        """Capture value, target and achievement of every active KPI and indicator.
+
+        One ``INSERT ... SELECT`` per source. Records already captured for
+        ``period_key``, whatever the date of their row, are left alone, so
+        running it again for the same period is a no-op. With
+        ``created_before`` only records created before that UTC datetime are
+        captured.
+
+        Captures of the same period are serialized on its row in
+        ``performance_score_capture``: a concurrent capture waits for the
+        first to commit and then, under REPEATABLE READ, fails with a
+        serialization error instead of inserting a second row per record
+        under another date.
+
+        Returns:
+            dict: model name -> number of rows inserted
+        """
+        self.env.cr.execute(f"""
+            INSERT INTO {self._CAPTURE_TABLE} (period_key, captured_at)
+            VALUES (%s, NOW() AT TIME ZONE 'UTC')
+            ON CONFLICT (period_key) DO UPDATE SET captured_at = EXCLUDED.captured_at
+        """, [period_key])
+        self.env['performance.history.partition']._ensure_partitions('performance.score', snapshot_date, snapshot_date)
+        params = {
+            'period_key': period_key,
+            'date': snapshot_date,
+            'period': period or None,
+            'notes': notes,
+            'year': snapshot_date.year,
+            'uid': self.env.uid,
+            'created_before': created_before,
+        }
+        created_clause = 'AND t.create_date < %(created_before)s' if created_before else ''
+        inserted = {}
+        for model_name, spec in self._SNAPSHOT_SOURCES.items():
+            self.env[model_name].flush_model(['active', 'name', 'current_value', 'target_value',
+                                              'achievement_percentage'])
+            column = spec['column']
+            achievement = 'COALESCE(t.achievement_percentage, 0.0)'
+            self.env.cr.execute(f"""
+                INSERT INTO performance_score (
+                    {column}, period_key, date, period, value, target_value, achievement_percentage,
+                    notes, year, status, display_name, indicator_name, programme_name,
+                    create_uid, create_date, write_uid, write_date
+                )
+                SELECT t.id, %(period_key)s, %(date)s, %(period)s, COALESCE(t.current_value, 0.0),
+                       t.target_value, {achievement}, %(notes)s, %(year)s,
+                       {_STATUS_SQL.format(a=achievement)},
+                       t.name || ' - ' || %(date)s::date || ' (' || ROUND({achievement}::numeric, 1) || '%%)',
+                       {spec['indicator_name']}, {spec['programme_name']},
+                       %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+                  FROM {spec['from']}
+                 WHERE t.active {created_clause}
+                   AND NOT EXISTS (
+                       SELECT 1 FROM performance_score s
+                        WHERE s.{column} = t.id AND s.period_key = %(period_key)s
+                   )
+                ON CONFLICT ({column}, period_key, date) WHERE {column} IS NOT NULL AND period_key IS NOT NULL
+                DO NOTHING
+            """, params)
+            inserted[model_name] = self.env.cr.rowcount
+        _logger.info("Score snapshot %s: %s", period_key, inserted)
+        return inserted
+
+    @api.model
+    def _get_snapshot_grace_days(self):
+        """Days after a period closes during which its snapshot is dated on the period end."""
+        try:
+            return int(self.env['ir.config_parameter'].sudo().get_param('robust_pmis.score_snapshot_grace_days') or 7)
+        except ValueError:
+            return 7
+
+    @api.model
+    def _capture_period(self, period_type, day, notes=None):
+        """Snapshot the closed ``period_type`` period containing ``day``.
+
+        Within the grace window after the close the rows are dated on the
+        period end and cover only the records that existed by then. A later
+        capture holds today's values, so its rows are dated today; a value is
+        never recorded against a date it was not observed on.
+        """
+        today = fields.Date.context_today(self)
+        period_key, period, snapshot_date = self._snapshot_period(period_type, day)
+        created_before = None
+        if period_type != 'daily':
+            if snapshot_date >= today:
+                return {}
+            if (today - snapshot_date).days <= self._get_snapshot_grace_days():
+                created_before = datetime.combine(snapshot_date + timedelta(days=1), time.min)
+            else:
+                snapshot_date = today
+        return self.snapshot(period_key, snapshot_date, period=period, notes=notes,
+                             created_before=created_before)
+
     @api.model
     def create_periodic_scores(self, period_type='quarterly'):
-        """Create periodic score records for all active indicators"""
-        indicators = self.env['performance.indicator'].search([('active', '=', True)])
+        """Snapshot all active KPIs and indicators for the last closed period.
+
+        ``daily`` captures today; ``quarterly`` and ``annual`` capture the
+        fiscal quarter / year that ended last. Idempotent, so the daily cron
+        may call it every day.
+        """
         today = fields.Date.context_today(self)
-        
-        for indicator in indicators:
-            # Check if score already exists for this period
-            existing_score = self.search([
-                ('indicator_id', '=', indicator.id),
-                ('date', '=', today),
-            ], limit=1)
-            
-            if not existing_score:
-                self.create({
-                    'indicator_id': indicator.id,
-                    'date': today,
-                    'value': indicator.current_value,
-                    'achievement_percentage': indicator.achievement_percentage,
-                    'target_value': indicator.target_value,
-                    'notes': f'Automatic {period_type} score record',
-                })
-    
+        day = today
+        if period_type == 'quarterly':
+            day = self.env['performance.history.partition']._period_start(today, 'quarter') - timedelta(days=1)
+        elif period_type == 'annual':
+            day = date(today.year if today.month >= 7 else today.year - 1, 6, 30)
+        return self._capture_period(period_type, day, notes=f'Automatic {period_type} score record')
+
+    @api.model
+    def cron_snapshot_scores(self):
+        """Daily: make sure the last closed fiscal quarter and year are captured."""
+        for period_type in ('quarterly', 'annual'):
+            self.create_periodic_scores(period_type)
+        return True
+
     def action_view_indicator(self):
         """Action to view the related indicator"""
         return {
@@ -187,12 +459,18 @@ class PerformanceScore(models.Model):
         week_start = today - timedelta(days=today.weekday() + 7)
         week_end = week_start + timedelta(days=6)
 
-        # Generate summary for each directorate
+        # Generate summary for each directorate, with all status counts read in one query
         directorates = self.env['kcca.directorate'].search([('active', '=', True)])
+        status_counts = defaultdict(dict)
+        for directorate, status, count in self.env['key.performance.indicator']._read_group(
+                [('directorate_id', 'in', directorates.ids), ('active', '=', True)],
+                ['directorate_id', 'status'], ['__count']):
+            status_counts[directorate.id][status] = count
 
         for directorate in directorates:
-            self._generate_weekly_summary(directorate, week_start, week_end)
+            self._generate_weekly_summary(directorate, week_start, week_end, status_counts[directorate.id])
 
+        self.env['performance.notification.digest'].flush()
         return True
 
     @api.model
@@ -215,38 +493,50 @@ class PerformanceScore(models.Model):
 
         # Generate monthly report
         self._generate_monthly_report(month_start, month_end)
+        self.env['performance.notification.digest'].flush()
 
         return True
 
-    def _generate_weekly_summary(self, directorate, start_date, end_date):
-        """Generate weekly performance summary for a directorate"""
-        # Get KPIs for this directorate
-        kpis = self.env['key.performance.indicator'].search([
-            ('directorate_id', '=', directorate.id),
-            ('active', '=', True)
-        ])
+    def _generate_weekly_summary(self, directorate, start_date, end_date, status_counts=None):
+        """Generate weekly performance summary for a directorate
+
+        ``status_counts`` maps KPI status to the number of active KPIs of the
+        directorate; it is read here when not given.
+        """
+        if status_counts is None:
+            status_counts = dict(self.env['key.performance.indicator']._read_group(
+                [('directorate_id', '=', directorate.id), ('active', '=', True)], ['status'], ['__count']))
 
         # Calculate summary statistics
-        total_kpis = len(kpis)
-        achieved_kpis = len(kpis.filtered(lambda k: k.status == 'achieved'))
-        on_track_kpis = len(kpis.filtered(lambda k: k.status == 'on_track'))
-        at_risk_kpis = len(kpis.filtered(lambda k: k.status == 'at_risk'))
-        behind_kpis = len(kpis.filtered(lambda k: k.status == 'behind'))
+        total_kpis = sum(status_counts.values())
+        achieved_kpis = status_counts.get('achieved', 0)
+        on_track_kpis = status_counts.get('on_track', 0)
+        at_risk_kpis = status_counts.get('at_risk', 0)
+        behind_kpis = status_counts.get('behind', 0)
 
-        # Send summary email to director
+        # Queue the summary for the director; sent with the run's digest
         if directorate.director_id:
-            template = self.env.ref('robust_pmis.email_template_weekly_summary', raise_if_not_found=False)
-            if template:
-                template.with_context(
-                    directorate=directorate,
-                    start_date=start_date,
-                    end_date=end_date,
-                    total_kpis=total_kpis,
-                    achieved_kpis=achieved_kpis,
-                    on_track_kpis=on_track_kpis,
-                    at_risk_kpis=at_risk_kpis,
-                    behind_kpis=behind_kpis,
-                ).send_mail(directorate.director_id.id, force_send=True)
+            tiles = ''.join(f"""
+                <div style="text-align: center; flex: 1;">
+                    <div style="font-size: 24px; font-weight: bold; color: {color};">{count}</div>
+                    <div style="font-size: 12px; color: #666;">{label}</div>
+                </div>""" for count, label, color in [
+                (achieved_kpis, _("Achieved"), '#28a745'),
+                (on_track_kpis, _("On Track"), '#17a2b8'),
+                (at_risk_kpis, _("At Risk"), '#ffc107'),
+                (behind_kpis, _("Behind"), '#dc3545'),
+            ])
+            body = f"""
+                <p>Here is your weekly performance summary for <strong>{directorate.name}</strong>
+                ({start_date} to {end_date}):</p>
+                <div style="background-color: #f9f9f9; padding: 20px; margin: 15px 0; border-radius: 5px;">
+                    <div style="display: flex; justify-content: space-between; margin: 10px 0;">{tiles}</div>
+                    <p style="text-align: center; margin-top: 15px;"><strong>Total KPIs: {total_kpis}</strong></p>
+                </div>
+            """
+            self.env['performance.notification.digest'].add(
+                directorate.director_id, _("Weekly Performance Summary - %s") % directorate.name, body,
+                category=_("Weekly Performance Summary"))
 
     def _generate_monthly_report(self, start_date, end_date):
         """Generate monthly performance report for KCCA leadership"""
@@ -258,19 +548,26 @@ class PerformanceScore(models.Model):
         overall_kpi_performance = sum(kpi.achievement_percentage for kpi in all_kpis) / len(all_kpis) if all_kpis else 0
         overall_programme_performance = sum(prog.overall_performance for prog in all_programmes) / len(all_programmes) if all_programmes else 0
 
-        # Send to KCCA leadership
+        # Queue the report for KCCA leadership; one digest section for all of them
         leadership_users = self.env['res.users'].search([
             ('groups_id', 'in', [self.env.ref('robust_pmis.group_kcca_pmis_admin').id])
         ])
 
-        template = self.env.ref('robust_pmis.email_template_monthly_report', raise_if_not_found=False)
-        if template:
-            for user in leadership_users:
-                template.with_context(
-                    start_date=start_date,
-                    end_date=end_date,
-                    overall_kpi_performance=overall_kpi_performance,
-                    overall_programme_performance=overall_programme_performance,
-                    total_kpis=len(all_kpis),
-                    total_programmes=len(all_programmes),
-                ).send_mail(user.id, force_send=True)
+        body = f"""
+            <p>Please find below the monthly performance report for KCCA ({start_date} to {end_date}):</p>
+            <div style="background-color: #f9f9f9; padding: 20px; margin: 15px 0; border-radius: 5px;">
+                <div style="margin: 10px 0;">
+                    <strong>Overall KPI Performance:</strong>
+                    <span style="font-size: 18px; color: #2c5aa0;">{overall_kpi_performance:.1f}%</span>
+                </div>
+                <div style="margin: 10px 0;">
+                    <strong>Overall Programme Performance:</strong>
+                    <span style="font-size: 18px; color: #2c5aa0;">{overall_programme_performance:.1f}%</span>
+                </div>
+                <div style="margin: 10px 0;"><strong>Total KPIs:</strong> {len(all_kpis)}</div>
+                <div style="margin: 10px 0;"><strong>Total Programmes:</strong> {len(all_programmes)}</div>
+            </div>
+        """
+        self.env['performance.notification.digest'].add(
+            leadership_users, _("KCCA Monthly Performance Report - %s") % start_date, body,
+            category=_("Monthly Performance Report"))
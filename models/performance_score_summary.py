@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, _
+from odoo.exceptions import ValidationError
+
+
+class PerformanceScoreSummary(models.Model):
+    """Per fiscal-quarter summary of compacted ``performance.score`` rows.
+
+    Detail scores older than the retention window are folded into one row per
+    indicator or strategic KPI and fiscal quarter (see
+    ``performance.history.partition``).
+    """
+    _name = 'performance.score.summary'
+    _description = 'Performance Score Summary'
+    _order = 'period_start desc, indicator_id, kpi_id'
+    _log_access = False
+
+    _sql_constraints = [
+        ('score_summary_period_unique', 'unique(indicator_id, period_key)',
+         'Only one summary per indicator and period is allowed.'),
+        ('score_summary_kpi_period_unique', 'unique(kpi_id, period_key)',
+         'Only one summary per strategic KPI and period is allowed.'),
+    ]
+
+    indicator_id = fields.Many2one('performance.indicator', string='Performance Indicator',
+                                   ondelete='cascade', index=True)
+    kpi_id = fields.Many2one('key.performance.indicator', string='Strategic KPI',
+                             ondelete='cascade', index=True)
+    period_key = fields.Char(string='Period', required=True,
+                             help="Fiscal quarter in dashboard format, e.g. q1:2024")
+    period_start = fields.Date(string='Period Start', required=True, index=True)
+    period_end = fields.Date(string='Period End', required=True)
+    score_count = fields.Integer(string='Scores')
+    avg_achievement = fields.Float(string='Average Achievement (%)')
+    min_achievement = fields.Float(string='Minimum Achievement (%)')
+    max_achievement = fields.Float(string='Maximum Achievement (%)')
+    last_date = fields.Date(string='Last Score Date')
+    last_value = fields.Float(string='Last Value')
+    last_target_value = fields.Float(string='Last Target Value')
+    last_achievement = fields.Float(string='Last Achievement (%)')
+
+    @api.constrains('indicator_id', 'kpi_id')
+    def _check_subject(self):
+        for record in self:
+            if bool(record.indicator_id) == bool(record.kpi_id):
+                raise ValidationError(_("A score summary belongs to either a performance indicator or a strategic KPI."))
@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+import csv
+import io
+import json
+import math
+import re
+from collections import defaultdict
+from datetime import date
+
+from odoo import models, api, _
+from odoo.exceptions import ValidationError
+from odoo.tools import split_every
+
+# "2024/25", "2024_25", "FY 2024/25", "fy:2024", "2024"
+_FY_RE = re.compile(r'^\s*(?:fy\s*:?\s*)?(\d{4})(?:\s*[/_-]\s*(\d{2}|\d{4}))?\s*$', re.IGNORECASE)
+
+
+class PerformanceValueIngest(models.AbstractModel):
+    """Bulk loading of per-FY indicator targets and actuals.
+
+    Rows are ``(indicator, fy, target, actual)`` where ``indicator`` is a
+    database id, an external id or an exact indicator name. Rows are
+    validated as a set, the ``target_fy*``/``actual_fy*`` columns are updated
+    with one ``UPDATE ... FROM unnest()`` per fiscal year and chunk, and the
+    ORM is told about the change once so dependent stored fields are
+    recomputed in a single batch.
+    """
+    _name = 'performance.value.ingest'
+    _description = 'Performance Indicator Value Ingestion'
+
+    _CHUNK = 5000
+    _MAX_REPORTED_ERRORS = 20
+    _ROW_KEYS = ('indicator', 'fy', 'target', 'actual')
+
+    # ------------------------------------------------------------------
+    # Parsing
+    # ------------------------------------------------------------------
+    @api.model
+    def _parse_payload(self, content, data_format='json'):
+        """Return the rows of a CSV (with header) or JSON (list or {'rows': [...]}) payload."""
+        if isinstance(content, bytes):
+            content = content.decode('utf-8-sig')
+        if data_format == 'csv':
+            return list(csv.DictReader(io.StringIO(content)))
+        data = json.loads(content or '[]')
+        if isinstance(data, dict):
+            data = data.get('rows') or []
+        return data
+
+    @api.model
+    def _normalize_fy(self, value):
+        """Return the FY label key ('2024_25') of ``value`` or None."""
+        match = _FY_RE.match(str(value or ''))
+        if not match:
+            return None
+        year = int(match.group(1))
+        if match.group(2):
+            end = int(match.group(2))
+            if end % 100 != (year + 1) % 100:
+                return None
+        return f"{year}_{str((year + 1) % 100).zfill(2)}"
+
+    @api.model
+    def _parse_number(self, value):
+        """Return (ok, float or None); empty values mean "leave unchanged"."""
+        if value is None or (isinstance(value, str) and not value.strip()):
+            return True, None
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return False, None
+        return math.isfinite(number), number
+
+    @api.model
+    def _current_fy_key(self):
+        today = date.today()
+        return self._normalize_fy(today.year if today.month >= 7 else today.year - 1)
+
+    # ------------------------------------------------------------------
+    # Set-wise validation
+    # ------------------------------------------------------------------
+    @api.model
+    def _resolve_refs(self, refs):
+        """Return {ref: indicator id or error message} with one query per reference kind."""
+        cr = self.env.cr
+        ids, xmlids = {}, {}
+        for ref in refs:
+            text = str(ref).strip()
+            if text.isdigit():
+                ids[ref] = int(text)
+                continue
+            if '.' in text and ' ' not in text:
+                xmlids[ref] = text.split('.', 1)
+
+        resolved = {}
+        if ids:
+            cr.execute("SELECT id FROM performance_indicator WHERE id = ANY(%s)", [list(set(ids.values()))])
+            existing = {row[0] for row in cr.fetchall()}
+            for ref, rid in ids.items():
+                resolved[ref] = rid if rid in existing else _("Unknown indicator id %s") % rid
+        if xmlids:
+            modules, xml_names = zip(*xmlids.values())
+            cr.execute("""
+                SELECT d.module || '.' || d.name, d.res_id
+                  FROM ir_model_data d
+                  JOIN unnest(%s::varchar[], %s::varchar[]) AS r(module, name)
+                    ON d.module = r.module AND d.name = r.name
+                 WHERE d.model = 'performance.indicator'
+            """, [list(modules), list(xml_names)])
+            by_xmlid = dict(cr.fetchall())
+            for ref in xmlids:
+                if str(ref).strip() in by_xmlid:
+                    resolved[ref] = by_xmlid[str(ref).strip()]
+        pending_names = {str(ref).strip() for ref in refs if ref not in resolved and ref not in ids}
+        if pending_names:
+            cr.execute("""
+                SELECT name, array_agg(id) FROM performance_indicator
+                 WHERE active AND name = ANY(%s)
+              GROUP BY name
+            """, [list(pending_names)])
+            by_name = dict(cr.fetchall())
+            for ref in refs:
+                if ref in resolved:
+                    continue
+                matches = by_name.get(str(ref).strip())
+                if not matches:
+                    resolved[ref] = _("Unknown indicator %s") % ref
+                elif len(matches) > 1:
+                    resolved[ref] = _("Indicator name %s is ambiguous (%s matches)") % (ref, len(matches))
+                else:
+                    resolved[ref] = matches[0]
+        return resolved
+
+    @api.model
+    def _validate_rows(self, rows):
+        """Return (values, errors) where values is [(row number, indicator id, fy key, target, actual)]."""
+        Indicator = self.env['performance.indicator']
+        errors = []
+        parsed = []
+        for row_no, row in enumerate(rows, start=1):
+            if isinstance(row, (list, tuple)):
+                row = dict(zip(self._ROW_KEYS, row))
+            if not isinstance(row, dict):
+                errors.append((row_no, _("Row must be an object or a list")))
+                continue
+            ref = row.get('indicator')
+            if ref in (None, ''):
+                errors.append((row_no, _("Missing indicator reference")))
+                continue
+            fy_key = self._normalize_fy(row.get('fy'))
+            if not fy_key or f'target_fy{fy_key}' not in Indicator._fields:
+                errors.append((row_no, _("Unsupported financial year %s") % row.get('fy')))
+                continue
+            target_ok, target = self._parse_number(row.get('target'))
+            actual_ok, actual = self._parse_number(row.get('actual'))
+            if not (target_ok and actual_ok):
+                errors.append((row_no, _("Target and actual must be numbers")))
+                continue
+            if target is None and actual is None:
+                errors.append((row_no, _("Row has neither a target nor an actual value")))
+                continue
+            parsed.append((row_no, ref if isinstance(ref, int) else str(ref), fy_key, target, actual))
+
+        resolved = self._resolve_refs({p[1] for p in parsed})
+        values = []
+        seen = {}
+        for row_no, ref, fy_key, target, actual in parsed:
+            indicator_id = resolved[ref]
+            if not isinstance(indicator_id, int):
+                errors.append((row_no, indicator_id))
+                continue
+            first = seen.setdefault((indicator_id, fy_key), row_no)
+            if first != row_no:
+                errors.append((row_no, _("Duplicate of row %s") % first))
+                continue
+            values.append((row_no, indicator_id, fy_key, target, actual))
+        errors.sort()
+        return values, errors
+
+    # ------------------------------------------------------------------
+    # Ingestion
+    # ------------------------------------------------------------------
+    @api.model
+    def ingest_payload(self, content, data_format='json', **kwargs):
+        """Parse a CSV/JSON payload and ingest it (see ``ingest``)."""
+        return self.ingest(self._parse_payload(content, data_format), **kwargs)
+
+    @api.model
+    def ingest(self, rows, on_error='abort', update_current=False):
+        """Upsert per-FY targets and actuals of performance indicators.
+
+        Args:
+            rows (list): dicts with indicator, fy, target and actual keys (or
+                lists in that order); an empty target or actual is left unchanged
+            on_error (str): 'abort' raises on any invalid row, 'skip' loads the
+                valid rows and reports the others
+            update_current (bool): also copy current-FY rows into
+                target_value/current_value, with the usual value-change history
+
+        Returns:
+            dict: row count, updated indicator count and [(row number, message)] errors
+        """
+        Indicator = self.env['performance.indicator']
+        Indicator.check_access('write')
+        values, errors = self._validate_rows(rows)
+        if errors and on_error != 'skip':
+            lines = [_("Row %s: %s") % (row_no, message) for row_no, message in errors[:self._MAX_REPORTED_ERRORS]]
+            if len(errors) > self._MAX_REPORTED_ERRORS:
+                lines.append(_("... and %s more invalid rows") % (len(errors) - self._MAX_REPORTED_ERRORS))
+            raise ValidationError('\n'.join(lines))
+        result = {'rows': len(rows), 'loaded': len(values), 'updated': 0, 'errors': errors}
+        if not values:
+            return result
+        # Record rules are checked once for the whole set
+        Indicator.browse({v[1] for v in values}).check_access('write')
+
+        by_fy = defaultdict(list)
+        for _row_no, indicator_id, fy_key, target, actual in values:
+            by_fy[fy_key].append((indicator_id, target, actual))
+        fnames = [name for key in by_fy for name in (f'target_fy{key}', f'actual_fy{key}')]
+        Indicator.flush_model(fnames + ['target_value', 'current_value'])
+
+        updated = {}
+        for fy_key, fy_values in by_fy.items():
+            for rid, fields_changed in self._update_fy_columns(fy_key, fy_values).items():
+                updated.setdefault(rid, set()).update(fields_changed)
+
+        current_changes = {}
+        current_key = self._current_fy_key()
+        if update_current and current_key in by_fy:
+            current_changes = self._update_current_values(by_fy[current_key])
+            if current_changes:
+                fnames += ['target_value', 'current_value']
+                for rid in current_changes:
+                    updated.setdefault(rid, set()).update(('target_value', 'current_value'))
+
+        if updated:
+            records = Indicator.browse(sorted(updated))
+            records.invalidate_recordset(fnames)
+            # Dependent stored fields are marked once and recomputed in one batch
+            records.modified(fnames)
+            Indicator.flush_model()
+            self._after_ingest(records, updated, current_changes)
+        result['updated'] = len(updated)
+        return result
+
+    @api.model
+    def _update_fy_columns(self, fy_key, fy_values):
+        """Update one FY's columns in chunks; return {indicator id: changed column names}."""
+        cr = self.env.cr
+        target_col, actual_col = f'target_fy{fy_key}', f'actual_fy{fy_key}'
+        changed = {}
+        for chunk in split_every(self._CHUNK, fy_values):
+            ids, targets, actuals = zip(*chunk)
+            cr.execute(f"""
+                UPDATE performance_indicator p
+                   SET {target_col} = COALESCE(v.target, p.{target_col}),
+                       {actual_col} = COALESCE(v.actual, p.{actual_col}),
+                       write_uid = %s,
+                       write_date = (now() at time zone 'UTC')
+                  FROM unnest(%s::int[], %s::float8[], %s::float8[]) AS v(id, target, actual),
+                       performance_indicator old
+                 WHERE p.id = v.id AND old.id = p.id
+                   AND (old.{target_col} IS DISTINCT FROM COALESCE(v.target, old.{target_col})
+                        OR old.{actual_col} IS DISTINCT FROM COALESCE(v.actual, old.{actual_col}))
+             RETURNING p.id,
+                       old.{target_col} IS DISTINCT FROM p.{target_col},
+                       old.{actual_col} IS DISTINCT FROM p.{actual_col}
+            """, [self.env.uid, list(ids), list(targets), list(actuals)])
+            for rid, target_changed, actual_changed in cr.fetchall():
+                changed[rid] = {name for name, flag in ((target_col, target_changed), (actual_col, actual_changed))
+                                if flag}
+        return changed
+
+    @api.model
+    def _update_current_values(self, fy_values):
+        """Copy current-FY rows into target_value/current_value; return {id: old current_value}."""
+        cr = self.env.cr
+        changes = {}
+        for chunk in split_every(self._CHUNK, fy_values):
+            ids, targets, actuals = zip(*chunk)
+            cr.execute("""
+                UPDATE performance_indicator p
+                   SET target_value = COALESCE(v.target, p.target_value),
+                       current_value = COALESCE(v.actual, p.current_value),
+                       write_uid = %s,
+                       write_date = (now() at time zone 'UTC')
+                  FROM unnest(%s::int[], %s::float8[], %s::float8[]) AS v(id, target, actual),
+                       performance_indicator old
+                 WHERE p.id = v.id AND old.id = p.id
+                   AND (old.target_value IS DISTINCT FROM COALESCE(v.target, old.target_value)
+                        OR old.current_value IS DISTINCT FROM COALESCE(v.actual, old.current_value))
+             RETURNING p.id, old.current_value, p.current_value
+            """, [self.env.uid, list(ids), list(targets), list(actuals)])
+            for rid, old_current, new_current in cr.fetchall():
+                changes[rid] = (old_current or 0.0, new_current or 0.0)
+        return changes
+
+    @api.model
+    def _after_ingest(self, records, updated, current_changes):
+        """Side effects normally triggered by ``write``: caches, rollups, history and audit."""
+        self.env['performance.dashboard.cache']._invalidate()
+        if current_changes:
+            current = records.browse(list(current_changes))
+            self.env['performance.rollup']._mark_dirty(current)
+            self.env['kpi.unified']._mark_dirty(current)
+            changed = current.filtered(lambda r: current_changes[r.id][0] != current_changes[r.id][1])
+            if changed:
+                mode = self.env.context.get('pmis_indicator_chatter', 'deferred')
+                changed.with_context(pmis_indicator_chatter=mode)._queue_value_changes({
+                    rid: old for rid, (old, _new) in current_changes.items()
+                })
+
+        AuditLog = self.env['audit.log']
+        request_info = AuditLog._get_request_info()
+        AuditLog._buffer([AuditLog._prepare_log_vals(
+            'performance.indicator', rid, 'import', "Per-FY values loaded by bulk ingestion",
+            details=', '.join(sorted(fields_changed)), request_info=request_info,
+        ) for rid, fields_changed in updated.items()])
@@ -1,8 +1,20 @@
 # -*- coding: utf-8 -*-
 
+import operator
+
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
 
+_COUNT_OPERATORS = {
+    '=': operator.eq,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+}
+
 
 class ProgrammeDirectorateRel(models.Model):
     """Intermediate model for Programme-Directorate relationships
@@ -218,76 +230,60 @@ class ProgrammeDirectorateRel(models.Model):
             else:
                 record.display_name = "New Relationship"
 
+    # Results-chain models counted on the smart buttons
+    _CHAIN_COUNT_FIELDS = {
+        'intermediate.outcome': 'intermediate_outcome_count',
+        'intervention': 'intervention_count',
+        'output': 'output_count',
+        'piap.action': 'piap_action_count',
+        'performance.indicator': 'performance_indicator_count',
+    }
+
+    def _get_programme_descendants(self, model_name):
+        """Return (visible records, {programme_id: set(ids)}) of ``model_name`` under the programmes of ``self``.
+
+        The ids come from the programme hierarchy closure in one lookup; a single
+        search then applies the active filter and access rules.
+        """
+        Closure = self.env['programme.hierarchy.closure']
+        by_programme = Closure._get_descendant_ids('kcca.programme', self.programme_id.ids, model_name)
+        all_ids = set().union(*by_programme.values()) if by_programme else set()
+        if not all_ids:
+            return self.env[model_name], {}
+        visible = self.env[model_name].search([('id', 'in', list(all_ids))])
+        visible_ids = set(visible.ids)
+        return visible, {pid: ids & visible_ids for pid, ids in by_programme.items()}
+
+    def _get_programme_chain_domain(self, model_name):
+        """Domain matching the ``model_name`` records under this relation's programme"""
+        self.ensure_one()
+        by_programme = self.env['programme.hierarchy.closure']._get_descendant_ids(
+            'kcca.programme', self.programme_id.ids, model_name)
+        return [('id', 'in', sorted(by_programme.get(self.programme_id.id, ())))]
+
     @api.depends('programme_id')
     def _compute_smart_button_counts(self):
         """Compute counts for smart buttons"""
+        descendants = {
+            model_name: self._get_programme_descendants(model_name)[1]
+            for model_name in self._CHAIN_COUNT_FIELDS
+        }
         for record in self:
-            if record.programme_id:
-                # Get programme hierarchy
-                programme = record.programme_id
-
-                # Count intermediate outcomes
-                intermediate_outcomes = self.env['intermediate.outcome'].search([
-                    ('objective_id.programme_id', '=', programme.id)
-                ])
-                record.intermediate_outcome_count = len(intermediate_outcomes)
-
-                # Count interventions
-                interventions = self.env['intervention'].search([
-                    ('outcome_id', 'in', intermediate_outcomes.ids)
-                ])
-                record.intervention_count = len(interventions)
-
-                # Count outputs
-                outputs = self.env['output'].search([
-                    ('intervention_id', 'in', interventions.ids)
-                ])
-                record.output_count = len(outputs)
-
-                # Count PIAP actions
-                piap_actions = self.env['piap.action'].search([
-                    ('output_id', 'in', outputs.ids)
-                ])
-                record.piap_action_count = len(piap_actions)
-
-                # Count performance indicators (from outputs and PIAP actions)
-                performance_indicators = self.env['performance.indicator'].search([
-                    '|',
-                    ('output_id', 'in', outputs.ids),
-                    ('piap_action_id', 'in', piap_actions.ids)
-                ])
-                record.performance_indicator_count = len(performance_indicators)
-            else:
-                record.intermediate_outcome_count = 0
-                record.intervention_count = 0
-                record.output_count = 0
-                record.piap_action_count = 0
-                record.performance_indicator_count = 0
+            programme_id = record.programme_id.id
+            for model_name, field_name in self._CHAIN_COUNT_FIELDS.items():
+                record[field_name] = len(descendants[model_name].get(programme_id, ())) if programme_id else 0
 
     @api.depends('programme_id', 'directorate_id')
     def _compute_contributing_indicators(self):
+        indicators, by_programme = self._get_programme_descendants('performance.indicator')
         for record in self:
-            if not record.programme_id:
+            ids = by_programme.get(record.programme_id.id) if record.programme_id else None
+            if not ids:
                 record.contributing_indicator_ids = [(6, 0, [])]
                 record.all_programme_indicator_ids = [(6, 0, [])]
                 continue
-            # Gather full results-chain under the selected programme
-            intermediate_outcomes = self.env['intermediate.outcome'].search([
-                ('objective_id.programme_id', '=', record.programme_id.id)
-            ])
-            interventions = self.env['intervention'].search([
-                ('outcome_id', 'in', intermediate_outcomes.ids)
-            ])
-            outputs = self.env['output'].search([
-                ('intervention_id', 'in', interventions.ids)
-            ])
-            piap_actions = self.env['piap.action'].search([
-                ('output_id', 'in', outputs.ids)
-            ])
-            # All programme indicators
-            all_indicators = self.env['performance.indicator'].search([
-                '|', ('output_id', 'in', outputs.ids), ('piap_action_id', 'in', piap_actions.ids)
-            ])
+            # All programme indicators, in the indicator model's order
+            all_indicators = indicators.browse([i for i in indicators.ids if i in ids])
             record.all_programme_indicator_ids = [(6, 0, all_indicators.ids)]
             # Directorate-owned indicators (requires attribution on indicator)
             if record.directorate_id:
@@ -295,71 +291,70 @@ class ProgrammeDirectorateRel(models.Model):
             else:
                 owned = all_indicators
             record.contributing_indicator_ids = [(6, 0, owned.ids)]
+
     def _compute_indicator_counts(self):
         for rec in self:
             rec.owned_indicator_count = len(rec.contributing_indicator_ids)
             rec.all_indicator_count = len(rec.all_programme_indicator_ids)
 
+    def _get_indicator_counts(self):
+        """Return {relation_id: (owned count, all count)} for every relationship in one query"""
+        self.env['programme.hierarchy.closure']._flush_pending()
+        self.env['performance.indicator'].flush_model(['active', 'responsible_directorate_id'])
+        self.flush_model(['programme_id', 'directorate_id'])
+        self.env.cr.execute(f"""
+            SELECT r.id,
+                   COUNT(i.id) FILTER (WHERE r.directorate_id IS NULL
+                                          OR i.responsible_directorate_id = r.directorate_id),
+                   COUNT(i.id)
+              FROM {self._table} r
+         LEFT JOIN programme_hierarchy_closure c
+                ON c.ancestor_model = 'kcca.programme' AND c.ancestor_id = r.programme_id
+               AND c.descendant_model = 'performance.indicator' AND c.depth > 0
+         LEFT JOIN performance_indicator i ON i.id = c.descendant_id AND i.active IS TRUE
+          GROUP BY r.id
+        """)
+        return {rel_id: (owned, total) for rel_id, owned, total in self.env.cr.fetchall()}
+
+    def _search_indicator_count(self, index, operator, value):
+        compare = _COUNT_OPERATORS.get(operator)
+        if compare is None:
+            return []
+        try:
+            value = int(value or 0)
+        except (TypeError, ValueError):
+            return []
+        counts = self._get_indicator_counts()
+        return [('id', 'in', [rel_id for rel_id, row in counts.items() if compare(row[index], value)])]
+
     def _search_owned_indicator_count(self, operator, value):
-        # Relations with at least one owned KPI
-        if operator in ('>', '>=') and value <= 0:
-            return [('id', 'in', self.search([]).filtered(lambda r: len(r.contributing_indicator_ids) > 0).ids)]
-        if operator in ('=', '==') and value == 0:
-            return [('id', 'in', self.search([]).filtered(lambda r: len(r.contributing_indicator_ids) == 0).ids)]
-        # Fallback: not optimized for all operators, defer to in-memory filtering
-        all_recs = self.search([])
-        if operator in ('>', '>=', '<', '<=', '=', '==', '!='):
-            matched = []
-            for r in all_recs:
-                cnt = len(r.contributing_indicator_ids)
-                if eval(f"cnt {operator.replace('==','=')} {value}"):
-                    matched.append(r.id)
-            return [('id', 'in', matched)]
-        return []
+        return self._search_indicator_count(0, operator, value)
 
     def _search_all_indicator_count(self, operator, value):
-        # Relations with at least one programme KPI
-        if operator in ('>', '>=') and value <= 0:
-            return [('id', 'in', self.search([]).filtered(lambda r: len(r.all_programme_indicator_ids) > 0).ids)]
-        if operator in ('=', '==') and value == 0:
-            return [('id', 'in', self.search([]).filtered(lambda r: len(r.all_programme_indicator_ids) == 0).ids)]
-        return []
+        return self._search_indicator_count(1, operator, value)
+
+    @api.model
+    def _indicator_ids_from_value(self, value):
+        ids = value
+        if isinstance(ids, models.BaseModel):
+            ids = ids.ids
+        if not isinstance(ids, (list, tuple)):
+            ids = [ids]
+        return [int(i) for i in ids if i]
 
     def _search_all_programme_indicator_ids(self, operator, value):
         """Search helper to allow dependencies to resolve. Supports [('all_programme_indicator_ids','in', [ids])]."""
-        Indicator = self.env['performance.indicator']
         if operator in ('in', '='):
-            ids = value
-            if isinstance(ids, models.BaseModel):
-                ids = ids.ids
-            if not isinstance(ids, (list, tuple)):
-                ids = [ids]
-            ids = [int(i) for i in ids if i]
+            ids = self._indicator_ids_from_value(value)
             if not ids:
                 return [('id', '=', 0)]
-            indicators = Indicator.browse(ids)
-            # Determine programme IDs from indicators
-            programme_ids = set()
-            for ind in indicators:
-                if ind.programme_id:
-                    programme_ids.add(ind.programme_id.id)
-                elif ind.outcome_id and getattr(ind.outcome_id, 'objective_id', False):
-                    programme_ids.add(ind.outcome_id.objective_id.programme_id.id)
-                elif ind.output_id and getattr(ind.output_id, 'intervention_id', False):
-                    outcome = ind.output_id.intervention_id.outcome_id
-                    if outcome and outcome.objective_id:
-                        programme_ids.add(outcome.objective_id.programme_id.id)
-                elif ind.piap_action_id and getattr(ind.piap_action_id, 'output_id', False):
-                    out = ind.piap_action_id.output_id
-                    if out and out.intervention_id and out.intervention_id.outcome_id and out.intervention_id.outcome_id.objective_id:
-                        programme_ids.add(out.intervention_id.outcome_id.objective_id.programme_id.id)
+            # Programmes owning the indicators, through any link of the results chain
+            owners = self.env['programme.hierarchy.closure']._get_ancestor_ids(
+                'performance.indicator', ids, 'kcca.programme')
+            programme_ids = set().union(*owners.values()) if owners else set()
             if not programme_ids:
                 return [('id', '=', 0)]
-            # Any relation whose programme matches any of those programme_ids
-            domain = ['|'] * (len(programme_ids) - 1)
-            for pid in programme_ids:
-                domain += [('programme_id', '=', pid)]
-            return domain
+            return [('programme_id', 'in', sorted(programme_ids))]
         elif operator in ('not in', '!='):
             pos_domain = self._search_all_programme_indicator_ids('in', value)
             return ['!', pos_domain] if pos_domain else []
@@ -371,43 +366,23 @@ class ProgrammeDirectorateRel(models.Model):
         Returns programme.directorate.rel records where the given indicators would
         appear in the computed contributing_indicator_ids list.
         """
-        Indicator = self.env['performance.indicator']
         if operator in ('in', '='):
-            ids = value
-            if isinstance(ids, models.BaseModel):
-                ids = ids.ids
-            if not isinstance(ids, (list, tuple)):
-                ids = [ids]
-            ids = [int(i) for i in ids if i]
+            ids = self._indicator_ids_from_value(value)
             if not ids:
                 return [('id', '=', 0)]
-            indicators = Indicator.browse(ids)
-            rel_domain = []
+            owners = self.env['programme.hierarchy.closure']._get_ancestor_ids(
+                'performance.indicator', ids, 'kcca.programme')
             combos = set()
-            for ind in indicators:
-                # Determine programme for the indicator through its linkage
-                programme_id = False
-                if ind.programme_id:
-                    programme_id = ind.programme_id.id
-                elif ind.outcome_id and getattr(ind.outcome_id, 'objective_id', False):
-                    programme_id = ind.outcome_id.objective_id.programme_id.id or False
-                elif ind.output_id and getattr(ind.output_id, 'intervention_id', False):
-                    outcome = ind.output_id.intervention_id.outcome_id
-                    programme_id = outcome.objective_id.programme_id.id if outcome and outcome.objective_id else False
-                elif ind.piap_action_id and getattr(ind.piap_action_id, 'output_id', False):
-                    out = ind.piap_action_id.output_id
-                    if out and out.intervention_id and out.intervention_id.outcome_id and out.intervention_id.outcome_id.objective_id:
-                        programme_id = out.intervention_id.outcome_id.objective_id.programme_id.id
-                directorate_id = ind.responsible_directorate_id.id if ind.responsible_directorate_id else False
-                if programme_id and directorate_id:
-                    combos.add((programme_id, directorate_id))
+            for ind in self.env['performance.indicator'].browse(list(owners)):
+                directorate_id = ind.responsible_directorate_id.id
+                if directorate_id:
+                    combos.update((programme_id, directorate_id) for programme_id in owners[ind.id])
             if not combos:
                 # If we cannot resolve combos, no relation would match
                 return [('id', '=', 0)]
             # Build a domain that matches any of the (programme, directorate) pairs
-            combos = list(combos)
             domain = []
-            for i, (p_id, d_id) in enumerate(combos):
+            for i, (p_id, d_id) in enumerate(sorted(combos)):
                 if i:
                     domain.append('|')
                 domain += [('programme_id', '=', p_id), ('directorate_id', '=', d_id)]
@@ -640,13 +615,17 @@ class ProgrammeDirectorateRel(models.Model):
         # Sync the many-to-many field for affected programmes
         programmes = records.mapped('programme_id')
         programmes.sync_directorate_relationships()
+        self.env['strategic.goal']._mark_rollup_dirty(records)
 
         return records
 
     def write(self, vals):
         """Override write to sync many-to-many relationships"""
         old_programmes = self.mapped('programme_id')
+        Goal = self.env['strategic.goal']
+        Goal._mark_rollup_dirty(self)
         result = super().write(vals)
+        Goal._mark_rollup_dirty(self)
 
         # Sync for both old and potentially new programmes
         new_programmes = self.mapped('programme_id')
@@ -658,6 +637,7 @@ class ProgrammeDirectorateRel(models.Model):
     def unlink(self):
         """Override unlink to sync many-to-many relationships"""
         programmes = self.mapped('programme_id')
+        self.env['strategic.goal']._mark_rollup_dirty(self)
         result = super().unlink()
 
         # Sync the many-to-many field for affected programmes
@@ -672,27 +652,8 @@ class ProgrammeDirectorateRel(models.Model):
         if not self.programme_id:
             return
 
-        # Get programme hierarchy
         programme = self.programme_id
-        intermediate_outcomes = self.env['intermediate.outcome'].search([
-            ('objective_id.programme_id', '=', programme.id)
-        ])
-        interventions = self.env['intervention'].search([
-            ('outcome_id', 'in', intermediate_outcomes.ids)
-        ])
-        outputs = self.env['output'].search([
-            ('intervention_id', 'in', interventions.ids)
-        ])
-        piap_actions = self.env['piap.action'].search([
-            ('output_id', 'in', outputs.ids)
-        ])
-
-        # Get performance indicators
-        domain = [
-            '|',
-            ('output_id', 'in', outputs.ids),
-            ('piap_action_id', 'in', piap_actions.ids)
-        ]
+        domain = self._get_programme_chain_domain('performance.indicator')
 
         return {
             'name': f'Performance Indicators - {programme.name}',
@@ -713,19 +674,8 @@ class ProgrammeDirectorateRel(models.Model):
         if not self.programme_id:
             return
 
-        # Get programme hierarchy
         programme = self.programme_id
-        intermediate_outcomes = self.env['intermediate.outcome'].search([
-            ('objective_id.programme_id', '=', programme.id)
-        ])
-        interventions = self.env['intervention'].search([
-            ('outcome_id', 'in', intermediate_outcomes.ids)
-        ])
-        outputs = self.env['output'].search([
-            ('intervention_id', 'in', interventions.ids)
-        ])
-
-        domain = [('output_id', 'in', outputs.ids)]
+        domain = self._get_programme_chain_domain('piap.action')
 
         return {
             'name': f'PIAP Actions - {programme.name}',
@@ -746,16 +696,8 @@ class ProgrammeDirectorateRel(models.Model):
         if not self.programme_id:
             return
 
-        # Get programme hierarchy
         programme = self.programme_id
-        intermediate_outcomes = self.env['intermediate.outcome'].search([
-            ('objective_id.programme_id', '=', programme.id)
-        ])
-        interventions = self.env['intervention'].search([
-            ('outcome_id', 'in', intermediate_outcomes.ids)
-        ])
-
-        domain = [('intervention_id', 'in', interventions.ids)]
+        domain = self._get_programme_chain_domain('output')
 
         return {
             'name': f'Outputs - {programme.name}',
@@ -776,13 +718,8 @@ class ProgrammeDirectorateRel(models.Model):
         if not self.programme_id:
             return
 
-        # Get programme hierarchy
         programme = self.programme_id
-        intermediate_outcomes = self.env['intermediate.outcome'].search([
-            ('objective_id.programme_id', '=', programme.id)
-        ])
-
-        domain = [('outcome_id', 'in', intermediate_outcomes.ids)]
+        domain = self._get_programme_chain_domain('intervention')
 
         return {
             'name': f'Interventions - {programme.name}',
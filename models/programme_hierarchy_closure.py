@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+from collections import defaultdict
+
+from odoo import models, fields, api
+
+
+class ProgrammeHierarchyClosure(models.Model):
+    """Ancestor/descendant closure of the programme results chain.
+
+    One row per (ancestor, descendant) pair of the chain
+    programme → objective → intermediate outcome → intervention → output →
+    PIAP action → performance indicator, plus a depth-0 row per node.
+    Indicators may hang off several levels at once (programme, outcome, output
+    and/or PIAP action); each of those links contributes ancestors and the
+    shortest path wins.
+
+    Rows are maintained by the create/write/unlink hooks of the chain models:
+    touched nodes are queued and their subtree is rebuilt level by level before
+    the next lookup or, at the latest, right before the transaction commits.
+    """
+    _name = 'programme.hierarchy.closure'
+    _description = 'Programme Hierarchy Closure'
+    _log_access = False
+    _order = 'ancestor_model, ancestor_id, depth'
+
+    _sql_constraints = [
+        ('closure_pair_unique',
+         'unique(ancestor_model, ancestor_id, descendant_model, descendant_id)',
+         'Only one closure row per ancestor/descendant pair is allowed.'),
+    ]
+
+    _CHAIN_MODELS = [
+        ('kcca.programme', 'Programme'),
+        ('programme.objective', 'Programme Objective'),
+        ('intermediate.outcome', 'Intermediate Outcome'),
+        ('intervention', 'Intervention'),
+        ('output', 'Output'),
+        ('piap.action', 'PIAP Action'),
+        ('performance.indicator', 'Performance Indicator'),
+    ]
+
+    ancestor_model = fields.Selection(_CHAIN_MODELS, string='Ancestor Model', required=True)
+    ancestor_id = fields.Integer(string='Ancestor ID', required=True)
+    descendant_model = fields.Selection(_CHAIN_MODELS, string='Descendant Model', required=True)
+    descendant_id = fields.Integer(string='Descendant ID', required=True)
+    depth = fields.Integer(string='Depth', required=True,
+                           help="Number of links between ancestor and descendant (0 for the node itself)")
+
+    _PENDING_KEY = 'programme.hierarchy.closure.pending'
+
+    # model -> parent links [(column, parent model)], listed top-down
+    _CHAIN_LINKS = {
+        'kcca.programme': [],
+        'programme.objective': [('programme_id', 'kcca.programme')],
+        'intermediate.outcome': [('objective_id', 'programme.objective')],
+        'intervention': [('outcome_id', 'intermediate.outcome')],
+        'output': [('intervention_id', 'intervention')],
+        'piap.action': [('output_id', 'output')],
+        'performance.indicator': [
+            ('programme_id', 'kcca.programme'),
+            ('outcome_id', 'intermediate.outcome'),
+            ('output_id', 'output'),
+            ('piap_action_id', 'piap.action'),
+        ],
+    }
+
+    def init(self):
+        cr = self.env.cr
+        cr.execute("""
+            CREATE INDEX IF NOT EXISTS programme_hierarchy_closure_descendants_idx
+                ON programme_hierarchy_closure (ancestor_model, ancestor_id, descendant_model)
+        """)
+        cr.execute("""
+            CREATE INDEX IF NOT EXISTS programme_hierarchy_closure_ancestors_idx
+                ON programme_hierarchy_closure (descendant_model, descendant_id, ancestor_model)
+        """)
+
+    # ------------------------------------------------------------------
+    # Rebuild
+    # ------------------------------------------------------------------
+    @api.model
+    def _insert_level(self, model_name, ids=None):
+        """Insert closure rows of ``model_name`` nodes from their parents' rows.
+
+        Parents must already be up to date, hence the top-down order of callers.
+        """
+        table = self.env[model_name]._table
+        id_filter = ''
+        id_params = []
+        if ids is not None:
+            ids = tuple(ids)
+            if not ids:
+                return
+            id_filter = 'AND t.id IN %s'
+            id_params = [ids]
+
+        selects = [f"SELECT %s AS ancestor_model, t.id AS ancestor_id, t.id AS descendant_id, 0 AS depth "
+                   f"FROM {table} t WHERE TRUE {id_filter}"]
+        params = [model_name] + id_params
+        for column, parent_model in self._CHAIN_LINKS[model_name]:
+            selects.append(f"""
+                SELECT c.ancestor_model, c.ancestor_id, t.id, c.depth + 1
+                  FROM {table} t
+                  JOIN programme_hierarchy_closure c
+                    ON c.descendant_model = %s AND c.descendant_id = t.{column}
+                 WHERE t.{column} IS NOT NULL {id_filter}
+            """)
+            params += [parent_model] + id_params
+
+        self.env.cr.execute(f"""
+            INSERT INTO programme_hierarchy_closure
+                   (ancestor_model, ancestor_id, descendant_model, descendant_id, depth)
+            SELECT x.ancestor_model, x.ancestor_id, %s, x.descendant_id, MIN(x.depth)
+              FROM ({' UNION ALL '.join(selects)}) x
+          GROUP BY x.ancestor_model, x.ancestor_id, x.descendant_id
+        """, [model_name] + params)
+
+    @api.model
+    def _flush_chain_models(self):
+        for model_name in self._CHAIN_LINKS:
+            self.env[model_name].flush_model()
+
+    @api.model
+    def rebuild_all(self):
+        """Rebuild the whole closure table from the parent links."""
+        self._flush_chain_models()
+        self.env.cr.precommit.data.pop(self._PENDING_KEY, None)
+        self.env.cr.execute("DELETE FROM programme_hierarchy_closure")
+        for model_name in self._CHAIN_LINKS:
+            self._insert_level(model_name)
+        self.invalidate_model()
+        return True
+
+    @api.model
+    def cron_rebuild_programme_hierarchy(self):
+        """Nightly full rebuild; catches parent links changed through raw SQL."""
+        return self.rebuild_all()
+
+    # ------------------------------------------------------------------
+    # Incremental maintenance
+    # ------------------------------------------------------------------
+    @api.model
+    def _is_relevant_write(self, model_name, vals):
+        return any(column in vals for column, _parent in self._CHAIN_LINKS.get(model_name, []))
+
+    @api.model
+    def _mark_dirty(self, records):
+        """Queue ``records`` (and, through them, their subtrees) for a rebuild."""
+        if not records:
+            return
+        data = self.env.cr.precommit.data
+        pending = data.get(self._PENDING_KEY)
+        if pending is None:
+            pending = data[self._PENDING_KEY] = defaultdict(set)
+            self.env.cr.precommit.add(self._flush_pending)
+        pending[records._name].update(records.ids)
+
+    @api.model
+    def _flush_pending(self):
+        """Rebuild the subtrees of all queued nodes."""
+        if not self.env.cr.precommit.data.get(self._PENDING_KEY):
+            return
+        self._flush_chain_models()
+        pending = self.env.cr.precommit.data.pop(self._PENDING_KEY, None) or {}
+        cr = self.env.cr
+
+        # Nodes below a moved node keep their own links but inherit new ancestors
+        affected = defaultdict(set)
+        for model_name, ids in pending.items():
+            if not ids:
+                continue
+            affected[model_name].update(ids)
+            cr.execute("""
+                SELECT descendant_model, descendant_id
+                  FROM programme_hierarchy_closure
+                 WHERE ancestor_model = %s AND ancestor_id IN %s AND depth > 0
+            """, [model_name, tuple(ids)])
+            for desc_model, desc_id in cr.fetchall():
+                affected[desc_model].add(desc_id)
+
+        for model_name in self._CHAIN_LINKS:
+            ids = affected.get(model_name)
+            if not ids:
+                continue
+            cr.execute("""
+                DELETE FROM programme_hierarchy_closure
+                 WHERE descendant_model = %s AND descendant_id IN %s
+            """, [model_name, tuple(ids)])
+            self._insert_level(model_name, ids)
+        self.invalidate_model()
+
+    @api.model
+    def _forget(self, records):
+        """Drop the rows of ``records`` and their subtrees before they are deleted.
+
+        Every parent link of the chain cascades on delete, so the whole subtree
+        disappears together with the node.
+        """
+        if not records:
+            return
+        self._flush_pending()
+        self.env.cr.execute("""
+            DELETE FROM programme_hierarchy_closure c
+             USING programme_hierarchy_closure sub
+             WHERE sub.ancestor_model = %s AND sub.ancestor_id IN %s
+               AND c.descendant_model = sub.descendant_model
+               AND c.descendant_id = sub.descendant_id
+        """, [records._name, tuple(records.ids)])
+        self.invalidate_model()
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+    @api.model
+    def _get_descendant_ids(self, ancestor_model, ancestor_ids, descendant_model):
+        """Return {ancestor_id: set(descendant ids of ``descendant_model``)}."""
+        ancestor_ids = tuple(i for i in ancestor_ids if i)
+        if not ancestor_ids:
+            return {}
+        self._flush_pending()
+        self.env.cr.execute("""
+            SELECT ancestor_id, array_agg(descendant_id)
+              FROM programme_hierarchy_closure
+             WHERE ancestor_model = %s AND ancestor_id IN %s AND descendant_model = %s
+               AND depth > 0
+          GROUP BY ancestor_id
+        """, [ancestor_model, ancestor_ids, descendant_model])
+        return {anc_id: set(desc_ids) for anc_id, desc_ids in self.env.cr.fetchall()}
+
+    @api.model
+    def _get_ancestor_ids(self, descendant_model, descendant_ids, ancestor_model):
+        """Return {descendant_id: set(ancestor ids of ``ancestor_model``)}."""
+        descendant_ids = tuple(i for i in descendant_ids if i)
+        if not descendant_ids:
+            return {}
+        self._flush_pending()
+        self.env.cr.execute("""
+            SELECT descendant_id, array_agg(ancestor_id)
+              FROM programme_hierarchy_closure
+             WHERE descendant_model = %s AND descendant_id IN %s AND ancestor_model = %s
+               AND depth > 0
+          GROUP BY descendant_id
+        """, [descendant_model, descendant_ids, ancestor_model])
+        return {desc_id: set(anc_ids) for desc_id, anc_ids in self.env.cr.fetchall()}
+
+    @api.model
+    def _search_descendants(self, ancestor_model, ancestor_ids, descendant_model):
+        """Return the (active, accessible) ``descendant_model`` records under the ancestors."""
+        by_ancestor = self._get_descendant_ids(ancestor_model, ancestor_ids, descendant_model)
+        ids = set().union(*by_ancestor.values()) if by_ancestor else set()
+        if not ids:
+            return self.env[descendant_model]
+        return self.env[descendant_model].search([('id', 'in', list(ids))])
@@ -188,3 +188,26 @@ class ProgrammeObjective(models.Model):
             'view_type': 'form',
             'target': 'current',
         }
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env['programme.hierarchy.closure']._mark_dirty(records)
+        return records
+
+    def write(self, vals):
+        # A move changes the parent programme of the indicators below
+        Closure = self.env['programme.hierarchy.closure']
+        Rollup = self.env['performance.rollup']
+        moved = Closure._is_relevant_write(self._name, vals)
+        if moved:
+            indicators = Rollup._mark_chain_dirty(self)
+        result = super().write(vals)
+        if moved:
+            Closure._mark_dirty(self)
+            Rollup._mark_dirty(indicators)
+        return result
+
+    def unlink(self):
+        self.env['programme.hierarchy.closure']._forget(self)
+        return super().unlink()
@@ -40,3 +40,45 @@ class ResConfigSettings(models.TransientModel):
         config_parameter='robust_pmis.plan_years',
         help='Number of fiscal years in the plan (e.g., 5)'
     )
+
+    # Performance indicator value-change notes
+    pmis_indicator_chatter = fields.Selection([
+        ('immediate', 'Post immediately'),
+        ('deferred', 'Post in the background'),
+        ('disabled', 'Do not post'),
+    ], string='Indicator Value Notes',
+        config_parameter='robust_pmis.indicator_chatter',
+        default='immediate',
+        help='How value-change notes are posted on performance indicators. Background posting '
+             'keeps mass edits and imports fast; the notes follow within a few minutes.'
+    )
+
+    # History retention (0 keeps every detail row)
+    pmis_score_retention_months = fields.Integer(
+        string='Score History Retention (months)',
+        config_parameter='robust_pmis.score_retention_months',
+        help='Performance scores older than this are compacted into per fiscal-quarter summaries. 0 keeps all scores.'
+    )
+    pmis_audit_log_retention_months = fields.Integer(
+        string='Audit Log Retention (months)',
+        config_parameter='robust_pmis.audit_log_retention_months',
+        help='Audit entries older than this are compacted into monthly counts. 0 keeps all entries.'
+    )
+
+    # Instrumentation of routes and scheduled jobs
+    # Selection rather than Boolean: an unchecked Boolean parameter is deleted,
+    # which would fall back to the enabled default
+    pmis_instrumentation = fields.Selection([
+        ('on', 'Record'),
+        ('off', 'Disabled'),
+    ], string='Endpoint Statistics',
+        config_parameter='robust_pmis.instrumentation',
+        default='on',
+        help='Record query counts and latency of the dashboard, portal and scheduled jobs.'
+    )
+    pmis_instrumentation_slow_ms = fields.Integer(
+        string='Slow Call Threshold (ms)',
+        config_parameter='robust_pmis.instrumentation_slow_ms',
+        default=1000,
+        help='Calls slower than this are logged with their slowest queries.'
+    )
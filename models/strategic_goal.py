@@ -54,69 +54,75 @@ class StrategicGoal(models.Model):
         help="Direct KRAs under this strategic goal"
     )
     
-    # Computed fields
+    # Stored rollups, maintained by _refresh_rollups() when KRAs, KPIs,
+    # objectives, programmes or implementing relations change
     objective_count = fields.Integer(
         string='Objectives Count',
-        compute='_compute_counts',
-        store=True
+        readonly=True
     )
     
     kra_count = fields.Integer(
         string='KRAs Count',
-        compute='_compute_counts',
-        store=True
+        readonly=True
     )
     
     kpi_count = fields.Integer(
         string='KPIs Count',
-        compute='_compute_counts',
-        store=True
+        readonly=True
     )
     
     progress = fields.Float(
         string='Overall Progress (%)',
-        compute='_compute_progress',
-        store=True,
+        readonly=True,
         help="Overall progress based on KPIs achievement"
     )
 
-    # Smart card computed fields
+    # Smart card fields
     programme_count = fields.Integer(
         string='Programmes Count',
-        compute='_compute_smart_card_counts',
+        readonly=True,
         help="Total programmes contributing to this strategic goal"
     )
 
     directorate_count = fields.Integer(
         string='Directorates Count',
-        compute='_compute_smart_card_counts',
+        readonly=True,
         help="Total directorates involved in this strategic goal"
     )
 
     division_count = fields.Integer(
         string='Divisions Count',
-        compute='_compute_smart_card_counts',
+        readonly=True,
         help="Total divisions involved in this strategic goal"
     )
 
     programme_ids = fields.Many2many(
         'kcca.programme',
+        'strategic_goal_programme_rel',
+        'goal_id',
+        'programme_id',
         string='Related Programmes',
-        compute='_compute_related_entities',
+        readonly=True,
         help="All programmes contributing to this strategic goal"
     )
 
     directorate_ids = fields.Many2many(
         'kcca.directorate',
+        'strategic_goal_directorate_rel',
+        'goal_id',
+        'directorate_id',
         string='Related Directorates',
-        compute='_compute_related_entities',
+        readonly=True,
         help="All directorates involved in this strategic goal"
     )
 
     division_ids = fields.Many2many(
         'kcca.division',
+        'strategic_goal_division_rel',
+        'goal_id',
+        'division_id',
         string='Related Divisions',
-        compute='_compute_related_entities',
+        readonly=True,
         help="All divisions involved in this strategic goal"
     )
     # URLs for dashboard actions
@@ -131,81 +137,6 @@ class StrategicGoal(models.Model):
         readonly=True
     )
     
-    @api.depends('strategic_objective_ids', 'kra_ids', 'kra_ids.kpi_ids')
-    def _compute_counts(self):
-        for record in self:
-            record.objective_count = len(record.strategic_objective_ids)
-            
-            # Count direct KRAs and KRAs from objectives
-            direct_kras = record.kra_ids
-            objective_kras = record.strategic_objective_ids.mapped('kra_ids')
-            all_kras = direct_kras | objective_kras
-            record.kra_count = len(all_kras)
-            
-            # Count all KPIs from all KRAs
-            all_kpis = all_kras.mapped('kpi_ids')
-            record.kpi_count = len(all_kpis)
-    
-    @api.depends('kra_ids.progress', 'strategic_objective_ids.kra_ids.progress')
-    def _compute_progress(self):
-        for record in self:
-            # Get all KRAs (direct and from objectives)
-            direct_kras = record.kra_ids
-            objective_kras = record.strategic_objective_ids.mapped('kra_ids')
-            all_kras = direct_kras | objective_kras
-
-            if all_kras:
-                total_progress = sum(kra.progress for kra in all_kras)
-                record.progress = total_progress / len(all_kras)
-            else:
-                record.progress = 0.0
-
-    @api.depends('strategic_objective_ids.programme_ids',
-                 'strategic_objective_ids.programme_ids.implementing_directorate_ids',
-                 'strategic_objective_ids.programme_ids.implementing_division_ids',
-                 'strategic_objective_ids.programme_ids.directorate_id',
-                 'strategic_objective_ids.programme_ids.division_id')
-    def _compute_smart_card_counts(self):
-        for record in self:
-            # Get all programmes from strategic objectives
-            programmes = record.strategic_objective_ids.mapped('programme_ids')
-            record.programme_count = len(programmes)
-
-            # Get all directorates implementing these programmes
-            directorates = self.env['kcca.directorate']
-            divisions = self.env['kcca.division']
-            
-            if programmes:
-                # Get directorates from many-to-many relationships
-                m2m_directorates = programmes.mapped('implementing_directorate_ids')
-
-                # Get directorates from programme-directorate relationships
-                prog_dir_rels = self.env['programme.directorate.rel'].search([
-                    ('programme_id', 'in', programmes.ids)
-                ])
-                rel_directorates = prog_dir_rels.mapped('directorate_id')
-
-                # Also get directorates from legacy single directorate field
-                legacy_directorates = programmes.mapped('directorate_id').filtered(lambda x: x)
-
-                # Combine all directorates
-                directorates = m2m_directorates | rel_directorates | legacy_directorates
-
-                # Compute divisions count (many2many and legacy field)
-                div_m2m = programmes.mapped('implementing_division_ids')
-                
-                # Get divisions from division-programme relationships
-                div_prog_rels = self.env['division.programme.rel'].search([
-                    ('programme_id', 'in', programmes.ids)
-                ])
-                rel_divisions = div_prog_rels.mapped('division_id')
-                
-                legacy_divs = programmes.mapped('division_id').filtered(lambda d: d)
-                divisions = div_m2m | rel_divisions | legacy_divs
-
-            record.directorate_count = len(directorates)
-            record.division_count = len(divisions)
-
     @api.depends()
     def _compute_urls(self):
         """
@@ -224,31 +155,213 @@ class StrategicGoal(models.Model):
                 rec.url_goals = ''
                 rec.url_programmes = ''
 
-    @api.depends('strategic_objective_ids.programme_ids')
-    def _compute_related_entities(self):
-        for record in self:
-            # Get all programmes from strategic objectives
-            programmes = record.strategic_objective_ids.mapped('programme_ids')
-            record.programme_ids = programmes
-
-            # Get all directorates implementing these programmes
-            directorates = self.env['kcca.directorate']
-            if programmes:
-                prog_dir_rels = self.env['programme.directorate.rel'].search([
-                    ('programme_id', 'in', programmes.ids)
-                ])
-                directorates = prog_dir_rels.mapped('directorate_id')
-            record.directorate_ids = directorates
-
-            # Get all divisions implementing these programmes
-            divisions = self.env['kcca.division']
-            if programmes:
-                div_prog_rels = self.env['division.programme.rel'].search([
-                    ('programme_id', 'in', programmes.ids)
-                ])
-                divisions = div_prog_rels.mapped('division_id')
-            record.division_ids = divisions
-    
+    # ------------------------------------------------------------------
+    # Stored rollups
+    # ------------------------------------------------------------------
+    _ROLLUP_PENDING_KEY = 'strategic.goal.rollup.pending'
+    _ROLLUP_FIELDS = [
+        'objective_count', 'kra_count', 'kpi_count', 'progress', 'programme_count',
+        'directorate_count', 'division_count', 'programme_ids', 'directorate_ids', 'division_ids',
+    ]
+
+    # model -> fields whose writes move a goal rollup (None: every write does)
+    _ROLLUP_TRIGGERS = {
+        'strategic.objective': {'strategic_goal_id', 'programme_ids', 'active'},
+        'key.result.area': {'strategic_goal_id', 'strategic_objective_id', 'active'},
+        'key.performance.indicator': {
+            'kra_id', 'active', 'current_value', 'target_value', 'baseline_value', 'kpi_type',
+        },
+        'kcca.programme': {
+            'strategic_objective_ids', 'implementing_directorate_ids', 'directorate_id', 'division_id', 'active',
+        },
+        'programme.directorate.rel': None,
+        'division.programme.rel': None,
+    }
+
+    @api.model
+    def _rollup_goal_ids(self, records):
+        """Return the ids of the goals whose rollups depend on ``records`` (current values)."""
+        records = records.sudo().with_context(active_test=False)
+        if records._name == 'strategic.goal':
+            return set(records.ids)
+        if records._name == 'strategic.objective':
+            return set(records.strategic_goal_id.ids)
+        if records._name == 'key.performance.indicator':
+            records = records.kra_id
+        if records._name == 'key.result.area':
+            return set((records.strategic_goal_id | records.strategic_objective_id.strategic_goal_id).ids)
+        if records._name in ('programme.directorate.rel', 'division.programme.rel'):
+            records = records.programme_id
+        return set(records.strategic_objective_ids.strategic_goal_id.ids)
+
+    @api.model
+    def _is_rollup_write(self, model_name, vals):
+        trigger_fields = self._ROLLUP_TRIGGERS[model_name]
+        return trigger_fields is None or bool(trigger_fields.intersection(vals))
+
+    @api.model
+    def _mark_rollup_dirty(self, records):
+        """Queue the goals touched by ``records`` for a rollup refresh before commit."""
+        if not records:
+            return
+        goal_ids = self._rollup_goal_ids(records)
+        if not goal_ids:
+            return
+        data = self.env.cr.precommit.data
+        pending = data.get(self._ROLLUP_PENDING_KEY)
+        if pending is None:
+            pending = data[self._ROLLUP_PENDING_KEY] = set()
+            self.env.cr.precommit.add(self._flush_rollups)
+        pending.update(goal_ids)
+
+    @api.model
+    def _flush_rollups(self):
+        """Refresh the queued goals."""
+        if not self.env.cr.precommit.data.get(self._ROLLUP_PENDING_KEY):
+            return
+        self._flush_rollup_sources()
+        # Take the batch only after flushing: flushing may queue more goals
+        goal_ids = self.env.cr.precommit.data.pop(self._ROLLUP_PENDING_KEY, None)
+        if goal_ids:
+            self._refresh_rollups(goal_ids, flush=False)
+
+    @api.model
+    def _flush_rollup_sources(self):
+        # KPIs first: their achievement feeds the stored KRA progress
+        for model_name in ('key.performance.indicator', 'key.result.area', 'strategic.objective',
+                           'kcca.programme', 'programme.directorate.rel', 'division.programme.rel'):
+            self.env[model_name].flush_model()
+
+    @api.model
+    def _refresh_rollups(self, goal_ids=None, flush=True):
+        """Recount the stored rollups of ``goal_ids`` (every goal when None).
+
+        The related programmes, directorates and divisions are rewritten in the
+        goal relation tables, then counts and progress are updated in one
+        statement; only goals whose values change are rewritten.
+
+        Returns:
+            int: number of goals whose counts or progress changed
+        """
+        if flush:
+            self._flush_rollup_sources()
+        self.flush_model()
+        cr = self.env.cr
+        if goal_ids is None:
+            goal_filter, goal_params = 'TRUE', []
+        else:
+            goal_ids = [goal_id for goal_id in goal_ids if goal_id]
+            if not goal_ids:
+                return 0
+            goal_filter, goal_params = '{column} = ANY(%s)', [goal_ids]
+
+        for table in ('strategic_goal_programme_rel', 'strategic_goal_directorate_rel', 'strategic_goal_division_rel'):
+            cr.execute(f"DELETE FROM {table} WHERE {goal_filter.format(column='goal_id')}", goal_params)
+        # Programmes linked to the goal's active objectives
+        cr.execute(f"""
+            INSERT INTO strategic_goal_programme_rel (goal_id, programme_id)
+            SELECT DISTINCT x.goal_id, x.programme_id
+              FROM (SELECT so.strategic_goal_id AS goal_id, opr.programme_id
+                      FROM strategic_objective so
+                      JOIN objective_programme_rel opr ON opr.objective_id = so.id
+                      JOIN kcca_programme p ON p.id = opr.programme_id AND p.active IS TRUE
+                     WHERE so.active IS TRUE AND so.strategic_goal_id IS NOT NULL) x
+             WHERE {goal_filter.format(column='x.goal_id')}
+        """, goal_params)
+        # Directorates through the implementing m2m, the relationship model and the legacy field
+        cr.execute(f"""
+            INSERT INTO strategic_goal_directorate_rel (goal_id, directorate_id)
+            SELECT DISTINCT gp.goal_id, x.directorate_id
+              FROM strategic_goal_programme_rel gp
+              JOIN (SELECT programme_id, directorate_id FROM programme_directorate_rel
+                    UNION
+                    SELECT programme_id, directorate_id FROM programme_directorate_relationship
+                     WHERE active IS TRUE
+                    UNION
+                    SELECT id, directorate_id FROM kcca_programme WHERE directorate_id IS NOT NULL) x
+                ON x.programme_id = gp.programme_id
+              JOIN kcca_directorate d ON d.id = x.directorate_id AND d.active IS TRUE
+             WHERE {goal_filter.format(column='gp.goal_id')}
+        """, goal_params)
+        # Divisions through the division-programme relationships and the legacy field
+        cr.execute(f"""
+            INSERT INTO strategic_goal_division_rel (goal_id, division_id)
+            SELECT DISTINCT gp.goal_id, x.division_id
+              FROM strategic_goal_programme_rel gp
+              JOIN (SELECT programme_id, division_id FROM division_programme_relationship
+                     WHERE active IS TRUE
+                    UNION
+                    SELECT id, division_id FROM kcca_programme WHERE division_id IS NOT NULL) x
+                ON x.programme_id = gp.programme_id
+              JOIN kcca_division d ON d.id = x.division_id AND d.active IS TRUE
+             WHERE {goal_filter.format(column='gp.goal_id')}
+        """, goal_params)
+
+        # KRAs hang off the goal directly or through one of its active objectives
+        cr.execute(f"""
+            UPDATE strategic_goal g
+               SET objective_count = c.objective_count,
+                   kra_count = c.kra_count,
+                   kpi_count = c.kpi_count,
+                   progress = c.progress,
+                   programme_count = c.programme_count,
+                   directorate_count = c.directorate_count,
+                   division_count = c.division_count
+              FROM (
+                    SELECT g.id,
+                           (SELECT COUNT(*) FROM strategic_objective so
+                             WHERE so.strategic_goal_id = g.id AND so.active IS TRUE) AS objective_count,
+                           k.kra_count,
+                           k.progress,
+                           (SELECT COUNT(*) FROM key_performance_indicator kpi
+                             WHERE kpi.kra_id = ANY(k.kra_ids) AND kpi.active IS TRUE) AS kpi_count,
+                           (SELECT COUNT(*) FROM strategic_goal_programme_rel r
+                             WHERE r.goal_id = g.id) AS programme_count,
+                           (SELECT COUNT(*) FROM strategic_goal_directorate_rel r
+                             WHERE r.goal_id = g.id) AS directorate_count,
+                           (SELECT COUNT(*) FROM strategic_goal_division_rel r
+                             WHERE r.goal_id = g.id) AS division_count
+                      FROM strategic_goal g
+                      LEFT JOIN LATERAL (
+                            SELECT COUNT(*) AS kra_count,
+                                   COALESCE(AVG(COALESCE(kra.progress, 0)), 0) AS progress,
+                                   array_agg(kra.id) AS kra_ids
+                              FROM key_result_area kra
+                              LEFT JOIN strategic_objective so ON so.id = kra.strategic_objective_id
+                             WHERE kra.active IS TRUE
+                               AND (kra.strategic_goal_id = g.id
+                                    OR (so.strategic_goal_id = g.id AND so.active IS TRUE))
+                      ) k ON TRUE
+                     WHERE {goal_filter.format(column='g.id')}
+              ) c
+             WHERE g.id = c.id
+               AND (g.objective_count IS DISTINCT FROM c.objective_count
+                    OR g.kra_count IS DISTINCT FROM c.kra_count
+                    OR g.kpi_count IS DISTINCT FROM c.kpi_count
+                    OR g.progress IS DISTINCT FROM c.progress
+                    OR g.programme_count IS DISTINCT FROM c.programme_count
+                    OR g.directorate_count IS DISTINCT FROM c.directorate_count
+                    OR g.division_count IS DISTINCT FROM c.division_count)
+         RETURNING g.id
+        """, goal_params)
+        changed_ids = [row[0] for row in cr.fetchall()]
+
+        self.invalidate_model(self._ROLLUP_FIELDS)
+        if changed_ids:
+            self.browse(changed_ids).modified(['objective_count', 'kra_count', 'kpi_count', 'progress'])
+        return len(changed_ids)
+
+    def web_read(self, specification):
+        # Goals queued in this transaction show their refreshed rollups right away
+        self._flush_rollups()
+        return super().web_read(specification)
+
+    @api.model
+    def web_search_read(self, domain, specification, offset=0, limit=None, order=None, count_limit=None):
+        self._flush_rollups()
+        return super().web_search_read(domain, specification, offset=offset, limit=limit, order=order,
+                                       count_limit=count_limit)
+
     def action_view_objectives(self):
         """Action to view strategic objectives"""
         action = self.env.ref('robust_pmis.action_strategic_objective').read()[0]
@@ -277,91 +390,52 @@ class StrategicGoal(models.Model):
         action['domain'] = [('id', 'in', all_kpis.ids)]
         return action
 
-    def action_view_programmes(self):
-        """Action to view related programmes"""
-        programmes = self.strategic_objective_ids.mapped('programme_ids')
-
-        action = self.env.ref('robust_pmis.action_kcca_programme').read()[0]
-        action['domain'] = [('id', 'in', programmes.ids)]
-        action['context'] = {'default_strategic_goal_id': self.id}
-        return action
-
-    def action_view_directorates(self):
-        """Action to view related directorates"""
-        programmes = self.strategic_objective_ids.mapped('programme_ids')
-        directorates = self.env['kcca.directorate']
-
-        if programmes:
-            prog_dir_rels = self.env['programme.directorate.rel'].search([
-                ('programme_id', 'in', programmes.ids)
-            ])
-            directorates = prog_dir_rels.mapped('directorate_id')
-
-        action = self.env.ref('robust_pmis.action_kcca_directorate').read()[0]
-        action['domain'] = [('id', 'in', directorates.ids)]
-        return action
-
-    def action_view_divisions(self):
-        """Action to view related divisions"""
-        programmes = self.strategic_objective_ids.mapped('programme_ids')
-        divisions = self.env['kcca.division']
-
-        if programmes:
-            div_prog_rels = self.env['division.programme.rel'].search([
-                ('programme_id', 'in', programmes.ids)
-            ])
-            divisions = div_prog_rels.mapped('division_id')
-
-        action = self.env.ref('robust_pmis.action_kcca_division').read()[0]
-        action['domain'] = [('id', 'in', divisions.ids)]
-        return action
-
     def force_recompute_counts(self):
         """Force recomputation of all counts - for debugging"""
-        self._compute_counts()
-        self._compute_smart_card_counts()
-        self._compute_related_entities()
+        self._refresh_rollups(self.ids)
         return True
 
     def recompute_all_counts(self):
         """Force recomputation of all counts"""
-        self._compute_counts()
-        self._compute_smart_card_counts()
-        self._compute_progress()
-        self._compute_related_entities()
+        self._refresh_rollups(self.ids)
         return True
 
+    # Kept for maintenance scripts that refreshed the former computed fields
+    def _compute_smart_card_counts(self):
+        self._refresh_rollups(self.ids)
+
+    def _compute_related_entities(self):
+        self._refresh_rollups(self.ids)
+
     @api.model
     def recompute_all_strategic_goals(self):
         """Recompute all strategic goals counts"""
-        goals = self.search([])
-        for goal in goals:
-            goal.recompute_all_counts()
+        self._refresh_rollups()
         return True
 
+    @api.model
+    def cron_refresh_strategic_goal_rollups(self):
+        """Nightly recount; catches hierarchy changes that bypass the write hooks."""
+        return self.recompute_all_strategic_goals()
+
     # Executive Dashboard Action Methods
     def action_view_programmes(self):
         """Action to view all programmes contributing to this strategic goal"""
-        programmes = self.strategic_objective_ids.mapped('programme_ids')
         action = self.env.ref('robust_pmis.action_kcca_programme').read()[0]
-        action['domain'] = [('id', 'in', programmes.ids)]
+        action['domain'] = [('id', 'in', self.programme_ids.ids)]
         action['context'] = {'default_strategic_goal_id': self.id}
         return action
 
     def action_view_directorates(self):
         """Action to view all directorates implementing programmes for this goal"""
-        programmes = self.strategic_objective_ids.mapped('programme_ids')
-        directorates = programmes.mapped('implementing_directorate_ids')
         action = self.env.ref('robust_pmis.action_kcca_directorate').read()[0]
-        action['domain'] = [('id', 'in', directorates.ids)]
+        action['domain'] = [('id', 'in', self.directorate_ids.ids)]
         return action
 
     def action_view_divisions(self):
         """Action to view all divisions involved in this strategic goal"""
-        programmes = self.strategic_objective_ids.mapped('programme_ids')
-        divisions = programmes.mapped('implementing_division_ids')
         action = self.env.ref('robust_pmis.action_kcca_division').read()[0]
-        action['domain'] = [('id', 'in', divisions.ids)]
+        action['domain'] = [('id', 'in', self.division_ids.ids)]
         return action
 
     def action_performance_report(self):
@@ -383,9 +457,8 @@ class StrategicGoal(models.Model):
 
     def action_financial_overview(self):
         """View financial overview for this strategic goal"""
-        programmes = self.strategic_objective_ids.mapped('programme_ids')
         action = self.env.ref('robust_pmis.action_programme_budget').read()[0]
-        action['domain'] = [('programme_id', 'in', programmes.ids)]
+        action['domain'] = [('programme_id', 'in', self.programme_ids.ids)]
         return action
 
     def action_analytics_dashboard(self):
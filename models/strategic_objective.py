@@ -106,7 +106,35 @@ class StrategicObjective(models.Model):
                 record.progress = total_progress / len(record.kra_ids)
             else:
                 record.progress = 0.0
-    
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env['strategic.goal']._mark_rollup_dirty(records)
+        return records
+
+    def write(self, vals):
+        Goal = self.env['strategic.goal']
+        goal_dirty = Goal._is_rollup_write(self._name, vals)
+        moved = 'strategic_goal_id' in vals
+        if goal_dirty:
+            Goal._mark_rollup_dirty(self)
+        if moved:
+            # KPI rollup rows of the old and the new goal
+            kpis = self.with_context(active_test=False).kra_ids.kpi_ids
+            self.env['performance.rollup']._mark_dirty(kpis)
+        res = super().write(vals)
+        if goal_dirty:
+            Goal._mark_rollup_dirty(self)
+        if moved:
+            self.env['performance.rollup']._mark_dirty(kpis)
+            self.env['kpi.unified']._mark_dirty(kpis)
+        return res
+
+    def unlink(self):
+        self.env['strategic.goal']._mark_rollup_dirty(self)
+        return super().unlink()
+
     def action_view_kras(self):
         """Action to view KRAs"""
         action = self.env.ref('robust_pmis.action_key_result_area').read()[0]
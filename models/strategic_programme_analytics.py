@@ -1,16 +1,130 @@
 # -*- coding: utf-8 -*-
-
-from odoo import models, fields, api, tools, _
-from odoo.exceptions import UserError
-import json
-from datetime import datetime, timedelta
+import logging
 from collections import defaultdict
 
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+# Rows take the id of their (KPI, indicator) pair in this table, so a refresh
+# keeps the ids the client already holds. Pairs are only ever added.
+_LINK_TABLE = 'strategic_programme_analytics_link'
+
+_ANALYTICS_SELECT = """
+    SELECT
+        link.id AS id,
+
+        -- Strategic KPI Information
+        kpi.id AS strategic_kpi_id,
+        kpi.name AS strategic_kpi_name,
+        kra.name AS kra_name,
+        kpi.thematic_area,
+        kpi.target_value AS strategic_target,
+        kpi.current_value AS strategic_current,
+        kpi.achievement_percentage AS strategic_achievement,
+
+        -- Programme Indicator Information
+        pi.id AS programme_indicator_id,
+        pi.name AS programme_indicator_name,
+        prog.name AS programme_name,
+        pi.target_value AS programme_target,
+        pi.current_value AS programme_current,
+        pi.achievement_percentage AS programme_achievement,
+
+        -- Linkage Information
+        pi.contribution_weight,
+        pi.impact_relationship,
+
+        -- Performance Analysis
+        (pi.target_value - pi.current_value) AS performance_gap,
+        (pi.achievement_percentage * pi.contribution_weight / 100) AS contribution_impact,
+
+        -- Directorate Information
+        dir.name AS responsible_directorate,
+
+        -- Time Analysis (as of the refresh)
+        pi.write_date AS last_update_date,
+        (CURRENT_DATE - pi.write_date::date) AS days_since_update,
+        NOW() AT TIME ZONE 'UTC' AS refreshed_at
+
+    FROM key_performance_indicator kpi
+    JOIN key_result_area kra ON kpi.kra_id = kra.id
+    JOIN kpi_programme_indicator_rel rel ON kpi.id = rel.strategic_kpi_id
+    JOIN performance_indicator pi ON rel.programme_indicator_id = pi.id
+    JOIN {link_table} link
+      ON link.strategic_kpi_id = rel.strategic_kpi_id AND link.programme_indicator_id = rel.programme_indicator_id
+    LEFT JOIN kcca_programme prog ON pi.parent_programme_id = prog.id
+    LEFT JOIN kcca_directorate dir ON prog.directorate_id = dir.id
+
+    WHERE kpi.auto_calculate = TRUE
+""".format(link_table=_LINK_TABLE)
+
+# column -> index name suffix; the unique pair index is what CONCURRENTLY needs
+_INDEXES = {
+    'thematic_area': 'thematic_area_idx',
+    'strategic_kpi_id': 'strategic_kpi_idx',
+    'programme_indicator_id': 'programme_indicator_idx',
+}
+
+_ALIGNMENT_STATUS = [
+    # (strategic on track, programme on track) -> label
+    ((True, True), 'Aligned High Performance'),
+    ((True, False), 'Strategic Success, Programme Gaps'),
+    ((False, True), 'Programme Success, Strategic Gaps'),
+]
+
+
+def _avg(values):
+    values = [v for v in values if v is not None]
+    return sum(values) / len(values) if values else None
+
+
+def _desc(value):
+    """Sort key for ``value DESC`` with PostgreSQL's NULLS FIRST."""
+    return (value is not None, -(value or 0.0))
+
+
+def _impact_level(weight):
+    if weight > 30:
+        return 'High Impact'
+    if weight > 15:
+        return 'Medium Impact'
+    return 'Low Impact'
+
+
+def _performance_status(achievement):
+    if achievement is not None and achievement >= 80:
+        return 'Performing'
+    if achievement is not None and achievement >= 50:
+        return 'At Risk'
+    return 'Underperforming'
+
+
+def _data_freshness(days):
+    if days is None:
+        return 'Stale'
+    if days <= 7:
+        return 'Recent'
+    if days <= 30:
+        return 'Current'
+    if days <= 90:
+        return 'Outdated'
+    return 'Stale'
+
 
 class StrategicProgrammeAnalytics(models.Model):
+    """Strategic KPI / programme indicator linkage rows.
+
+    Backed by a materialized view with indexes on the thematic area, KPI and
+    indicator. It is refreshed concurrently (readers are not blocked) by an
+    hourly cron and on demand through ``refresh``; ``refreshed_at`` tells how
+    current the rows are. The report sections are all computed from a single
+    read of the view.
+    """
     _name = 'strategic.programme.analytics'
     _description = 'Strategic-Programme Performance Analytics'
-    _auto = False  # This is a reporting model
+    _auto = False  # Materialized view, created in init()
+    _order = 'thematic_area, strategic_kpi_name, programme_indicator_name'
 
     # Strategic KPI Fields
     strategic_kpi_id = fields.Many2one('key.performance.indicator', string='Strategic KPI')
@@ -62,207 +176,217 @@ class StrategicProgrammeAnalytics(models.Model):
     # Time Analysis
     last_update_date = fields.Datetime(string='Last Update Date')
     days_since_update = fields.Integer(string='Days Since Update')
+    refreshed_at = fields.Datetime(string='Refreshed At', help="When the analytics rows were last refreshed")
+
 
     def init(self):
-        """Create the view for strategic-programme analytics"""
-        tools.drop_view_if_exists(self.env.cr, self._table)
-        self.env.cr.execute("""
-            CREATE OR REPLACE VIEW %s AS (
-                SELECT 
-                    ROW_NUMBER() OVER() AS id,
-                    
-                    -- Strategic KPI Information
-                    kpi.id AS strategic_kpi_id,
-                    kpi.name AS strategic_kpi_name,
-                    kra.name AS kra_name,
-                    kpi.thematic_area,
-                    kpi.target_value AS strategic_target,
-                    kpi.current_value AS strategic_current,
-                    kpi.achievement_percentage AS strategic_achievement,
-                    
-                    -- Programme Indicator Information
-                    pi.id AS programme_indicator_id,
-                    pi.name AS programme_indicator_name,
-                    prog.name AS programme_name,
-                    pi.target_value AS programme_target,
-                    pi.current_value AS programme_current,
-                    pi.achievement_percentage AS programme_achievement,
-                    
-                    -- Linkage Information
-                    pi.contribution_weight,
-                    pi.impact_relationship,
-                    
-                    -- Performance Analysis
-                    (pi.target_value - pi.current_value) AS performance_gap,
-                    (pi.achievement_percentage * pi.contribution_weight / 100) AS contribution_impact,
-                    
-                    -- Directorate Information
-                    dir.name AS responsible_directorate,
-                    
-                    -- Time Analysis
-                    pi.write_date AS last_update_date,
-                    EXTRACT(DAY FROM (NOW() - pi.write_date)) AS days_since_update
-                    
-                FROM key_performance_indicator kpi
-                JOIN key_result_area kra ON kpi.kra_id = kra.id
-                JOIN kpi_programme_indicator_rel rel ON kpi.id = rel.strategic_kpi_id
-                JOIN performance_indicator pi ON rel.programme_indicator_id = pi.id
-                LEFT JOIN kcca_programme prog ON pi.parent_programme_id = prog.id
-                LEFT JOIN kcca_directorate dir ON prog.directorate_id = dir.id
-                
-                WHERE kpi.auto_calculate = TRUE
-                ORDER BY kpi.thematic_area, kpi.name, pi.name
+        """Create the materialized view and its indexes."""
+        cr = self.env.cr
+        cr.execute("SELECT relkind FROM pg_class WHERE relname = %s AND relkind IN ('v', 'm')", [self._table])
+        kind = cr.fetchone()
+        # Earlier versions created a plain view; the definition may also have changed
+        if kind and kind[0] == 'v':
+            cr.execute(f"DROP VIEW {self._table} CASCADE")
+        elif kind:
+            cr.execute(f"DROP MATERIALIZED VIEW {self._table} CASCADE")
+        cr.execute(f"""
+            CREATE TABLE IF NOT EXISTS {_LINK_TABLE} (
+                id serial PRIMARY KEY,
+                strategic_kpi_id integer NOT NULL,
+                programme_indicator_id integer NOT NULL,
+                UNIQUE (strategic_kpi_id, programme_indicator_id)
             )
-        """ % self._table)
+        """)
+        self._register_links()
+        cr.execute(f"CREATE MATERIALIZED VIEW {self._table} AS ({_ANALYTICS_SELECT}) WITH DATA")
+        cr.execute(f"CREATE UNIQUE INDEX {self._table}_id_idx ON {self._table} (id)")
+        cr.execute(f"CREATE UNIQUE INDEX {self._table}_link_idx "
+                   f"ON {self._table} (strategic_kpi_id, programme_indicator_id)")
+        for column, suffix in _INDEXES.items():
+            cr.execute(f"CREATE INDEX {self._table}_{suffix} ON {self._table} ({column})")
+
+    @api.model
+    def _register_links(self):
+        """Give an id to every (KPI, indicator) pair linked since the last refresh."""
+        self.env.cr.execute(f"""
+            INSERT INTO {_LINK_TABLE} (strategic_kpi_id, programme_indicator_id)
+            SELECT strategic_kpi_id, programme_indicator_id
+              FROM kpi_programme_indicator_rel
+          ORDER BY strategic_kpi_id, programme_indicator_id
+            ON CONFLICT (strategic_kpi_id, programme_indicator_id) DO NOTHING
+        """)
+
+    @api.model
+    def refresh(self, concurrently=True):
+        """Refresh the materialized view from the KPI and indicator tables.
+
+        With ``concurrently`` the view stays readable during the refresh.
+        """
+        self.env['key.performance.indicator'].flush_model()
+        self.env['performance.indicator'].flush_model()
+        self._register_links()
+        self.env.cr.execute(
+            f"REFRESH MATERIALIZED VIEW {'CONCURRENTLY ' if concurrently else ''}{self._table}")
+        self.invalidate_model()
+        _logger.info("Strategic-programme analytics refreshed")
+        return True
+
+    def action_refresh(self):
+        """On-demand refresh from the list view."""
+        self.refresh()
+        return {'type': 'ir.actions.client', 'tag': 'reload'}
+
+    @api.model
+    def cron_refresh_programme_analytics(self):
+        """Scheduled concurrent refresh."""
+        return self.refresh()
+
+    @api.model
+    def _fetch_report_rows(self):
+        self.env.cr.execute(f"""
+            SELECT strategic_kpi_id, strategic_kpi_name, thematic_area, strategic_achievement,
+                   programme_indicator_id, programme_indicator_name, programme_name,
+                   programme_achievement, contribution_weight, contribution_impact,
+                   impact_relationship, days_since_update
+              FROM {self._table}
+             ORDER BY {self._order}
+        """)
+        return self.env.cr.dictfetchall()
+
+    @api.model
+    def _build_report_sections(self, rows=None):
+        """Compute every report section from one pass over the analytics rows."""
+        if rows is None:
+            rows = self._fetch_report_rows()
+        thematic = defaultdict(lambda: {'kpis': set(), 'indicators': set(), 'strategic': [], 'programme': [],
+                                        'on_track_strategic': 0, 'on_track_programme': 0})
+        linkages = {}
+        contribution, trends = [], []
+        kpi_ids, indicator_ids, areas = set(), set(), set()
+        for row in rows:
+            strategic, programme = row['strategic_achievement'], row['programme_achievement']
+            kpi_ids.add(row['strategic_kpi_id'])
+            indicator_ids.add(row['programme_indicator_id'])
+
+            if row['thematic_area']:
+                areas.add(row['thematic_area'])
+                area = thematic[row['thematic_area']]
+                area['kpis'].add(row['strategic_kpi_id'])
+                area['indicators'].add(row['programme_indicator_id'])
+                area['strategic'].append(strategic)
+                area['programme'].append(programme)
+                area['on_track_strategic'] += strategic is not None and strategic >= 80
+                area['on_track_programme'] += programme is not None and programme >= 80
+
+            key = (row['strategic_kpi_id'], row['strategic_kpi_name'], row['thematic_area'], strategic)
+            linkage = linkages.setdefault(key, {'count': 0, 'programme': [], 'impact': []})
+            linkage['count'] += 1
+            linkage['programme'].append(programme)
+            linkage['impact'].append(row['contribution_impact'])
+
+            if (row['contribution_weight'] or 0) > 0:
+                contribution.append({
+                    'strategic_kpi_name': row['strategic_kpi_name'],
+                    'programme_indicator_name': row['programme_indicator_name'],
+                    'programme_name': row['programme_name'],
+                    'contribution_weight': row['contribution_weight'],
+                    'programme_achievement': programme,
+                    'contribution_impact': row['contribution_impact'],
+                    'impact_relationship': row['impact_relationship'],
+                    'impact_level': _impact_level(row['contribution_weight']),
+                    'performance_status': _performance_status(programme),
+                })
+
+            trends.append({
+                'thematic_area': row['thematic_area'],
+                'strategic_kpi_name': row['strategic_kpi_name'],
+                'strategic_achievement': strategic,
+                'programme_indicator_name': row['programme_indicator_name'],
+                'programme_achievement': programme,
+                'days_since_update': row['days_since_update'],
+                'data_freshness': _data_freshness(row['days_since_update']),
+            })
+
+        thematic_summary = []
+        for name, area in thematic.items():
+            kpi_count, indicator_count = len(area['kpis']), len(area['indicators'])
+            thematic_summary.append({
+                'thematic_area': name,
+                'strategic_kpis_count': kpi_count,
+                'programme_indicators_count': indicator_count,
+                'avg_strategic_achievement': _avg(area['strategic']),
+                'avg_programme_achievement': _avg(area['programme']),
+                'on_track_strategic': area['on_track_strategic'],
+                'on_track_programme': area['on_track_programme'],
+                'strategic_on_track_pct': (area['on_track_strategic'] / kpi_count) * 100 if kpi_count else 0,
+                'programme_on_track_pct': (area['on_track_programme'] / indicator_count) * 100 if indicator_count else 0,
+            })
+        thematic_summary.sort(key=lambda item: _desc(item['avg_strategic_achievement']))
+
+        linkage_effectiveness = []
+        for (_kpi_id, kpi_name, area, strategic), linkage in linkages.items():
+            avg_programme = _avg(linkage['programme'])
+            status = 'Performance Gaps'
+            if strategic is not None and avg_programme is not None:
+                status = dict(_ALIGNMENT_STATUS).get((strategic >= 80, avg_programme >= 80), status)
+            impacts = [v for v in linkage['impact'] if v is not None]
+            linkage_effectiveness.append({
+                'strategic_kpi_name': kpi_name,
+                'thematic_area': area,
+                'strategic_achievement': strategic,
+                'linked_indicators_count': linkage['count'],
+                'avg_programme_achievement': avg_programme,
+                'total_contribution_impact': sum(impacts) if impacts else None,
+                'alignment_status': status,
+            })
+        linkage_effectiveness.sort(key=lambda item: _desc(item['strategic_achievement']))
+
+        contribution.sort(key=lambda item: (item['strategic_kpi_name'] or '', -item['contribution_weight']))
+        trends.sort(key=lambda item: (item['thematic_area'] or '~', _desc(item['strategic_achievement'])))
+
+        strategic_values = [row['strategic_achievement'] or 0.0 for row in rows]
+        programme_values = [row['programme_achievement'] or 0.0 for row in rows]
+        overall_stats = {
+            'total_strategic_kpis': len(kpi_ids),
+            'total_programme_indicators': len(indicator_ids),
+            'avg_strategic_achievement': sum(strategic_values) / len(rows) if rows else 0,
+            'avg_programme_achievement': sum(programme_values) / len(rows) if rows else 0,
+            'total_linkages': len(rows),
+            'thematic_areas_covered': len(areas),
+        }
+        return {
+            'thematic_summary': thematic_summary,
+            'linkage_effectiveness': linkage_effectiveness,
+            'contribution_analysis': contribution,
+            'performance_trends': trends,
+            'overall_stats': overall_stats,
+        }
 
     @api.model
     def get_thematic_performance_summary(self):
         """Get performance summary by thematic area"""
-        query = """
-            SELECT 
-                thematic_area,
-                COUNT(DISTINCT strategic_kpi_id) as strategic_kpis_count,
-                COUNT(DISTINCT programme_indicator_id) as programme_indicators_count,
-                AVG(strategic_achievement) as avg_strategic_achievement,
-                AVG(programme_achievement) as avg_programme_achievement,
-                SUM(CASE WHEN strategic_achievement >= 80 THEN 1 ELSE 0 END) as on_track_strategic,
-                SUM(CASE WHEN programme_achievement >= 80 THEN 1 ELSE 0 END) as on_track_programme
-            FROM %s
-            WHERE thematic_area IS NOT NULL
-            GROUP BY thematic_area
-            ORDER BY avg_strategic_achievement DESC
-        """ % self._table
-        
-        self.env.cr.execute(query)
-        results = self.env.cr.dictfetchall()
-        
-        # Calculate percentages
-        for result in results:
-            if result['strategic_kpis_count'] > 0:
-                result['strategic_on_track_pct'] = (result['on_track_strategic'] / result['strategic_kpis_count']) * 100
-            else:
-                result['strategic_on_track_pct'] = 0
-                
-            if result['programme_indicators_count'] > 0:
-                result['programme_on_track_pct'] = (result['on_track_programme'] / result['programme_indicators_count']) * 100
-            else:
-                result['programme_on_track_pct'] = 0
-        
-        return results
+        return self._build_report_sections()['thematic_summary']
 
     @api.model
     def get_linkage_effectiveness_analysis(self):
         """Analyze the effectiveness of strategic-programme linkages"""
-        query = """
-            SELECT 
-                strategic_kpi_name,
-                thematic_area,
-                strategic_achievement,
-                COUNT(programme_indicator_id) as linked_indicators_count,
-                AVG(programme_achievement) as avg_programme_achievement,
-                SUM(contribution_impact) as total_contribution_impact,
-                CASE 
-                    WHEN strategic_achievement >= 80 AND AVG(programme_achievement) >= 80 THEN 'Aligned High Performance'
-                    WHEN strategic_achievement >= 80 AND AVG(programme_achievement) < 80 THEN 'Strategic Success, Programme Gaps'
-                    WHEN strategic_achievement < 80 AND AVG(programme_achievement) >= 80 THEN 'Programme Success, Strategic Gaps'
-                    ELSE 'Performance Gaps'
-                END as alignment_status
-            FROM %s
-            GROUP BY strategic_kpi_id, strategic_kpi_name, thematic_area, strategic_achievement
-            ORDER BY strategic_achievement DESC
-        """ % self._table
-        
-        self.env.cr.execute(query)
-        return self.env.cr.dictfetchall()
+        return self._build_report_sections()['linkage_effectiveness']
 
     @api.model
     def get_contribution_analysis(self):
         """Analyze contribution weights and their effectiveness"""
-        query = """
-            SELECT 
-                strategic_kpi_name,
-                programme_indicator_name,
-                programme_name,
-                contribution_weight,
-                programme_achievement,
-                contribution_impact,
-                impact_relationship,
-                CASE 
-                    WHEN contribution_weight > 30 THEN 'High Impact'
-                    WHEN contribution_weight > 15 THEN 'Medium Impact'
-                    ELSE 'Low Impact'
-                END as impact_level,
-                CASE 
-                    WHEN programme_achievement >= 80 THEN 'Performing'
-                    WHEN programme_achievement >= 50 THEN 'At Risk'
-                    ELSE 'Underperforming'
-                END as performance_status
-            FROM %s
-            WHERE contribution_weight > 0
-            ORDER BY strategic_kpi_name, contribution_weight DESC
-        """ % self._table
-        
-        self.env.cr.execute(query)
-        return self.env.cr.dictfetchall()
+        return self._build_report_sections()['contribution_analysis']
 
     @api.model
     def get_performance_trends_data(self):
-        """Get data for performance trends analysis"""
-        # This would typically involve historical data
-        # For now, we'll provide current snapshot data
-        query = """
-            SELECT 
-                thematic_area,
-                strategic_kpi_name,
-                strategic_achievement,
-                programme_indicator_name,
-                programme_achievement,
-                days_since_update,
-                CASE 
-                    WHEN days_since_update <= 7 THEN 'Recent'
-                    WHEN days_since_update <= 30 THEN 'Current'
-                    WHEN days_since_update <= 90 THEN 'Outdated'
-                    ELSE 'Stale'
-                END as data_freshness
-            FROM %s
-            ORDER BY thematic_area, strategic_achievement DESC
-        """ % self._table
-        
-        self.env.cr.execute(query)
-        return self.env.cr.dictfetchall()
+        """Get data for performance trends analysis (current snapshot)"""
+        return self._build_report_sections()['performance_trends']
 
     @api.model
     def generate_strategic_programme_report(self):
         """Generate comprehensive strategic-programme linkage report"""
-        report_data = {
-            'generation_date': fields.Datetime.now(),
-            'thematic_summary': self.get_thematic_performance_summary(),
-            'linkage_effectiveness': self.get_linkage_effectiveness_analysis(),
-            'contribution_analysis': self.get_contribution_analysis(),
-            'performance_trends': self.get_performance_trends_data(),
-        }
-        
-        # Calculate overall statistics
-        all_records = self.search([])
-        if all_records:
-            report_data['overall_stats'] = {
-                'total_strategic_kpis': len(set(all_records.mapped('strategic_kpi_id.id'))),
-                'total_programme_indicators': len(set(all_records.mapped('programme_indicator_id.id'))),
-                'avg_strategic_achievement': sum(all_records.mapped('strategic_achievement')) / len(all_records),
-                'avg_programme_achievement': sum(all_records.mapped('programme_achievement')) / len(all_records),
-                'total_linkages': len(all_records),
-                'thematic_areas_covered': len(set(all_records.mapped('thematic_area')))
-            }
-        else:
-            report_data['overall_stats'] = {
-                'total_strategic_kpis': 0,
-                'total_programme_indicators': 0,
-                'avg_strategic_achievement': 0,
-                'avg_programme_achievement': 0,
-                'total_linkages': 0,
-                'thematic_areas_covered': 0
-            }
-        
+        report_data = {'generation_date': fields.Datetime.now()}
+        report_data.update(self._build_report_sections())
         return report_data
 
     @api.model
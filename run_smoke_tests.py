@@ -16,8 +16,24 @@ def main():
         registry = odoo.modules.registry.Registry(db)
         with registry.cursor() as cr:
             env = api.Environment(cr, SUPERUSER_ID, {})
-            from robust_pmis.tests import test_dashboard_filters
-            ok = test_dashboard_filters.run(env)
+            from robust_pmis.tests import (
+                test_dashboard_filters, test_dashboard_aggregation, test_programme_hierarchy,
+                test_indicator_value_changes, test_audit_log, test_history_partition, test_value_ingest,
+                test_achievement_recompute, test_instrumentation, test_goal_rollups,
+                test_kpi_unified, test_programme_analytics, test_performance_alerts,
+                test_notification_digest, test_score_snapshot, test_performance_analytics,
+                test_dashboard_live, test_dashboard_cache, test_period_close,
+            )
+            ok = (test_dashboard_filters.run(env) and test_dashboard_aggregation.run(env)
+                  and test_programme_hierarchy.run(env) and test_indicator_value_changes.run(env)
+                  and test_audit_log.run(env) and test_history_partition.run(env)
+                  and test_value_ingest.run(env) and test_achievement_recompute.run(env)
+                  and test_instrumentation.run(env) and test_goal_rollups.run(env)
+                  and test_kpi_unified.run(env) and test_programme_analytics.run(env)
+                  and test_performance_alerts.run(env) and test_notification_digest.run(env)
+                  and test_score_snapshot.run(env) and test_performance_analytics.run(env)
+                  and test_dashboard_live.run(env) and test_dashboard_cache.run(env)
+                  and test_period_close.run(env))
             cr.commit()
             print('Smoke tests completed:', 'PASS' if ok else 'FAIL')
 
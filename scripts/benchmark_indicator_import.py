@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# Benchmark the side effects of mass indicator value updates (performance.action,
+# performance.score, audit.log and chatter notes). Everything runs inside a
+# savepoint that is rolled back, so the database is left untouched.
+#
+#   ODOO_DB=robust_pmis BENCH_ROWS=2000 python3 scripts/benchmark_indicator_import.py
+import os
+import sys
+import time
+sys.path.append('/home/richards/Dev/odoo18')
+
+import odoo
+from odoo import api, SUPERUSER_ID
+
+
+def _seed(env, rows):
+    programme = env['kcca.programme'].create({'name': 'BENCH Programme'})
+    return env['performance.indicator'].create([{
+        'name': f'BENCH Indicator {i}',
+        'programme_id': programme.id,
+        'target_value': 100.0,
+        'current_value': 0.0,
+    } for i in range(rows)])
+
+
+def _measure(env, label, func):
+    Indicator = env['performance.indicator']
+    with env.cr.savepoint() as sp:
+        start_queries = env.cr.sql_log_count
+        start = time.perf_counter()
+        func()
+        Indicator._flush_value_changes()
+        env.flush_all()
+        elapsed = time.perf_counter() - start
+        queries = env.cr.sql_log_count - start_queries
+        sp.rollback()
+    env.invalidate_all()
+    print(f"{label:<40} {elapsed:8.2f}s {queries:8d} queries")
+    return elapsed
+
+
+def main():
+    db = os.environ.get('ODOO_DB', 'robust_pmis')
+    rows = int(os.environ.get('BENCH_ROWS', '2000'))
+    odoo.tools.config.parse_config(['-d', db])
+    registry = odoo.registry(db)
+    with registry.cursor() as cr:
+        env = api.Environment(cr, SUPERUSER_ID, {})
+        with env.cr.savepoint() as sp:
+            indicators = _seed(env, rows)
+            env.flush_all()
+            print(f"Updating current_value on {rows} indicators")
+
+            def per_record(mode):
+                def run():
+                    # Historical path: every row pays for its own inserts and note
+                    for i, record in enumerate(indicators.with_context(pmis_indicator_chatter=mode)):
+                        record.write({'current_value': float(i % 120)})
+                        record._flush_value_changes()
+                return run
+
+            def batched(mode):
+                def run():
+                    indicators.with_context(pmis_indicator_chatter=mode).write({'current_value': 10.0})
+                return run
+
+            def import_load():
+                data = [[f'__bench__.ind_{r.id}', str(float(i % 90))] for i, r in enumerate(indicators)]
+                env['ir.model.data'].create([{
+                    'module': '__bench__', 'name': f'ind_{r.id}', 'model': r._name, 'res_id': r.id,
+                } for r in indicators])
+                result = env['performance.indicator'].with_context(import_file=True).load(['id', 'current_value'], data)
+                assert not result['messages'], result['messages']
+
+            baseline = _measure(env, 'per-record writes, immediate notes', per_record('immediate'))
+            for label, func in [
+                ('mass write, immediate notes', batched('immediate')),
+                ('mass write, deferred notes', batched('deferred')),
+                ('mass write, notes disabled', batched('disabled')),
+                ('import (load), deferred notes', import_load),
+            ]:
+                elapsed = _measure(env, label, func)
+                print(f"{'':<40} speedup vs per-record: {baseline / elapsed if elapsed else 0:.1f}x")
+            sp.rollback()
+
+
+if __name__ == '__main__':
+    main()
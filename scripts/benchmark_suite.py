@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# Benchmark suite: wall time and SQL query counts of the dashboard endpoints,
+# crons, report wizards and bulk edits. Each case runs in its own savepoint
+# that is rolled back, so cases do not see each other's writes.
+#
+#   ODOO_DB=pmis_bench BENCH_SCALE=10 python3 scripts/benchmark_suite.py
+#
+# Environment:
+#   BENCH_SCALE      generate a synthetic dataset at this scale first (0 = use the data in the database)
+#   BENCH_YEARS      years of score/audit history to generate (default 3)
+#   BENCH_REPEAT     runs per case, the median is reported (default 3)
+#   BENCH_ONLY       comma-separated case groups to run (dashboard, cron, wizard, bulk)
+#   BENCH_OUTPUT     write the results as JSON to this path
+#   BENCH_BASELINE   compare with a previous BENCH_OUTPUT file and flag regressions
+#   BENCH_TOLERANCE  allowed slowdown before a case is flagged (default 0.2 = 20%)
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from datetime import date
+sys.path.append('/home/richards/Dev/odoo18')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import odoo
+from odoo import api, SUPERUSER_ID
+
+from generate_synthetic_data import generate
+
+
+def _dashboard(env):
+    dashboard = env['performance.dashboard'].search([], limit=1)
+    return dashboard or env['performance.dashboard'].create({})
+
+
+def _fy_filters(env):
+    today = date.today()
+    fy = today.year if today.month >= 7 else today.year - 1
+    return {'period': f'fy:{fy}', 'data_type': 'all', 'scope': 'organization', 'entity': 'all', 'performance': 'all'}
+
+
+def _cold(func):
+    """Run ``func`` with an empty dashboard cache."""
+    def run(env):
+        env['performance.dashboard.cache'].clear()
+        return func(env)
+    return run
+
+
+def _cron(model, method):
+    return lambda env: getattr(env[model], method)()
+
+
+def _quarterly_report(env):
+    today = date.today()
+    wizard = env['quarterly.report.wizard'].create({
+        'name': 'BENCH Quarterly Report', 'year': today.year, 'quarter': f'q{(today.month - 1) // 3 + 1}',
+    })
+    return wizard.action_generate_report()
+
+
+def _update_wizard_load(env):
+    wizard = env['performance.update.wizard'].new({'name': 'BENCH Update', 'update_type': 'both'})
+    wizard._load_kpis()
+    wizard._load_performance_indicators()
+
+
+def _mass_write(model, values):
+    return lambda env: env[model].search([]).write(values)
+
+
+def _per_record_writes(env):
+    for i, indicator in enumerate(env['performance.indicator'].search([], limit=200)):
+        indicator.write({'current_value': float(i % 120)})
+    env['performance.indicator']._flush_value_changes()
+
+
+def _ingest_all(env):
+    Ingest = env['performance.value.ingest']
+    fy = Ingest._current_fy_key()
+    rows = [{'indicator': rid, 'fy': fy, 'target': 100.0, 'actual': float(rid % 120)}
+            for rid in env['performance.indicator'].search([]).ids]
+    Ingest.with_context(pmis_indicator_chatter='deferred').ingest(rows, update_current=True)
+
+
+CASES = [
+    # group, label, function(env)
+    ('dashboard', 'data (cold cache)', _cold(lambda env: _dashboard(env).get_dashboard_data())),
+    ('dashboard', 'data (warm cache)', lambda env: _dashboard(env).get_dashboard_data()),
+    ('dashboard', 'filtered data, current FY (cold)',
+     _cold(lambda env: _dashboard(env).get_filtered_dashboard_data(_fy_filters(env)))),
+    ('dashboard', 'summary (realtime metrics)', lambda env: _dashboard(env).get_realtime_metrics()),
+    ('dashboard', 'summary (realtime metrics, cold)', _cold(lambda env: _dashboard(env).get_realtime_metrics())),
+    ('dashboard', 'single chart section (cold)',
+     _cold(lambda env: _dashboard(env).get_dashboard_sections(['distribution']))),
+    ('dashboard', 'period options', lambda env: _dashboard(env).get_period_options()),
+    ('dashboard', 'unified KPI pivot (type x fiscal year)',
+     lambda env: env['kpi.unified'].read_group([], ['achievement_percentage:avg'], ['kind', 'fiscal_year'], lazy=False)),
+    ('dashboard', 'strategic-programme report',
+     lambda env: env['strategic.programme.analytics'].generate_strategic_programme_report()),
+    ('cron', 'refresh performance rollups', _cron('performance.rollup', 'cron_refresh_performance_rollups')),
+    ('cron', 'rebuild programme hierarchy', _cron('programme.hierarchy.closure', 'cron_rebuild_programme_hierarchy')),
+    ('cron', 'refresh strategic-programme analytics',
+     _cron('strategic.programme.analytics', 'cron_refresh_programme_analytics')),
+    ('cron', 'weekly analytics', _cron('performance.analytics', 'cron_generate_weekly_analytics')),
+    ('cron', 'publish dashboard updates', _cron('performance.dashboard.live', 'cron_publish_dashboard_updates')),
+    ('cron', 'performance alerts', _cron('performance.alert', 'cron_check_performance_alerts')),
+    ('cron', 'daily KPI check', _cron('key.performance.indicator', 'cron_daily_performance_check')),
+    ('cron', 'weekly score summary', _cron('performance.score', 'cron_weekly_performance_summary')),
+    ('cron', 'monthly score report', _cron('performance.score', 'cron_monthly_performance_report')),
+    ('cron', 'division integrity check', _cron('division.programme.rel', 'cron_integrity_check')),
+    ('cron', 'maintain history partitions',
+     _cron('performance.history.partition', 'cron_maintain_history_partitions')),
+    ('wizard', 'quarterly report', _quarterly_report),
+    ('wizard', 'bulk update wizard (load lines)', _update_wizard_load),
+    ('bulk', 'mass write indicator current_value',
+     lambda env: _mass_write('performance.indicator', {'current_value': 42.0})(
+         env.with_context(pmis_indicator_chatter='deferred'))),
+    ('bulk', 'mass write KPI current_value', _mass_write('key.performance.indicator', {'current_value': 42.0})),
+    ('bulk', 'per-record writes (200 indicators)', _per_record_writes),
+    ('bulk', 'ingest current FY for all indicators', _ingest_all),
+    ('bulk', 'batched achievement recompute',
+     lambda env: env['performance.achievement'].recompute_all()),
+]
+
+
+def _measure(env, func):
+    with env.cr.savepoint() as sp:
+        start_queries = env.cr.sql_log_count
+        start = time.perf_counter()
+        func(env)
+        env.flush_all()
+        # Precommit work (rollups, closure, history, audit) is part of the cost
+        env.cr.precommit.run()
+        elapsed = time.perf_counter() - start
+        queries = env.cr.sql_log_count - start_queries
+        sp.rollback()
+    env.invalidate_all()
+    return elapsed, queries
+
+
+def run_suite(env, repeat=3, groups=None):
+    results = {}
+    for group, label, func in CASES:
+        if groups and group not in groups:
+            continue
+        key = f'{group}: {label}'
+        runs = []
+        try:
+            for _i in range(repeat):
+                runs.append(_measure(env, func))
+        except Exception as e:
+            print(f"{key:<52} FAILED: {e}")
+            results[key] = {'error': str(e)}
+            continue
+        elapsed = statistics.median(r[0] for r in runs)
+        queries = int(statistics.median(r[1] for r in runs))
+        results[key] = {'seconds': round(elapsed, 4), 'queries': queries}
+        print(f"{key:<52} {elapsed:9.3f}s {queries:9d} queries")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print the cases slower or chattier than ``baseline``; return their count."""
+    regressions = 0
+    for key, result in results.items():
+        before = baseline.get(key)
+        if not before or 'seconds' not in before or 'seconds' not in result:
+            continue
+        slower = result['seconds'] > before['seconds'] * (1 + tolerance)
+        chattier = result['queries'] > before['queries']
+        if slower or chattier:
+            regressions += 1
+            print(f"REGRESSION {key}: {before['seconds']:.3f}s/{before['queries']}q "
+                  f"-> {result['seconds']:.3f}s/{result['queries']}q")
+    return regressions
+
+
+def main():
+    db = os.environ.get('ODOO_DB', 'robust_pmis')
+    scale = float(os.environ.get('BENCH_SCALE', '1'))
+    years = int(os.environ.get('BENCH_YEARS', '3'))
+    repeat = int(os.environ.get('BENCH_REPEAT', '3'))
+    groups = set(filter(None, os.environ.get('BENCH_ONLY', '').split(',')))
+    odoo.tools.config.parse_config(['-d', db])
+    # Mail crons and wizards must not reach the SMTP server
+    threading.current_thread().testing = True
+    registry = odoo.registry(db)
+    with registry.cursor() as cr:
+        env = api.Environment(cr, SUPERUSER_ID, {})
+        with env.cr.savepoint() as sp:
+            if scale > 0:
+                start = time.perf_counter()
+                counts = generate(env, scale=scale, history_years=years)
+                print(f"Synthetic dataset {scale:g}x generated in {time.perf_counter() - start:.1f}s: "
+                      f"{counts['key.performance.indicator']} KPIs, {counts['performance.indicator']} indicators, "
+                      f"{counts['performance.score']} scores, {counts['audit.log']} audit entries")
+                env['performance.rollup'].refresh_all()
+                env.cr.precommit.run()
+            results = run_suite(env, repeat=repeat, groups=groups)
+            sp.rollback()
+        cr.rollback()
+
+    output = os.environ.get('BENCH_OUTPUT')
+    if output:
+        with open(output, 'w', encoding='utf-8') as handle:
+            json.dump({'scale': scale, 'repeat': repeat, 'results': results}, handle, indent=2, sort_keys=True)
+        print(f"Results written to {output}")
+    baseline_path = os.environ.get('BENCH_BASELINE')
+    if baseline_path:
+        with open(baseline_path, encoding='utf-8') as handle:
+            baseline = json.load(handle).get('results', {})
+        tolerance = float(os.environ.get('BENCH_TOLERANCE', '0.2'))
+        regressions = compare(results, baseline, tolerance)
+        print(f"{regressions} regression(s) against {baseline_path}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# Throughput benchmark of the bulk per-FY value ingestion against per-record ORM
+# writes. Everything runs inside a savepoint that is rolled back, so the
+# database is left untouched.
+#
+#   ODOO_DB=robust_pmis BENCH_INDICATORS=5000 BENCH_FYS=5 python3 scripts/benchmark_value_ingest.py
+import os
+import sys
+import time
+sys.path.append('/home/richards/Dev/odoo18')
+
+import odoo
+from odoo import api, SUPERUSER_ID
+
+
+def _seed(env, count):
+    programme = env['kcca.programme'].create({'name': 'BENCH Programme'})
+    return env['performance.indicator'].create([{
+        'name': f'BENCH Indicator {i}',
+        'programme_id': programme.id,
+        'target_value': 100.0,
+        'current_value': 0.0,
+    } for i in range(count)])
+
+
+def _measure(env, label, rows, func):
+    with env.cr.savepoint() as sp:
+        start_queries = env.cr.sql_log_count
+        start = time.perf_counter()
+        func()
+        env.flush_all()
+        elapsed = time.perf_counter() - start
+        queries = env.cr.sql_log_count - start_queries
+        sp.rollback()
+    env.invalidate_all()
+    rate = rows / elapsed if elapsed else 0
+    print(f"{label:<40} {elapsed:8.2f}s {queries:8d} queries {rate:12.0f} rows/s")
+    return elapsed
+
+
+def main():
+    db = os.environ.get('ODOO_DB', 'robust_pmis')
+    count = int(os.environ.get('BENCH_INDICATORS', '5000'))
+    fy_count = int(os.environ.get('BENCH_FYS', '5'))
+    odoo.tools.config.parse_config(['-d', db])
+    registry = odoo.registry(db)
+    with registry.cursor() as cr:
+        env = api.Environment(cr, SUPERUSER_ID, {})
+        with env.cr.savepoint() as sp:
+            indicators = _seed(env, count)
+            env.flush_all()
+            Ingest = env['performance.value.ingest']
+            start_year = int(Ingest._current_fy_key()[:4]) - 1
+            fys = [f"{y}/{str((y + 1) % 100).zfill(2)}" for y in range(start_year, start_year + fy_count)]
+            rows = [
+                {'indicator': rec.id, 'fy': fy, 'target': float(100 + i % 50), 'actual': float(i % 120)}
+                for rec in indicators for i, fy in enumerate(fys)
+            ]
+            csv_payload = "indicator,fy,target,actual\n" + ''.join(
+                f"{r['indicator']},{r['fy']},{r['target']},{r['actual']}\n" for r in rows)
+            print(f"Loading {len(rows)} rows ({count} indicators x {len(fys)} FYs)")
+
+            def per_record():
+                # Historical path: one ORM write (constraints, tracking) per row
+                for row in rows:
+                    key = Ingest._normalize_fy(row['fy'])
+                    indicators.browse(row['indicator']).write({
+                        f'target_fy{key}': row['target'],
+                        f'actual_fy{key}': row['actual'],
+                    })
+
+            baseline = _measure(env, 'per-record ORM writes', len(rows), per_record)
+            for label, func in [
+                ('ingest (rows)', lambda: Ingest.ingest(rows)),
+                ('ingest (CSV payload)', lambda: Ingest.ingest_payload(csv_payload, 'csv')),
+                ('ingest + current FY values', lambda: Ingest.with_context(
+                    pmis_indicator_chatter='deferred').ingest(rows, update_current=True)),
+            ]:
+                elapsed = _measure(env, label, len(rows), func)
+                print(f"{'':<40} speedup vs per-record: {baseline / elapsed if elapsed else 0:.1f}x")
+            sp.rollback()
+
+
+if __name__ == '__main__':
+    main()
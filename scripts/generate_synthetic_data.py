@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# Synthetic PMIS dataset at a configurable multiple of KCCA's size: strategic
+# goals down to KPIs, directorates/divisions, the programme results chain down
+# to indicators, implementing relations, and years of score and audit history.
+#
+#   ODOO_DB=pmis_bench SYN_SCALE=10 SYN_YEARS=3 SYN_COMMIT=1 python3 scripts/generate_synthetic_data.py
+#
+# Without SYN_COMMIT=1 the data is generated, counted and rolled back.
+# scripts/benchmark_suite.py imports generate() to seed its own savepoint.
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+sys.path.append('/home/richards/Dev/odoo18')
+
+import odoo
+from odoo import api, SUPERUSER_ID
+from odoo.tools import split_every
+
+# Scale 1 approximates the KCCA deployment; top-level counts are multiplied by
+# the scale, fan-outs below them stay constant.
+BASE_SIZE = {
+    'goals': 5,
+    'directorates': 10,
+    'programmes': 16,
+}
+FAN_OUT = {
+    'objectives_per_goal': 3,
+    'kras_per_objective': 3,
+    'kpis_per_kra': 4,
+    'divisions_per_directorate': 3,
+    'programme_objectives': 2,
+    'outcomes_per_objective': 2,
+    'interventions_per_outcome': 2,
+    'outputs_per_intervention': 2,
+    'piaps_per_output': 2,
+    'indicators_per_programme': 2,
+    'indicators_per_outcome': 2,
+    'indicators_per_output': 1,
+    'audit_entries_per_indicator_month': 2,
+}
+KPI_TYPES = ['increasing'] * 6 + ['decreasing'] * 2 + ['target'] * 2
+CHUNK = 5000
+
+
+def _create(env, model, vals_list):
+    """ORM create in chunks, without mail tracking/followers."""
+    Model = env[model].with_context(tracking_disable=True, mail_create_nolog=True, mail_notrack=True)
+    records = Model.browse()
+    for chunk in split_every(CHUNK, vals_list):
+        records |= Model.create(list(chunk))
+    return records.with_env(env)
+
+
+def _value_spec(rng):
+    kind = rng.choice(KPI_TYPES)
+    target = float(rng.choice([10, 50, 100, 250, 1000]))
+    if kind == 'decreasing':
+        baseline = target * rng.uniform(1.5, 4.0)
+        current = rng.uniform(target * 0.5, baseline)
+    else:
+        baseline = target * rng.uniform(0.0, 0.3)
+        current = target * rng.uniform(0.0, 1.3)
+    return kind, round(target, 2), round(current, 2), round(baseline, 2)
+
+
+def _fy_dates(today, years):
+    fy_start = today.year if today.month >= 7 else today.year - 1
+    return date(fy_start - years + 1, 7, 1), date(fy_start + 1, 6, 30)
+
+
+def _quarter_ends(start, end):
+    ends = []
+    year, month = start.year, start.month
+    while True:
+        month += 3
+        if month > 12:
+            year, month = year + 1, month - 12
+        quarter_end = date(year, month, 1) - timedelta(days=1)
+        if quarter_end > end:
+            return ends
+        ends.append(quarter_end)
+
+
+def generate(env, scale=1.0, history_years=3, seed=42, tag='SYN'):
+    """Create the synthetic dataset in ``env``'s transaction and return row counts per model."""
+    rng = random.Random(seed)
+    today = date.today()
+    start_date, end_date = _fy_dates(today, history_years)
+    dates = {'start_date': start_date, 'end_date': end_date}
+    size = {key: max(1, int(round(count * scale))) for key, count in BASE_SIZE.items()}
+
+    # Organisation
+    directorates = _create(env, 'kcca.directorate', [
+        {'name': f'{tag} Directorate {d}'} for d in range(size['directorates'])])
+    divisions = _create(env, 'kcca.division', [
+        {'name': f'{tag} Division {d}.{v}', 'directorate_id': directorate.id}
+        for d, directorate in enumerate(directorates)
+        for v in range(FAN_OUT['divisions_per_directorate'])])
+
+    # Strategic plan: goals > objectives > KRAs > KPIs
+    goals = _create(env, 'strategic.goal', [{'name': f'{tag} Goal {g}'} for g in range(size['goals'])])
+    objectives = _create(env, 'strategic.objective', [
+        {'name': f'{tag} Objective {g}.{o}', 'strategic_goal_id': goal.id}
+        for g, goal in enumerate(goals) for o in range(FAN_OUT['objectives_per_goal'])])
+    kras = _create(env, 'key.result.area', [
+        {'name': f'{tag} KRA {objective.id}.{k}', 'strategic_objective_id': objective.id}
+        for objective in objectives for k in range(FAN_OUT['kras_per_objective'])])
+    kpi_vals = []
+    for kra in kras:
+        for k in range(FAN_OUT['kpis_per_kra']):
+            kind, target, current, baseline = _value_spec(rng)
+            division = rng.choice(divisions)
+            kpi_vals.append({
+                'name': f'{tag} KPI {kra.id}.{k}', 'kra_id': kra.id, 'kpi_type': kind,
+                'target_value': target, 'current_value': current, 'baseline_value': baseline,
+                'directorate_id': division.directorate_id.id, 'division_id': division.id, **dates,
+            })
+    kpis = _create(env, 'key.performance.indicator', kpi_vals)
+
+    # Programme results chain
+    programmes = _create(env, 'kcca.programme', [
+        {'name': f'{tag} Programme {p}', 'directorate_id': rng.choice(directorates).id}
+        for p in range(size['programmes'])])
+    prog_objectives = _create(env, 'programme.objective', [
+        {'name': f'{tag} Programme Objective {programme.id}.{o}', 'programme_id': programme.id}
+        for programme in programmes for o in range(FAN_OUT['programme_objectives'])])
+    outcomes = _create(env, 'intermediate.outcome', [
+        {'name': f'{tag} Outcome {objective.id}.{o}', 'objective_id': objective.id}
+        for objective in prog_objectives for o in range(FAN_OUT['outcomes_per_objective'])])
+    interventions = _create(env, 'intervention', [
+        {'name': f'{tag} Intervention {outcome.id}.{i}', 'outcome_id': outcome.id}
+        for outcome in outcomes for i in range(FAN_OUT['interventions_per_outcome'])])
+    outputs = _create(env, 'output', [
+        {'name': f'{tag} Output {intervention.id}.{o}', 'intervention_id': intervention.id}
+        for intervention in interventions for o in range(FAN_OUT['outputs_per_intervention'])])
+    piaps = _create(env, 'piap.action', [
+        {'name': f'{tag} PIAP {output.id}.{a}', 'output_id': output.id}
+        for output in outputs for a in range(FAN_OUT['piaps_per_output'])])
+
+    # Indicators hang off programmes directly, off outcomes, and off outputs (with their outcome)
+    anchors = [({'programme_id': programme.id}, FAN_OUT['indicators_per_programme']) for programme in programmes]
+    anchors += [({'outcome_id': outcome.id}, FAN_OUT['indicators_per_outcome']) for outcome in outcomes]
+    anchors += [({'outcome_id': output.intervention_id.outcome_id.id, 'output_id': output.id},
+                 FAN_OUT['indicators_per_output']) for output in outputs]
+    indicator_vals = []
+    for links, count in anchors:
+        for _i in range(count):
+            kind, target, current, baseline = _value_spec(rng)
+            division = rng.choice(divisions)
+            vals = {
+                'name': f'{tag} Indicator {len(indicator_vals)}', 'indicator_type': kind,
+                'target_value': target, 'current_value': current, 'baseline_value': baseline,
+                'responsible_directorate_id': division.directorate_id.id,
+                'responsible_division_id': division.id, **links, **dates,
+            }
+            # Per-FY targets and actuals over the history window
+            for y in range(start_date.year, end_date.year):
+                key = f"{y}_{str((y + 1) % 100).zfill(2)}"
+                if f'target_fy{key}' in env['performance.indicator']._fields:
+                    vals[f'target_fy{key}'] = target
+                    vals[f'actual_fy{key}'] = round(current * rng.uniform(0.6, 1.1), 2)
+            indicator_vals.append(vals)
+    indicators = _create(env, 'performance.indicator', indicator_vals)
+
+    # Every division implements every programme (is_direct is derived on create)
+    relations = _create(env, 'division.programme.rel', [
+        {'division_id': division.id, 'programme_id': programme.id}
+        for division in divisions for programme in programmes])
+
+    # History: quarterly scores per indicator and monthly audit entries
+    Partition = env['performance.history.partition']
+    Partition._ensure_partitions('performance.score', start_date, today)
+    Partition._ensure_partitions('audit.log', start_date, today)
+    quarter_ends = [d for d in _quarter_ends(start_date, end_date) if d <= today]
+    score_vals = []
+    for indicator in indicators:
+        level = rng.uniform(0.2, 0.6)
+        for quarter_end in quarter_ends:
+            level = min(1.3, max(0.0, level + rng.uniform(-0.1, 0.15)))
+            value = round(indicator.target_value * level, 2)
+            score_vals.append({
+                'indicator_id': indicator.id, 'date': quarter_end, 'value': value,
+                'target_value': indicator.target_value,
+                'achievement_percentage': min(100.0, level * 100),
+                'period': f'q{(quarter_end.month - 7) % 12 // 3 + 1}', 'notes': f'{tag} history',
+            })
+    _create(env, 'performance.score', score_vals)
+
+    AuditLog = env['audit.log']
+    request_info = (None, None, None)
+    audit_rows = []
+    month = date(start_date.year, start_date.month, 1)
+    while month <= today:
+        for indicator in indicators:
+            for _e in range(FAN_OUT['audit_entries_per_indicator_month']):
+                row = AuditLog._prepare_log_vals(
+                    'performance.indicator', indicator.id, 'update', f'{tag} value update',
+                    field_name='current_value', old_value=0.0, new_value=indicator.current_value,
+                    record_name=indicator.name, request_info=request_info)
+                row['timestamp'] = datetime(month.year, month.month, rng.randint(1, 28), rng.randint(7, 18))
+                audit_rows.append(row)
+        if len(audit_rows) >= 50000:
+            AuditLog._insert_rows(audit_rows)
+            audit_rows = []
+        month = date(month.year + (month.month == 12), month.month % 12 + 1, 1)
+    if audit_rows:
+        AuditLog._insert_rows(audit_rows)
+    env.flush_all()
+
+    counts = {
+        'kcca.directorate': len(directorates), 'kcca.division': len(divisions),
+        'strategic.goal': len(goals), 'strategic.objective': len(objectives),
+        'key.result.area': len(kras), 'key.performance.indicator': len(kpis),
+        'kcca.programme': len(programmes), 'programme.objective': len(prog_objectives),
+        'intermediate.outcome': len(outcomes), 'intervention': len(interventions),
+        'output': len(outputs), 'piap.action': len(piaps),
+        'performance.indicator': len(indicators), 'division.programme.rel': len(relations),
+        'performance.score': len(score_vals),
+    }
+    env.cr.execute("SELECT COUNT(*) FROM audit_log WHERE action_description = %s", [f'{tag} value update'])
+    counts['audit.log'] = env.cr.fetchone()[0]
+    return counts
+
+
+def main():
+    db = os.environ.get('ODOO_DB', 'robust_pmis')
+    scale = float(os.environ.get('SYN_SCALE', '1'))
+    years = int(os.environ.get('SYN_YEARS', '3'))
+    seed = int(os.environ.get('SYN_SEED', '42'))
+    commit = os.environ.get('SYN_COMMIT') == '1'
+    odoo.tools.config.parse_config(['-d', db])
+    registry = odoo.registry(db)
+    with registry.cursor() as cr:
+        env = api.Environment(cr, SUPERUSER_ID, {})
+        start = time.perf_counter()
+        counts = generate(env, scale=scale, history_years=years, seed=seed)
+        elapsed = time.perf_counter() - start
+        for model, count in counts.items():
+            print(f"{model:<32} {count:>10}")
+        print(f"Generated scale {scale:g}x, {years} year(s) of history in {elapsed:.1f}s")
+        if commit:
+            cr.commit()
+            print("Committed")
+        else:
+            cr.rollback()
+            print("Rolled back (set SYN_COMMIT=1 to keep the data)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
-# Recompute and clamp PMIS performance fields
+# Recompute and clamp PMIS performance fields (KPI/indicator achievement and
+# status are rewritten with one set-based UPDATE per model)
+import os
 import sys
 sys.path.append('/home/richards/Dev/odoo18')
 
@@ -7,7 +9,7 @@ import odoo
 from odoo import api, SUPERUSER_ID
 
 def main():
-    db = 'robust_pmis'
+    db = os.environ.get('ODOO_DB', 'robust_pmis')
     odoo.tools.config.parse_config(['-d', db])
     registry = odoo.registry(db)
     with registry.cursor() as cr:
@@ -1,21 +1,75 @@
 /** @odoo-module **/
 
+import { registry } from "@web/core/registry";
+
+const LIVE_CHANNEL = 'robust_pmis.dashboard';
+const LIVE_NOTIFICATION = 'robust_pmis/dashboard_changed';
+
+// Live dashboard updates pushed by the server (performance.dashboard.live).
+// The bus channel is only joined while at least one dashboard listens.
+registry.category("services").add("pmis_dashboard_live", {
+    dependencies: ["bus_service"],
+    start(env, { bus_service }) {
+        const listeners = new Set();
+        bus_service.subscribe(LIVE_NOTIFICATION, (payload) => {
+            listeners.forEach((listener) => listener(payload));
+        });
+        const live = {
+            listen(listener) {
+                if (!listeners.size) {
+                    bus_service.addChannel(LIVE_CHANNEL);
+                }
+                listeners.add(listener);
+            },
+            unlisten(listener) {
+                listeners.delete(listener);
+                if (!listeners.size) {
+                    bus_service.deleteChannel(LIVE_CHANNEL);
+                }
+            },
+        };
+        // Also reachable from the legacy dashboard scripts
+        window.pmisDashboardLive = live;
+        return live;
+    },
+});
+
 // Dashboard Real-time Data Loader for Odoo 18
 class DashboardDataLoader {
     constructor() {
         this.refreshInterval = null;
         this.isLoading = false;
+        // Version token of the last summary received; the server answers
+        // "not modified" while it still matches
+        this.version = null;
+        this.data = {};
+        // A push arrived while a load was running
+        this.refreshQueued = false;
+        this.onLiveUpdate = this.applyLiveUpdate.bind(this);
+    }
+
+    applyLiveUpdate(payload) {
+        // The push only names what changed; refetch through this session so
+        // the figures respect the user's own access rights
+        const metrics = (payload && payload.metrics) || [];
+        if (!metrics.length) return;
+        if (this.isLoading) {
+            this.refreshQueued = true;
+            return;
+        }
+        this.loadSummaryData(true);
     }
 
-    async loadSummaryData() {
+    async loadSummaryData(force = false) {
         if (this.isLoading) return;
         this.isLoading = true;
         
         try {
+            const params = (!force && this.version) ? { version: this.version } : {};
             // Try using Odoo's RPC if available
             let data;
             if (window.odoo && window.odoo.http) {
-                const response = await window.odoo.http.post('/performance/dashboard/summary', {});
+                const response = await window.odoo.http.post('/performance/dashboard/summary', params);
                 data = response.result || response;
             } else {
                 // Fallback to fetch API
@@ -28,7 +82,7 @@ class DashboardDataLoader {
                     body: JSON.stringify({
                         jsonrpc: '2.0',
                         method: 'call',
-                        params: {}
+                        params: params
                     })
                 });
                 
@@ -36,13 +90,22 @@ class DashboardDataLoader {
                 data = result.result;
             }
             
+            if (data && data.not_modified) {
+                return;
+            }
             if (data) {
+                this.version = data.version || null;
+                this.data = data;
                 this.updateDashboardUI(data);
             }
         } catch (error) {
             console.error('Error loading dashboard data:', error);
         } finally {
             this.isLoading = false;
+            if (this.refreshQueued) {
+                this.refreshQueued = false;
+                this.loadSummaryData(true);
+            }
         }
     }
 
@@ -214,6 +277,18 @@ class DashboardDataLoader {
             console.log('Auto-refresh stopped');
         }
     }
+
+    startLiveUpdates() {
+        if (!window.pmisDashboardLive) return false;
+        window.pmisDashboardLive.listen(this.onLiveUpdate);
+        return true;
+    }
+
+    stopLiveUpdates() {
+        if (window.pmisDashboardLive) {
+            window.pmisDashboardLive.unlisten(this.onLiveUpdate);
+        }
+    }
 }
 
 // Initialize dashboard when DOM is ready
@@ -228,8 +303,9 @@ function initializeDashboard() {
         // Load initial data immediately
         loader.loadSummaryData();
         
-        // Start auto-refresh every 30 seconds
-        loader.startAutoRefresh(30000);
+        // Changes are pushed over the bus; polling is only a slow safety net
+        // then, and the 30 second poll remains for clients without the bus
+        loader.startAutoRefresh(loader.startLiveUpdates() ? 300000 : 30000);
         
         // Add manual refresh button if it exists
         const refreshButton = document.querySelector('.dashboard-refresh-btn, .btn-refresh');
@@ -237,13 +313,14 @@ function initializeDashboard() {
             refreshButton.addEventListener('click', (e) => {
                 e.preventDefault();
                 console.log('Manual refresh triggered');
-                loader.loadSummaryData();
+                loader.loadSummaryData(true);
             });
         }
         
         // Stop auto-refresh when leaving the page
         window.addEventListener('beforeunload', () => {
             loader.stopAutoRefresh();
+            loader.stopLiveUpdates();
         });
         
         // Make loader globally available for debugging
@@ -18,6 +18,52 @@ odoo.define('robust_pmis.interactive_dashboard', function(require) {
             this._setupEventListeners();
             this._initCharts();
             this._loadDashboardData();
+            this._startLiveUpdates();
+        },
+        
+        destroy: function() {
+            if (this._onLiveUpdate && window.pmisDashboardLive) {
+                window.pmisDashboardLive.unlisten(this._onLiveUpdate);
+                this._onLiveUpdate = null;
+            }
+            this._super.apply(this, arguments);
+        },
+        
+        _startLiveUpdates: function() {
+            // Server pushes the names of the metrics and chart sections that changed
+            if (!window.pmisDashboardLive || this._onLiveUpdate) {
+                return;
+            }
+            this._onLiveUpdate = this._applyLiveUpdate.bind(this);
+            window.pmisDashboardLive.listen(this._onLiveUpdate);
+        },
+        
+        _applyLiveUpdate: function(payload) {
+            // Refetch only the changed parts, through this user's own session
+            var self = this;
+            var metrics = (payload && payload.metrics) || [];
+            var sections = ((payload && payload.sections) || []).slice();
+            if (metrics.length) {
+                sections.push('realtime');
+            }
+            if (!sections.length) {
+                return;
+            }
+            return rpc.query({
+                model: 'performance.dashboard',
+                method: 'get_dashboard_sections',
+                args: [self.state.res_id, sections],
+            }).then(function(data) {
+                if (data.realtime) {
+                    self._metrics = Object.assign(self._metrics || {}, data.realtime);
+                    self._updateMetricsDisplay(self._metrics, metrics);
+                }
+                // Charts missing from the response are left untouched
+                self._updateChartsWithData(data);
+                if (data.top_kpis) {
+                    self._updateTopPerformersList(data.top_kpis);
+                }
+            });
         },
         
         _setupEventListeners: function() {
@@ -55,28 +101,22 @@ odoo.define('robust_pmis.interactive_dashboard', function(require) {
         _loadDashboardData: function() {
             var self = this;
             
-            // Get real-time metrics first
+            // Metrics and the rendered charts in one request; the server computes
+            // shared intermediates once and skips the contribution sections
             return rpc.query({
                 model: 'performance.dashboard',
-                method: 'get_realtime_metrics',
-                args: [self.state.res_id],
-            }).then(function(metrics) {
-                self._updateMetricsDisplay(metrics);
-                
-                // Then get chart data
-                return rpc.query({
-                    model: 'performance.dashboard', 
-                    method: 'get_dashboard_data',
-                    args: [self.state.res_id],
-                });
-            }).then(function(chartData) {
-                self._updateChartsWithData(chartData);
-                self._updateTopPerformersList(chartData.top_kpis);
+                method: 'get_dashboard_sections',
+                args: [self.state.res_id, ['realtime', 'goals_performance', 'kras_performance', 'distribution', 'top_kpis']],
+            }).then(function(sections) {
+                self._metrics = sections.realtime;
+                self._updateMetricsDisplay(sections.realtime);
+                self._updateChartsWithData(sections);
+                self._updateTopPerformersList(sections.top_kpis);
             });
         },
         
-        _updateMetricsDisplay: function(metrics) {
-            // Update metric cards with real-time data
+        _updateMetricsDisplay: function(metrics, onlyFields) {
+            // Update metric cards with real-time data (only ``onlyFields`` when given)
             var self = this;
             var metricFields = {
                 'total_strategic_goals': metrics.total_strategic_goals,
@@ -91,6 +131,9 @@ odoo.define('robust_pmis.interactive_dashboard', function(require) {
             };
             
             Object.keys(metricFields).forEach(function(fieldName) {
+                if (onlyFields && onlyFields.indexOf(fieldName) === -1) {
+                    return;
+                }
                 var field = self.el.querySelector('.o_field_widget[name="' + fieldName + '"]');
                 if (field) {
                     if (fieldName.includes('avg_') && field.classList.contains('o_field_progressbar')) {
@@ -1,9 +1,25 @@
 /** @odoo-module **/
 
-import { Component } from "@odoo/owl";
+import { Component, onWillStart, useState } from "@odoo/owl";
 import { registry } from "@web/core/registry";
+import { useService } from "@web/core/utils/hooks";
 
-class KpiLinkageDashboard extends Component {}
+class KpiLinkageDashboard extends Component {
+    setup() {
+        this.orm = useService("orm");
+        this.state = useState({
+            strategic_count: 0,
+            programme_count: 0,
+            thematic_area_count: 0,
+            linkage_coverage: 0,
+        });
+        onWillStart(async () => {
+            // Summary counts come from the unified KPI fact table in one grouped query
+            const summary = await this.orm.call("kpi.unified", "get_linkage_summary", []);
+            Object.assign(this.state, summary);
+        });
+    }
+}
 
 KpiLinkageDashboard.template = "robust_pmis.kpi_linkage_dashboard_client";
 
@@ -23,36 +23,31 @@ class UnifiedKPIDashboard extends Component {
 
     async loadKPIData() {
         try {
-            // Load strategic KPIs
-            const strategicKPIs = await this.orm.searchRead(
-                "key.performance.indicator",
-                [["active", "=", true]],
-                ["name", "achievement_percentage", "status", "kra_id", "directorate_id", "classification_level", "parent_type"]
-            );
+            // Everything comes from the unified KPI fact table: one grouped
+            // query for the cards and two indexed reads for the tables
+            const fields = ["name", "achievement_percentage", "status", "kra_id", "programme_id"];
+            const [groups, strategicKPIs, programmeKPIs] = await Promise.all([
+                this.orm.readGroup("kpi.unified", [], ["achievement_percentage:sum"], ["kind"], { lazy: false }),
+                this.orm.searchRead("kpi.unified", [["kind", "=", "strategic"]], fields,
+                    { order: "source_id desc", limit: 5 }),
+                this.orm.searchRead("kpi.unified", [["kind", "=", "programme"]], fields,
+                    { order: "source_id desc", limit: 5 }),
+            ]);
 
-            // Load programme KPIs
-            const programmeKPIs = await this.orm.searchRead(
-                "performance.indicator",
-                [["active", "=", true]],
-                ["name", "achievement_percentage", "status", "parent_programme_id", "outcome_id", "results_chain_level"]
-            );
-
-            // Calculate statistics
-            const allPerformances = [
-                ...strategicKPIs.map(kpi => kpi.achievement_percentage || 0),
-                ...programmeKPIs.map(kpi => kpi.achievement_percentage || 0)
-            ];
-
-            const avgPerformance = allPerformances.length > 0 
-                ? allPerformances.reduce((sum, perf) => sum + perf, 0) / allPerformances.length 
-                : 0;
+            const counts = { strategic: 0, programme: 0 };
+            let achievementSum = 0;
+            for (const group of groups) {
+                counts[group.kind] = group.__count;
+                achievementSum += group.achievement_percentage || 0;
+            }
+            const totalCount = counts.strategic + counts.programme;
 
             this.state.strategicKPIs = strategicKPIs;
             this.state.programmeKPIs = programmeKPIs;
-            this.state.strategicCount = strategicKPIs.length;
-            this.state.programmeCount = programmeKPIs.length;
-            this.state.totalCount = strategicKPIs.length + programmeKPIs.length;
-            this.state.avgPerformance = avgPerformance;
+            this.state.strategicCount = counts.strategic;
+            this.state.programmeCount = counts.programme;
+            this.state.totalCount = totalCount;
+            this.state.avgPerformance = totalCount > 0 ? achievementSum / totalCount : 0;
             this.state.loading = false;
         } catch (error) {
             console.error("Error loading KPI data:", error);
@@ -83,11 +78,7 @@ class UnifiedKPIDashboard extends Component {
     }
 
     async openAllKPIs() {
-        // Reload the unified KPI dashboard (acts as the "all" hub)
-        await this.action.doAction({
-            type: 'ir.actions.client',
-            tag: 'unified_kpi_dashboard',
-        });
+        await this.action.doAction("robust_pmis.action_kpi_unified");
     }
 
     getStatusColor(status) {
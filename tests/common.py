@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Shared fixtures of the smoke tests.
+
+Tests seed their records inside ``rolled_back``: everything they create is
+rolled back and the ORM caches are dropped afterwards, so the database is
+left as it was found. Seeded names start with a per-module tag to keep
+records of different tests apart.
+"""
+from contextlib import contextmanager
+from datetime import date
+
+# Dates of a record running over fiscal year 2024/25
+FY_2024 = {'start_date': date(2024, 7, 1), 'end_date': date(2025, 6, 30)}
+
+
+@contextmanager
+def rolled_back(env):
+    """Run the block inside a savepoint that is always rolled back."""
+    try:
+        with env.cr.savepoint() as sp:
+            yield
+            sp.rollback()
+    finally:
+        env.invalidate_all()
+
+
+def seed_strategy(env, tag):
+    """Create a goal, an objective and a KRA; return (goal, objective, kra)."""
+    goal = env['strategic.goal'].create({'name': f'{tag} Goal'})
+    objective = env['strategic.objective'].create({'name': f'{tag} Objective', 'strategic_goal_id': goal.id})
+    kra = env['key.result.area'].create({'name': f'{tag} KRA', 'strategic_objective_id': objective.id})
+    return goal, objective, kra
+
+
+def seed_kpis(env, kra, tag, count=1, **vals):
+    """Create ``count`` increasing KPIs under ``kra`` (target 100, FY 2024/25), ``vals`` overriding."""
+    return env['key.performance.indicator'].create([{
+        'name': f'{tag} KPI' if count == 1 else f'{tag} KPI {i}',
+        'kra_id': kra.id,
+        'kpi_type': 'increasing',
+        'target_value': 100.0,
+        **FY_2024,
+        **vals,
+    } for i in range(count)])
+
+
+def seed_programme(env, tag):
+    """Create a programme in a directorate of its own."""
+    directorate = env['kcca.directorate'].create({'name': f'{tag} Directorate'})
+    return env['kcca.programme'].create({'name': f'{tag} Programme', 'directorate_id': directorate.id})
+
+
+def seed_indicators(env, tag, count=1, programme=None, **vals):
+    """Create ``count`` indicators (target 100, current 10) under ``programme`` or a new one."""
+    programme = programme or seed_programme(env, tag)
+    return env['performance.indicator'].create([{
+        'name': f'{tag} Indicator' if count == 1 else f'{tag} Indicator {i}',
+        'programme_id': programme.id,
+        'target_value': 100.0,
+        'current_value': 10.0,
+        **vals,
+    } for i in range(count)])
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the set-based achievement/status recompute.
+"""
+from robust_pmis.tests.common import FY_2024, rolled_back, seed_strategy
+
+# (type, target, current, baseline) covering every branch and clamp
+_SPECS = [
+    ('increasing', 100.0, 45.0, 0.0),
+    ('increasing', 100.0, 130.0, 0.0),
+    ('increasing', 100.0, -20.0, 0.0),
+    ('increasing', 0.0, 10.0, 0.0),
+    ('increasing', -5.0, 10.0, 0.0),
+    ('decreasing', 10.0, 8.0, 50.0),
+    ('decreasing', 10.0, 30.0, 50.0),
+    ('decreasing', 10.0, 80.0, 50.0),
+    ('decreasing', 10.0, 30.0, 0.0),
+    ('target', 50.0, 40.0, 0.0),
+    ('target', 50.0, 150.0, 0.0),
+    ('target', 50.0, 0.0, 0.0),
+]
+
+
+def _seed(env):
+    _goal, _objective, kra = seed_strategy(env, 'ACH')
+    programme = env['kcca.programme'].create({'name': 'ACH Programme'})
+    kpis = env['key.performance.indicator'].create([{
+        'name': f'ACH KPI {i}', 'kra_id': kra.id, 'kpi_type': kpi_type,
+        'target_value': target, 'current_value': current, 'baseline_value': baseline, **FY_2024,
+    } for i, (kpi_type, target, current, baseline) in enumerate(_SPECS)])
+    indicators = env['performance.indicator'].create([{
+        'name': f'ACH Indicator {i}', 'programme_id': programme.id, 'indicator_type': ind_type,
+        'target_value': target, 'current_value': current, 'baseline_value': baseline, **FY_2024,
+    } for i, (ind_type, target, current, baseline) in enumerate(_SPECS)])
+    return kpis, indicators
+
+
+def test_batched_recompute_matches_orm(env):
+    with rolled_back(env):
+        Achievement = env['performance.achievement']
+        for records in _seed(env):
+            fnames = ['achievement_percentage'] + list(Achievement._ACHIEVEMENT_MODELS[records._name]['columns'])
+            env.flush_all()
+            expected = records.read(fnames)
+            # Stale stored values, as left behind by older code
+            env.cr.execute(f"UPDATE {records._table} SET achievement_percentage = -1, status = 'achieved' "
+                           f"WHERE id = ANY(%s)", [records.ids])
+            records.invalidate_recordset(fnames)
+
+            assert Achievement.recompute(records._name, records.ids) == len(records)
+            assert records.read(fnames) == expected
+            # Nothing left to rewrite
+            assert Achievement.recompute(records._name, records.ids) == 0
+
+
+def run(env):
+    test_batched_recompute_matches_orm(env)
+    return True
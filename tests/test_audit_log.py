@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the buffered audit log writer.
+"""
+from robust_pmis.tests.common import rolled_back
+
+
+def _count_rows(env, record):
+    env.cr.execute("SELECT COUNT(*) FROM audit_log WHERE model_name = %s AND record_id = %s",
+                   [record._name, record.id])
+    return env.cr.fetchone()[0]
+
+
+def test_entries_are_buffered_until_commit(env):
+    with rolled_back(env):
+        AuditLog = env['audit.log']
+        programme = env['kcca.programme'].create({'name': 'AUDIT Programme'})
+        for value in range(3):
+            AuditLog.log_field_change(programme, 'name', f'old {value}', f'new {value}')
+        AuditLog.log_action('kcca.programme', programme.id, 'other', 'AUDIT action')
+        assert _count_rows(env, programme) == 0
+
+        # Searches of the same transaction flush the buffer first
+        logs = AuditLog.search([('model_name', '=', 'kcca.programme'), ('record_id', '=', programme.id)])
+        assert len(logs) == 4
+        assert set(logs.mapped('model_display_name')) == {programme._description}
+        assert set(logs.mapped('user_id').ids) == {env.uid}
+
+        # Entries queued inside a rolled back savepoint are dropped with it
+        with env.cr.savepoint() as inner:
+            AuditLog.log_action('kcca.programme', programme.id, 'other', 'AUDIT dropped')
+            inner.rollback()
+        env.cr.flush()
+        assert _count_rows(env, programme) == 4
+
+
+def run(env):
+    test_entries_are_buffered_until_commit(env)
+    return True
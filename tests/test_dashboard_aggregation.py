@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Regression tests for the set-based dashboard aggregation engine.
+"""
+from robust_pmis.tests.common import FY_2024, rolled_back, seed_strategy
+
+
+def _seed(env, tag='AGG'):
+    """Create a small but representative hierarchy and return the records."""
+    goal, objective, kra_a = seed_strategy(env, tag)
+    kra_b = env['key.result.area'].create({'name': f'{tag} KRA B', 'strategic_objective_id': objective.id})
+    env['key.result.area'].create({'name': f'{tag} KRA Empty', 'strategic_goal_id': goal.id})
+
+    directorate = env['kcca.directorate'].create({'name': f'{tag} Directorate'})
+    division = env['kcca.division'].create({'name': f'{tag} Division', 'directorate_id': directorate.id})
+    prog_dir = env['kcca.programme'].create({'name': f'{tag} Programme D', 'directorate_id': directorate.id})
+    prog_div = env['kcca.programme'].create({'name': f'{tag} Programme V', 'division_id': division.id})
+    prog_impl = env['kcca.programme'].create({'name': f'{tag} Programme I', 'directorate_id': directorate.id})
+    env['division.programme.rel'].create([
+        {'division_id': division.id, 'programme_id': prog_impl.id, 'is_direct': False},
+        {'division_id': division.id, 'programme_id': prog_div.id, 'is_direct': True},
+    ])
+
+    kpi_specs = [
+        (kra_a, 'increasing', 100.0, 95.0, 0.0),
+        (kra_a, 'increasing', 100.0, 120.0, 0.0),
+        (kra_a, 'decreasing', 10.0, 30.0, 50.0),
+        (kra_b, 'target', 50.0, 40.0, 0.0),
+        (kra_b, 'increasing', 0.0, 10.0, 0.0),
+    ]
+    env['key.performance.indicator'].create([{
+        'name': f'{tag} KPI {i}',
+        'kra_id': kra.id,
+        'kpi_type': kpi_type,
+        'target_value': target,
+        'current_value': current,
+        'baseline_value': baseline,
+        'directorate_id': directorate.id,
+        **FY_2024,
+    } for i, (kra, kpi_type, target, current, baseline) in enumerate(kpi_specs)])
+
+    ind_specs = [
+        (prog_dir, 100.0, 45.0),
+        (prog_div, 100.0, 75.0),
+        (prog_impl, 200.0, 200.0),
+        (prog_impl, 80.0, 60.0),
+    ]
+    env['performance.indicator'].create([{
+        'name': f'{tag} Indicator {i}',
+        'programme_id': prog.id,
+        'target_value': target,
+        'current_value': current,
+        **FY_2024,
+    } for i, (prog, target, current) in enumerate(ind_specs)])
+    env.flush_all()
+    return goal
+
+
+def _assert_same(expected, actual, path='payload'):
+    if isinstance(expected, dict):
+        assert isinstance(actual, dict), path
+        assert set(expected) == set(actual), f'{path}: keys differ {set(expected) ^ set(actual)}'
+        for key in expected:
+            _assert_same(expected[key], actual[key], f'{path}.{key}')
+    elif isinstance(expected, (list, tuple)):
+        assert len(expected) == len(actual), f'{path}: length {len(expected)} != {len(actual)}'
+        for i, (e, a) in enumerate(zip(expected, actual)):
+            _assert_same(e, a, f'{path}[{i}]')
+    elif isinstance(expected, float) or isinstance(actual, float):
+        assert abs(float(expected) - float(actual)) < 1e-6, f'{path}: {expected} != {actual}'
+    else:
+        assert expected == actual, f'{path}: {expected!r} != {actual!r}'
+
+
+def test_engine_matches_legacy_payload(env):
+    with rolled_back(env):
+        _seed(env)
+        dashboard = env['performance.dashboard'].create({})
+        legacy = dashboard._get_dashboard_data_legacy()
+        current = dashboard.get_dashboard_data()
+    _assert_same(legacy, current)
+
+
+def test_sections_match_full_payload(env):
+    with rolled_back(env):
+        _seed(env)
+        dashboard = env['performance.dashboard'].create({})
+        _assert_same(dashboard._get_realtime_metrics_legacy(), dashboard.get_realtime_metrics())
+        full = dashboard.get_dashboard_data()
+        partial = dashboard.get_dashboard_sections(['distribution', 'top_kpis', 'no_such_section'])
+        assert set(partial) == {'distribution', 'top_kpis'}
+        _assert_same({key: full[key] for key in partial}, partial)
+        combined = dashboard.get_dashboard_sections()
+        assert set(combined) == set(full) | {'realtime'}
+
+
+def test_rollups_follow_writes(env):
+    with rolled_back(env):
+        goal = _seed(env)
+        Rollup = env['performance.rollup']
+        kpis = env['key.performance.indicator'].search([('kra_id.strategic_objective_id.strategic_goal_id', '=', goal.id)])
+        kpis[:2].write({'current_value': 0.0})
+        kpis[2:3].write({'active': False})
+        row = Rollup._get_stats('kpi', 'goal', [goal.id])[goal.id]
+        remaining = kpis.filtered('active')
+        assert row['record_count'] == len(remaining)
+        assert abs(row['achievement_sum'] - sum(remaining.mapped('achievement_percentage'))) < 1e-6
+        assert row['count_none'] == len(remaining.filtered(lambda k: not k.achievement_percentage))
+        # Period rows only count records overlapping the period
+        assert Rollup._get_stats('kpi', 'goal', [goal.id], 'fy:2024')[goal.id]['record_count'] == len(remaining)
+        assert goal.id not in Rollup._get_stats('kpi', 'goal', [goal.id], 'fy:2026')
+
+        # Moving a KRA under another goal moves its KPIs' rows with it
+        kra = kpis[:1].kra_id
+        moved = remaining.filtered(lambda k: k.kra_id == kra)
+        other_goal, other_objective, _kra = seed_strategy(env, 'AGG Move')
+        kra.write({'strategic_objective_id': other_objective.id})
+        stats = Rollup._get_stats('kpi', 'goal', [goal.id, other_goal.id])
+        assert stats[goal.id]['record_count'] == len(remaining) - len(moved)
+        assert stats[other_goal.id]['record_count'] == len(moved)
+
+        # So does moving a programme objective, whose indicators change parent programme
+        programme = env['kcca.programme'].search([('name', '=', 'AGG Programme D')])
+        other_programme = env['kcca.programme'].search([('name', '=', 'AGG Programme V')])
+        objective = env['programme.objective'].create({'name': 'AGG Move Objective', 'programme_id': programme.id})
+        outcome = env['intermediate.outcome'].create({'name': 'AGG Move Outcome', 'objective_id': objective.id})
+        env['performance.indicator'].create({
+            'name': 'AGG Move Indicator', 'outcome_id': outcome.id, 'target_value': 100.0, 'current_value': 50.0,
+        })
+        before = Rollup._get_stats('indicator', 'parent_programme', [programme.id, other_programme.id])
+        objective.write({'programme_id': other_programme.id})
+        after = Rollup._get_stats('indicator', 'parent_programme', [programme.id, other_programme.id])
+        assert after[programme.id]['record_count'] == before[programme.id]['record_count'] - 1
+        assert after[other_programme.id]['record_count'] == before[other_programme.id]['record_count'] + 1
+
+
+def test_scoped_filters_use_resolved_ids(env):
+    with rolled_back(env):
+        goal = _seed(env)
+        dashboard = env['performance.dashboard'].create({})
+        division = env['kcca.division'].search([('name', '=', 'AGG Division')], limit=1)
+        data = dashboard._compute_filtered_dashboard_data({
+            'data_type': 'programme', 'scope': 'division', 'entity': division.id,
+            'performance': 'all', 'period': 'fy:2024',
+        })
+        expected = env['performance.indicator'].search_count([
+            ('parent_programme_id.division_programme_rel_ids.division_id', '=', division.id),
+        ])
+        assert data['summary']['filtered_kpis'] == expected == 3
+        # Goal scope: KRA performance only counts KPIs under that goal
+        data = dashboard._compute_filtered_dashboard_data({
+            'data_type': 'strategic', 'scope': 'strategic_goal', 'entity': goal.id,
+            'performance': 'all', 'period': '',
+        })
+        assert data['summary']['filtered_kpis'] == 5
+
+
+def run(env):
+    test_engine_matches_legacy_payload(env)
+    test_sections_match_full_payload(env)
+    test_rollups_follow_writes(env)
+    test_scoped_filters_use_resolved_ids(env)
+    return True
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the shared dashboard payload cache: a payload stored by one cursor
+is served to another without recomputation, as it would be to any other
+worker; purges drop old versions and surplus entries, and payloads that do
+not survive JSON are never shared. Cache rows are committed on a cursor of
+their own, so each test deletes the keys it wrote.
+"""
+import json
+from contextlib import contextmanager
+
+from odoo import api
+
+from robust_pmis.models.performance_dashboard_cache import _PostgresBackend
+
+
+def _fail():
+    raise AssertionError("payload recomputed instead of served from the cache")
+
+
+@contextmanager
+def _worker(env):
+    """Cache model on a fresh cursor, as another worker sees the database.
+
+    The postgres backend is forced for the duration of the block; the
+    parameter is set in a savepoint that is rolled back afterwards.
+    """
+    with env.registry.cursor() as cr:
+        worker_env = api.Environment(cr, env.uid, dict(env.context))
+        try:
+            with cr.savepoint() as sp:
+                worker_env['ir.config_parameter'].sudo().set_param('robust_pmis.dashboard_cache_backend', 'postgres')
+                yield worker_env['performance.dashboard.cache']
+                sp.rollback()
+        finally:
+            # Cached parameter values may still hold the forced backend
+            env.registry.clear_cache()
+
+
+def _drop(env, keys):
+    with env.registry.cursor() as cr:
+        cr.execute("DELETE FROM performance_payload_cache WHERE key = ANY(%s)", [keys])
+
+
+def test_postgres_backend_shares_payloads(env):
+    filters = {'data_type': 'all', 'scope': 'organization', 'entity': 'all', 'performance': 'all', 'period': 'fy:2024'}
+    payload = {'summary': {'avg_performance': 71.5, 'total_kpis': 12}, 'filters': ['fy:2024']}
+    with _worker(env) as Cache:
+        assert isinstance(Cache._get_backend(), _PostgresBackend)
+        version = Cache._get_data_version()
+        keys = [Cache._make_key('test', filters, version), Cache._make_key('tuple', filters, version)]
+        assert Cache.get_or_compute('test', filters, lambda: payload) == payload
+        assert Cache.get_or_compute('tuple', filters, lambda: {'pair': (1, 2)}) == {'pair': (1, 2)}
+    try:
+        with _worker(env) as Cache:
+            served = Cache.get_or_compute('test', dict(filters), _fail)
+            assert served == payload and served is not payload
+            # Tuples would come back as lists: such payloads are not shared
+            cr = Cache.env.cr
+            cr.execute("SELECT key, data_version FROM performance_payload_cache WHERE key = ANY(%s)", [keys])
+            assert cr.fetchall() == [(keys[0], version)]
+
+            # Entries computed before the current data version are purged
+            with cr.savepoint() as sp:
+                _PostgresBackend(Cache).purge(version + 1, 1000)
+                cr.execute("SELECT COUNT(*) FROM performance_payload_cache WHERE key = ANY(%s)", [keys])
+                assert cr.fetchone()[0] == 0
+                sp.rollback()
+    finally:
+        _drop(env, keys)
+
+
+def test_purge_trims_to_size(env):
+    with _worker(env) as Cache:
+        version = Cache._get_data_version()
+        backend = _PostgresBackend(Cache)
+        keys = []
+        for period in ('fy:2022', 'fy:2023', 'fy:2024'):
+            keys.append(Cache._make_key('test', {'period': period}, version))
+            payload = {'period': period}
+            backend.set(keys[-1], payload, json.dumps(payload), 900, 2, version)
+    try:
+        with _worker(env) as Cache:
+            cr = Cache.env.cr
+            # Writes never trim: all three rows are there until a purge
+            cr.execute("SELECT COUNT(*) FROM performance_payload_cache WHERE key = ANY(%s)", [keys])
+            assert cr.fetchone()[0] == 3
+            with cr.savepoint() as sp:
+                _PostgresBackend(Cache).purge(version, 2)
+                cr.execute("SELECT COUNT(*) FROM performance_payload_cache")
+                assert cr.fetchone()[0] <= 2
+                sp.rollback()
+    finally:
+        _drop(env, keys)
+
+
+def run(env):
+    test_postgres_backend_shares_payloads(env)
+    test_purge_trims_to_size(env)
+    return True
@@ -5,6 +5,8 @@ These are lightweight and can be run with Odoo test runner or as reference.
 """
 from odoo import api, SUPERUSER_ID
 
+from robust_pmis.tests.common import rolled_back
+
 
 def _call(env, method, args=None):
     rec = env['performance.dashboard'].search([], limit=1)
@@ -38,7 +40,38 @@ def test_filtered_averages_do_not_inflate(env):
             assert 0.0 <= v <= 100.0
 
 
+def test_filtered_cache_matches_uncached(env):
+    filters = {'data_type': 'all', 'scope': 'organization', 'entity': 'all', 'performance': 'good', 'period': ''}
+    first = _call(env, 'get_filtered_dashboard_data', [filters])
+    # Second call may be served from the cache; it must be indistinguishable
+    second = _call(env, 'get_filtered_dashboard_data', [dict(filters)])
+    fresh = _call(env, '_compute_filtered_dashboard_data', [filters])
+    assert first == second == fresh
+    # Callers may mutate the payload without poisoning the cache
+    second['summary']['avg_performance'] = -1
+    third = _call(env, 'get_filtered_dashboard_data', [filters])
+    assert third['summary']['avg_performance'] == fresh['summary']['avg_performance']
+
+
+def test_summary_version_tracks_changes(env):
+    Cache = env['performance.dashboard.cache']
+    version = Cache._get_summary_version()
+    assert version == Cache._get_summary_version()
+    with rolled_back(env):
+        goals = env['strategic.goal'].create([{'name': 'VER Goal 1'}, {'name': 'VER Goal 2'}])
+        env.flush_all()
+        created = Cache._get_summary_version()
+        assert created != version
+        # Same latest write_date, one row less
+        goals[0].unlink()
+        env.flush_all()
+        assert Cache._get_summary_version() != created
+    assert Cache._get_summary_version() == version
+
+
 def run(env):
     test_period_options(env)
     test_filtered_averages_do_not_inflate(env)
+    test_filtered_cache_matches_uncached(env)
+    test_summary_version_tracks_changes(env)
     return True
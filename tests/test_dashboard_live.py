@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the live dashboard publication: only the names of the metrics and
+sections that changed since the previous publication are broadcast, never
+their values, and a publication without changes sends nothing.
+"""
+from robust_pmis.tests.common import rolled_back
+
+
+def _bus_count(env):
+    env['bus.bus'].flush_model()
+    return env['bus.bus'].search_count([])
+
+
+def test_publish_sends_only_changes(env):
+    Live = env['performance.dashboard.live']
+    with rolled_back(env):
+        Live.publish()
+        before = _bus_count(env)
+        assert Live.publish() == {}
+        assert _bus_count(env) == before
+
+        env['strategic.goal'].create({'name': 'LIVE Goal'})
+        message = Live.publish()
+        assert 'total_goals' in message['metrics'] and 'total_kras' not in message['metrics']
+        # Clients refetch the values under their own access rights
+        assert all(isinstance(name, str) for name in message['metrics'] + message['sections'])
+        assert _bus_count(env) == before + 1
+
+
+def test_schedule_coalesces(env):
+    Live = env['performance.dashboard.live']
+    cron = env.ref('robust_pmis.cron_publish_dashboard_updates')
+    with rolled_back(env):
+        env['ir.cron.trigger'].search([('cron_id', '=', cron.id)]).unlink()
+        assert Live._schedule()
+        # A publication is pending: further changes join it
+        assert not Live._schedule()
+        assert env['ir.cron.trigger'].search_count([('cron_id', '=', cron.id)]) == 1
+
+
+def run(env):
+    test_publish_sends_only_changes(env)
+    test_schedule_coalesces(env)
+    return True
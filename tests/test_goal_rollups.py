@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the stored strategic goal rollups: counts, related entities and
+progress follow KRA, KPI, programme and relationship changes.
+"""
+from robust_pmis.tests.common import rolled_back, seed_kpis, seed_programme, seed_strategy
+
+
+def _seed(env, tag='GRU'):
+    goal, objective, kra_a = seed_strategy(env, tag)
+    # A second KRA attached to the goal directly
+    kra_b = env['key.result.area'].create({'name': f'{tag} KRA B', 'strategic_goal_id': goal.id})
+    seed_kpis(env, kra_a, f'{tag} A', current_value=80.0)
+    seed_kpis(env, kra_b, f'{tag} B', current_value=40.0)
+    programme = seed_programme(env, tag)
+    division = env['kcca.division'].create({'name': f'{tag} Division', 'directorate_id': programme.directorate_id.id})
+    objective.write({'programme_ids': [(4, programme.id)]})
+    relation = env['division.programme.rel'].create({'division_id': division.id, 'programme_id': programme.id})
+    return goal, kra_a, programme, division, relation
+
+
+def test_rollups_follow_changes(env):
+    with rolled_back(env):
+        Goal = env['strategic.goal']
+        goal, kra_a, programme, division, relation = _seed(env)
+        Goal._flush_rollups()
+        assert (goal.objective_count, goal.kra_count, goal.kpi_count) == (1, 2, 2)
+        assert round(goal.progress, 2) == 60.0
+        assert goal.programme_ids == programme and goal.programme_count == 1
+        assert goal.directorate_count == 1 and goal.division_ids == division
+
+        kra_a.kpi_ids.write({'current_value': 100.0})
+        relation.unlink()
+        Goal._flush_rollups()
+        assert round(goal.progress, 2) == 70.0
+        assert goal.division_count == 0 and not goal.division_ids
+
+        # A full recount agrees with the incremental values
+        assert Goal._refresh_rollups([goal.id]) == 0
+
+
+def run(env):
+    test_rollups_follow_changes(env)
+    return True
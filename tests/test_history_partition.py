@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for history partition periods and the retention policy.
+"""
+from datetime import date
+
+from robust_pmis.tests.common import rolled_back, seed_kpis, seed_strategy
+
+
+def test_period_bounds(env):
+    Partition = env['performance.history.partition']
+    months = Partition._period_bounds(date(2024, 12, 15), date(2025, 1, 3), 'month')
+    assert [b[0] for b in months] == ['y2024m12', 'y2025m01']
+    assert months[0][1:] == (date(2024, 12, 1), date(2025, 1, 1))
+    quarters = Partition._period_bounds(date(2024, 8, 1), date(2025, 4, 1), 'quarter')
+    assert [b[0] for b in quarters] == ['fy2024q1', 'fy2024q2', 'fy2024q3', 'fy2024q4']
+    assert quarters[2][1:] == (date(2025, 1, 1), date(2025, 4, 1))
+
+
+def test_retention_compacts_old_scores(env):
+    with rolled_back(env):
+        env['ir.config_parameter'].sudo().set_param('robust_pmis.score_retention_months', '12')
+        indicator = env['performance.indicator'].create({'name': 'RET Indicator', 'target_value': 100.0})
+        Score = env['performance.score']
+        Score.create([
+            {'indicator_id': indicator.id, 'date': date(2020, 8, 1), 'value': 20.0, 'target_value': 100.0},
+            {'indicator_id': indicator.id, 'date': date(2020, 9, 1), 'value': 40.0, 'target_value': 100.0},
+            {'indicator_id': indicator.id, 'date': date.today(), 'value': 60.0, 'target_value': 100.0},
+        ])
+        env['performance.history.partition']._apply_retention('performance.score')
+
+        assert Score.search([('indicator_id', '=', indicator.id)]).mapped('value') == [60.0]
+        summary = env['performance.score.summary'].search([('indicator_id', '=', indicator.id)])
+        assert len(summary) == 1 and summary.period_key == 'q1:2020'
+        assert summary.score_count == 2 and summary.last_value == 40.0
+
+
+def test_retention_keeps_kpi_history(env):
+    with rolled_back(env):
+        env['ir.config_parameter'].sudo().set_param('robust_pmis.score_retention_months', '12')
+        _goal, _objective, kra = seed_strategy(env, 'RET')
+        kpi = seed_kpis(env, kra, 'RET', current_value=30.0)
+        Score = env['performance.score']
+        Score.snapshot('q1:2020', date(2020, 9, 30), period='q1', notes='RET')
+        Score.snapshot('q2:2020', date(2020, 12, 31), period='q2', notes='RET')
+        env['performance.history.partition']._apply_retention('performance.score')
+
+        assert not Score.search([('kpi_id', '=', kpi.id), ('date', '<', date(2021, 1, 1))])
+        summaries = env['performance.score.summary'].search([('kpi_id', '=', kpi.id)], order='period_start')
+        assert summaries.mapped('period_key') == ['q1:2020', 'q2:2020']
+        assert not summaries.indicator_id and set(summaries.mapped('last_achievement')) == {30.0}
+
+
+def run(env):
+    test_period_bounds(env)
+    test_retention_compacts_old_scores(env)
+    test_retention_keeps_kpi_history(env)
+    return True
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the batched side effects of performance indicator value changes.
+"""
+from robust_pmis.tests.common import rolled_back, seed_indicators
+
+
+def test_mass_write_batches_side_effects(env):
+    with rolled_back(env):
+        indicators = seed_indicators(env, 'VAL', 3)
+        indicators.with_context(pmis_indicator_chatter='immediate').write({'current_value': 40.0})
+        # Unchanged values produce no side effects
+        indicators[:1].write({'current_value': 40.0})
+        env['performance.indicator']._flush_value_changes()
+
+        actions = env['performance.action'].search([('indicator_id', 'in', indicators.ids)])
+        assert len(actions) == 3
+        assert set(actions.mapped('previous_value')) == {10.0}
+        assert not any(actions.mapped('chatter_pending'))
+        scores = env['performance.score'].search([('indicator_id', 'in', indicators.ids)])
+        assert len(scores) == 3 and scores.action_id == actions
+        assert set(scores.mapped('achievement_percentage')) == set(indicators.mapped('achievement_percentage'))
+        logs = env['audit.log'].search([
+            ('model_name', '=', 'performance.indicator'), ('record_id', 'in', indicators.ids),
+            ('field_name', '=', 'current_value'),
+        ])
+        assert len(logs) == 3
+        notes = env['mail.message'].search([
+            ('model', '=', 'performance.indicator'), ('res_id', 'in', indicators.ids),
+            ('body', 'ilike', 'Value Updated'),
+        ])
+        assert len(notes) == 3
+
+
+def test_deferred_notes_are_posted_by_cron(env):
+    with rolled_back(env):
+        indicators = seed_indicators(env, 'VAL', 2)
+        indicators.with_context(pmis_indicator_chatter='deferred').write({'current_value': 20.0})
+        indicators.with_context(pmis_indicator_chatter='deferred').write({'current_value': 30.0})
+        env['performance.indicator']._flush_value_changes()
+
+        Message = env['mail.message']
+        notes_domain = [
+            ('model', '=', 'performance.indicator'), ('res_id', 'in', indicators.ids),
+            ('body', 'ilike', 'Value Updated'),
+        ]
+        assert not Message.search_count(notes_domain)
+        env['performance.action'].cron_post_pending_chatter()
+        # Two changes per indicator keep two separate notes
+        assert Message.search_count(notes_domain) == 4
+        assert not env['performance.action'].search_count([
+            ('indicator_id', 'in', indicators.ids), ('chatter_pending', '=', True)])
+
+
+def run(env):
+    test_mass_write_batches_side_effects(env)
+    test_deferred_notes_are_posted_by_cron(env)
+    return True
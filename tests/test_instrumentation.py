@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the endpoint instrumentation: percentile estimation, per-call
+aggregation and storage of the buffered stats.
+"""
+from odoo import fields
+
+from robust_pmis.models import performance_instrumentation as instrumentation
+from robust_pmis.tests.common import rolled_back
+
+
+def test_percentile(env):
+    Instrumentation = env['performance.instrumentation']
+    histogram = [0] * (len(instrumentation._BUCKETS_MS) + 1)
+    # 10 calls in the 10-25 ms bucket
+    histogram[2] = 10
+    assert Instrumentation._percentile(histogram, 10, 20.0, 0.5) == 17.5
+    assert Instrumentation._percentile(histogram, 10, 20.0, 0.95) == 20.0
+    assert Instrumentation._percentile(histogram, 0, 0.0, 0.5) == 0.0
+
+
+def test_probe_aggregates_queries(env):
+    key = (env.cr.dbname, 'route', 'test:probe', fields.Date.today())
+    instrumentation._PENDING.pop(key, None)
+    with instrumentation._probe(env, 'route', 'test:probe') as probe:
+        env.cr.execute("SELECT 1")
+        env.cr.execute("SELECT id FROM res_users LIMIT 1")
+    assert probe.queries >= 2
+    agg = instrumentation._PENDING.pop(key)
+    assert agg['calls'] == 1 and agg['queries'] == probe.queries
+    assert sum(agg['histogram']) == 1
+
+
+def test_store_merges_days(env):
+    with rolled_back(env):
+        Instrumentation = env['performance.instrumentation']
+        day = fields.Date.today()
+        histogram = [0] * (len(instrumentation._BUCKETS_MS) + 1)
+        histogram[3] = 2
+        agg = {'calls': 2, 'total_ms': 80.0, 'sql_ms': 30.0, 'queries': 10, 'rows': 4, 'max_ms': 45.0,
+               'histogram': histogram}
+        key = (env.cr.dbname, 'route', 'test:store', day)
+        Instrumentation._store({key: dict(agg, histogram=list(histogram))}, [])
+        Instrumentation._store({key: dict(agg, histogram=list(histogram))}, [])
+        stat = env['performance.endpoint.stat'].search([('endpoint', '=', 'test:store'), ('day', '=', day)])
+        assert len(stat) == 1
+        assert stat.call_count == 4 and stat.query_count == 20
+        assert stat.avg_ms == 40.0 and stat.avg_queries == 5.0
+        assert 25.0 <= stat.p50_ms <= 45.0
+
+
+def run(env):
+    test_percentile(env)
+    test_probe_aggregates_queries(env)
+    test_store_merges_days(env)
+    return True
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the unified KPI fact table: rows follow KPI and indicator writes
+and carry the fiscal period and hierarchy keys.
+"""
+from datetime import date
+
+from robust_pmis.tests.common import (
+    FY_2024, rolled_back, seed_indicators, seed_kpis, seed_programme, seed_strategy,
+)
+
+
+def test_facts_follow_sources(env):
+    with rolled_back(env):
+        goal, objective, kra = seed_strategy(env, 'UKF')
+        kpi = seed_kpis(env, kra, 'UKF', current_value=50.0, start_date=date(2025, 1, 1))
+        programme = seed_programme(env, 'UKF')
+        indicator = seed_indicators(env, 'UKF', programme=programme, target_value=10.0, current_value=5.0,
+                                    parent_strategic_kpi_id=kpi.id, **FY_2024)
+        Unified = env['kpi.unified']
+
+        row = Unified.search([('source_model', '=', kpi._name), ('source_id', '=', kpi.id)])
+        assert len(row) == 1 and row.kind == 'strategic'
+        assert (row.fiscal_year, row.fiscal_quarter) == (2024, 'q3')
+        assert row.goal_id == goal and row.objective_id == objective
+        assert row.achievement_percentage == 50.0
+
+        ind_row = Unified.search([('source_model', '=', indicator._name), ('source_id', '=', indicator.id)])
+        assert ind_row.kind == 'programme' and ind_row.programme_id == programme
+        assert ind_row.is_linked and ind_row.fiscal_quarter == 'q1'
+
+        kpi.write({'current_value': 80.0})
+        indicator.unlink()
+        row = Unified.search([('source_model', '=', kpi._name), ('source_id', '=', kpi.id)])
+        assert row.achievement_percentage == 80.0
+        assert not Unified.search_count([('source_model', '=', 'performance.indicator'),
+                                         ('source_id', '=', ind_row.source_id)])
+
+
+def run(env):
+    test_facts_follow_sources(env)
+    return True
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the notification digest: sections queued during a run reach each
+recipient as one email, left to the mail queue instead of being sent inline.
+"""
+from robust_pmis.tests.common import rolled_back
+
+
+def test_one_queued_email_per_recipient(env):
+    with rolled_back(env):
+        Users = env['res.users'].with_context(no_reset_password=True)
+        alice, bob = Users.create([{'name': f'DIG {name}', 'login': f'dig_{name}@example.com',
+                                    'email': f'dig_{name}@example.com'} for name in ('alice', 'bob')])
+        Digest = env['performance.notification.digest']
+        Digest.add(alice | bob, 'DIG Weekly Summary', '<p>DIG weekly</p>', category='Weekly')
+        Digest.add(alice, 'DIG Reminder', '<p>DIG reminder</p>', category='Reminders')
+
+        assert Digest.flush() == 2
+        mails = env['mail.mail'].search([('recipient_ids', 'in', (alice | bob).partner_id.ids)])
+        by_partner = {mail.recipient_ids: mail for mail in mails}
+        assert set(by_partner) == {alice.partner_id, bob.partner_id}
+        assert by_partner[bob.partner_id].subject == 'DIG Weekly Summary'
+        alice_mail = by_partner[alice.partner_id]
+        assert 'DIG weekly' in alice_mail.body_html and 'DIG reminder' in alice_mail.body_html
+        assert set(mails.mapped('state')) == {'outgoing'}
+        # Nothing left to send at commit
+        assert Digest.flush() == 0
+
+
+def test_cron_queues_instead_of_sending(env):
+    with rolled_back(env):
+        last_id = env['mail.mail'].search([], order='id desc', limit=1).id or 0
+        env['performance.score'].cron_weekly_performance_summary()
+        directors = env['kcca.directorate'].search([('active', '=', True)]).director_id.filtered('email')
+        queued = env['mail.mail'].search([('id', '>', last_id)])
+        assert len(queued) == len(directors)
+        assert all(mail.state == 'outgoing' for mail in queued)
+
+
+def run(env):
+    test_one_queued_email_per_recipient(env)
+    test_cron_queues_instead_of_sending(env)
+    return True
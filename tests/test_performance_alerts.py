@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the set-based alert checks: candidates are de-duplicated against
+recent alerts and created in one batch, each recipient gets one digest per
+cron run.
+Score-history trends drive the indicator decline and missed-target alerts.
+"""
+from datetime import date, timedelta
+
+from robust_pmis.tests.common import rolled_back, seed_indicators, seed_kpis, seed_strategy
+
+
+def test_decline_alerts_are_deduplicated(env):
+    with rolled_back(env):
+        _goal, _objective, kra = seed_strategy(env, 'PAL')
+        user = env['res.users'].create({'name': 'PAL Owner', 'login': 'pal_owner@example.com',
+                                        'email': 'pal_owner@example.com'})
+        today = date.today()
+        kpis = seed_kpis(env, kra, 'PAL', 3, current_value=10.0, responsible_user_id=user.id,
+                         start_date=today - timedelta(days=30), end_date=today + timedelta(days=2))
+        Alert = env['performance.alert']
+
+        created = Alert._check_kpi_performance_decline()
+        mine = created.filtered(lambda alert: alert.kpi_id in kpis)
+        assert len(mine) == 3 and all(mine.mapped('notification_sent'))
+        assert set(mine.mapped('severity')) == {'critical'}
+
+        # One digest for the owner covering the three alerts
+        digests = env['mail.message'].search([('partner_ids', 'in', user.partner_id.ids),
+                                              ('message_type', '=', 'user_notification')])
+        assert len(digests) == 1 and '3 new performance alerts' in digests.subject
+
+        # A second run inside the de-duplication window creates nothing for these KPIs
+        again = Alert._check_kpi_performance_decline()
+        assert not again.filtered(lambda alert: alert.kpi_id in kpis)
+
+        deadlines = Alert._check_approaching_deadlines().filtered(lambda alert: alert.kpi_id in kpis)
+        assert len(deadlines) == 3 and set(deadlines.mapped('severity')) == {'urgent'}
+
+
+def test_cron_sends_one_digest_per_recipient(env):
+    with rolled_back(env):
+        _goal, _objective, kra = seed_strategy(env, 'PAL')
+        user = env['res.users'].create({'name': 'PAL Owner', 'login': 'pal_owner@example.com',
+                                        'email': 'pal_owner@example.com'})
+        today = date.today()
+        kpis = seed_kpis(env, kra, 'PAL', 2, current_value=10.0, responsible_user_id=user.id,
+                         start_date=today - timedelta(days=30), end_date=today + timedelta(days=2))
+
+        env['performance.alert'].cron_check_performance_alerts()
+        mine = env['performance.alert'].search([('kpi_id', 'in', kpis.ids)])
+        assert set(mine.mapped('alert_type')) == {'performance_decline', 'deadline_approaching'}
+        assert len(mine) == 4 and all(mine.mapped('notification_sent'))
+        # Decline and deadline alerts of the run share a single digest
+        digests = env['mail.message'].search([('partner_ids', 'in', user.partner_id.ids),
+                                              ('message_type', '=', 'user_notification')])
+        assert len(digests) == 1 and '4 new performance alerts' in digests.subject
+
+
+def test_score_trend_alerts(env):
+    with rolled_back(env):
+        today = date.today()
+        falling, steady = seed_indicators(env, 'PAL', 2, current_value=40.0, start_date=today - timedelta(days=720),
+                                          end_date=today + timedelta(days=365))
+        # Six scores 60 days apart, the latest today
+        history = {falling: [90.0, 85.0, 80.0, 60.0, 50.0, 40.0], steady: [100.0] * 6}
+        env['performance.score'].create([{
+            'indicator_id': indicator.id, 'date': today - timedelta(days=60 * (5 - i)),
+            'value': achievement, 'target_value': 100.0, 'achievement_percentage': achievement,
+        } for indicator, achievements in history.items() for i, achievement in enumerate(achievements)])
+
+        trends = env['performance.score']._analyze_trends(as_of=today)
+        trend = trends[falling.id]
+        assert trend['points'] == 6 and trend['last_achievement'] == 40.0
+        assert trend['slope'] < 0 and trend['projected_achievement'] < 40.0
+        assert abs(trend['recent_avg'] - 50.0) < 1e-6 and abs(trend['previous_avg'] - 85.0) < 1e-6
+        assert abs(trends[steady.id]['slope']) < 1e-9
+        assert abs(trends[steady.id]['projected_achievement'] - 100.0) < 1e-6
+
+        Alert = env['performance.alert']
+        declines = Alert._check_indicator_decline(trends)
+        assert declines.mapped('indicator_id') & (falling | steady) == falling
+        misses = Alert._check_missed_targets(trends)
+        assert misses.mapped('indicator_id') & (falling | steady) == falling
+        assert misses.filtered(lambda alert: alert.indicator_id == falling).severity == 'critical'
+        # De-duplicated on the next run
+        assert not Alert._check_indicator_decline(trends).filtered(lambda alert: alert.indicator_id == falling)
+
+
+def run(env):
+    test_decline_alerts_are_deduplicated(env)
+    test_cron_sends_one_digest_per_recipient(env)
+    test_score_trend_alerts(env)
+    return True
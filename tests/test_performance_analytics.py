@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the batched weekly trend analysis: the vectorized statistics match
+the pure-Python ones, one record is created per changed indicator and
+unchanged inputs are skipped on the next run.
+"""
+from datetime import date, timedelta
+
+from robust_pmis.models import performance_analytics
+from robust_pmis.tests.common import rolled_back, seed_indicators
+
+
+def test_trend_stats_match(env):
+    series = [[50.0, 60.0, 70.0], [90.0, 85.0, 80.0, 60.0, 55.0], [75.0, 75.0, 75.0, 75.0]]
+    expected = performance_analytics._trend_stats_python(series)
+    if performance_analytics.numpy is not None:
+        vectorized = performance_analytics._trend_stats_numpy(series)
+        for left, right in zip(expected, vectorized):
+            assert left.keys() == right.keys()
+            for key in left:
+                assert abs(left[key] - right[key]) < 1e-9, (key, left[key], right[key])
+    assert expected[1]['recent_avg'] == 65.0 and expected[1]['earlier_avg'] == 85.0
+    assert expected[2]['volatility'] == 0.0
+
+
+def test_trend_analysis_skips_unchanged(env):
+    with rolled_back(env):
+        indicator = seed_indicators(env, 'PAN', current_value=0.0, start_date=date.today() - timedelta(days=120),
+                                    end_date=date.today() + timedelta(days=240))
+        programme = indicator.programme_id
+        Score = env['performance.score']
+        today = date.today()
+        for offset, achievement in ((40, 90.0), (30, 85.0), (20, 70.0), (10, 60.0), (5, 50.0)):
+            Score.create({
+                'indicator_id': indicator.id, 'date': today - timedelta(days=offset),
+                'value': achievement, 'achievement_percentage': achievement,
+            })
+        Analytics = env['performance.analytics']
+
+        first = Analytics._generate_kpi_trend_analysis()
+        analysis = first.filtered(lambda a: a.indicator_id == indicator)
+        assert len(analysis) == 1 and analysis.scope == 'indicator' and analysis.programme_id == programme
+        assert analysis.data_points == 5 and analysis.input_signature
+        assert analysis.risk_level == 'high' and analysis.confidence_score == 5 / 12 * 100
+
+        # Same scores: nothing to re-analyse
+        second = Analytics._generate_kpi_trend_analysis()
+        assert not second.filtered(lambda a: a.indicator_id == indicator)
+
+        Score.create({
+            'indicator_id': indicator.id, 'date': today, 'value': 95.0, 'achievement_percentage': 95.0,
+        })
+        third = Analytics._generate_kpi_trend_analysis()
+        analysis = third.filtered(lambda a: a.indicator_id == indicator)
+        assert len(analysis) == 1 and analysis.data_points == 6
+
+
+def run(env):
+    test_trend_stats_match(env)
+    test_trend_analysis_skips_unchanged(env)
+    return True
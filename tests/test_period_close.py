@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the period close: closing a fiscal year freezes its rollups, every
+user is served the figures as they stood at the close even after its KPIs
+change, frozen rows cannot be edited, and reopening needs a reason and
+brings the live figures back.
+"""
+from datetime import date
+
+from odoo.exceptions import UserError
+
+from robust_pmis.tests.common import FY_2024, rolled_back, seed_kpis, seed_strategy
+
+
+def _expect_user_error(func):
+    try:
+        func()
+    except UserError:
+        return
+    raise AssertionError("UserError expected")
+
+
+def test_close_and_reopen(env):
+    filters = {'data_type': 'strategic', 'scope': 'organization', 'entity': 'all', 'performance': 'all',
+               'period': 'fy:2024'}
+    with rolled_back(env):
+        goal, _objective, kra = seed_strategy(env, 'PCL')
+        kpi = seed_kpis(env, kra, 'PCL', current_value=40.0, **FY_2024)
+        dashboard = env['performance.dashboard'].search([], limit=1) or env['performance.dashboard'].create({})
+        Close = env['performance.period.close']
+        _expect_user_error(lambda: Close.close_period('fy:%s' % date.today().year))
+        _expect_user_error(lambda: Close.close_period('fy:2020'))
+
+        live = dashboard._compute_filtered_dashboard_data(filters)
+        close = Close.close_period('fy:2024')
+        assert close.state == 'closed' and close.snapshot_count > 0
+        _expect_user_error(lambda: Close.close_period('fy:2024'))
+
+        frozen = dashboard.get_filtered_dashboard_data(dict(filters))
+        assert frozen['summary']['filtered_kpis'] == live['summary']['filtered_kpis']
+        assert frozen['summary']['kpi_only_performance'] == live['summary']['kpi_only_performance']
+        goal_filters = dict(filters, scope='strategic_goal', entity=str(goal.id))
+        frozen_goal = dashboard.get_filtered_dashboard_data(goal_filters)
+        assert frozen_goal['summary']['filtered_kpis'] == 1
+        assert frozen_goal['summary']['kpi_only_performance'] == 40.0
+
+        # Later changes to the period's KPIs reach no user
+        kpi.write({'current_value': 95.0})
+        assert dashboard._compute_filtered_dashboard_data(filters)['summary'] != live['summary']
+        viewer = env['res.users'].create({
+            'name': 'PCL Viewer', 'login': 'pcl_viewer@example.com',
+            'groups_id': [(6, 0, [env.ref('robust_pmis.group_kcca_pmis_user').id])],
+        })
+        for user_dashboard in (dashboard, dashboard.with_user(viewer)):
+            assert user_dashboard.get_filtered_dashboard_data(dict(filters))['summary'] == frozen['summary']
+            assert user_dashboard.get_filtered_dashboard_data(dict(goal_filters))['summary'] == frozen_goal['summary']
+
+        snapshot = env['performance.period.snapshot'].search([('close_id', '=', close.id)], limit=1)
+        _expect_user_error(lambda: snapshot.write({'record_count': 0}))
+        _expect_user_error(lambda: snapshot.unlink())
+
+        _expect_user_error(close.action_reopen)
+        close.reopen_reason = 'PCL correction of FY 2024/25 actuals'
+        close.action_reopen()
+        assert close.state == 'reopened' and not env['performance.period.snapshot'].search_count(
+            [('close_id', '=', close.id)])
+        reopened = dashboard.get_filtered_dashboard_data(dict(goal_filters))
+        assert reopened['summary']['kpi_only_performance'] == 95.0
+
+
+def run(env):
+    test_close_and_reopen(env)
+    return True
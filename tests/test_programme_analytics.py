@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the strategic-programme analytics materialized view: rows keep
+their ids across refreshes and the one-pass report matches the rows.
+"""
+from robust_pmis.tests.common import FY_2024, rolled_back, seed_kpis, seed_programme, seed_strategy
+
+
+def test_refresh_and_report(env):
+    with rolled_back(env):
+        _goal, _objective, kra = seed_strategy(env, 'SPA')
+        kpi = seed_kpis(env, kra, 'SPA', current_value=90.0, auto_calculate=True, thematic_area='health')
+        programme = seed_programme(env, 'SPA')
+        indicators = env['performance.indicator'].create([{
+            'name': f'SPA Indicator {i}', 'programme_id': programme.id, 'target_value': 10.0, 'current_value': value,
+            'contribution_weight': weight, 'strategic_kpi_ids': [(6, 0, [kpi.id])], **FY_2024,
+        } for i, (value, weight) in enumerate([(9.0, 40.0), (4.0, 10.0)])])
+        Analytics = env['strategic.programme.analytics']
+
+        Analytics.refresh()
+        rows = Analytics.search([('strategic_kpi_id', '=', kpi.id)])
+        assert len(rows) == 2
+        assert set(rows.mapped('programme_indicator_id')) == set(indicators)
+        ids = set(rows.ids)
+
+        indicators[1].write({'current_value': 6.0})
+        Analytics.refresh()
+        rows = Analytics.search([('strategic_kpi_id', '=', kpi.id)])
+        assert set(rows.ids) == ids, "ids must survive a refresh"
+        assert sorted(rows.mapped('programme_current')) == [6.0, 9.0]
+
+        # A pair keeps its id when it is unlinked and linked again
+        indicators[1].write({'strategic_kpi_ids': [(3, kpi.id)]})
+        Analytics.refresh()
+        assert len(Analytics.search([('strategic_kpi_id', '=', kpi.id)])) == 1
+        indicators[1].write({'strategic_kpi_ids': [(4, kpi.id)]})
+        Analytics.refresh()
+        assert set(Analytics.search([('strategic_kpi_id', '=', kpi.id)]).ids) == ids
+
+        report = Analytics.generate_strategic_programme_report()
+        linkage = [item for item in report['linkage_effectiveness'] if item['strategic_kpi_name'] == 'SPA KPI']
+        assert len(linkage) == 1 and linkage[0]['linked_indicators_count'] == 2
+        assert linkage[0]['alignment_status'] == 'Strategic Success, Programme Gaps'
+        contribution = [item['impact_level'] for item in report['contribution_analysis']
+                        if item['strategic_kpi_name'] == 'SPA KPI']
+        assert contribution == ['High Impact', 'Low Impact']
+        assert report['overall_stats']['total_linkages'] == Analytics.search_count([])
+        assert any(item['thematic_area'] == 'health' for item in report['thematic_summary'])
+    env['strategic.programme.analytics'].refresh()
+
+
+def run(env):
+    test_refresh_and_report(env)
+    return True
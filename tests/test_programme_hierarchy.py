@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the programme results-chain closure table.
+"""
+from robust_pmis.tests.common import rolled_back
+
+
+def _seed_chain(env, programme, tag):
+    objective = env['programme.objective'].create({'name': f'{tag} Objective', 'programme_id': programme.id})
+    outcome = env['intermediate.outcome'].create({'name': f'{tag} Outcome', 'objective_id': objective.id})
+    intervention = env['intervention'].create({'name': f'{tag} Intervention', 'outcome_id': outcome.id})
+    output = env['output'].create({'name': f'{tag} Output', 'intervention_id': intervention.id})
+    piap = env['piap.action'].create({'name': f'{tag} PIAP', 'output_id': output.id})
+    return objective, outcome, intervention, output, piap
+
+
+def test_closure_follows_chain_changes(env):
+    with rolled_back(env):
+        Closure = env['programme.hierarchy.closure']
+        directorate = env['kcca.directorate'].create({'name': 'HIER Directorate'})
+        prog_a = env['kcca.programme'].create({'name': 'HIER Programme A', 'directorate_id': directorate.id})
+        prog_b = env['kcca.programme'].create({'name': 'HIER Programme B', 'directorate_id': directorate.id})
+        _obj_a, outcome_a, intervention_a, output_a, piap_a = _seed_chain(env, prog_a, 'HIER A')
+        _obj_b, outcome_b, _intervention_b, _output_b, _piap_b = _seed_chain(env, prog_b, 'HIER B')
+        Indicator = env['performance.indicator']
+        ind_output = Indicator.create({'name': 'HIER via output', 'output_id': output_a.id,
+                                       'responsible_directorate_id': directorate.id})
+        ind_piap = Indicator.create({'name': 'HIER via PIAP', 'piap_action_id': piap_a.id})
+        ind_direct = Indicator.create({'name': 'HIER direct', 'programme_id': prog_b.id})
+
+        owners = Closure._get_ancestor_ids('performance.indicator', [ind_output.id, ind_piap.id, ind_direct.id],
+                                           'kcca.programme')
+        assert owners == {ind_output.id: {prog_a.id}, ind_piap.id: {prog_a.id}, ind_direct.id: {prog_b.id}}
+
+        rel = env['programme.directorate.rel'].search([
+            ('programme_id', '=', prog_a.id), ('directorate_id', '=', directorate.id)], limit=1)
+        if not rel:
+            rel = env['programme.directorate.rel'].create({
+                'programme_id': prog_a.id, 'directorate_id': directorate.id})
+        assert rel.intermediate_outcome_count == 1
+        assert rel.piap_action_count == 1
+        assert set(rel.all_programme_indicator_ids.ids) == {ind_output.id, ind_piap.id}
+        assert rel.contributing_indicator_ids.ids == [ind_output.id]
+        assert rel in env['programme.directorate.rel'].search([('owned_indicator_count', '>', 0)])
+        assert rel in env['programme.directorate.rel'].search([('contributing_indicator_ids', 'in', [ind_output.id])])
+
+        # Moving an intervention moves its whole subtree to the other programme
+        intervention_a.write({'outcome_id': outcome_b.id})
+        under_b = Closure._get_descendant_ids('kcca.programme', [prog_b.id], 'performance.indicator')[prog_b.id]
+        assert {ind_output.id, ind_piap.id, ind_direct.id} <= under_b
+        assert prog_a.id not in Closure._get_descendant_ids('kcca.programme', [prog_a.id], 'performance.indicator')
+
+        # Deleting a node drops its subtree
+        output_a.unlink()
+        env.cr.execute("""
+            SELECT COUNT(*) FROM programme_hierarchy_closure
+             WHERE descendant_model = 'piap.action' AND descendant_id = %s
+        """, [piap_a.id])
+        assert env.cr.fetchone()[0] == 0
+
+        # The incremental result matches a full rebuild
+        env.cr.execute("SELECT ancestor_model, ancestor_id, descendant_model, descendant_id, depth "
+                       "FROM programme_hierarchy_closure ORDER BY 1, 2, 3, 4")
+        incremental = env.cr.fetchall()
+        Closure.rebuild_all()
+        env.cr.execute("SELECT ancestor_model, ancestor_id, descendant_model, descendant_id, depth "
+                       "FROM programme_hierarchy_closure ORDER BY 1, 2, 3, 4")
+        assert incremental == env.cr.fetchall()
+
+
+def run(env):
+    test_closure_follows_chain_changes(env)
+    return True
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the score snapshot: one row per KPI or indicator and period, the
+stored fields match the ORM computations and a second run inserts nothing;
+late captures are dated on the capture day, never backdated.
+"""
+from datetime import date, datetime, timedelta
+
+from robust_pmis.tests.common import rolled_back, seed_indicators, seed_kpis, seed_strategy
+
+
+def test_snapshot_is_idempotent(env):
+    with rolled_back(env):
+        _goal, _objective, kra = seed_strategy(env, 'SNP')
+        kpi = seed_kpis(env, kra, 'SNP', target_value=200.0, current_value=150.0)
+        indicator = seed_indicators(env, 'SNP', target_value=10.0, current_value=9.0,
+                                    start_date=date(2024, 7, 1), end_date=date(2025, 6, 30))
+        Score = env['performance.score']
+
+        # Calendar Q1 2025 is fiscal Q3 of FY 2024/25
+        period_key, period, snapshot_date = Score._snapshot_period('quarterly', date(2025, 3, 31))
+        assert (period_key, period, snapshot_date) == ('q3:2024', 'q3', date(2025, 3, 31))
+
+        first = Score.snapshot(period_key, snapshot_date, period=period, notes='SNP')
+        assert first['performance.indicator'] >= 1 and first['key.performance.indicator'] >= 1
+        second = Score.snapshot(period_key, snapshot_date, period=period, notes='SNP')
+        assert second == {'performance.indicator': 0, 'key.performance.indicator': 0}
+
+        kpi_score = Score.search([('kpi_id', '=', kpi.id), ('period_key', '=', period_key)])
+        assert len(kpi_score) == 1 and not kpi_score.indicator_id
+        assert kpi_score.achievement_percentage == 75.0 and kpi_score.status == 'at_risk'
+        assert kpi_score.display_name == 'SNP KPI - 2025-03-31 (75.0%)'
+
+        ind_score = Score.search([('indicator_id', '=', indicator.id), ('period_key', '=', period_key)])
+        assert len(ind_score) == 1 and ind_score.value == 9.0 and ind_score.year == 2025
+        assert ind_score.programme_name == indicator.parent_programme_id.name
+        assert ind_score.status == 'on_track'
+
+
+def test_capture_is_not_backdated(env):
+    with rolled_back(env):
+        _goal, _objective, kra = seed_strategy(env, 'SNL')
+        kpi = seed_kpis(env, kra, 'SNL', current_value=40.0, start_date=date(2023, 7, 1), end_date=date(2024, 6, 30))
+        Score = env['performance.score']
+        today = date.today()
+
+        # Records created after the period end are left out of a backdated capture
+        Score.snapshot('q1:2019', date(2019, 9, 30), period='q1', notes='SNL',
+                       created_before=datetime(2019, 10, 1))
+        assert not Score.search([('kpi_id', '=', kpi.id), ('period_key', '=', 'q1:2019')])
+
+        # Long past the grace window: captured today, under the period key
+        Score._capture_period('quarterly', date(2023, 9, 30), notes='SNL')
+        score = Score.search([('kpi_id', '=', kpi.id), ('period_key', '=', 'q1:2023')])
+        assert len(score) == 1 and score.date == today
+
+        # Later runs do not add a row on another date
+        again = Score._capture_period('quarterly', date(2023, 9, 30), notes='SNL')
+        assert again == {'performance.indicator': 0, 'key.performance.indicator': 0}
+
+        # An open period is not captured at all
+        assert Score._capture_period('quarterly', today + timedelta(days=100)) == {}
+
+
+def test_wizard_quarter_maps_to_fiscal_key(env):
+    Score = env['performance.score']
+    for quarter, expected in (('q1', 'q3:2024'), ('q2', 'q4:2024'), ('q3', 'q1:2025'), ('q4', 'q2:2025')):
+        wizard = env['quarterly.report.wizard'].new({'year': 2025, 'quarter': quarter})
+        fiscal_quarter, fiscal_year = wizard._get_fiscal_quarter()
+        assert f'{fiscal_quarter}:{fiscal_year}' == expected
+        assert Score._snapshot_period('quarterly', wizard._get_quarter_dates()[1])[0] == expected
+
+
+def run(env):
+    test_snapshot_is_idempotent(env)
+    test_capture_is_not_backdated(env)
+    test_wizard_quarter_maps_to_fiscal_key(env)
+    return True
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the bulk per-FY indicator value ingestion.
+"""
+from odoo.exceptions import ValidationError
+
+from robust_pmis.tests.common import rolled_back, seed_indicators
+
+
+def test_ingest_upserts_fy_columns(env):
+    with rolled_back(env):
+        indicators = seed_indicators(env, 'ING', 3)
+        Ingest = env['performance.value.ingest']
+        csv_payload = (
+            "indicator,fy,target,actual\n"
+            f"{indicators[0].id},2024/25,50,20\n"
+            f"ING Indicator 1,FY 2025/26,80,\n"
+            f"{indicators[2].id},2024_25,,35\n"
+        )
+        result = Ingest.ingest_payload(csv_payload, 'csv')
+        assert result['updated'] == 3 and not result['errors']
+        assert (indicators[0].target_fy2024_25, indicators[0].actual_fy2024_25) == (50.0, 20.0)
+        assert indicators[1].target_fy2025_26 == 80.0 and indicators[1].actual_fy2025_26 == 0.0
+        assert indicators[2].actual_fy2024_25 == 35.0
+        # Unchanged rows are not rewritten
+        assert Ingest.ingest([[indicators[0].id, '2024', 50, 20]])['updated'] == 0
+
+        rows = [
+            {'indicator': indicators[0].id, 'fy': '2024/25', 'target': 60},
+            {'indicator': indicators[0].id, 'fy': '2024/25', 'target': 70},
+            {'indicator': 'ING Missing', 'fy': '2024/25', 'target': 1},
+            {'indicator': indicators[1].id, 'fy': '1999/00', 'target': 1},
+            {'indicator': indicators[1].id, 'fy': '2024/25', 'target': 'abc'},
+        ]
+        try:
+            Ingest.ingest(rows)
+            raise AssertionError("invalid rows must abort the load")
+        except ValidationError:
+            pass
+        result = Ingest.ingest(rows, on_error='skip')
+        assert [row_no for row_no, _message in result['errors']] == [2, 3, 4, 5]
+        assert indicators[0].target_fy2024_25 == 60.0
+
+
+def test_ingest_updates_current_values_once(env):
+    with rolled_back(env):
+        indicators = seed_indicators(env, 'ING', 2)
+        Ingest = env['performance.value.ingest']
+        fy = Ingest._current_fy_key()
+        result = Ingest.with_context(pmis_indicator_chatter='disabled').ingest([
+            {'indicator': rec.id, 'fy': fy, 'target': 200, 'actual': 150} for rec in indicators
+        ], update_current=True)
+        assert result['updated'] == 2
+        assert set(indicators.mapped('current_value')) == {150.0}
+        assert set(indicators.mapped('achievement_percentage')) == {75.0}
+        assert set(indicators.mapped('status')) == {'at_risk'}
+        env['performance.indicator']._flush_value_changes()
+        actions = env['performance.action'].search([('indicator_id', 'in', indicators.ids)])
+        assert len(actions) == 2 and set(actions.mapped('previous_value')) == {10.0}
+
+
+def run(env):
+    test_ingest_upserts_fy_columns(env)
+    test_ingest_updates_current_values_once(env)
+    return True
@@ -91,6 +91,21 @@ class QuarterlyReportWizard(models.TransientModel):
         
         return start_date, end_date
     
+    def _get_fiscal_quarter(self):
+        """Map the selected calendar quarter to (fiscal quarter, fiscal year).
+
+        Fiscal years run July-June and are named after the year they start in,
+        e.g. calendar Q1 2025 (Jan-Mar) is fiscal Q3 of FY 2024/25.
+        """
+        fiscal_quarters = {
+            'q1': ('q3', -1),
+            'q2': ('q4', -1),
+            'q3': ('q1', 0),
+            'q4': ('q2', 0),
+        }
+        fiscal_quarter, year_offset = fiscal_quarters[self.quarter]
+        return fiscal_quarter, self.year + year_offset
+
     def action_generate_report(self):
         """Generate the quarterly performance report"""
         start_date, end_date = self._get_quarter_dates()
@@ -109,27 +124,14 @@ class QuarterlyReportWizard(models.TransientModel):
             return self._generate_comprehensive_report(start_date, end_date)
     
     def _create_quarterly_scores(self, start_date, end_date):
-        """Create quarterly performance score records"""
-        # Create scores for KPIs
-        kpis = self.env['key.performance.indicator'].search([('active', '=', True)])
-        for kpi in kpis:
-            existing_score = self.env['performance.score'].search([
-                ('indicator_id', '=', kpi.id),
-                ('date', '>=', start_date),
-                ('date', '<=', end_date),
-                ('period', '=', self.quarter),
-            ], limit=1)
-            
-            if not existing_score:
-                self.env['performance.score'].create({
-                    'indicator_id': kpi.id,
-                    'date': end_date,
-                    'value': kpi.current_value,
-                    'achievement_percentage': kpi.achievement_percentage,
-                    'target_value': kpi.target_value,
-                    'period': self.quarter,
-                    'notes': f'Quarterly score for {self.quarter.upper()} {self.year}',
-                })
+        """Snapshot KPIs and indicators for the quarter once it has closed"""
+        if end_date >= fields.Date.context_today(self):
+            # Open quarter: the report reads live values, nothing to freeze yet
+            return {}
+        fiscal_quarter, fiscal_year = self._get_fiscal_quarter()
+        notes = (f'Quarterly score for fiscal {fiscal_quarter.upper()} FY {fiscal_year}/{(fiscal_year + 1) % 100:02d} '
+                 f'(calendar {self.quarter.upper()} {self.year})')
+        return self.env['performance.score']._capture_period('quarterly', end_date, notes=notes)
     
     def _generate_strategic_report(self, start_date, end_date):
         """Generate strategic goals performance report"""